@@ -4,7 +4,7 @@ Maven Service - Flask API Entry Point
 CFO & CTO of Mother Haven - Treasury, Trading, and Technology.
 Provides health, status, treasury tracking, and trading analysis endpoints.
 """
-from flask import Flask, jsonify, request
+from flask import Flask, Response, jsonify, request
 from flask_cors import CORS
 import os
 import sys
@@ -22,41 +22,132 @@ CORS(app)
 
 # Maven base directory for accessing git-first data
 MAVEN_BASE_DIR = os.getenv('MAVEN_BASE_DIR', '/app')
+MAVEN_DATA_DIR = os.path.join(MAVEN_BASE_DIR, '.moha', 'maven')
 
-# Import database connection context manager
+# Import request-scoped database sessions
 try:
-    from database.connection import get_db_connection as _get_db_connection
+    from database.connection import execute_prepared, get_pool_stats
+    from maven_api.sessions import init_app as _init_db_sessions, get_request_connection, use_primary
+    _init_db_sessions(app)
+    # Per-route latency, status and DB time, scraped at /metrics
+    from maven_api import metrics
+    metrics.init_app(app)
     CLAUDE_DB_AVAILABLE = True
 except Exception as e:
     logger.error(f"Database import failed: {e}")
-    _get_db_connection = None
+    execute_prepared = None
+    get_pool_stats = None
+    get_request_connection = None
+    use_primary = None
     CLAUDE_DB_AVAILABLE = False
 
+# Import response cache (Redis with in-process fallback)
+from maven_api.cache import cached, invalidate as invalidate_cache, response_cache
+from maven_api.http_cache import conditional, file_validator
+from maven_api import health, ingest, maintenance, ratelimit, stream
+from database.circuit import CircuitOpenError
+from maven_api.pagination import keyset_clause, page_args, paginate
+from maven_mcp import session_log
+from maven_mcp.decision_index import get_decision_index
+
 # Import email sending function
 try:
-    from maven_mcp.tools import _send_email
+    from maven_mcp.tools import _send_email, _log_events
     EMAIL_AVAILABLE = True
 except Exception as e:
     logger.error(f"Email tools import failed: {e}")
     _send_email = None
+    _log_events = None
     EMAIL_AVAILABLE = False
 
+# Incoming email webhook: durable, deduplicated queue ingested in the background
+from maven_api import inbox
+inbox.init_app(
+    app, os.path.join(MAVEN_DATA_DIR, 'inbox'), _log_events,
+    start=os.getenv('MAVEN_INBOX_INGESTER', 'true').lower() == 'true'
+)
+
+# Outbound notification email is spooled and sent in the background; the
+# dispatcher is created below the notification endpoints (it needs the renderer)
+from maven_api import notifications
+NOTIFICATIONS_DIR = os.path.join(MAVEN_DATA_DIR, 'notifications')
+
 def get_db():
-    """Get database connection (returns connection object from pool)."""
-    if not _get_db_connection:
+    """
+    Get the database connection bound to the current request.
+
+    The connection is returned to the pool automatically when the request
+    ends (see maven_api.sessions), so handlers must not close or put it back.
+    """
+    if not get_request_connection:
         return None
-    # Return a connection from the pool directly (not context manager)
-    return _get_db_connection().__enter__()
+    try:
+        return get_request_connection()
+    except CircuitOpenError as e:
+        # Postgres is known to be down: answer 503 now instead of after a connect timeout
+        logger.debug(str(e))
+        return None
+
+
+@app.errorhandler(CircuitOpenError)
+def circuit_open(e):
+    """A dependency call refused by its circuit breaker (see database.circuit)."""
+    response = jsonify({'error': str(e), 'dependency': e.name})
+    response.headers['Retry-After'] = str(max(1, int(e.retry_after + 0.5)))
+    return response, 503
+
+
+# Per-client token buckets (shared via Redis) and per-route-class concurrency
+# caps, checked before any handler touches the pool
+ratelimit.init_app(app)
+
+
+# Cached dependency probes (Postgres, Redis, Hyperliquid, email API) feeding
+# the circuit breakers; reported on /health?deep=1
+health.init_app(app, start=os.getenv('MAVEN_HEALTH_PROBES', 'true').lower() == 'true')
+
+# Scheduled housekeeping (snapshot partitions and retention), one run per job
+# interval at a time across workers
+maintenance.init_app(app, start=os.getenv('MAVEN_MAINTENANCE', 'true').lower() == 'true')
 
 @app.route('/health', methods=['GET'])
 def health_check():
-    """Health check endpoint for container orchestration."""
-    return jsonify({
+    """
+    Health check endpoint for container orchestration.
+
+    Always 200 while the process serves requests. With ?deep=1 it adds the
+    cached status, probe latency and circuit state of each dependency
+    (maven_api.health) and reports 'degraded' if any of them is down.
+    """
+    body = {
         'status': 'healthy',
         'service': 'maven',
         'version': '1.0.0',
         'mcp_server': 'running on port 3100'
-    })
+    }
+    if request.args.get('deep', '').lower() in ('1', 'true', 'yes'):
+        dependencies = health.monitor.snapshot()
+        body['dependencies'] = dependencies
+        if any(d['status'] != 'up' or d['circuit'] != 'closed' for d in dependencies.values()):
+            body['status'] = 'degraded'
+    return jsonify(body)
+
+@app.route('/api/db/pool', methods=['GET'])
+def db_pool_stats():
+    """Connection pool utilisation, checkout wait and hold times."""
+    if not get_pool_stats:
+        return jsonify({'error': 'Database unavailable'}), 503
+    return jsonify(get_pool_stats())
+
+@app.route('/api/maintenance/stats', methods=['GET'])
+def maintenance_stats():
+    """Runs, skips, errors and last result of each scheduled maintenance job."""
+    return jsonify(maintenance.scheduler.stats())
+
+@app.route('/api/cache/stats', methods=['GET'])
+def cache_stats():
+    """Response cache hit/miss counters per endpoint."""
+    return jsonify(response_cache.stats())
 
 @app.route('/api/maven/status', methods=['GET'])
 def maven_status():
@@ -88,6 +179,7 @@ def maven_status():
 # =============================================================================
 
 @app.route('/api/treasury/state', methods=['GET'])
+@cached('treasury_state')
 def treasury_state():
     """Get current treasury state from database."""
     try:
@@ -96,9 +188,7 @@ def treasury_state():
             return jsonify({'error': 'Database unavailable'}), 503
 
         cursor = db.cursor()
-        cursor.execute("""
-            SELECT * FROM maven_treasury_current
-        """)
+        execute_prepared(cursor, 'treasury_current', "SELECT * FROM maven_treasury_current")
         row = cursor.fetchone()
         cursor.close()
 
@@ -175,6 +265,7 @@ def record_treasury_snapshot():
         snapshot_id = cursor.fetchone()[0]
         db.commit()
         cursor.close()
+        invalidate_cache('treasury_state')
 
         return jsonify({
             'success': True,
@@ -186,11 +277,64 @@ def record_treasury_snapshot():
         return jsonify({'error': str(e)}), 500
 
 
+@app.route('/api/treasury/snapshots/batch', methods=['POST'])
+def record_treasury_snapshots_batch():
+    """
+    Record many treasury snapshots in one transaction.
+
+    Request body: [{account_value, withdrawable, margin_used, unrealized_pnl,
+    positions, snapshot_at?}, ...] or {"snapshots": [...], "allow_partial": bool}.
+    The whole batch is validated first; invalid rows are reported by index and,
+    unless allow_partial is set, nothing is written.
+    """
+    try:
+        rows, allow_partial = ingest.unpack_batch(request.get_json(silent=True), 'snapshots')
+        return _ingest_batch(rows, allow_partial, ingest.validate_snapshot,
+                             ingest.insert_snapshots, 'treasury_state', 'snapshot_ids')
+    except ingest.BatchError as e:
+        return jsonify({'error': str(e)}), e.status
+    except Exception as e:
+        logger.error(f"Treasury snapshot batch error: {e}")
+        return jsonify({'error': str(e)}), 500
+
+
+def _ingest_batch(rows, allow_partial, validator, inserter, cache_namespace, ids_key):
+    """Validate a batch, insert the valid rows in one transaction, report per-row errors."""
+    valid, invalid = ingest.validate_batch(rows, validator)
+    if invalid and (not allow_partial or not valid):
+        return jsonify({
+            'success': False,
+            'error': f'{len(invalid)} of {len(rows)} rows failed validation',
+            'inserted': 0,
+            'rejected': invalid
+        }), 400
+
+    db = get_db()
+    if not db:
+        return jsonify({'error': 'Database unavailable'}), 503
+
+    cursor = db.cursor()
+    ids = inserter(cursor, [values for _, values in valid])
+    db.commit()
+    cursor.close()
+    invalidate_cache(cache_namespace)
+
+    logger.info(f"Batch ingest: {len(ids)} rows inserted, {len(invalid)} rejected")
+    return jsonify({
+        'success': True,
+        'inserted': len(ids),
+        ids_key: ids,
+        'indexes': [index for index, _ in valid],
+        'rejected': invalid
+    })
+
+
 # =============================================================================
 # WATCHLIST ENDPOINTS
 # =============================================================================
 
 @app.route('/api/watchlist', methods=['GET'])
+@cached('watchlist')
 def get_watchlist():
     """Get Maven's coin watchlist with latest prices."""
     try:
@@ -199,7 +343,7 @@ def get_watchlist():
             return jsonify({'error': 'Database unavailable'}), 503
 
         cursor = db.cursor()
-        cursor.execute("SELECT * FROM maven_watchlist_prices")
+        execute_prepared(cursor, 'watchlist_prices', "SELECT * FROM maven_watchlist_prices")
         rows = cursor.fetchall()
         cursor.close()
 
@@ -251,6 +395,7 @@ def add_to_watchlist():
         watch_id = cursor.fetchone()[0]
         db.commit()
         cursor.close()
+        invalidate_cache('watchlist')
 
         return jsonify({
             'success': True,
@@ -266,22 +411,116 @@ def add_to_watchlist():
 # SIGNALS ENDPOINTS
 # =============================================================================
 
+def _market_history(kind, coin):
+    """Shared body of the market history endpoints (see database.downsample)."""
+    from database import downsample
+
+    try:
+        start, end, step = downsample.parse_range(request.args)
+        points = request.args.get('points', type=int)
+        resolution = request.args.get('resolution') or downsample.pick_resolution(
+            kind, start, end, step=step, max_points=points)
+        if (resolution not in downsample.RESOLUTIONS[kind]
+                and resolution not in downsample.EXPLICIT_RESOLUTIONS[kind]):
+            raise ValueError(f"Invalid resolution: {resolution}")
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    try:
+        db = get_db()
+        if not db:
+            return jsonify({'error': 'Database unavailable'}), 503
+
+        cursor = db.cursor()
+        rows, truncated = downsample.history(cursor, kind, coin.upper(), start, end, resolution)
+        cursor.close()
+
+        return jsonify({
+            'coin': coin.upper(),
+            'resolution': resolution,
+            'start': start.isoformat(),
+            'end': end.isoformat(),
+            'points': rows,
+            'count': len(rows),
+            'truncated': truncated
+        })
+    except Exception as e:
+        logger.error(f"Market history error: {e}")
+        return jsonify({'error': str(e)}), 500
+
+
+@app.route('/api/market/<coin>/history', methods=['GET'])
+def market_history(coin):
+    """
+    Market snapshot history for a coin: mid OHLC, funding, OI, depth, spread.
+
+    Query params:
+        start, end: ISO 8601 range (default the last 24 hours)
+        step: detail needed, e.g. 15m, 4h, 1d or seconds (default range / points)
+        points: default 500
+        resolution: force raw, 5m, 1h or 1d instead of picking one
+
+    Served from the coarsest stored resolution no wider than step.
+    """
+    return _market_history('bars', coin)
+
+
+@app.route('/api/market/<coin>/candles', methods=['GET'])
+def market_candles(coin):
+    """
+    OHLCV candles for a coin; same query params as /api/market/<coin>/history,
+    with resolutions 1m, 5m, 1h and 1d (15m and 4h when asked for by name;
+    watchlist coins are kept filled by maven_api.candles).
+    """
+    return _market_history('candles', coin)
+
+
 @app.route('/api/signals', methods=['GET'])
+@cached('signals')
 def get_signals():
-    """Get active trading signals."""
+    """
+    Get active trading signals, newest first.
+
+    Query params:
+        coin: only signals for this coin
+        limit: page size (default 50, max 200)
+        cursor: next_cursor from the previous page
+    """
+    try:
+        limit, after = page_args(request.args, default=50)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
     try:
         db = get_db()
         if not db:
             return jsonify({'error': 'Database unavailable'}), 503
 
+        coin = request.args.get('coin')
+        keyset, params = keyset_clause('generated_at', 'id', after)
+        coin_filter = "AND coin = %s" if coin else ""
+        if coin:
+            params.append(coin.upper())
+
         cursor = db.cursor()
-        cursor.execute("SELECT * FROM maven_active_signals LIMIT 50")
-        rows = cursor.fetchall()
+        cursor.execute(f"""
+            SELECT coin, signal_source, signal_type, strength, reasoning,
+                   generated_at, valid_until, id
+            FROM maven_trading_signals
+            WHERE NOT expired
+              AND (valid_until IS NULL OR valid_until > NOW())
+              AND {keyset}
+              {coin_filter}
+            ORDER BY generated_at DESC, id DESC
+            LIMIT %s
+        """, (*params, limit + 1))
+        rows, next_cursor = paginate(cursor.fetchall(), limit, key=lambda r: (r[5], r[7]))
         cursor.close()
 
         signals = []
         for row in rows:
             signals.append({
+                'id': row[7],
                 'coin': row[0],
                 'source': row[1],
                 'signal_type': row[2],
@@ -291,7 +530,7 @@ def get_signals():
                 'valid_until': row[6].isoformat() if row[6] else None
             })
 
-        return jsonify({'signals': signals, 'count': len(signals)})
+        return jsonify({'signals': signals, 'count': len(signals), 'next_cursor': next_cursor})
     except Exception as e:
         logger.error(f"Signals error: {e}")
         return jsonify({'error': str(e)}), 500
@@ -327,6 +566,7 @@ def record_signal():
         signal_id = cursor.fetchone()[0]
         db.commit()
         cursor.close()
+        invalidate_cache('signals')
 
         logger.info(f"Signal recorded: {data['coin']} {data['signal_type']} (ID: {signal_id})")
 
@@ -341,6 +581,104 @@ def record_signal():
         return jsonify({'error': str(e)}), 500
 
 
+@app.route('/api/signals/batch', methods=['POST'])
+def record_signals_batch():
+    """
+    Record many trading signals in one transaction.
+
+    Request body: [{coin, signal_type, strength?, source?, bot_id?, reasoning?,
+    indicators?, market_context?, valid_until?, generated_at?}, ...] or
+    {"signals": [...], "allow_partial": bool}. Validation and error reporting
+    work as for /api/treasury/snapshots/batch.
+    """
+    try:
+        rows, allow_partial = ingest.unpack_batch(request.get_json(silent=True), 'signals')
+        return _ingest_batch(rows, allow_partial, ingest.validate_signal,
+                             ingest.insert_signals, 'signals', 'signal_ids')
+    except ingest.BatchError as e:
+        return jsonify({'error': str(e)}), e.status
+    except Exception as e:
+        logger.error(f"Signal batch error: {e}")
+        return jsonify({'error': str(e)}), 500
+
+
+# =============================================================================
+# LIVE EVENT STREAM
+# =============================================================================
+
+@app.route('/api/stream', methods=['GET'])
+def stream_events():
+    """
+    Server-Sent Events feed of new treasury snapshots, signals and watchlist
+    prices as they are written.
+
+    Query params:
+        topics: comma separated subset of treasury,signals,watchlist (default all)
+        coins: comma separated coin filter for signals/watchlist events
+        last_event_id: resume cursor for clients that cannot set Last-Event-ID
+
+    A reconnecting client's Last-Event-ID is used to replay missed rows
+    before live events resume.
+    """
+    try:
+        topics = stream.parse_topics(request.args.get('topics'))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    coins = {c.strip().upper() for c in request.args.get('coins', '').split(',') if c.strip()}
+
+    # Events are NOTIFYed by the primary; a lagging replica's backlog could
+    # miss rows the live feed has already moved past
+    if use_primary:
+        use_primary()
+
+    # Subscribe before reading the backlog so nothing falls in between;
+    # duplicates are dropped by id in stream.event_stream.
+    try:
+        sub = stream.broker.subscribe(topics, coins)
+    except stream.StreamsFull as e:
+        # Every stream pins a worker thread; past the cap the REST API would starve
+        response = jsonify({'error': str(e)})
+        response.headers['Retry-After'] = str(max(1, -(-stream.RETRY_MS // 1000)))
+        return response, 503
+
+    try:
+        db = get_db()
+        if not db:
+            stream.broker.unsubscribe(sub)
+            return jsonify({'error': 'Database unavailable'}), 503
+
+        cursor = stream.parse_cursor(
+            request.headers.get('Last-Event-ID') or request.args.get('last_event_id')
+        )
+        backlog = []
+        if cursor is None:
+            cursor = stream.latest_cursor(db)
+        else:
+            backlog = stream.load_backlog(db, cursor, topics)
+
+        # Not wrapped in stream_with_context: the request's pooled connection is
+        # released as soon as this view returns, not held for the stream's life.
+        response = Response(
+            stream.event_stream(sub, cursor, backlog),
+            mimetype='text/event-stream',
+            headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'},
+        )
+        # event_stream() unsubscribes in its finally, which never runs if the
+        # client goes away before the first chunk is pulled
+        response.call_on_close(lambda: stream.broker.unsubscribe(sub))
+        return response
+    except Exception as e:
+        stream.broker.unsubscribe(sub)
+        logger.error(f"Event stream error: {e}")
+        return jsonify({'error': str(e)}), 500
+
+
+@app.route('/api/stream/stats', methods=['GET'])
+def stream_stats():
+    """Subscriber count and delivery counters for this worker."""
+    return jsonify(stream.broker.stats())
+
+
 # =============================================================================
 # EMAIL INCOMING WEBHOOK
 # =============================================================================
@@ -350,70 +688,79 @@ def email_incoming():
     """
     Webhook endpoint for incoming emails to maven@motherhaven.app.
 
-    Called by moha-next when SendGrid delivers an email to maven@.
-    Logs the email and queues for processing.
+    Called by moha-next when SendGrid delivers an email to maven@. The email
+    is committed to the inbox queue and acknowledged; the git-first file,
+    session log entry and maven_memory row are written in the background
+    (maven_api.inbox). Redeliveries of the same email (same messageId, or
+    identical content) are acknowledged without being queued again.
     """
     try:
         data = request.get_json()
         if not data:
             return jsonify({'error': 'Request body required'}), 400
 
-        from_email = data.get('from', 'unknown')
-        from_name = data.get('fromName', '')
-        subject = data.get('subject', '(No Subject)')
-        text_content = data.get('textContent', '')
-        html_content = data.get('htmlContent', '')
-        received_at = data.get('receivedAt', datetime.utcnow().isoformat())
-
-        logger.info(f"📨 INCOMING EMAIL from {from_name} <{from_email}>")
-        logger.info(f"   Subject: {subject}")
-
-        # Save to git-first persistence
-        email_dir = Path(MAVEN_BASE_DIR) / '.moha' / 'maven' / 'inbox'
-        email_dir.mkdir(parents=True, exist_ok=True)
-
-        timestamp = datetime.utcnow().strftime('%Y%m%d_%H%M%S')
-        safe_from = from_email.replace('@', '_at_').replace('.', '_')[:30]
-        filename = f"email_{timestamp}_{safe_from}.json"
-
-        email_record = {
-            'from': from_email,
-            'from_name': from_name,
-            'subject': subject,
-            'text_content': text_content,
-            'html_content': html_content,
-            'received_at': received_at,
-            'processed': False,
-            'logged_at': datetime.utcnow().isoformat()
-        }
-
-        with open(email_dir / filename, 'w') as f:
-            json.dump(email_record, f, indent=2)
-
-        logger.info(f"   Saved to: {filename}")
-
-        # Log to session
-        try:
-            from maven_mcp.tools import _log_event
-            _log_event(
-                event_type='email_received',
-                content=f"Email from {from_name or from_email}: {subject}",
-                metadata={'from': from_email, 'subject': subject, 'file': filename}
-            )
-        except Exception as e:
-            logger.warning(f"Could not log to session: {e}")
+        record, duplicate = inbox.store.enqueue(data)
+        if duplicate:
+            logger.info(f"📨 Duplicate delivery of {record['filename']} ignored")
+        else:
+            logger.info(f"📨 INCOMING EMAIL from {record['from_name']} <{record['from_email']}>")
+            logger.info(f"   Subject: {record['subject']}")
+            inbox.ingester.notify()
 
         return jsonify({
             'success': True,
-            'message': 'Email received and logged',
-            'filename': filename
-        })
+            'message': 'Duplicate email ignored' if duplicate else 'Email queued for logging',
+            'duplicate': duplicate,
+            'filename': record['filename']
+        }), 200 if duplicate else 202
 
     except Exception as e:
         logger.error(f"Email incoming error: {e}")
         return jsonify({'error': str(e)}), 500
 
 
+@app.route('/api/email/inbox', methods=['GET'])
+def email_inbox():
+    """
+    Search received emails, newest first.
+
+    Query params:
+        q: words to match in subject, sender or text body
+        from: exact sender address
+        limit: page size (default 20, max 200)
+        cursor: next_cursor from the previous page
+    """
+    try:
+        limit, before = page_args(request.args, default=20)
+        records, next_cursor = paginate(
+            inbox.store.search(request.args.get('q'), request.args.get('from'), limit + 1, before),
+            limit, key=lambda r: (datetime.fromtimestamp(r['created_at']), r['seq'])
+        )
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        logger.error(f"Email inbox error: {e}")
+        return jsonify({'error': str(e)}), 500
+
+    return jsonify({
+        'emails': [
+            {
+                'from': r['from_email'],
+                'from_name': r['from_name'],
+                'subject': r['subject'],
+                'text_content': r['text_content'],
+                'received_at': r['received_at'],
+                'filename': r['filename'],
+                'status': r['status'],
+            }
+            for r in records
+        ],
+        'count': len(records),
+        'next_cursor': next_cursor,
+        'ingest': inbox.ingester.stats()
+    })
+
+
 # =============================================================================
 # NOTIFICATIONS ENDPOINTS
 # =============================================================================
@@ -430,8 +777,13 @@ def send_notification():
         {
             "opportunities": [...],  # List of high-confidence opportunities
             "confidence_threshold": 90,
-            "recipient": "email@example.com"
+            "recipient": "email@example.com",
+            "coalesce": true         # false = send this batch on its own
         }
+
+    Coalesced opportunities are merged per asset/signal into the recipient's
+    next digest (see maven_api.notifications); the response then has status
+    'coalesced' and the digest time instead of a message id.
     """
     try:
         data = request.get_json()
@@ -448,61 +800,56 @@ def send_notification():
         if not recipient:
             return jsonify({'error': 'Recipient email required'}), 400
 
+        dispatcher = notifications.dispatcher
+        if data.get('coalesce', True) and dispatcher.coalescing:
+            result = dispatcher.coalesce(recipient, opportunities, confidence_threshold)
+            logger.info(f"📧 Coalesced {len(opportunities)} signals for {recipient} "
+                        f"({result['new']} new, {result['merged']} merged)")
+            return jsonify({
+                'status': 'coalesced',
+                'message': f"{result['new']} new and {result['merged']} repeated signals "
+                           f"added to the next digest",
+                'recipient': recipient,
+                'signal_count': len(opportunities),
+                'new': result['new'],
+                'merged': result['merged'],
+                'digest_at': datetime.fromtimestamp(result['digest_at']).isoformat()
+                if result['digest_at'] is not None else None,
+            }), 202
+
         # Build email content
-        subject = _build_notification_subject(opportunities)
-        html_content = _build_notification_html(opportunities, confidence_threshold)
-        text_content = _build_notification_text(opportunities, confidence_threshold)
+        subject, html_content, text_content = _render_notification(opportunities, confidence_threshold)
 
-        # Send email via maven_send_email
         logger.info(f"📧 HIGH-CONFIDENCE ALERT: {len(opportunities)} signals >= {confidence_threshold}%")
         logger.info(f"To: {recipient}")
         logger.info(f"Subject: {subject}")
 
-        # Actually send the email
-        if EMAIL_AVAILABLE and _send_email:
-            email_result = _send_email(
-                to=recipient,
-                subject=subject,
-                html_content=html_content,
-                text_content=text_content,
-                from_name="Maven",
-                from_email="maven@motherhaven.app"
-            )
+        # Persist and hand off to the background dispatcher
+        notification_id = dispatcher.enqueue(
+            recipient, subject, html_content, text_content, opportunities
+        )
+        if not EMAIL_AVAILABLE:
+            logger.warning("Email tools not available, notification left for manual pickup")
 
-            if email_result.get('success'):
-                logger.info(f"✅ Email sent successfully to {recipient}")
-                return jsonify({
-                    'status': 'sent',
-                    'message': f'Email sent for {len(opportunities)} high-confidence signals',
-                    'recipient': recipient,
-                    'signal_count': len(opportunities)
-                })
-            else:
-                # Email failed - queue for retry
-                logger.error(f"❌ Email send failed: {email_result.get('error')}")
-                _queue_notification(recipient, subject, html_content, text_content, opportunities)
-                return jsonify({
-                    'status': 'queued',
-                    'message': f'Email failed, queued for retry: {email_result.get("error")}',
-                    'recipient': recipient,
-                    'signal_count': len(opportunities)
-                })
-        else:
-            # Email not available - queue for manual pickup
-            logger.warning("Email tools not available, queuing notification")
-            _queue_notification(recipient, subject, html_content, text_content, opportunities)
-            return jsonify({
-                'status': 'queued',
-                'message': f'Notification queued (email tools unavailable)',
-                'recipient': recipient,
-                'signal_count': len(opportunities)
-            })
+        return jsonify({
+            'status': 'queued',
+            'id': notification_id,
+            'message': f'Notification queued for {len(opportunities)} high-confidence signals',
+            'recipient': recipient,
+            'signal_count': len(opportunities)
+        }), 202
 
     except Exception as e:
         logger.error(f"Notification send error: {e}")
         return jsonify({'error': str(e)}), 500
 
 
+@app.route('/api/notifications/stats', methods=['GET'])
+def notification_stats():
+    """Notification queue depth, outcomes and send latency for this worker."""
+    return jsonify(notifications.dispatcher.stats())
+
+
 def _build_notification_subject(opportunities):
     """Build notification email subject."""
     if len(opportunities) == 1:
@@ -519,6 +866,7 @@ def _build_notification_html(opportunities, threshold):
     for i, opp in enumerate(opportunities, 1):
         conf_color = "#10b981" if opp['maven_confidence'] >= 95 else "#f59e0b"
         funding_info = f"<li><strong>Funding APR:</strong> {opp.get('funding_apr', 0):.1f}%</li>" if opp.get('funding_apr') else ""
+        repeat_info = f"<li><strong>Alerts:</strong> {opp['alert_count']}x in this digest</li>" if opp.get('alert_count', 1) > 1 else ""
 
         opps_html += f"""
         <div style="background: #1f2937; border-left: 4px solid {conf_color}; padding: 16px; margin-bottom: 16px; border-radius: 4px;">
@@ -530,6 +878,7 @@ def _build_notification_html(opportunities, threshold):
                 <li><strong>Risk:</strong> {opp.get('risk_level', 'MEDIUM')}</li>
                 <li><strong>Size:</strong> ${opp.get('position_size_usd', 0):,.0f}</li>
                 {funding_info}
+                {repeat_info}
             </ul>
             <p style="color: #9ca3af; margin: 12px 0 0 0; font-style: italic;">{opp.get('reasoning', '')}</p>
         </div>
@@ -567,6 +916,8 @@ def _build_notification_text(opportunities, threshold):
         lines.append(f"  Size: ${opp.get('position_size_usd', 0):,.0f}")
         if opp.get('funding_apr'):
             lines.append(f"  Funding: {opp['funding_apr']:.1f}% APR")
+        if opp.get('alert_count', 1) > 1:
+            lines.append(f"  Alerts: {opp['alert_count']}x in this digest")
         lines.append(f"  {opp.get('reasoning', '')}")
         lines.append("")
 
@@ -574,90 +925,99 @@ def _build_notification_text(opportunities, threshold):
     return "\n".join(lines)
 
 
-def _queue_notification(recipient, subject, html_content, text_content, opportunities):
-    """Save notification to queue for Claude Code to send via MCP."""
-    import json
-    from pathlib import Path
-
-    notifications_dir = Path('/app/.moha/maven/notifications')
-    notifications_dir.mkdir(parents=True, exist_ok=True)
-
-    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-    notification_file = notifications_dir / f'signal_{timestamp}.json'
+def _render_notification(opportunities, threshold):
+    """(subject, html, text) for a notification or digest."""
+    return (
+        _build_notification_subject(opportunities),
+        _build_notification_html(opportunities, threshold),
+        _build_notification_text(opportunities, threshold),
+    )
 
-    notification = {
-        'type': 'high_confidence_signal',
-        'timestamp': datetime.now().isoformat(),
-        'recipient': recipient,
-        'subject': subject,
-        'html_content': html_content,
-        'text_content': text_content,
-        'opportunities': opportunities,
-        'sent': False
-    }
-
-    with open(notification_file, 'w') as f:
-        json.dump(notification, f, indent=2)
 
-    logger.info(f"📧 Queued: {notification_file}")
+notifications.init_app(
+    app, NOTIFICATIONS_DIR, _send_email, render=_render_notification,
+    start=os.getenv('MAVEN_NOTIFY_DISPATCHER', 'true').lower() == 'true'
+)
 
 
 @app.route('/api/notifications/pending', methods=['GET'])
 def get_pending_notifications():
-    """Get list of pending (unsent) notifications."""
-    try:
-        from pathlib import Path
-        import json
-
-        notifications_dir = Path('/app/.moha/maven/notifications')
-        if not notifications_dir.exists():
-            return jsonify({'pending': [], 'count': 0})
-
-        pending = []
-        for notification_file in sorted(notifications_dir.glob('signal_*.json')):
-            try:
-                with open(notification_file, 'r') as f:
-                    notification = json.load(f)
-
-                if not notification.get('sent', False):
-                    pending.append({
-                        'file': notification_file.name,
-                        'timestamp': notification['timestamp'],
-                        'recipient': notification['recipient'],
-                        'subject': notification['subject'],
-                        'signal_count': len(notification.get('opportunities', []))
-                    })
-            except Exception as e:
-                logger.error(f"Error reading notification {notification_file}: {e}")
+    """
+    List unsent notifications, oldest first.
 
-        return jsonify({
-            'pending': pending,
-            'count': len(pending)
-        })
+    Query params:
+        status: pending (default; includes messages being sent) or failed
+        limit: page size (default 50, max 200)
+        cursor: next_cursor from the previous page
+    """
+    status = request.args.get('status', 'pending')
+    statuses = {'pending': ('pending', 'sending'), 'failed': ('failed',)}.get(status)
+    if statuses is None:
+        return jsonify({'error': "status must be 'pending' or 'failed'"}), 400
 
+    try:
+        limit, after = page_args(request.args, default=50)
+        spool = notifications.dispatcher.spool
+        records, next_cursor = paginate(
+            spool.list(statuses, limit + 1, after), limit,
+            key=lambda r: (datetime.fromtimestamp(r['created_at']), r['seq'])
+        )
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         logger.error(f"Get pending notifications error: {e}")
         return jsonify({'error': str(e)}), 500
 
+    counts = spool.counts()
+    return jsonify({
+        'pending': [
+            {
+                'id': r['id'],
+                'status': r['status'],
+                'timestamp': r['timestamp'],
+                'recipient': r['recipient'],
+                'subject': r['subject'],
+                'attempts': r['attempts'],
+                'last_error': r['last_error'],
+                'signal_count': len(r['opportunities']) if isinstance(r['opportunities'], list) else 0
+            }
+            for r in records
+        ],
+        'count': sum(counts.get(s, 0) for s in statuses),
+        'next_cursor': next_cursor
+    })
+
 
 @app.route('/api/decisions', methods=['GET'])
 def get_decisions():
-    """Get recent Maven decisions."""
+    """
+    Get recent Maven decisions, newest first.
+
+    Query params:
+        limit: page size (default 20, max 200)
+        cursor: next_cursor from the previous page
+    """
+    try:
+        limit, after = page_args(request.args, default=20)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
     try:
-        limit = request.args.get('limit', 20, type=int)
         db = get_db()
         if not db:
             return jsonify({'error': 'Database unavailable'}), 503
 
+        keyset, params = keyset_clause('decided_at', 'id', after)
         cursor = db.cursor()
-        cursor.execute("""
+        execute_prepared(cursor, 'decisions_page', f"""
             SELECT id, decision_type, asset, action, reasoning, confidence,
                    risk_level, executed, decided_at
             FROM maven_decisions
-            ORDER BY decided_at DESC
+            WHERE {keyset}
+            ORDER BY decided_at DESC, id DESC
             LIMIT %s
-        """, (limit,))
-        rows = cursor.fetchall()
+        """, (*params, limit + 1))
+        rows, next_cursor = paginate(cursor.fetchall(), limit, key=lambda r: (r[8], r[0]))
         cursor.close()
 
         decisions = []
@@ -674,7 +1034,7 @@ def get_decisions():
                 'decided_at': row[8].isoformat() if row[8] else None
             })
 
-        return jsonify({'decisions': decisions, 'count': len(decisions)})
+        return jsonify({'decisions': decisions, 'count': len(decisions), 'next_cursor': next_cursor})
     except Exception as e:
         logger.error(f"Decisions error: {e}")
         return jsonify({'error': str(e)}), 500
@@ -682,16 +1042,59 @@ def get_decisions():
 
 @app.route('/api/decisions/performance', methods=['GET'])
 def decision_performance():
-    """Get decision performance summary."""
+    """
+    Get decision performance summary, newest decision first.
+
+    Query params:
+        days: lookback window (default 7)
+        limit: page size (default 50, max 200)
+        cursor: next_cursor from the previous page
+
+    Same output as maven_decision_performance(days), but the page of
+    decisions is selected by keyset first and only its trades are
+    aggregated, so later pages do not re-aggregate the whole window.
+    """
     try:
         days = request.args.get('days', 7, type=int)
+        limit, after = page_args(request.args, default=50)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    try:
         db = get_db()
         if not db:
             return jsonify({'error': 'Database unavailable'}), 503
 
+        keyset, params = keyset_clause('decided_at', 'id', after)
         cursor = db.cursor()
-        cursor.execute("SELECT * FROM maven_decision_performance(%s)", (days,))
-        rows = cursor.fetchall()
+        cursor.execute(f"""
+            WITH page AS (
+                SELECT id, decided_at, decision_type, asset, confidence
+                FROM maven_decisions
+                WHERE decided_at > NOW() - (%s || ' days')::INTERVAL
+                  AND {keyset}
+                ORDER BY decided_at DESC, id DESC
+                LIMIT %s
+            )
+            SELECT
+                d.id,
+                d.decided_at,
+                d.decision_type,
+                d.asset,
+                d.confidence,
+                COUNT(t.id)::INTEGER AS trades_executed,
+                COALESCE(SUM(t.net_pnl_usd), 0) AS total_pnl,
+                CASE
+                    WHEN COALESCE(SUM(t.net_pnl_usd), 0) > 0 THEN 'profitable'
+                    WHEN COALESCE(SUM(t.net_pnl_usd), 0) < 0 THEN 'loss'
+                    ELSE 'breakeven'
+                END AS outcome
+            FROM page d
+            LEFT JOIN maven_trades t ON t.decision_id = d.id AND t.status = 'closed'
+            GROUP BY d.id, d.decided_at, d.decision_type, d.asset, d.confidence
+            ORDER BY d.decided_at DESC, d.id DESC
+        """, (days, *params, limit + 1))
+        rows, next_cursor = paginate(cursor.fetchall(), limit, key=lambda r: (r[1], r[0]))
         cursor.close()
 
         performance = []
@@ -710,7 +1113,8 @@ def decision_performance():
         return jsonify({
             'period_days': days,
             'decisions': performance,
-            'count': len(performance)
+            'count': len(performance),
+            'next_cursor': next_cursor
         })
     except Exception as e:
         logger.error(f"Decision performance error: {e}")
@@ -722,10 +1126,11 @@ def decision_performance():
 # =============================================================================
 
 @app.route('/api/mcp/identity', methods=['GET'])
+@conditional(lambda: file_validator(os.path.join(MAVEN_DATA_DIR, 'identity.json')))
 def mcp_identity():
     """Get Maven's identity (mirrors maven://identity MCP resource)."""
     try:
-        identity_path = os.path.join(MAVEN_BASE_DIR, '.moha', 'maven', 'identity.json')
+        identity_path = os.path.join(MAVEN_DATA_DIR, 'identity.json')
         if os.path.exists(identity_path):
             with open(identity_path, 'r', encoding='utf-8') as f:
                 data = json.load(f)
@@ -744,36 +1149,67 @@ def mcp_identity():
 
 
 @app.route('/api/mcp/memory', methods=['GET'])
+@conditional(lambda: file_validator(os.path.join(MAVEN_DATA_DIR, 'session_log.md')))
 def mcp_memory():
-    """Get Maven's session log (mirrors maven://memory MCP resource)."""
-    try:
-        memory_path = os.path.join(MAVEN_BASE_DIR, '.moha', 'maven', 'session_log.md')
-        lines = request.args.get('lines', type=int)  # Optional: return last N lines
+    """
+    Get Maven's session log (mirrors maven://memory MCP resource).
 
-        if os.path.exists(memory_path):
-            with open(memory_path, 'r', encoding='utf-8') as f:
-                content = f.read()
+    Query params (first one present wins):
+        after: Byte offset or ISO timestamp; return entries appended after it
+        entries: Return the last N log entries
+        lines: Return the last N lines
 
-            if lines:
-                # Return last N lines
-                all_lines = content.splitlines()
-                content = '\n'.join(all_lines[-lines:])
+    Partial responses carry X-Log-Offset (where the text starts), X-Log-Next-Cursor
+    (pass back as ?after= to poll incrementally) and X-Log-Size.
+    """
+    try:
+        memory_path = os.path.join(MAVEN_DATA_DIR, 'session_log.md')
+        after = request.args.get('after')
+        entries = request.args.get('entries', type=int)
+        lines = request.args.get('lines', type=int)  # Optional: return last N lines
 
-            return content, 200, {'Content-Type': 'text/markdown; charset=utf-8'}
-        else:
+        if not os.path.exists(memory_path):
             return "# Maven Session Log\n\nNo events recorded yet.", 200, {
                 'Content-Type': 'text/markdown; charset=utf-8'
             }
+
+        if after is not None:
+            try:
+                cursor = session_log.parse_cursor(after)
+            except ValueError:
+                return jsonify({'error': f'Invalid cursor: {after}'}), 400
+            log_slice = session_log.read_after(memory_path, cursor)
+        elif entries:
+            log_slice = session_log.tail_entries(memory_path, entries)
+        elif lines:
+            log_slice = session_log.tail_lines(memory_path, lines)
+        else:
+            def stream():
+                with open(memory_path, 'rb') as f:
+                    while chunk := f.read(64 * 1024):
+                        yield chunk
+            return Response(stream(), 200, {'Content-Type': 'text/markdown; charset=utf-8'})
+
+        headers = {
+            'Content-Type': 'text/markdown; charset=utf-8',
+            'X-Log-Offset': str(log_slice.start),
+            'X-Log-Next-Cursor': str(log_slice.next_cursor),
+            'X-Log-Size': str(log_slice.size),
+        }
+        if log_slice.reset:
+            headers['X-Log-Reset'] = '1'
+        return log_slice.text, 200, headers
     except Exception as e:
         logger.error(f"Memory read error: {e}")
         return jsonify({'error': str(e)}), 500
 
 
 @app.route('/api/mcp/infrastructure', methods=['GET'])
+@conditional(lambda: file_validator(os.path.join(MAVEN_DATA_DIR, 'infrastructure.json')))
 def mcp_infrastructure():
     """Get Maven's infrastructure knowledge (mirrors maven://infrastructure MCP resource)."""
     try:
-        infra_path = os.path.join(MAVEN_BASE_DIR, '.moha', 'maven', 'infrastructure.json')
+        infra_path = os.path.join(MAVEN_DATA_DIR, 'infrastructure.json')
         if os.path.exists(infra_path):
             with open(infra_path, 'r', encoding='utf-8') as f:
                 data = json.load(f)
@@ -785,49 +1221,45 @@ def mcp_infrastructure():
         return jsonify({'error': str(e)}), 500
 
 
+def _decision_index():
+    """Process-wide index over .moha/maven/decisions (see maven_mcp.decision_index)."""
+    return get_decision_index(os.path.join(MAVEN_DATA_DIR, 'decisions'), suffix='.md')
+
+
 @app.route('/api/mcp/decisions/recent', methods=['GET'])
+@conditional(lambda: _decision_index().validator(request.args.get('limit', 10, type=int)))
 def mcp_recent_decisions():
     """Get Maven's recent decisions (mirrors maven://decisions MCP resource)."""
     try:
-        decisions_dir = os.path.join(MAVEN_BASE_DIR, '.moha', 'maven', 'decisions')
         limit = request.args.get('limit', 10, type=int)
 
-        if os.path.exists(decisions_dir):
-            # Get all decision files sorted by modification time
-            decision_files = []
-            for filename in os.listdir(decisions_dir):
-                if filename.endswith('.md') and filename != '.gitkeep':
-                    filepath = os.path.join(decisions_dir, filename)
-                    decision_files.append((filepath, os.path.getmtime(filepath)))
-
-            # Sort by modification time (newest first)
-            decision_files.sort(key=lambda x: x[1], reverse=True)
-
-            # Read recent decisions
-            decisions = []
-            for filepath, _ in decision_files[:limit]:
+        # Newest first by decision timestamp; only the returned files are opened
+        decisions = []
+        for filepath in _decision_index().latest(limit):
+            try:
                 with open(filepath, 'r', encoding='utf-8') as f:
                     decisions.append({
-                        'filename': os.path.basename(filepath),
+                        'filename': filepath.name,
                         'content': f.read()
                     })
+            except FileNotFoundError:
+                continue
 
-            return jsonify({
-                'count': len(decisions),
-                'decisions': decisions
-            })
-        else:
-            return jsonify({'count': 0, 'decisions': []})
+        return jsonify({
+            'count': len(decisions),
+            'decisions': decisions
+        })
     except Exception as e:
         logger.error(f"Recent decisions read error: {e}")
         return jsonify({'error': str(e)}), 500
 
 
 @app.route('/api/mcp/trading-setup', methods=['GET'])
+@conditional(lambda: file_validator(os.path.join(MAVEN_DATA_DIR, 'TRADING_SETUP.md')))
 def mcp_trading_setup():
     """Get Maven's trading setup documentation."""
     try:
-        setup_path = os.path.join(MAVEN_BASE_DIR, '.moha', 'maven', 'TRADING_SETUP.md')
+        setup_path = os.path.join(MAVEN_DATA_DIR, 'TRADING_SETUP.md')
         if os.path.exists(setup_path):
             with open(setup_path, 'r', encoding='utf-8') as f:
                 content = f.read()
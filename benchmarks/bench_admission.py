@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+"""
+Admission control benchmark: one abusive client vs well-behaved clients.
+
+Serves a small Flask app on a threaded server in a child process. Its one
+route holds a slot of a 10-connection "pool" for --query-ms, like a
+DB-backed handler. One client offers more load than the pool can serve
+(--abusive-rps from many threads, one API key) while a few well-behaved
+clients poll at a steady rate. The run is repeated with maven_api.ratelimit
+off and on, and reports the well-behaved clients' p50/p99 latency plus how
+the abusive client was answered.
+
+No Postgres or Redis needed; the token buckets use their local fallback.
+
+Usage:
+    python benchmarks/bench_admission.py --seconds 5 --abusive-rps 300
+"""
+import argparse
+import logging
+import subprocess
+import sys
+import threading
+import time
+from collections import Counter
+from pathlib import Path
+
+import requests
+from flask import Flask, jsonify
+from werkzeug.serving import make_server
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from database.circuit import CircuitBreaker  # noqa: E402
+from maven_api import ratelimit  # noqa: E402
+from maven_api.ratelimit import AdmissionController, TokenBuckets  # noqa: E402
+
+
+class NoRedis:
+    def register_script(self, source):
+        raise ConnectionError("benchmark runs without Redis")
+
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, int(round(pct / 100 * len(sorted_values))) - 1))
+    return sorted_values[index]
+
+
+def build_app(pool_size, query_ms):
+    app = Flask(__name__)
+    pool = threading.BoundedSemaphore(pool_size)
+
+    @app.route('/api/signals')
+    def signals():
+        with pool:
+            time.sleep(query_ms / 1000)
+        return jsonify({'signals': []})
+
+    ratelimit.init_app(app)
+    return app
+
+
+def serve(args):
+    """Child process: run the app until killed."""
+    logging.getLogger('werkzeug').setLevel(logging.ERROR)
+    ratelimit.controller = AdmissionController(
+        buckets=TokenBuckets(redis_client=NoRedis(),
+                             breaker=CircuitBreaker('redis', failure_threshold=1, reset_seconds=3600)),
+        enabled=args.serve == 'on',
+    )
+    app = build_app(args.pool_size, args.query_ms)
+    make_server('127.0.0.1', args.port, app, threaded=True).serve_forever()
+
+
+def start_server(args, enabled):
+    command = [sys.executable, __file__, '--serve', 'on' if enabled else 'off',
+               '--port', str(args.port), '--pool-size', str(args.pool_size),
+               '--query-ms', str(args.query_ms)]
+    proc = subprocess.Popen(command, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    deadline = time.time() + 30
+    while time.time() < deadline:
+        try:
+            requests.get(f'http://127.0.0.1:{args.port}/api/signals', timeout=1)
+            return proc
+        except requests.exceptions.RequestException:
+            time.sleep(0.2)
+    proc.kill()
+    raise RuntimeError(f"server did not start on port {args.port}")
+
+
+def run(args, enabled):
+    proc = start_server(args, enabled)
+    url = f'http://127.0.0.1:{args.port}/api/signals'
+
+    stop = threading.Event()
+    latencies = []
+    abusive = Counter()
+    lock = threading.Lock()
+
+    def abuser():
+        session = requests.Session()
+        interval = args.abusive_threads / args.abusive_rps
+        while not stop.is_set():
+            started = time.perf_counter()
+            status = session.get(url, headers={'X-API-Key': 'abuser'}).status_code
+            with lock:
+                abusive[status] += 1
+            time.sleep(max(0.0, interval - (time.perf_counter() - started)))
+
+    def polite(n):
+        session = requests.Session()
+        while not stop.is_set():
+            started = time.perf_counter()
+            response = session.get(url, headers={'X-API-Key': f'client-{n}'})
+            elapsed = time.perf_counter() - started
+            with lock:
+                latencies.append((elapsed * 1000, response.status_code))
+            time.sleep(max(0.0, 1 / args.client_rps - elapsed))
+
+    threads = ([threading.Thread(target=abuser) for _ in range(args.abusive_threads)]
+               + [threading.Thread(target=polite, args=(n,)) for n in range(args.clients)])
+    for thread in threads:
+        thread.start()
+    time.sleep(args.seconds)
+    stop.set()
+    for thread in threads:
+        thread.join()
+    proc.terminate()
+    proc.wait()
+
+    ok = sorted(ms for ms, status in latencies if status == 200)
+    return {
+        'admission': 'on' if enabled else 'off',
+        'p50_ms': percentile(ok, 50),
+        'p99_ms': percentile(ok, 99),
+        'polite_errors': sum(1 for _, status in latencies if status != 200),
+        'abusive_200': abusive[200],
+        'abusive_429': abusive[429],
+        'abusive_503': abusive[503],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark admission control')
+    parser.add_argument('--seconds', type=float, default=5)
+    parser.add_argument('--abusive-threads', type=int, default=40)
+    parser.add_argument('--abusive-rps', type=float, default=300,
+                        help='Offered load from the abusive client (pool capacity is '
+                             'pool-size / query-ms)')
+    parser.add_argument('--clients', type=int, default=4)
+    parser.add_argument('--client-rps', type=float, default=5)
+    parser.add_argument('--pool-size', type=int, default=10)
+    parser.add_argument('--query-ms', type=float, default=50)
+    parser.add_argument('--port', type=int, default=5098)
+    parser.add_argument('--serve', choices=['on', 'off'], help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.serve:
+        return serve(args)
+
+    results = [run(args, enabled=False), run(args, enabled=True)]
+
+    print(f"{'admission':<10} {'p50 ms':>8} {'p99 ms':>8} {'errors':>7} "
+          f"{'abuse 200':>10} {'abuse 429':>10} {'abuse 503':>10}")
+    for r in results:
+        print(f"{r['admission']:<10} {r['p50_ms']:>8.1f} {r['p99_ms']:>8.1f} "
+              f"{r['polite_errors']:>7} {r['abusive_200']:>10} "
+              f"{r['abusive_429']:>10} {r['abusive_503']:>10}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Decision index benchmark with a large decisions directory.
+
+Creates N synthetic decision files (default 100,000) and compares the old
+listdir + getmtime + sort per request against maven_mcp.decision_index for
+cold build, warm "latest 10", and refresh after one new decision.
+
+Usage:
+    python benchmarks/bench_decision_index.py --files 100000
+"""
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from maven_mcp.decision_index import DecisionIndex  # noqa: E402
+
+
+def naive_latest(directory, limit):
+    """What app.py used to do on every request."""
+    files = []
+    for filename in os.listdir(directory):
+        if filename.endswith('.md') and filename != '.gitkeep':
+            filepath = os.path.join(directory, filename)
+            files.append((filepath, os.path.getmtime(filepath)))
+    files.sort(key=lambda x: x[1], reverse=True)
+    return files[:limit]
+
+
+def timed(label, fn, repeat=1):
+    started = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    per_call = (time.perf_counter() - started) / repeat
+    print(f"{label:<40} {per_call * 1000:>10.3f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the decision index')
+    parser.add_argument('--files', type=int, default=100_000)
+    args = parser.parse_args()
+
+    directory = Path(tempfile.mkdtemp()) / 'decisions'
+    directory.mkdir()
+    print(f"Creating {args.files:,} decision files in {directory} ...")
+    start = datetime(2020, 1, 1)
+    for i in range(args.files):
+        stamp = (start + timedelta(minutes=i)).strftime('%Y%m%d_%H%M%S')
+        (directory / f'decision_{stamp}.md').write_text(f'# Decision {i}\n')
+
+    try:
+        timed("naive listdir+getmtime+sort (per call)", lambda: naive_latest(directory, 10), repeat=3)
+
+        index = DecisionIndex(directory)
+        timed("index cold build", index.refresh)
+        # Let the directory mtime age so the index trusts it
+        time.sleep(2.1)
+        index.refresh()
+        timed("index warm latest(10) (per call)", lambda: index.latest(10), repeat=1000)
+        timed("index validator(10) (per call)", lambda: index.validator(10), repeat=1000)
+
+        (directory / 'decision_29990101_000000.md').write_text('# newest\n')
+        timed("index refresh after 1 new file", index.refresh)
+        assert index.latest(1)[0].name == 'decision_29990101_000000.md'
+    finally:
+        shutil.rmtree(directory.parent)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Metrics middleware overhead micro-benchmark.
+
+Measures RequestMetrics.observe() on its own, the before/after hooks as
+they run for one request, and - as an end-to-end sanity check - a trivial
+Flask route through the WSGI test client with and without the middleware.
+The end-to-end difference is noisy (the test client itself costs ~200 us),
+so the hook timing is the number to watch.
+
+Usage:
+    python benchmarks/bench_metrics.py --requests 50000
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from flask import Flask  # noqa: E402
+
+from maven_api import metrics  # noqa: E402
+
+
+def bench_observe(n):
+    registry = metrics.RequestMetrics()
+    started = time.perf_counter()
+    for i in range(n):
+        registry.observe('/api/treasury/state', 'GET', 200, 0.004, 0.001)
+    return (time.perf_counter() - started) / n
+
+
+def bench_hooks(n):
+    app = Flask(__name__)
+    with app.test_request_context('/ping'):
+        response = app.response_class('ok')
+        started = time.perf_counter()
+        for _ in range(n):
+            metrics._start_timer()
+            metrics._record(response)
+        return (time.perf_counter() - started) / n
+
+
+def make_app(instrumented):
+    app = Flask(__name__)
+
+    @app.route('/ping')
+    def ping():
+        return 'ok'
+
+    if instrumented:
+        metrics.shared = None  # keep Redis out of the measurement
+        metrics.init_app(app)
+    return app
+
+
+def bench_requests(app, n):
+    client = app.test_client()
+    for _ in range(min(n, 1000)):
+        client.get('/ping')
+    started = time.perf_counter()
+    for _ in range(n):
+        client.get('/ping')
+    return (time.perf_counter() - started) / n
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--requests', type=int, default=50000)
+    parser.add_argument('--rounds', type=int, default=3)
+    args = parser.parse_args()
+
+    observe = min(bench_observe(args.requests) for _ in range(args.rounds))
+    print(f"observe():           {observe * 1e6:8.2f} us")
+
+    hooks = min(bench_hooks(args.requests) for _ in range(args.rounds))
+    print(f"hooks per request:   {hooks * 1e6:8.2f} us")
+
+    plain = make_app(False)
+    instrumented = make_app(True)
+    base, with_metrics = [], []
+    for _ in range(args.rounds):  # interleave to spread drift over both
+        base.append(bench_requests(plain, args.requests))
+        with_metrics.append(bench_requests(instrumented, args.requests))
+    print(f"request (plain):     {min(base) * 1e6:8.2f} us")
+    print(f"request (metrics):   {min(with_metrics) * 1e6:8.2f} us")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Serving-mode benchmark: Flask dev server vs gunicorn production mode.
+
+Starts the API in each mode via `python -m maven_api.serve`, drives
+/api/treasury/state and /api/watchlist with concurrent clients, and
+reports p50/p99 latency and requests per second for each.
+
+Needs a reachable Postgres (DB_* env vars) for meaningful numbers.
+
+Usage:
+    python benchmarks/bench_serving.py --requests 2000 --concurrency 16
+    python benchmarks/bench_serving.py --modes production --json results.json
+"""
+import argparse
+import json
+import os
+import signal
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import requests
+
+
+ROOT_DIR = Path(__file__).parent.parent
+ENDPOINTS = ['/api/treasury/state', '/api/watchlist']
+
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, int(round(pct / 100 * len(sorted_values))) - 1))
+    return sorted_values[index]
+
+
+def start_server(mode, port):
+    """Launch the API in a new process group and wait for /health."""
+    env = dict(os.environ, MAVEN_SERVER_MODE=mode, MAVEN_API_PORT=str(port))
+    proc = subprocess.Popen(
+        [sys.executable, '-m', 'maven_api.serve'],
+        cwd=ROOT_DIR,
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+        start_new_session=True
+    )
+    deadline = time.time() + 30
+    while time.time() < deadline:
+        try:
+            if requests.get(f'http://127.0.0.1:{port}/health', timeout=1).status_code == 200:
+                return proc
+        except requests.exceptions.RequestException:
+            time.sleep(0.2)
+    stop_server(proc)
+    raise RuntimeError(f"{mode} server did not become healthy on port {port}")
+
+
+def stop_server(proc):
+    """Gracefully stop the server and any reloader/worker children."""
+    try:
+        os.killpg(proc.pid, signal.SIGTERM)
+        proc.wait(timeout=30)
+    except (ProcessLookupError, subprocess.TimeoutExpired):
+        os.killpg(proc.pid, signal.SIGKILL)
+
+
+def run_load(base_url, path, total, concurrency):
+    """Send `total` GETs with `concurrency` clients; return latency stats."""
+    session = requests.Session()
+    session.mount('http://', requests.adapters.HTTPAdapter(pool_maxsize=concurrency))
+
+    def timed(_):
+        started = time.perf_counter()
+        try:
+            ok = session.get(f'{base_url}{path}', timeout=30).status_code == 200
+        except requests.exceptions.RequestException:
+            ok = False
+        return time.perf_counter() - started, ok
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        results = list(executor.map(timed, range(total)))
+    elapsed = time.perf_counter() - started
+
+    latencies = sorted(r[0] for r in results)
+    return {
+        'requests': total,
+        'errors': sum(1 for r in results if not r[1]),
+        'rps': total / elapsed if elapsed else 0,
+        'p50_ms': percentile(latencies, 50) * 1000,
+        'p99_ms': percentile(latencies, 99) * 1000,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark Maven API serving modes')
+    parser.add_argument('--modes', nargs='+', default=['development', 'production'],
+                        choices=['development', 'production'])
+    parser.add_argument('--requests', type=int, default=2000, help='Requests per endpoint')
+    parser.add_argument('--concurrency', type=int, default=16)
+    parser.add_argument('--port', type=int, default=5099)
+    parser.add_argument('--json', help='Write results to this file')
+    args = parser.parse_args()
+
+    results = []
+    for mode in args.modes:
+        proc = start_server(mode, args.port)
+        try:
+            base_url = f'http://127.0.0.1:{args.port}'
+            for path in ENDPOINTS:
+                run_load(base_url, path, min(100, args.requests), args.concurrency)  # warm-up
+                stats = run_load(base_url, path, args.requests, args.concurrency)
+                stats.update({'mode': mode, 'endpoint': path})
+                results.append(stats)
+        finally:
+            stop_server(proc)
+
+    print(f"{'mode':<12} {'endpoint':<22} {'rps':>8} {'p50 ms':>8} {'p99 ms':>8} {'errors':>7}")
+    for r in results:
+        print(f"{r['mode']:<12} {r['endpoint']:<22} {r['rps']:>8.0f} "
+              f"{r['p50_ms']:>8.2f} {r['p99_ms']:>8.2f} {r['errors']:>7}")
+
+    if args.json:
+        Path(args.json).write_text(json.dumps(results, indent=2))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Session log read benchmark on a large synthetic log.
+
+Builds a session_log.md of the requested size (default 500 MB) in the
+format written by maven_mcp.tools._log_event, then times tail and cursor
+reads and records peak Python heap usage for each. --naive adds the old
+read-everything-and-splitlines approach for comparison.
+
+Usage:
+    python benchmarks/bench_session_log.py --size-mb 500
+    python benchmarks/bench_session_log.py --size-mb 500 --naive --keep /tmp/big_log.md
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from maven_mcp import session_log  # noqa: E402
+
+
+def build_log(path, size_mb):
+    """Write a synthetic log of roughly `size_mb` megabytes; return entry count and last time."""
+    target = size_mb * 1024 * 1024
+    stamp = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    written = 0
+    count = 0
+    metadata = json.dumps({"coin": "BTC", "confidence": 87, "note": "x" * 120})
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("# Maven Session Log\n\nCreated: synthetic\n\n---\n")
+        batch = []
+        while written < target:
+            stamp += timedelta(seconds=7)
+            entry = (
+                f"\n## [{stamp.isoformat()}] OBSERVATION\n\n"
+                f"Synthetic event {count} for benchmark purposes.\n"
+                f"\n**Metadata:** {metadata}\n\n---\n"
+            )
+            batch.append(entry)
+            written += len(entry)
+            count += 1
+            if len(batch) >= 10_000:
+                f.write("".join(batch))
+                batch.clear()
+        f.write("".join(batch))
+    return count, stamp
+
+
+def measure(label, fn):
+    tracemalloc.start()
+    started = time.perf_counter()
+    result = fn()
+    elapsed = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    returned = len(result) if isinstance(result, str) else len(result.text)
+    print(f"{label:<38} {elapsed * 1000:>10.2f} ms   peak {peak / 1024:>10.1f} KiB   returned {returned:>8} chars")
+
+
+def naive_tail(path, n):
+    with open(path, "r", encoding="utf-8") as f:
+        content = f.read()
+    return "\n".join(content.splitlines()[-n:])
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark session log tail/cursor reads')
+    parser.add_argument('--size-mb', type=int, default=500)
+    parser.add_argument('--naive', action='store_true', help='Also time the read-everything approach')
+    parser.add_argument('--keep', help='Write the log here and keep it (reused if it exists)')
+    args = parser.parse_args()
+
+    path = Path(args.keep) if args.keep else Path(tempfile.mkdtemp()) / 'session_log.md'
+    if not path.exists():
+        print(f"Building {args.size_mb} MB synthetic log at {path} ...")
+        count, last = build_log(path, args.size_mb)
+        print(f"  {count:,} entries, last at {last.isoformat()}")
+    size = path.stat().st_size
+    print(f"Log size: {size / 1024 / 1024:.1f} MB\n")
+
+    mid_time = datetime.fromisoformat(
+        session_log.tail_entries(path, 1).text.split(']')[0][4:]
+    ) - timedelta(minutes=5)
+
+    measure("tail_lines(100)", lambda: session_log.tail_lines(path, 100))
+    measure("tail_entries(50)", lambda: session_log.tail_entries(path, 50))
+    measure("read_after(offset = size - 64KiB)", lambda: session_log.read_after(path, size - 65536))
+    measure("read_after(timestamp = last - 5min)", lambda: session_log.read_after(path, mid_time))
+    measure("read_after(offset = 0), 1 MiB page", lambda: session_log.read_after(path, 0))
+    if args.naive:
+        measure("naive read + splitlines()[-100:]", lambda: naive_tail(path, 100))
+
+    if not args.keep:
+        os.remove(path)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Treasury rollup benchmark: performance summary and snapshot deltas as
+maven_treasury_state grows.
+
+Inside one transaction that is rolled back at the end, seeds synthetic
+snapshots (one per minute, going back in time) in steps up to --rows,
+rebuilds the rollups, and times at each size:
+
+    legacy performance   the old maven_treasury_performance() body, run
+                         directly against maven_treasury_state
+    rollup performance   maven_treasury_performance() on the rollups
+    legacy deltas        the three ORDER BY lookups the snapshot function did
+    rollup deltas        maven_treasury_deltas(): 1h from the raw table,
+                         24h and 7d from the hourly rollups
+
+Needs a development Postgres migrated with database/migrate.py
+(DB_* env vars); the table is locked while the benchmark runs. Its
+triggers are disabled for the seeding and re-enabled by the rollback.
+
+Usage:
+    python benchmarks/bench_treasury_rollups.py --rows 10000 100000 1000000 --days 30
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import psycopg2
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from database.connection import DB_CONFIG  # noqa: E402
+
+
+LEGACY_PERFORMANCE = """
+    WITH first_in_window AS (
+        SELECT account_value_usd FROM maven_treasury_state
+        WHERE snapshot_at >= NOW() - (%(days)s || ' days')::INTERVAL
+        ORDER BY snapshot_at ASC LIMIT 1
+    ), latest AS (
+        SELECT account_value_usd FROM maven_treasury_state
+        ORDER BY snapshot_at DESC LIMIT 1
+    )
+    SELECT
+        (SELECT * FROM first_in_window),
+        (SELECT * FROM latest),
+        MAX(account_value_usd), MIN(account_value_usd), COUNT(*)
+    FROM maven_treasury_state
+    WHERE snapshot_at >= NOW() - (%(days)s || ' days')::INTERVAL
+"""
+
+LEGACY_DELTAS = """
+    SELECT
+        (SELECT account_value_usd FROM maven_treasury_state
+         WHERE snapshot_at >= NOW() - INTERVAL '1 hour'
+         ORDER BY snapshot_at DESC LIMIT 1),
+        (SELECT account_value_usd FROM maven_treasury_state
+         WHERE snapshot_at >= NOW() - INTERVAL '24 hours'
+           AND snapshot_at <= NOW() - INTERVAL '23 hours'
+         ORDER BY snapshot_at DESC LIMIT 1),
+        (SELECT account_value_usd FROM maven_treasury_state
+         WHERE snapshot_at >= NOW() - INTERVAL '7 days'
+           AND snapshot_at <= NOW() - INTERVAL '6 days 23 hours'
+         ORDER BY snapshot_at DESC LIMIT 1)
+"""
+
+ROLLUP_PERFORMANCE = "SELECT * FROM maven_treasury_performance(%(days)s)"
+
+ROLLUP_DELTAS = "SELECT * FROM maven_treasury_deltas(10000, NOW())"
+
+
+def seed(cursor, start, stop):
+    """Snapshots start..stop-1 minutes before now, with a wandering value."""
+    cursor.execute("""
+        INSERT INTO maven_treasury_state (account_value_usd, withdrawable_usd, snapshot_at)
+        SELECT 10000 + 500 * sin(n / 600.0), 9000, NOW() - n * INTERVAL '1 minute'
+        FROM generate_series(%s, %s) AS n
+    """, (start, stop - 1))
+
+
+def timed(cursor, sql, params, repeat):
+    cursor.execute(sql, params)  # warm-up
+    cursor.fetchall()
+    started = time.perf_counter()
+    for _ in range(repeat):
+        cursor.execute(sql, params)
+        cursor.fetchall()
+    return (time.perf_counter() - started) / repeat * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark treasury rollups')
+    parser.add_argument('--rows', type=int, nargs='+', default=[10_000, 100_000, 1_000_000])
+    parser.add_argument('--days', type=int, default=30)
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    conn = psycopg2.connect(**DB_CONFIG)
+    cursor = conn.cursor()
+    params = {'days': args.days}
+    try:
+        cursor.execute("ALTER TABLE maven_treasury_state DISABLE TRIGGER USER")
+        cursor.execute("DELETE FROM maven_treasury_state")
+
+        print(f"{'rows':>10} {'legacy perf ms':>15} {'rollup perf ms':>15} "
+              f"{'legacy delta ms':>16} {'rollup delta ms':>16}")
+        seeded = 0
+        for rows in sorted(args.rows):
+            seed(cursor, seeded, rows)
+            seeded = rows
+            cursor.execute("SELECT maven_rebuild_treasury_rollups()")
+            cursor.execute("ANALYZE maven_treasury_state")
+            print(f"{rows:>10} "
+                  f"{timed(cursor, LEGACY_PERFORMANCE, params, args.repeat):>15.2f} "
+                  f"{timed(cursor, ROLLUP_PERFORMANCE, params, args.repeat):>15.2f} "
+                  f"{timed(cursor, LEGACY_DELTAS, None, args.repeat):>16.2f} "
+                  f"{timed(cursor, ROLLUP_DELTAS, None, args.repeat):>16.2f}")
+    finally:
+        conn.rollback()
+        conn.close()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+Watchlist price benchmark: LATERAL latest-snapshot lookup vs maven_market_latest.
+
+Inside one transaction that is rolled back at the end, adds --coins active
+watchlist coins and seeds their snapshots (one per coin per minute, going
+back in time) in steps up to --rows in total. At each size it times:
+
+    lateral   the old maven_watchlist_prices body: per coin,
+              ORDER BY snapshot_at DESC LIMIT 1 on maven_market_snapshots
+    latest    maven_watchlist_prices as it is now, joined to
+              maven_market_latest
+
+and finally the cost of the upsert trigger on writes: inserting one snapshot
+per coin with and without it.
+
+Needs a development Postgres migrated with database/migrate.py
+(DB_* env vars). Seeding 10M rows takes a while and needs a few GB
+of disk until the rollback. Snapshot triggers are disabled for the seeding
+and re-enabled by the rollback.
+
+Usage:
+    python benchmarks/bench_watchlist_latest.py --rows 100000 1000000 10000000 --coins 100
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import psycopg2
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from database.connection import DB_CONFIG  # noqa: E402
+
+
+LATERAL = """
+    SELECT w.coin, w.priority, w.market_type, m.mid_price, m.funding_rate,
+           m.volume_24h_usd, m.snapshot_at
+    FROM maven_watchlist w
+    LEFT JOIN LATERAL (
+        SELECT * FROM maven_market_snapshots ms
+        WHERE ms.coin = w.coin
+        ORDER BY ms.snapshot_at DESC
+        LIMIT 1
+    ) m ON TRUE
+    WHERE w.active = TRUE
+    ORDER BY w.priority DESC, w.coin
+"""
+
+LATEST = "SELECT * FROM maven_watchlist_prices"
+
+INSERT_ONE_PER_COIN = """
+    INSERT INTO maven_market_snapshots (coin, market_type, mid_price, funding_rate, volume_24h_usd, snapshot_at)
+    SELECT 'BENCH' || c, 'perp', 100 + c, 0.0001, 1000000, NOW()
+    FROM generate_series(0, %(coins)s - 1) AS c
+"""
+
+
+def seed(cursor, coins, start, stop):
+    """Minutes start..stop-1 before now, one snapshot per coin per minute."""
+    cursor.execute("""
+        INSERT INTO maven_market_snapshots (coin, market_type, mid_price, funding_rate,
+                                            volume_24h_usd, snapshot_at)
+        SELECT 'BENCH' || c, 'perp', 100 + c + sin(n / 60.0), 0.0001, 1000000,
+               NOW() - n * INTERVAL '1 minute'
+        FROM generate_series(0, %s - 1) AS c, generate_series(%s, %s) AS n
+    """, (coins, start, stop - 1))
+
+
+def timed(cursor, sql, params, repeat):
+    cursor.execute(sql, params)  # warm-up
+    cursor.fetchall()
+    started = time.perf_counter()
+    for _ in range(repeat):
+        cursor.execute(sql, params)
+        cursor.fetchall()
+    return (time.perf_counter() - started) / repeat * 1000
+
+
+def timed_insert(cursor, coins, repeat):
+    params = {'coins': coins}
+    started = time.perf_counter()
+    for _ in range(repeat):
+        cursor.execute(INSERT_ONE_PER_COIN, params)
+    return (time.perf_counter() - started) / repeat / coins * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark watchlist latest-price lookups')
+    parser.add_argument('--rows', type=int, nargs='+', default=[100_000, 1_000_000, 10_000_000])
+    parser.add_argument('--coins', type=int, default=100)
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    conn = psycopg2.connect(**DB_CONFIG)
+    cursor = conn.cursor()
+    minutes = max(args.rows) // args.coins
+    try:
+        cursor.execute("""
+            INSERT INTO maven_watchlist (coin, priority, active)
+            SELECT 'BENCH' || c, 'normal', TRUE FROM generate_series(0, %s - 1) AS c
+            ON CONFLICT (coin) DO NOTHING
+        """, (args.coins,))
+        cursor.execute("""
+            SELECT maven_market_snapshots_create_partitions(
+                NOW() - %s * INTERVAL '1 minute', NOW() + INTERVAL '1 day')
+        """, (minutes,))
+        cursor.execute("ALTER TABLE maven_market_snapshots DISABLE TRIGGER USER")
+
+        print(f"{'rows':>10} {'lateral ms':>11} {'latest ms':>10}")
+        seeded = 0
+        for rows in sorted(args.rows):
+            per_coin = rows // args.coins
+            seed(cursor, args.coins, seeded, per_coin)
+            seeded = per_coin
+            cursor.execute("SELECT maven_rebuild_market_latest()")
+            cursor.execute("ANALYZE maven_market_snapshots")
+            cursor.execute("ANALYZE maven_market_latest")
+            print(f"{rows:>10} "
+                  f"{timed(cursor, LATERAL, None, args.repeat):>11.2f} "
+                  f"{timed(cursor, LATEST, None, args.repeat):>10.2f}")
+
+        without = timed_insert(cursor, args.coins, args.repeat)
+        cursor.execute("ALTER TABLE maven_market_snapshots ENABLE TRIGGER maven_market_snapshots_latest")
+        with_trigger = timed_insert(cursor, args.coins, args.repeat)
+        print(f"\ninsert ms per snapshot: {without:.3f} without the latest trigger, "
+              f"{with_trigger:.3f} with it")
+    finally:
+        conn.rollback()
+        conn.close()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+Check read replica routing against a live primary and replica.
+
+Run inside the maven container of the two-server setup in
+docker-compose.replica.yml (DB_REPLICA_DSNS is set there):
+
+    docker exec maven python benchmarks/check_replica_routing.py
+
+Reports which server each kind of checkout reached, by asking the server
+whether it is in recovery:
+
+    readonly     checkout(readonly=True): expected on a replica
+    write        get_db_connection(): expected on the primary
+    after write  readonly again from the thread that just wrote: expected
+                 on the primary for DB_READ_YOUR_WRITES_SECONDS
+
+Then it times how long the replica takes to replay up to the primary's
+current WAL position. With the replica stopped, pass --expect-fallback:
+readonly checkouts are then expected on the primary.
+
+Exits non-zero if any checkout landed somewhere unexpected.
+"""
+import argparse
+import sys
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from database.connection import (  # noqa: E402
+    REPLICA_DSNS, checkout, get_db_connection, get_pool_stats, release,
+)
+
+ROLE_SQL = "SELECT pg_is_in_recovery(), inet_server_addr()::text"
+
+
+def server(conn):
+    cursor = conn.cursor()
+    cursor.execute(ROLE_SQL)
+    in_recovery, addr = cursor.fetchone()
+    cursor.close()
+    conn.rollback()
+    return ('replica' if in_recovery else 'primary'), addr
+
+
+def readonly_servers(n):
+    """Servers reached by n readonly checkouts (from a thread that has not written)."""
+    seen = []
+
+    def run():
+        for _ in range(n):
+            conn = checkout(owner='check_replica_routing', readonly=True)
+            try:
+                seen.append(server(conn))
+            finally:
+                release(conn)
+
+    thread = threading.Thread(target=run)
+    thread.start()
+    thread.join()
+    return seen
+
+
+def replication_delay(timeout):
+    """Seconds until a replica has replayed the primary's current WAL position."""
+    with get_db_connection(owner='check_replica_routing') as conn:
+        cursor = conn.cursor()
+        cursor.execute("SELECT pg_current_wal_lsn()::text")
+        lsn = cursor.fetchone()[0]
+    started = time.perf_counter()
+
+    caught_up = []
+
+    def poll():
+        while time.perf_counter() - started < timeout:
+            conn = checkout(owner='check_replica_routing', readonly=True)
+            try:
+                cursor = conn.cursor()
+                cursor.execute("SELECT pg_last_wal_replay_lsn() >= %s::pg_lsn", (lsn,))
+                done = cursor.fetchone()[0]
+                conn.rollback()
+            finally:
+                release(conn)
+            if done:
+                caught_up.append(time.perf_counter() - started)
+                return
+            time.sleep(0.01)
+
+    thread = threading.Thread(target=poll)
+    thread.start()
+    thread.join()
+    return caught_up[0] if caught_up else None
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Maven read replica routing check')
+    parser.add_argument('--reads', type=int, default=20, help='Readonly checkouts to make')
+    parser.add_argument('--expect-fallback', action='store_true',
+                        help='Replicas are down: expect reads on the primary')
+    parser.add_argument('--timeout', type=float, default=10.0,
+                        help='Seconds to wait for the replica to catch up')
+    args = parser.parse_args()
+
+    if not REPLICA_DSNS:
+        print("DB_REPLICA_DSNS is not set; nothing to route")
+        return 1
+
+    expected_reads = 'primary' if args.expect_fallback else 'replica'
+    failures = 0
+
+    reads = readonly_servers(args.reads)
+    roles = [role for role, _ in reads]
+    addrs = sorted({addr for role, addr in reads if role == 'replica'})
+    print(f"readonly:    {roles.count('replica')} replica, {roles.count('primary')} primary "
+          f"(replica addresses: {', '.join(addrs) or '-'})")
+    failures += sum(role != expected_reads for role in roles)
+
+    with get_db_connection(owner='check_replica_routing') as conn:
+        role, _ = server(conn)
+    print(f"write:       {role}")
+    failures += role != 'primary'
+
+    conn = checkout(owner='check_replica_routing', readonly=True)
+    try:
+        role, _ = server(conn)
+    finally:
+        release(conn)
+    print(f"after write: {role}")
+    failures += role != 'primary'
+
+    if not args.expect_fallback:
+        delay = replication_delay(args.timeout)
+        if delay is None:
+            print(f"replication: not caught up after {args.timeout:.0f}s")
+        else:
+            print(f"replication: caught up in {delay * 1000:.0f} ms")
+        failures += delay is None
+
+    replicas = get_pool_stats().get('replicas', {})
+    print(f"router:      checkouts={replicas.get('replica_checkouts')} "
+          f"fallbacks={replicas.get('primary_fallbacks')} lag_skips={replicas.get('lag_skips')} "
+          f"errors={replicas.get('errors')}")
+    for name, stats in replicas.get('servers', {}).items():
+        print(f"  {name}: circuit={stats['circuit']} lag={stats['lag_seconds']}")
+
+    print('OK' if not failures else f'{failures} check(s) failed')
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""
+Load test: hammer DB-backed endpoints and confirm the pool never leaks.
+
+Fires N requests from C concurrent clients at a running Maven API, then
+reads /api/db/pool to show that every connection came back.
+
+Usage:
+    python benchmarks/load_db_sessions.py --url http://localhost:5002 --requests 5000 --concurrency 32
+"""
+import argparse
+import sys
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+
+ENDPOINTS = ['/api/treasury/state', '/api/watchlist', '/api/signals', '/api/decisions']
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Maven DB session load test')
+    parser.add_argument('--url', default='http://localhost:5002', help='Maven API base URL')
+    parser.add_argument('--requests', type=int, default=5000, help='Total requests to send')
+    parser.add_argument('--concurrency', type=int, default=32, help='Concurrent clients')
+    args = parser.parse_args()
+
+    session = requests.Session()
+    adapter = requests.adapters.HTTPAdapter(pool_maxsize=args.concurrency)
+    session.mount('http://', adapter)
+
+    def hit(i):
+        path = ENDPOINTS[i % len(ENDPOINTS)]
+        try:
+            return session.get(f'{args.url}{path}', timeout=30).status_code
+        except requests.exceptions.RequestException as e:
+            return type(e).__name__
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as executor:
+        statuses = Counter(executor.map(hit, range(args.requests)))
+    elapsed = time.perf_counter() - started
+
+    pool = session.get(f'{args.url}/api/db/pool', timeout=10).json()
+
+    print(f"Requests:    {args.requests} in {elapsed:.2f}s ({args.requests / elapsed:.0f} req/s)")
+    print(f"Statuses:    {dict(statuses)}")
+    print(f"Pool:        in_use={pool.get('in_use')} max={pool.get('maxconn')} "
+          f"peak={pool.get('in_use_max')} timeouts={pool.get('timeouts')}")
+    print(f"Wait (s):    avg={pool.get('wait_seconds_avg', 0):.4f} max={pool.get('wait_seconds_max', 0):.4f}")
+    print(f"Hold (s):    max={pool.get('hold_seconds_max', 0):.4f}")
+
+    ok = statuses.get(200, 0) == args.requests and pool.get('in_use') == 0
+    print("PASS" if ok else "FAIL")
+    return 0 if ok else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,160 @@
+"""
+Circuit breakers for Maven's external dependencies.
+
+When Postgres is down every caller used to wait out a connect timeout
+before giving up. A breaker counts consecutive failures per dependency and,
+past a threshold, opens: callers are refused at once (CircuitOpenError)
+instead of trying. After `reset_seconds` one trial call is let through
+(half-open); its outcome closes the circuit again or re-opens it. The
+background health probes (maven_api.health) feed the same breakers, so a
+recovered dependency is noticed even while no traffic is trying it.
+
+    closed --N failures--> open --reset_seconds--> half-open --ok--> closed
+                                                             --fail--> open
+
+Usage:
+    from database.circuit import get_breaker
+
+    breaker = get_breaker('postgres')
+    breaker.before_call()          # raises CircuitOpenError while open
+    try:
+        ...
+    except OSError as e:
+        breaker.record_failure(e)
+        raise
+    breaker.record_success()
+"""
+import logging
+import os
+import threading
+import time
+
+
+logger = logging.getLogger(__name__)
+
+FAILURE_THRESHOLD = int(os.getenv('MAVEN_CIRCUIT_FAILURES', 3))
+RESET_SECONDS = float(os.getenv('MAVEN_CIRCUIT_RESET_SECONDS', 30))
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling a dependency whose circuit is open."""
+
+    def __init__(self, name, retry_after):
+        super().__init__(f"{name} unavailable (circuit open, retry in {retry_after:.0f}s)")
+        self.name = name
+        self.retry_after = retry_after
+
+
+class CircuitBreaker:
+    """Consecutive-failure breaker for one dependency."""
+
+    def __init__(self, name, failure_threshold=None, reset_seconds=None, clock=time.monotonic):
+        self.name = name
+        self.failure_threshold = failure_threshold or FAILURE_THRESHOLD
+        self.reset_seconds = RESET_SECONDS if reset_seconds is None else reset_seconds
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._state = CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._trial_in_flight = False
+        self._last_error = None
+        self._stats = {'opened': 0, 'rejected': 0}
+
+    @property
+    def state(self):
+        with self._lock:
+            return self._current_state()
+
+    def _current_state(self):
+        if self._state == OPEN and self._clock() - self._opened_at >= self.reset_seconds:
+            return HALF_OPEN
+        return self._state
+
+    def allows(self):
+        """True if a call would be let through now (does not take the trial slot)."""
+        with self._lock:
+            state = self._current_state()
+            return state == CLOSED or (state == HALF_OPEN and not self._trial_in_flight)
+
+    def before_call(self):
+        """Admit a call or raise CircuitOpenError; in half-open only one trial passes."""
+        with self._lock:
+            state = self._current_state()
+            if state == CLOSED:
+                return
+            if state == HALF_OPEN and not self._trial_in_flight:
+                self._trial_in_flight = True
+                return
+            self._stats['rejected'] += 1
+            retry_after = max(0.0, self._opened_at + self.reset_seconds - self._clock())
+        raise CircuitOpenError(self.name, retry_after)
+
+    def record_success(self):
+        with self._lock:
+            if self._state != CLOSED:
+                logger.info(f"Circuit {self.name} closed")
+            self._state = CLOSED
+            self._failures = 0
+            self._trial_in_flight = False
+
+    def record_failure(self, error=None):
+        with self._lock:
+            self._failures += 1
+            self._last_error = str(error) if error is not None else None
+            trial_failed = self._trial_in_flight
+            self._trial_in_flight = False
+            if trial_failed or (self._state == CLOSED and self._failures >= self.failure_threshold):
+                if self._state == CLOSED:
+                    self._stats['opened'] += 1
+                    logger.warning(f"Circuit {self.name} opened after {self._failures} "
+                                   f"failure(s): {error}")
+                self._state = OPEN
+                self._opened_at = self._clock()
+            elif self._state == OPEN:
+                # A failed probe while open restarts the cool-down
+                self._opened_at = self._clock()
+
+    def reset(self):
+        """Forget all failures and close the circuit."""
+        with self._lock:
+            self._state = CLOSED
+            self._failures = 0
+            self._trial_in_flight = False
+            self._last_error = None
+
+    def snapshot(self):
+        with self._lock:
+            state = self._current_state()
+            return {
+                'state': state,
+                'failures': self._failures,
+                'last_error': self._last_error,
+                'retry_in': (max(0.0, self._opened_at + self.reset_seconds - self._clock())
+                             if state == OPEN else 0.0),
+                **self._stats,
+            }
+
+
+_breakers = {}
+_breakers_lock = threading.Lock()
+
+
+def get_breaker(name):
+    """The process-wide breaker for a dependency, created on first use."""
+    with _breakers_lock:
+        breaker = _breakers.get(name)
+        if breaker is None:
+            breaker = _breakers[name] = CircuitBreaker(name)
+        return breaker
+
+
+def breaker_states():
+    """{name: snapshot} for every breaker created so far."""
+    with _breakers_lock:
+        breakers = list(_breakers.values())
+    return {b.name: b.snapshot() for b in breakers}
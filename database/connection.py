@@ -4,13 +4,43 @@ PostgreSQL connection pooling for Maven service.
 Supports connecting to:
 - maven_postgres (standalone mode)
 - moha_postgres (integrated with moha-bot)
+
+Two pools share one configuration (POOL_CONFIG, all from DB_POOL_* env):
+InstrumentedConnectionPool for the threaded Flask API and tools, and
+AsyncConnectionPool for asyncio code such as the MCP servers. Both
+recycle connections past DB_POOL_MAX_LIFETIME, ping connections that sat
+idle for DB_POOL_VALIDATE_IDLE seconds before handing them out, and apply
+DB_STATEMENT_TIMEOUT_MS to every session.
+
+Hot read queries go through execute_prepared(), which PREPAREs them once
+per connection so later calls skip parsing and planning. Only connections
+the pool keeps open while idle carry their prepared statements from one
+checkout to the next; psycopg2 closes any returned past DB_POOL_MIN, so it
+defaults to one per API thread (MAVEN_API_THREADS).
+
+With DB_REPLICA_DSNS set, checkouts that ask for readonly=True (the
+query_maven_* helpers, the API's GET handlers) go round-robin to streaming
+replicas, each with its own pool and circuit breaker. A replica is skipped
+while its circuit is open or while it replays more than
+DB_REPLICA_MAX_LAG_SECONDS behind the primary; with none usable, reads go
+to the primary. A thread that wrote through get_db_connection() reads from
+the primary for DB_READ_YOUR_WRITES_SECONDS afterwards.
 """
+import asyncio
+import hashlib
 import os
+import threading
+import time
+from collections import OrderedDict
 import psycopg2
-from psycopg2.pool import ThreadedConnectionPool
-from contextlib import contextmanager
+from psycopg2 import extensions
+from psycopg2.extensions import cursor as _cursor
+from psycopg2.pool import ThreadedConnectionPool, PoolError
+from contextlib import asynccontextmanager, contextmanager
 import logging
 
+from database.circuit import get_breaker
+
 logger = logging.getLogger(__name__)
 
 # Database configuration from environment
@@ -19,50 +49,994 @@ DB_CONFIG = {
     'port': int(os.getenv('DB_PORT', 5432)),
     'database': os.getenv('DB_NAME', 'maven_data'),
     'user': os.getenv('DB_USER', 'maven_user'),
-    'password': os.getenv('DB_PASSWORD', 'maven_password')
+    'password': os.getenv('DB_PASSWORD', 'maven_password'),
+    # Bounded so an unreachable server fails in seconds, not a TCP timeout
+    'connect_timeout': int(os.getenv('DB_CONNECT_TIMEOUT', 5)),
+}
+
+# Pool behaviour from environment
+POOL_CONFIG = {
+    # Connections kept open while idle (default: one per API thread, so
+    # concurrent requests reuse prepared statements), and the most open at once
+    'minconn': int(os.getenv('DB_POOL_MIN', os.getenv('MAVEN_API_THREADS', 4))),
+    'maxconn': int(os.getenv('DB_POOL_MAX', 10)),
+    # Seconds a caller waits for a free connection before PoolError
+    'checkout_timeout': float(os.getenv('DB_POOL_CHECKOUT_TIMEOUT', 5)),
+    # Seconds a connection may be held before the leak detector complains
+    'leak_threshold': float(os.getenv('DB_POOL_LEAK_SECONDS', 30)),
+    # Seconds after which a connection is closed instead of reused (0 = never)
+    'max_lifetime': float(os.getenv('DB_POOL_MAX_LIFETIME', 1800)),
+    # Connections idle at least this many seconds are pinged on checkout
+    # (0 = every checkout, negative = never)
+    'validate_idle': float(os.getenv('DB_POOL_VALIDATE_IDLE', 30)),
+    # Server-side statement timeout for pooled sessions (0 = none)
+    'statement_timeout_ms': int(os.getenv('DB_STATEMENT_TIMEOUT_MS', 30000)),
+    # Prepared statements kept per connection (0 = never PREPARE)
+    'statement_cache_size': int(os.getenv('DB_STATEMENT_CACHE_SIZE', 32)),
+}
+
+
+# Streaming replicas for read-only checkouts: comma-separated libpq DSNs or
+# URIs; whatever they leave out (user, password, ...) comes from DB_CONFIG
+REPLICA_DSNS = [dsn.strip() for dsn in os.getenv('DB_REPLICA_DSNS', '').split(',') if dsn.strip()]
+
+REPLICA_CONFIG = {
+    # A replica further behind than this is skipped until it catches up
+    'max_lag_seconds': float(os.getenv('DB_REPLICA_MAX_LAG_SECONDS', 10)),
+    # How often each process re-measures a replica's lag (on checkout)
+    'lag_check_seconds': float(os.getenv('DB_REPLICA_LAG_CHECK_SECONDS', 5)),
+    # After a write, reads stay on the primary this long
+    'read_your_writes_seconds': float(os.getenv('DB_READ_YOUR_WRITES_SECONDS', 15)),
 }
 
-# Connection pool (1-10 connections)
+
+def session_options():
+    """Extra psycopg2.connect() kwargs applied to pooled connections."""
+    timeout = POOL_CONFIG['statement_timeout_ms']
+    return {'options': f"-c statement_timeout={timeout}"} if timeout > 0 else {}
+
+
+# Per-thread running total of seconds spent in cursor.execute(); the API's
+# metrics middleware resets it at the start of each request
+_query_clock = threading.local()
+
+
+def record_query_time(seconds):
+    """Add `seconds` to the calling thread's query-time total."""
+    _query_clock.seconds = getattr(_query_clock, 'seconds', 0.0) + seconds
+
+
+def reset_query_time():
+    """Zero the calling thread's query-time total and return the old value."""
+    seconds = getattr(_query_clock, 'seconds', 0.0)
+    _query_clock.seconds = 0.0
+    return seconds
+
+
+# Opened by repeated connection failures (and failed health probes); while
+# open, checkouts fail fast with CircuitOpenError
+db_breaker = get_breaker('postgres')
+
+# id(conn) -> breaker, for connections to a server other than the primary
+_conn_breakers = {}
+
+
+def breaker_for(conn):
+    """The circuit breaker of the server `conn` is connected to."""
+    return _conn_breakers.get(id(conn), db_breaker)
+
+
+class TimedCursor(_cursor):
+    """
+    Default cursor for pooled connections; times execute() calls.
+
+    A query that fails because the connection itself dropped counts as a
+    failure for that server's breaker (db_breaker for the primary).
+    """
+
+    def execute(self, query, vars=None):
+        started = time.perf_counter()
+        try:
+            return super().execute(query, vars)
+        except (psycopg2.OperationalError, psycopg2.InterfaceError) as e:
+            if self.connection.closed:
+                breaker_for(self.connection).record_failure(e)
+            raise
+        finally:
+            record_query_time(time.perf_counter() - started)
+
+    def executemany(self, query, vars_list):
+        started = time.perf_counter()
+        try:
+            return super().executemany(query, vars_list)
+        except (psycopg2.OperationalError, psycopg2.InterfaceError) as e:
+            if self.connection.closed:
+                breaker_for(self.connection).record_failure(e)
+            raise
+        finally:
+            record_query_time(time.perf_counter() - started)
+
+
+class StatementCache:
+    """
+    Which prepared statements exist on which connection.
+
+    Connections are tracked by id(); pools call forget() whenever they open
+    or close one, so a reused id never inherits another session's names.
+    Past the per-connection size the least recently used name is dropped
+    (and DEALLOCATEd by the caller).
+    """
+
+    def __init__(self):
+        self._by_conn = {}  # id(conn) -> OrderedDict of names
+        self._lock = threading.Lock()
+        self._stats = {'hits': 0, 'prepares': 0, 'evictions': 0}
+
+    def lookup(self, conn, name):
+        """True if `name` is already prepared on `conn`."""
+        with self._lock:
+            names = self._by_conn.get(id(conn))
+            if names is None or name not in names:
+                return False
+            names.move_to_end(name)
+            self._stats['hits'] += 1
+            return True
+
+    def add(self, conn, name, size):
+        """Record a successful PREPARE; returns the names to DEALLOCATE."""
+        with self._lock:
+            names = self._by_conn.setdefault(id(conn), OrderedDict())
+            names[name] = True
+            self._stats['prepares'] += 1
+            evicted = []
+            while len(names) > size:
+                evicted.append(names.popitem(last=False)[0])
+            self._stats['evictions'] += len(evicted)
+            return evicted
+
+    def forget(self, conn):
+        with self._lock:
+            self._by_conn.pop(id(conn), None)
+
+    def stats(self):
+        with self._lock:
+            return dict(self._stats, connections=len(self._by_conn))
+
+
+statement_cache = StatementCache()
+
+
+def statement_name(label, sql):
+    """Prepared statement name: the label plus a hash of the exact SQL text."""
+    return f"{label}_{hashlib.sha1(sql.encode()).hexdigest()[:10]}"
+
+
+def _positional(sql):
+    """Rewrite psycopg2 %s placeholders as PREPARE's $1, $2, ..."""
+    parts = sql.split('%s')
+    return ''.join(f"{part}${i}" for i, part in enumerate(parts[:-1], 1)) + parts[-1]
+
+
+def _execute_statement(name, params):
+    if not params:
+        return f"EXECUTE {name}", None
+    return f"EXECUTE {name} ({', '.join(['%s'] * len(params))})", tuple(params)
+
+
+def execute_prepared(cursor, label, sql, params=()):
+    """
+    Run `sql` as a prepared statement on the cursor's connection.
+
+    `sql` uses %s placeholders like cursor.execute(); the first call on a
+    connection PREPAREs it, later calls only EXECUTE. The statement name is
+    derived from `label` and the SQL text, so query variants (e.g. with and
+    without a keyset condition) get separate statements. With
+    DB_STATEMENT_CACHE_SIZE=0 (or behind a transaction-pooling proxy) this
+    is a plain execute().
+    """
+    size = POOL_CONFIG['statement_cache_size']
+    if size <= 0:
+        return cursor.execute(sql, tuple(params) or None)
+    conn = cursor.connection
+    name = statement_name(label, sql)
+    if not statement_cache.lookup(conn, name):
+        cursor.execute(f"PREPARE {name} AS {_positional(sql)}")
+        for old in statement_cache.add(conn, name, size):
+            cursor.execute(f"DEALLOCATE {old}")
+    return cursor.execute(*_execute_statement(name, params))
+
+
+class InstrumentedConnectionPool(ThreadedConnectionPool):
+    """
+    ThreadedConnectionPool that blocks (up to a timeout) instead of failing
+    immediately when exhausted, and records checkout statistics.
+
+    Every checkout is tagged with an owner label (a Flask endpoint, a tool
+    name, ...) so connections held for too long can be attributed.
+    """
+
+    def __init__(self, minconn, maxconn, *args, checkout_timeout=5.0, max_lifetime=0.0,
+                 validate_idle=-1.0, breaker=None, **kwargs):
+        # Set before super().__init__(), which opens the first connections
+        self._opened = {}    # id(conn) -> monotonic time it was opened
+        self._returned = {}  # id(conn) -> monotonic time it went back to the pool
+        self.breaker = breaker or db_breaker
+        super().__init__(minconn, maxconn, *args, **kwargs)
+        self.checkout_timeout = checkout_timeout
+        self.max_lifetime = max_lifetime
+        self.validate_idle = validate_idle
+        self._slots = threading.BoundedSemaphore(self.maxconn)
+        self._stats_lock = threading.Lock()
+        self._checkouts = {}  # id(conn) -> (checked_out_at, owner)
+        self._stats = {
+            'checkouts': 0,
+            'timeouts': 0,
+            'recycled': 0,
+            'validation_failures': 0,
+            'in_use_max': 0,
+            'wait_seconds_total': 0.0,
+            'wait_seconds_max': 0.0,
+            'hold_seconds_total': 0.0,
+            'hold_seconds_max': 0.0,
+        }
+
+    def getconn(self, key=None, owner=None, timeout=None):
+        """Check out a connection, waiting up to `timeout` seconds for a free slot."""
+        if timeout is None:
+            timeout = self.checkout_timeout
+
+        started = time.monotonic()
+        if not self._slots.acquire(timeout=timeout):
+            with self._stats_lock:
+                self._stats['timeouts'] += 1
+            raise PoolError(
+                f"connection pool exhausted: no connection free after {timeout:.1f}s "
+                f"({self.maxconn} in use)"
+            )
+
+        try:
+            conn = super().getconn(key)
+            while not self._usable(conn):
+                self._discard(conn)
+                conn = super().getconn(key)
+        except Exception:
+            self._slots.release()
+            raise
+
+        now = time.monotonic()
+        waited = now - started
+        with self._stats_lock:
+            self._checkouts[id(conn)] = (now, owner or 'unknown')
+            self._stats['checkouts'] += 1
+            self._stats['in_use_max'] = max(self._stats['in_use_max'], len(self._checkouts))
+            self._stats['wait_seconds_total'] += waited
+            self._stats['wait_seconds_max'] = max(self._stats['wait_seconds_max'], waited)
+        return conn
+
+    def putconn(self, conn=None, key=None, close=False):
+        """Return a connection to the pool and record how long it was held."""
+        with self._stats_lock:
+            checkout = self._checkouts.pop(id(conn), None)
+            if checkout is not None:
+                held = time.monotonic() - checkout[0]
+                self._stats['hold_seconds_total'] += held
+                self._stats['hold_seconds_max'] = max(self._stats['hold_seconds_max'], held)
+
+        try:
+            super().putconn(conn, key, close)
+        finally:
+            if conn.closed:
+                self._forget(conn)
+            else:
+                self._returned[id(conn)] = time.monotonic()
+            if checkout is not None:
+                self._slots.release()
+
+    def _connect(self, key=None):
+        conn = super()._connect(key)
+        self._opened[id(conn)] = time.monotonic()
+        statement_cache.forget(conn)
+        if self.breaker is not db_breaker:
+            _conn_breakers[id(conn)] = self.breaker
+        return conn
+
+    def _forget(self, conn):
+        self._opened.pop(id(conn), None)
+        self._returned.pop(id(conn), None)
+        statement_cache.forget(conn)
+        _conn_breakers.pop(id(conn), None)
+
+    def owns(self, conn):
+        """True if `conn` is checked out of this pool."""
+        with self._stats_lock:
+            return id(conn) in self._checkouts
+
+    def _usable(self, conn):
+        """False for a connection that is closed, past max_lifetime, or fails a ping."""
+        if conn.closed:
+            return False
+        now = time.monotonic()
+        if self.max_lifetime > 0 and now - self._opened.get(id(conn), now) > self.max_lifetime:
+            with self._stats_lock:
+                self._stats['recycled'] += 1
+            return False
+        returned = self._returned.pop(id(conn), None)
+        if returned is None or self.validate_idle < 0 or now - returned < self.validate_idle:
+            return True
+        try:
+            cursor = conn.cursor()
+            cursor.execute("SELECT 1")
+            cursor.fetchone()
+            cursor.close()
+            conn.rollback()
+            return True
+        except psycopg2.Error as e:
+            logger.warning(f"Discarding pooled connection that failed validation: {e}")
+            with self._stats_lock:
+                self._stats['validation_failures'] += 1
+            return False
+
+    def _discard(self, conn):
+        """Close a connection that was just taken from the idle list."""
+        self._forget(conn)
+        try:
+            super().putconn(conn, close=True)
+        except Exception as e:
+            logger.warning(f"Error discarding pooled connection: {e}")
+
+    def stats(self):
+        """Snapshot of pool utilisation and checkout timings."""
+        with self._stats_lock:
+            stats = dict(self._stats)
+            in_use = len(self._checkouts)
+        checkouts = stats['checkouts']
+        stats.update({
+            'maxconn': self.maxconn,
+            'minconn': self.minconn,
+            'in_use': in_use,
+            'idle': len(self._pool),
+            'utilization': in_use / self.maxconn if self.maxconn else 0,
+            'wait_seconds_avg': stats['wait_seconds_total'] / checkouts if checkouts else 0.0,
+        })
+        return stats
+
+    def held_connections(self, min_seconds=0.0):
+        """List (owner, held_seconds) for connections checked out at least `min_seconds` ago."""
+        now = time.monotonic()
+        with self._stats_lock:
+            held = [(owner, now - since) for since, owner in self._checkouts.values()]
+        return sorted(
+            (item for item in held if item[1] >= min_seconds),
+            key=lambda item: item[1],
+            reverse=True
+        )
+
+
+# Connection pool (DB_POOL_MIN-DB_POOL_MAX connections)
 _pool = None
+_pool_lock = threading.Lock()
+_leak_detector = None
+
 
 def get_pool():
     """Get or create the connection pool."""
     global _pool
     if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                try:
+                    _pool = InstrumentedConnectionPool(
+                        minconn=min(POOL_CONFIG['minconn'], POOL_CONFIG['maxconn']),
+                        maxconn=POOL_CONFIG['maxconn'],
+                        checkout_timeout=POOL_CONFIG['checkout_timeout'],
+                        max_lifetime=POOL_CONFIG['max_lifetime'],
+                        validate_idle=POOL_CONFIG['validate_idle'],
+                        cursor_factory=TimedCursor,
+                        **DB_CONFIG,
+                        **session_options()
+                    )
+                    logger.info(f"Database pool created: {DB_CONFIG['host']}:{DB_CONFIG['port']}/{DB_CONFIG['database']}")
+                except Exception as e:
+                    logger.error(f"Failed to create database pool: {e}")
+                    raise
+    return _pool
+
+
+def reset_pool():
+    """
+    Close and forget the current pool and any read replica pools.
+
+    Call in a freshly forked worker so it builds its own pool instead of
+    sharing sockets inherited from the parent process.
+    """
+    global _pool, _router, _leak_detector
+    with _pool_lock:
+        if _pool is not None and not _pool.closed:
+            try:
+                _pool.closeall()
+            except Exception as e:
+                logger.warning(f"Error closing database pool: {e}")
+        if _router is not None:
+            _router.close()
+        _pool = None
+        _router = None
+        _leak_detector = None
+
+
+# =============================================================================
+# Read replicas
+# =============================================================================
+
+# Seconds of commits the replica has yet to replay; 0 when it has replayed
+# everything it received (or is not in recovery at all)
+REPLICA_LAG_SQL = """
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() THEN 0
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE COALESCE(EXTRACT(EPOCH FROM NOW() - pg_last_xact_replay_timestamp()), 0)
+    END
+"""
+
+
+def replica_config(dsn):
+    """psycopg2.connect() kwargs for one DB_REPLICA_DSNS entry, filled in from DB_CONFIG."""
+    params = extensions.parse_dsn(dsn)
+    if 'dbname' in params:
+        params['database'] = params.pop('dbname')
+    if 'port' in params:
+        params['port'] = int(params['port'])
+    return {**DB_CONFIG, **params}
+
+
+class Replica:
+    """One streaming replica: its own pool, circuit breaker and last measured lag."""
+
+    def __init__(self, config):
+        self.config = config
+        self.name = f"{config['host']}:{config['port']}"
+        self.breaker = get_breaker(f'postgres_replica:{self.name}')
+        self.lag_seconds = None
+        self._lag_checked = None  # monotonic time of the last measurement
+        self._pool = None
+        self._lock = threading.Lock()
+
+    @property
+    def pool(self):
+        if self._pool is None:
+            with self._lock:
+                if self._pool is None:
+                    self._pool = InstrumentedConnectionPool(
+                        minconn=min(POOL_CONFIG['minconn'], POOL_CONFIG['maxconn']),
+                        maxconn=POOL_CONFIG['maxconn'],
+                        checkout_timeout=POOL_CONFIG['checkout_timeout'],
+                        max_lifetime=POOL_CONFIG['max_lifetime'],
+                        validate_idle=POOL_CONFIG['validate_idle'],
+                        breaker=self.breaker,
+                        cursor_factory=TimedCursor,
+                        **self.config,
+                        **session_options()
+                    )
+                    logger.info(f"Read replica pool created: {self.name}/{self.config['database']}")
+        return self._pool
+
+    def owns(self, conn):
+        return self._pool is not None and self._pool.owns(conn)
+
+    def _lag_due(self):
+        return (self._lag_checked is None
+                or time.monotonic() - self._lag_checked >= REPLICA_CONFIG['lag_check_seconds'])
+
+    def lagging(self):
+        """True if the last measurement put this replica past DB_REPLICA_MAX_LAG_SECONDS."""
+        return self.lag_seconds is not None and self.lag_seconds > REPLICA_CONFIG['max_lag_seconds']
+
+    def _measure_lag(self, conn):
+        cursor = conn.cursor()
+        cursor.execute(REPLICA_LAG_SQL)
+        row = cursor.fetchone()
+        cursor.close()
+        conn.rollback()
+        self.lag_seconds = float(row[0]) if row and row[0] is not None else 0.0
+        self._lag_checked = time.monotonic()
+        if self.lagging():
+            logger.warning(f"Read replica {self.name} is {self.lag_seconds:.1f}s behind; "
+                           f"reading from other servers")
+
+    def checkout(self, owner=None):
+        """
+        A connection to this replica, or None while it is too far behind.
+
+        Lag is re-measured on the checked-out connection at most every
+        DB_REPLICA_LAG_CHECK_SECONDS; a lagging replica is not contacted
+        again until the next measurement is due. Raises like checkout().
+        """
+        if self.lagging() and not self._lag_due():
+            return None
+        self.breaker.before_call()
         try:
-            _pool = ThreadedConnectionPool(
-                minconn=1,
-                maxconn=10,
-                **DB_CONFIG
-            )
-            logger.info(f"Database pool created: {DB_CONFIG['host']}:{DB_CONFIG['port']}/{DB_CONFIG['database']}")
+            conn = self.pool.getconn(owner=owner)
+        except PoolError:
+            self.breaker.record_success()
+            raise
         except Exception as e:
-            logger.error(f"Failed to create database pool: {e}")
+            self.breaker.record_failure(e)
             raise
-    return _pool
+        self.breaker.record_success()
+
+        if self._lag_due():
+            try:
+                self._measure_lag(conn)
+            except Exception:
+                self.pool.putconn(conn, close=True)
+                raise
+        if self.lagging():
+            self.pool.putconn(conn)
+            return None
+        return conn
+
+    def close(self):
+        if self._pool is not None and not self._pool.closed:
+            self._pool.closeall()
+        self._pool = None
+
+    def stats(self):
+        return {
+            'circuit': self.breaker.state,
+            'lag_seconds': self.lag_seconds,
+            'pool': self._pool.stats() if self._pool is not None else None,
+        }
+
+
+class ReplicaRouter:
+    """Round-robin over the replicas whose circuit is closed and that are caught up."""
+
+    def __init__(self, replicas):
+        self.replicas = list(replicas)
+        self._next = 0
+        self._lock = threading.Lock()
+        self._stats = {'replica_checkouts': 0, 'primary_fallbacks': 0, 'lag_skips': 0, 'errors': 0}
+
+    def _count(self, key):
+        with self._lock:
+            self._stats[key] += 1
+
+    def checkout(self, owner=None):
+        """A replica connection, or None when no replica can take the read."""
+        with self._lock:
+            start = self._next
+            self._next = (self._next + 1) % len(self.replicas)
+        for offset in range(len(self.replicas)):
+            replica = self.replicas[(start + offset) % len(self.replicas)]
+            if not replica.breaker.allows():
+                continue
+            try:
+                conn = replica.checkout(owner=owner)
+            except Exception as e:
+                logger.warning(f"Read replica {replica.name} unavailable: {e}")
+                self._count('errors')
+                continue
+            if conn is None:
+                self._count('lag_skips')
+                continue
+            self._count('replica_checkouts')
+            return conn
+        self._count('primary_fallbacks')
+        return None
+
+    def release(self, conn, close=False):
+        """Return `conn` to its replica's pool; False if no replica lent it out."""
+        for replica in self.replicas:
+            if replica.owns(conn):
+                replica.pool.putconn(conn, close=close)
+                return True
+        return False
+
+    def close(self):
+        for replica in self.replicas:
+            try:
+                replica.close()
+            except Exception as e:
+                logger.warning(f"Error closing read replica pool {replica.name}: {e}")
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+        stats['servers'] = {replica.name: replica.stats() for replica in self.replicas}
+        return stats
+
+
+_router = None
+
+# Monotonic time of this thread's last committed get_db_connection() write
+_last_write = threading.local()
+
+
+def get_router():
+    """The ReplicaRouter for DB_REPLICA_DSNS, or None when no replicas are configured."""
+    global _router
+    if _router is None and REPLICA_DSNS:
+        with _pool_lock:
+            if _router is None:
+                _router = ReplicaRouter(Replica(replica_config(dsn)) for dsn in REPLICA_DSNS)
+    return _router
+
+
+def mark_write():
+    """Keep this thread's reads on the primary for DB_READ_YOUR_WRITES_SECONDS."""
+    _last_write.at = time.monotonic()
+
+
+def reads_from_primary():
+    """True if this thread wrote recently enough that a replica may not show it yet."""
+    at = getattr(_last_write, 'at', None)
+    return at is not None and time.monotonic() - at < REPLICA_CONFIG['read_your_writes_seconds']
+
+
+def checkout(owner=None, readonly=False):
+    """
+    Check a connection out of the pool through db_breaker.
+
+    Raises CircuitOpenError at once while the circuit is open. Failing to
+    create the pool or open a connection counts against the breaker; a
+    pool-exhausted PoolError does not (the server is up, just busy).
+
+    With readonly=True the connection comes from a read replica when one is
+    usable and this thread has not written recently (reads_from_primary());
+    otherwise from the primary. Hand it back with release().
+    """
+    if readonly and not reads_from_primary():
+        router = get_router()
+        if router is not None:
+            conn = router.checkout(owner=owner)
+            if conn is not None:
+                return conn
+
+    db_breaker.before_call()
+    try:
+        conn = get_pool().getconn(owner=owner)
+    except PoolError:
+        db_breaker.record_success()
+        raise
+    except Exception as e:
+        db_breaker.record_failure(e)
+        raise
+    db_breaker.record_success()
+    return conn
+
+
+def release(conn, close=False):
+    """Return a connection from checkout() to the pool it came from."""
+    if _router is not None and _router.release(conn, close=close):
+        return
+    get_pool().putconn(conn, close=close)
+
+
+def db_ready():
+    """False while the database circuit is open; callers can skip DB writes."""
+    return db_breaker.allows()
+
+
+def warm_pool():
+    """
+    Create the pool and validate one connection with a round trip.
+
+    Returns:
+        bool: True if the database answered
+    """
+    try:
+        conn = checkout(owner='warm_pool')
+        pool = get_pool()
+        try:
+            cursor = conn.cursor()
+            cursor.execute("SELECT 1")
+            cursor.fetchone()
+            cursor.close()
+            conn.rollback()
+        finally:
+            pool.putconn(conn)
+        logger.info(f"Database pool warmed ({pool.minconn}-{pool.maxconn} connections)")
+        return True
+    except Exception as e:
+        logger.warning(f"Database pool warm-up failed: {e}")
+        return False
+
+
+def get_pool_stats():
+    """
+    Get connection pool utilisation and timing stats.
+
+    Returns:
+        dict: Pool stats, or {'initialized': False} if no pool exists yet
+    """
+    if _pool is None:
+        return {'initialized': False}
+    stats = _pool.stats()
+    stats['initialized'] = True
+    stats['statements'] = statement_cache.stats()
+    if _router is not None:
+        stats['replicas'] = _router.stats()
+    return stats
+
+
+def check_for_leaks(threshold=None):
+    """
+    Log a warning for every connection held longer than `threshold` seconds.
+
+    Returns:
+        list: (owner, held_seconds) tuples for the offending checkouts
+    """
+    if _pool is None:
+        return []
+    if threshold is None:
+        threshold = POOL_CONFIG['leak_threshold']
+
+    leaks = _pool.held_connections(min_seconds=threshold)
+    if _router is not None:
+        for replica in _router.replicas:
+            if replica._pool is not None:
+                leaks += replica._pool.held_connections(min_seconds=threshold)
+    for owner, held in leaks:
+        logger.warning(f"Possible connection leak: '{owner}' has held a DB connection for {held:.1f}s")
+    return leaks
+
+
+def start_leak_detector(interval=None, threshold=None):
+    """Start a daemon thread that runs check_for_leaks() every `interval` seconds."""
+    global _leak_detector
+    if _leak_detector is not None and _leak_detector.is_alive():
+        return _leak_detector
+    if threshold is None:
+        threshold = POOL_CONFIG['leak_threshold']
+    if interval is None:
+        interval = max(threshold / 2, 1.0)
+
+    def _run():
+        while True:
+            time.sleep(interval)
+            try:
+                check_for_leaks(threshold)
+            except Exception as e:
+                logger.error(f"Leak detector error: {e}")
+
+    _leak_detector = threading.Thread(target=_run, name='db-leak-detector', daemon=True)
+    _leak_detector.start()
+    return _leak_detector
+
 
 @contextmanager
-def get_db_connection():
+def get_db_connection(owner=None, readonly=False):
     """
     Context manager for database connections.
 
     Usage:
-        with get_db_connection() as conn:
+        with get_db_connection(readonly=True) as conn:
             cursor = conn.cursor()
             cursor.execute("SELECT * FROM maven_memory")
             results = cursor.fetchall()
+
+    Args:
+        owner: Optional label recorded with the checkout for leak reports
+        readonly: The block only reads, so it may run on a read replica.
+            Otherwise it runs on the primary, and once it commits this
+            thread's reads stay there for DB_READ_YOUR_WRITES_SECONDS.
     """
-    pool = get_pool()
-    conn = pool.getconn()
+    conn = checkout(owner=owner, readonly=readonly)
     try:
         yield conn
         conn.commit()
+        if not readonly:
+            mark_write()
     except Exception as e:
         conn.rollback()
         logger.error(f"Database error: {e}")
         raise e
     finally:
-        pool.putconn(conn)
+        release(conn)
+
+# =============================================================================
+# asyncio pool (MCP servers)
+# =============================================================================
+
+async def wait_ready(conn):
+    """Drive a psycopg2 async connection until its pending operation completes."""
+    loop = asyncio.get_running_loop()
+    while True:
+        state = conn.poll()
+        if state == extensions.POLL_OK:
+            return
+        if state == extensions.POLL_READ:
+            add, remove = loop.add_reader, loop.remove_reader
+        elif state == extensions.POLL_WRITE:
+            add, remove = loop.add_writer, loop.remove_writer
+        else:
+            raise psycopg2.OperationalError(f"unexpected poll state {state}")
+        ready = loop.create_future()
+        fd = conn.fileno()
+        add(fd, lambda: ready.done() or ready.set_result(None))
+        try:
+            await ready
+        finally:
+            remove(fd)
+
+
+class AsyncConnectionPool:
+    """
+    asyncio counterpart of InstrumentedConnectionPool.
+
+    Uses psycopg2's asynchronous connections, waited on through the event
+    loop, so a slow query suspends only the coroutine that issued it. Async
+    connections run in autocommit mode; send BEGIN/COMMIT yourself for a
+    multi-statement transaction. Same knobs as the threaded pool: idle
+    connections beyond minconn are closed, old ones are recycled, and long
+    idle ones are pinged on checkout.
+
+    Usage:
+        pool = get_async_pool()
+        async with pool.connection() as conn:
+            cursor = await pool.execute_prepared(conn, 'treasury', "SELECT * FROM maven_treasury_current")
+            row = cursor.fetchone()
+    """
+
+    def __init__(self, minconn=None, maxconn=None, checkout_timeout=None, max_lifetime=None,
+                 validate_idle=None, **kwargs):
+        self.maxconn = POOL_CONFIG['maxconn'] if maxconn is None else maxconn
+        self.minconn = min(POOL_CONFIG['minconn'], self.maxconn) if minconn is None else minconn
+        self.checkout_timeout = (POOL_CONFIG['checkout_timeout']
+                                 if checkout_timeout is None else checkout_timeout)
+        self.max_lifetime = POOL_CONFIG['max_lifetime'] if max_lifetime is None else max_lifetime
+        self.validate_idle = POOL_CONFIG['validate_idle'] if validate_idle is None else validate_idle
+        self._kwargs = kwargs or dict(DB_CONFIG, **session_options())
+        self._idle = []      # (conn, returned_at)
+        self._opened = {}    # id(conn) -> opened_at
+        self._slots = None   # asyncio.Semaphore, created in the running loop
+        self._in_use = 0
+        self.closed = False
+        self._stats = {'checkouts': 0, 'timeouts': 0, 'recycled': 0, 'validation_failures': 0}
+
+    async def _connect(self):
+        db_breaker.before_call()
+        conn = None
+        try:
+            conn = psycopg2.connect(async_=1, **self._kwargs)
+            # libpq's connect_timeout is not enforced for async connections
+            await asyncio.wait_for(wait_ready(conn), self._kwargs.get('connect_timeout') or None)
+        except (Exception, asyncio.CancelledError) as e:
+            if conn is not None:
+                conn.close()
+            if not isinstance(e, asyncio.CancelledError):
+                db_breaker.record_failure(e)
+            raise
+        db_breaker.record_success()
+        self._opened[id(conn)] = time.monotonic()
+        statement_cache.forget(conn)
+        return conn
+
+    async def _usable(self, conn, returned):
+        if conn.closed:
+            return False
+        now = time.monotonic()
+        if self.max_lifetime > 0 and now - self._opened.get(id(conn), now) > self.max_lifetime:
+            self._stats['recycled'] += 1
+            return False
+        if self.validate_idle < 0 or now - returned < self.validate_idle:
+            return True
+        try:
+            (await self.execute(conn, "SELECT 1")).close()
+            return True
+        except psycopg2.Error as e:
+            logger.warning(f"Discarding pooled connection that failed validation: {e}")
+            self._stats['validation_failures'] += 1
+            return False
+
+    def _discard(self, conn):
+        self._opened.pop(id(conn), None)
+        statement_cache.forget(conn)
+        conn.close()
+
+    async def getconn(self, timeout=None):
+        """Check out a connection, waiting up to `timeout` seconds for a free slot."""
+        if self.closed:
+            raise PoolError("connection pool is closed")
+        if timeout is None:
+            timeout = self.checkout_timeout
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.maxconn)
+        try:
+            await asyncio.wait_for(self._slots.acquire(), timeout)
+        except asyncio.TimeoutError:
+            self._stats['timeouts'] += 1
+            raise PoolError(
+                f"connection pool exhausted: no connection free after {timeout:.1f}s "
+                f"({self.maxconn} in use)"
+            )
+
+        try:
+            while self._idle:
+                conn, returned = self._idle.pop()
+                if await self._usable(conn, returned):
+                    break
+                self._discard(conn)
+            else:
+                conn = await self._connect()
+        except BaseException:
+            self._slots.release()
+            raise
+        self._in_use += 1
+        self._stats['checkouts'] += 1
+        return conn
+
+    def putconn(self, conn, close=False):
+        """Return a connection; one left mid-query (e.g. a cancelled task) is closed."""
+        self._in_use -= 1
+        if (close or self.closed or conn.closed or conn.isexecuting()
+                or len(self._idle) >= self.minconn):
+            self._discard(conn)
+        else:
+            self._idle.append((conn, time.monotonic()))
+        self._slots.release()
+
+    @asynccontextmanager
+    async def connection(self, timeout=None):
+        conn = await self.getconn(timeout)
+        try:
+            yield conn
+        finally:
+            self.putconn(conn)
+
+    async def execute(self, conn, sql, params=None):
+        """Run one statement and return its cursor once the result has arrived."""
+        started = time.perf_counter()
+        try:
+            cursor = conn.cursor()
+            cursor.execute(sql, params)
+            await wait_ready(conn)
+            return cursor
+        except (psycopg2.OperationalError, psycopg2.InterfaceError) as e:
+            if conn.closed:
+                db_breaker.record_failure(e)
+            raise
+        finally:
+            record_query_time(time.perf_counter() - started)
+
+    async def execute_prepared(self, conn, label, sql, params=()):
+        """Async execute_prepared(): PREPARE once per connection, then EXECUTE."""
+        size = POOL_CONFIG['statement_cache_size']
+        if size <= 0:
+            return await self.execute(conn, sql, tuple(params) or None)
+        name = statement_name(label, sql)
+        if not statement_cache.lookup(conn, name):
+            (await self.execute(conn, f"PREPARE {name} AS {_positional(sql)}")).close()
+            for old in statement_cache.add(conn, name, size):
+                (await self.execute(conn, f"DEALLOCATE {old}")).close()
+        return await self.execute(conn, *_execute_statement(name, params))
+
+    def close(self):
+        """Close idle connections and refuse new checkouts."""
+        self.closed = True
+        while self._idle:
+            self._discard(self._idle.pop()[0])
+
+    def stats(self):
+        stats = dict(self._stats)
+        stats.update({
+            'maxconn': self.maxconn,
+            'minconn': self.minconn,
+            'in_use': self._in_use,
+            'idle': len(self._idle),
+        })
+        return stats
+
+
+_async_pool = None
+
+
+def get_async_pool():
+    """Get or create the process-wide AsyncConnectionPool (use from one event loop)."""
+    global _async_pool
+    if _async_pool is None or _async_pool.closed:
+        _async_pool = AsyncConnectionPool()
+    return _async_pool
+
 
 def query_maven_memory(limit=50):
     """
@@ -72,7 +1046,7 @@ def query_maven_memory(limit=50):
         list: Recent memory entries
     """
     try:
-        with get_db_connection() as conn:
+        with get_db_connection(readonly=True) as conn:
             cursor = conn.cursor()
             cursor.execute("""
                 SELECT event_type, description, metadata, created_at
@@ -104,7 +1078,7 @@ def query_maven_decisions(limit=10):
         list: Recent decision entries
     """
     try:
-        with get_db_connection() as conn:
+        with get_db_connection(readonly=True) as conn:
             cursor = conn.cursor()
             cursor.execute("""
                 SELECT decision_type, asset, action, reasoning, confidence, risk_level, created_at
@@ -139,7 +1113,7 @@ def query_maven_insights(limit=10):
         list: Recent insight entries
     """
     try:
-        with get_db_connection() as conn:
+        with get_db_connection(readonly=True) as conn:
             cursor = conn.cursor()
             cursor.execute("""
                 SELECT insight_type, content, confidence, market_conditions, created_at
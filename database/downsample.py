@@ -0,0 +1,237 @@
+"""
+Downsampled market history: 5m/1h/1d bars and candles.
+
+Section 8 of database/migrations/0003_treasury.sql rolls maven_market_snapshots
+up into maven_market_bars (5m from raw snapshots, 1h from 5m, 1d from 1h) and
+1m maven_candles into 5m/1h/1d candles. Every target advances from its own
+watermark and only covers closed buckets, so rows behind a watermark are
+final and the data they were built from can go:
+
+    raw snapshots   daily partitions dropped after MAVEN_SNAPSHOT_RETENTION_DAYS
+                    (database/partitions.py), never before the 5m bars exist
+    1m candles      deleted after MAVEN_CANDLES_1M_RETENTION_DAYS
+    5m bars         deleted after MAVEN_BARS_5M_RETENTION_DAYS
+    1h / 1d         kept
+
+run() is the maintenance job (maven_api.maintenance). history() answers
+range queries from the coarsest stored resolution that still gives the
+detail asked for, falling back to a coarser one where the finer data has
+already been pruned.
+
+Environment:
+    MAVEN_DOWNSAMPLE_LAG_SECONDS     Wait after a bucket closes before rolling it (default 120)
+    MAVEN_CANDLES_1M_RETENTION_DAYS  Days of 1m candles kept (default 30; 0 keeps everything)
+    MAVEN_BARS_5M_RETENTION_DAYS     Days of 5m bars kept (default 365; 0 keeps everything)
+    MAVEN_HISTORY_MAX_POINTS         Default detail: the range split into this many steps (default 500)
+"""
+import os
+import re
+from datetime import datetime, timedelta, timezone
+
+from database.partitions import RETENTION_DAYS as SNAPSHOT_RETENTION_DAYS
+
+
+LAG_SECONDS = int(os.getenv('MAVEN_DOWNSAMPLE_LAG_SECONDS', 120))
+CANDLES_1M_RETENTION_DAYS = int(os.getenv('MAVEN_CANDLES_1M_RETENTION_DAYS', 30))
+BARS_5M_RETENTION_DAYS = int(os.getenv('MAVEN_BARS_5M_RETENTION_DAYS', 365))
+HISTORY_MAX_POINTS = int(os.getenv('MAVEN_HISTORY_MAX_POINTS', 500))
+
+# Rows returned by one history() call at most
+HISTORY_ROW_LIMIT = 5000
+
+# Steps per target (and prune batches per source) in one job run; a large
+# backlog is worked off over several runs
+MAX_STEPS = 50
+PRUNE_BATCH = 10000
+
+# Cascaded targets come after their sources
+TARGETS = ('bars_5m', 'bars_1h', 'bars_1d', 'candles_5m', 'candles_1h', 'candles_1d')
+
+# Bucket width in seconds, finest first; 'raw' is the snapshots themselves
+RESOLUTIONS = {
+    'bars': {'raw': 0, '5m': 300, '1h': 3600, '1d': 86400},
+    'candles': {'1m': 60, '5m': 300, '1h': 3600, '1d': 86400},
+}
+
+# Stored by the candle store (maven_api.candles) but not rolled up here, so
+# only served when asked for by name
+EXPLICIT_RESOLUTIONS = {
+    'bars': (),
+    'candles': ('15m', '4h'),
+}
+
+STEP_UNITS = {'m': 60, 'h': 3600, 'd': 86400}
+
+
+def run(conn, lag_seconds=None, max_steps=None):
+    """
+    Bring every target up to date, then prune. Commits after each step.
+
+    Returns:
+        dict: {'rolled': {target: rows}, 'pruned': {source: rows}}
+    """
+    lag_seconds = LAG_SECONDS if lag_seconds is None else lag_seconds
+    max_steps = max_steps or MAX_STEPS
+    cursor = conn.cursor()
+
+    rolled = {}
+    for target in TARGETS:
+        rolled[target] = 0
+        for _ in range(max_steps):
+            cursor.execute("""
+                SELECT rolled, caught_up
+                FROM maven_downsample_step(%s, make_interval(secs => %s))
+            """, (target, lag_seconds))
+            rows, caught_up = cursor.fetchone()
+            conn.commit()
+            rolled[target] += rows
+            if caught_up:
+                break
+
+    pruned = {}
+    for source, days in (('candles_1m', CANDLES_1M_RETENTION_DAYS),
+                         ('bars_5m', BARS_5M_RETENTION_DAYS)):
+        pruned[source] = 0
+        for _ in range(max_steps):
+            cursor.execute("SELECT maven_downsample_prune(%s, %s, %s)", (source, days, PRUNE_BATCH))
+            deleted = cursor.fetchone()[0]
+            conn.commit()
+            pruned[source] += deleted
+            if deleted < PRUNE_BATCH:
+                break
+
+    return {'rolled': rolled, 'pruned': pruned}
+
+
+def parse_step(value):
+    """'15m', '4h', '1d' or plain seconds -> seconds."""
+    match = re.fullmatch(r'(\d+(?:\.\d+)?)([mhd]?)', str(value).strip())
+    if not match or float(match.group(1)) <= 0:
+        raise ValueError(f"Invalid step: {value}")
+    return float(match.group(1)) * STEP_UNITS.get(match.group(2), 1)
+
+
+def parse_range(args, default_hours=24):
+    """
+    start / end (ISO 8601, default the last `default_hours`) and step from
+    query args.
+
+    Returns:
+        tuple: (start, end, step_seconds or None)
+    """
+    def parse_time(name, default):
+        value = args.get(name)
+        if not value:
+            return default
+        try:
+            parsed = datetime.fromisoformat(value.replace('Z', '+00:00'))
+        except ValueError:
+            raise ValueError(f"Invalid {name}: {value}")
+        return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+    end = parse_time('end', datetime.now(timezone.utc))
+    start = parse_time('start', end - timedelta(hours=default_hours))
+    if start >= end:
+        raise ValueError("start must be before end")
+    step = args.get('step')
+    return start, end, parse_step(step) if step else None
+
+
+def _horizon_days(kind, resolution):
+    if kind == 'bars':
+        return {'raw': SNAPSHOT_RETENTION_DAYS, '5m': BARS_5M_RETENTION_DAYS}.get(resolution, 0)
+    return {'1m': CANDLES_1M_RETENTION_DAYS}.get(resolution, 0)
+
+
+def pick_resolution(kind, start, end, step=None, max_points=None, now=None):
+    """
+    The coarsest resolution no wider than `step` seconds (default: the range
+    over `max_points`), moved coarser while `start` is older than that
+    resolution is kept.
+
+    Args:
+        kind: 'bars' (market snapshots) or 'candles'
+    """
+    widths = RESOLUTIONS[kind]
+    if step is None:
+        step = (end - start).total_seconds() / (max_points or HISTORY_MAX_POINTS)
+    now = now or datetime.now(timezone.utc)
+
+    names = list(widths)
+    index = max(i for i, name in enumerate(names) if widths[name] <= step or i == 0)
+    while index < len(names) - 1:
+        days = _horizon_days(kind, names[index])
+        if not days or start >= now - timedelta(days=days):
+            break
+        index += 1
+    return names[index]
+
+
+def _number(value):
+    return float(value) if value is not None else None
+
+
+def history(cursor, kind, coin, start, end, resolution, limit=None):
+    """
+    Rows for one coin in [start, end) at `resolution`, oldest first.
+
+    Returns:
+        tuple: (points, truncated) - points are dicts; truncated is True when
+            more than `limit` rows matched
+    """
+    limit = limit or HISTORY_ROW_LIMIT
+    if kind == 'bars' and resolution == 'raw':
+        cursor.execute("""
+            SELECT snapshot_at, mid_price, mid_price, mid_price, mid_price,
+                   funding_rate, open_interest_usd, volume_24h_usd,
+                   bid_depth_10_usd, ask_depth_10_usd, spread_bps
+            FROM maven_market_snapshots
+            WHERE coin = %s AND snapshot_at >= %s AND snapshot_at < %s
+            ORDER BY snapshot_at
+            LIMIT %s
+        """, (coin, start, end, limit + 1))
+    elif kind == 'bars':
+        cursor.execute("""
+            SELECT bucket_start, open_price, high_price, low_price, close_price,
+                   funding_rate_avg, open_interest_usd, volume_24h_usd,
+                   bid_depth_avg_usd, ask_depth_avg_usd, spread_bps_avg
+            FROM maven_market_bars
+            WHERE coin = %s AND resolution = %s
+              AND bucket_start >= %s AND bucket_start < %s
+            ORDER BY bucket_start
+            LIMIT %s
+        """, (coin, resolution, start, end, limit + 1))
+    else:
+        cursor.execute("""
+            SELECT candle_open_at, open_price, high_price, low_price, close_price, volume_usd
+            FROM maven_candles
+            WHERE coin = %s AND interval = %s
+              AND candle_open_at >= %s AND candle_open_at < %s
+            ORDER BY candle_open_at
+            LIMIT %s
+        """, (coin, resolution, start, end, limit + 1))
+    rows = cursor.fetchall()
+    truncated = len(rows) > limit
+
+    points = []
+    for row in rows[:limit]:
+        point = {
+            'time': row[0].isoformat(),
+            'open': _number(row[1]),
+            'high': _number(row[2]),
+            'low': _number(row[3]),
+            'close': _number(row[4]),
+        }
+        if kind == 'bars':
+            point.update({
+                'funding_rate': _number(row[5]),
+                'open_interest_usd': _number(row[6]),
+                'volume_24h_usd': _number(row[7]),
+                'bid_depth_usd': _number(row[8]),
+                'ask_depth_usd': _number(row[9]),
+                'spread_bps': _number(row[10]),
+            })
+        else:
+            point['volume_usd'] = _number(row[5])
+        points.append(point)
+    return points, truncated
@@ -2,24 +2,49 @@
 """
 Maven Database Migration Script
 
-Initializes or updates the maven_postgres database with all required schemas.
-Idempotent - safe to run multiple times.
+Applies the numbered migrations in database/migrations/ that the database has
+not seen yet, in order, and records each one in schema_migrations with a
+SHA-256 checksum of the file and how long it took. A migration that was
+already applied is never run again, and the runner refuses to continue when
+an applied file has been edited since - add a new migration instead.
+
+Migrations are named NNNN_description.sql. Each runs in one transaction
+unless its first lines include
+
+    -- migrate: no-transaction
+
+in which case its statements run one by one in autocommit mode. Use that for
+CREATE INDEX CONCURRENTLY (which cannot run inside a transaction block), so
+an index on a large table like maven_market_snapshots is built without
+blocking writes. Statements in such a file should be idempotent (IF NOT
+EXISTS): a failure part-way leaves the earlier ones applied and the whole
+file is retried on the next run. An INVALID index left behind by a failed
+concurrent build is dropped before the build is retried.
+
+0001-0003 are the original schema files; they are idempotent, so a database
+created before this runner existed simply adopts them on the first run.
+
+Only one runner works at a time (advisory lock). DDL waits at most
+MAVEN_MIGRATION_LOCK_TIMEOUT (default 5s) for a table lock, so a migration
+stuck behind a long transaction fails and can be retried instead of queueing
+every reader and writer of that table behind it.
 
 Usage:
-    python database/migrate.py
-    python database/migrate.py --schema financial  # Run specific schema only
+    python database/migrate.py                  # Apply all pending migrations
+    python database/migrate.py --target 3       # Apply up to and including 0003
+    python database/migrate.py --status         # Applied / pending / changed
+    python database/migrate.py --verify-only --counts
 """
+import hashlib
 import os
+import re
 import sys
+import time
 import logging
+from dataclasses import dataclass
 from pathlib import Path
 import psycopg2
 
-# Setup logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
 logger = logging.getLogger(__name__)
 
 # Database config from environment
@@ -31,12 +56,133 @@ DB_CONFIG = {
     'password': os.getenv('DB_PASSWORD', 'maven_password')
 }
 
-# Schema files
-SCHEMAS_DIR = Path(__file__).parent / 'schemas'
-SCHEMA_FILES = {
-    'conversations': SCHEMAS_DIR / 'maven_conversations.sql',
-    'financial': SCHEMAS_DIR / 'maven_financial.sql'
-}
+MIGRATIONS_DIR = Path(__file__).parent / 'migrations'
+MIGRATION_FILE = re.compile(r'^(\d{4})_(\w+)\.sql$')
+NO_TRANSACTION = re.compile(r'^--\s*migrate:\s*no-transaction\s*$', re.MULTILINE)
+CONCURRENT_INDEX = re.compile(
+    r'CREATE\s+(?:UNIQUE\s+)?INDEX\s+CONCURRENTLY\s+(?:IF\s+NOT\s+EXISTS\s+)?("?[\w.]+"?)',
+    re.IGNORECASE
+)
+
+LOCK_TIMEOUT = os.getenv('MAVEN_MIGRATION_LOCK_TIMEOUT', '5s')
+ADVISORY_LOCK = 'maven_schema_migrations'
+
+
+class MigrationError(Exception):
+    """Migrations on disk and in schema_migrations do not agree."""
+
+
+@dataclass
+class Migration:
+    """One numbered SQL file."""
+    version: int
+    name: str
+    path: Path
+    sql: str
+    checksum: str
+    transactional: bool
+
+    @property
+    def label(self):
+        return f"{self.version:04d}_{self.name}"
+
+
+def load_migrations(directory=None):
+    """
+    Read every NNNN_name.sql file in `directory`, ordered by version.
+
+    Raises:
+        MigrationError: Two files share a version, or a transactional
+            migration uses CREATE INDEX CONCURRENTLY
+    """
+    directory = Path(directory or MIGRATIONS_DIR)
+    migrations = {}
+    for path in sorted(directory.glob('*.sql')):
+        match = MIGRATION_FILE.match(path.name)
+        if not match:
+            logger.warning(f"Ignoring {path.name}: not named NNNN_description.sql")
+            continue
+        version = int(match.group(1))
+        if version in migrations:
+            raise MigrationError(f"{path.name} and {migrations[version].path.name} share version {version}")
+
+        raw = path.read_bytes()
+        sql = raw.decode('utf-8')
+        # The marker only counts in the leading comment block
+        header = sql.split('\n\n', 1)[0]
+        transactional = not NO_TRANSACTION.search(header)
+        if transactional and CONCURRENT_INDEX.search(sql):
+            raise MigrationError(f"{path.name} uses CREATE INDEX CONCURRENTLY; "
+                                 f"mark it '-- migrate: no-transaction'")
+        migrations[version] = Migration(
+            version=version,
+            name=match.group(2),
+            path=path,
+            sql=sql,
+            checksum=hashlib.sha256(raw).hexdigest(),
+            transactional=transactional,
+        )
+    return [migrations[v] for v in sorted(migrations)]
+
+
+def split_statements(sql):
+    """
+    Split SQL on top-level semicolons, keeping quoted strings, quoted
+    identifiers, comments and dollar-quoted bodies intact.
+
+    Returns:
+        list: Statements without their trailing ';' (comment-only chunks dropped)
+    """
+    statements = []
+    current = []
+    i, n = 0, len(sql)
+    while i < n:
+        ch = sql[i]
+        if ch == '-' and sql.startswith('--', i):
+            end = sql.find('\n', i)
+            end = n if end == -1 else end
+            current.append(sql[i:end])
+            i = end
+        elif ch == '/' and sql.startswith('/*', i):
+            end = sql.find('*/', i + 2)
+            end = n if end == -1 else end + 2
+            current.append(sql[i:end])
+            i = end
+        elif ch in ("'", '"'):
+            end = i + 1
+            while end < n:
+                if sql[end] == ch:
+                    if end + 1 < n and sql[end + 1] == ch:  # doubled quote
+                        end += 2
+                        continue
+                    break
+                end += 1
+            current.append(sql[i:end + 1])
+            i = end + 1
+        elif ch == '$':
+            tag = re.match(r'\$(?:[A-Za-z_]\w*)?\$', sql[i:])
+            if tag:
+                end = sql.find(tag.group(0), i + len(tag.group(0)))
+                end = n if end == -1 else end + len(tag.group(0))
+                current.append(sql[i:end])
+                i = end
+            else:
+                current.append(ch)
+                i += 1
+        elif ch == ';':
+            statements.append(''.join(current))
+            current = []
+            i += 1
+        else:
+            current.append(ch)
+            i += 1
+    statements.append(''.join(current))
+
+    def has_code(statement):
+        without_comments = re.sub(r'--[^\n]*|/\*.*?\*/', '', statement, flags=re.DOTALL)
+        return without_comments.strip() != ''
+
+    return [s.strip() for s in statements if has_code(s)]
 
 
 def get_db_connection():
@@ -50,35 +196,162 @@ def get_db_connection():
         raise
 
 
-def run_schema_file(conn, schema_name, schema_file):
+def ensure_migrations_table(conn):
+    cursor = conn.cursor()
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS schema_migrations (
+            version INTEGER PRIMARY KEY,
+            name TEXT NOT NULL,
+            checksum TEXT NOT NULL,
+            transactional BOOLEAN NOT NULL,
+            execution_ms NUMERIC(12, 1) NOT NULL,
+            applied_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+        )
+    """)
+    conn.commit()
+
+
+def applied_migrations(conn):
+    """{version: {'name', 'checksum', 'execution_ms', 'applied_at'}} from schema_migrations."""
+    cursor = conn.cursor()
+    cursor.execute("""
+        SELECT version, name, checksum, execution_ms, applied_at
+        FROM schema_migrations
+        ORDER BY version
+    """)
+    rows = cursor.fetchall()
+    conn.commit()
+    return {version: {'name': name, 'checksum': checksum,
+                      'execution_ms': float(execution_ms), 'applied_at': applied_at}
+            for version, name, checksum, execution_ms, applied_at in rows}
+
+
+def migration_status(migrations, applied):
+    """
+    Every known version with its state: 'applied', 'pending', 'changed'
+    (applied, but the file has been edited since) or 'missing' (applied,
+    but the file is gone).
+    """
+    on_disk = {m.version: m for m in migrations}
+    status = []
+    for version in sorted(set(on_disk) | set(applied)):
+        migration, record = on_disk.get(version), applied.get(version)
+        if record is None:
+            state = 'pending'
+        elif migration is None:
+            state = 'missing'
+        elif migration.checksum != record['checksum']:
+            state = 'changed'
+        else:
+            state = 'applied'
+        status.append({
+            'version': version,
+            'name': migration.name if migration else record['name'],
+            'state': state,
+            'execution_ms': record['execution_ms'] if record else None,
+            'applied_at': record['applied_at'] if record else None,
+        })
+    return status
+
+
+def _drop_invalid_index(cursor, statement):
+    """Drop what a failed CREATE INDEX CONCURRENTLY of the same name left behind."""
+    match = CONCURRENT_INDEX.search(statement)
+    if not match:
+        return
+    index = match.group(1)
+    cursor.execute("""
+        SELECT NOT i.indisvalid FROM pg_index i WHERE i.indexrelid = to_regclass(%s)
+    """, (index,))
+    row = cursor.fetchone()
+    if row and row[0]:
+        logger.warning(f"  Dropping invalid index {index} from an earlier failed build")
+        cursor.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {index}")
+
+
+def _record(cursor, migration, elapsed_ms):
+    cursor.execute("""
+        INSERT INTO schema_migrations (version, name, checksum, transactional, execution_ms)
+        VALUES (%s, %s, %s, %s, %s)
+    """, (migration.version, migration.name, migration.checksum,
+          migration.transactional, round(elapsed_ms, 1)))
+
+
+def apply_migration(conn, migration):
     """
-    Execute a schema SQL file.
+    Run one migration and record it.
 
-    Args:
-        conn: Database connection
-        schema_name: Name of the schema (for logging)
-        schema_file: Path to SQL file
+    Returns:
+        float: Execution time in milliseconds
     """
+    cursor = conn.cursor()
+    started = time.perf_counter()
+
+    if migration.transactional:
+        try:
+            cursor.execute("SET LOCAL lock_timeout = %s", (LOCK_TIMEOUT,))
+            cursor.execute(migration.sql)
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            _record(cursor, migration, elapsed_ms)
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        return elapsed_ms
+
+    conn.autocommit = True
     try:
-        logger.info(f"Running {schema_name} schema: {schema_file.name}")
+        cursor.execute("SET lock_timeout = %s", (LOCK_TIMEOUT,))
+        for statement in split_statements(migration.sql):
+            _drop_invalid_index(cursor, statement)
+            cursor.execute(statement)
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        _record(cursor, migration, elapsed_ms)
+        cursor.execute("RESET lock_timeout")
+    finally:
+        conn.autocommit = False
+    return elapsed_ms
 
-        # Read SQL file
-        with open(schema_file, 'r', encoding='utf-8') as f:
-            sql = f.read()
 
-        # Execute SQL
-        cursor = conn.cursor()
-        cursor.execute(sql)
-        conn.commit()
-        cursor.close()
+def migrate(conn, directory=None, target=None):
+    """
+    Apply pending migrations up to `target` (default: all), in order.
 
-        logger.info(f"✓ {schema_name} schema applied successfully")
-        return True
+    Returns:
+        list: [(label, execution_ms)] for the migrations applied
 
-    except Exception as e:
-        logger.error(f"✗ Failed to apply {schema_name} schema: {e}")
-        conn.rollback()
-        return False
+    Raises:
+        MigrationError: An applied migration was edited or removed
+    """
+    migrations = load_migrations(directory)
+    cursor = conn.cursor()
+    cursor.execute("SELECT pg_advisory_lock(hashtext(%s))", (ADVISORY_LOCK,))
+    conn.commit()
+    try:
+        ensure_migrations_table(conn)
+        applied = applied_migrations(conn)
+        drifted = [s for s in migration_status(migrations, applied)
+                   if s['state'] in ('changed', 'missing')]
+        if drifted:
+            raise MigrationError("Applied migrations differ from the files on disk: " +
+                                 ', '.join(f"{s['version']:04d}_{s['name']} ({s['state']})"
+                                           for s in drifted))
+
+        done = []
+        for migration in migrations:
+            if migration.version in applied:
+                continue
+            if target is not None and migration.version > target:
+                break
+            mode = '' if migration.transactional else ' (no transaction)'
+            logger.info(f"Applying {migration.label}{mode}")
+            elapsed_ms = apply_migration(conn, migration)
+            logger.info(f"✓ {migration.label} applied in {elapsed_ms:.0f} ms")
+            done.append((migration.label, elapsed_ms))
+        return done
+    finally:
+        cursor.execute("SELECT pg_advisory_unlock(hashtext(%s))", (ADVISORY_LOCK,))
+        conn.commit()
 
 
 def verify_tables(conn):
@@ -90,7 +363,11 @@ def verify_tables(conn):
         'maven_portfolio_snapshots',
         'maven_performance_metrics',
         'maven_insights',
-        'maven_memory'
+        'maven_memory',
+        'maven_treasury_state',
+        'maven_market_snapshots',
+        'maven_watchlist',
+        'schema_migrations'
     ]
 
     try:
@@ -160,12 +437,21 @@ def main():
     """Main migration function."""
     import argparse
 
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
+
     parser = argparse.ArgumentParser(description='Maven Database Migration')
     parser.add_argument(
-        '--schema',
-        choices=['conversations', 'financial', 'all'],
-        default='all',
-        help='Which schema to run (default: all)'
+        '--target',
+        type=int,
+        help='Apply migrations up to and including this version (default: all)'
+    )
+    parser.add_argument(
+        '--status',
+        action='store_true',
+        help='List migrations and whether they are applied, then exit'
     )
     parser.add_argument(
         '--verify-only',
@@ -187,8 +473,8 @@ def main():
     # Connect to database
     try:
         conn = get_db_connection()
-    except Exception as e:
-        logger.error(f"Cannot proceed without database connection")
+    except Exception:
+        logger.error("Cannot proceed without database connection")
         return 1
 
     try:
@@ -199,16 +485,18 @@ def main():
                 get_table_counts(conn)
             return 0
 
-        # Run migrations
-        success = True
+        if args.status:
+            ensure_migrations_table(conn)
+            status = migration_status(load_migrations(), applied_migrations(conn))
+            for s in status:
+                timing = f"{s['execution_ms']:>10.0f} ms  {s['applied_at']:%Y-%m-%d %H:%M}" \
+                    if s['applied_at'] else ''
+                print(f"{s['version']:04d}_{s['name']:<36} {s['state']:<8} {timing}")
+            return 1 if any(s['state'] in ('changed', 'missing') for s in status) else 0
 
-        if args.schema in ['conversations', 'all']:
-            if not run_schema_file(conn, 'conversations', SCHEMA_FILES['conversations']):
-                success = False
-
-        if args.schema in ['financial', 'all']:
-            if not run_schema_file(conn, 'financial', SCHEMA_FILES['financial']):
-                success = False
+        done = migrate(conn, target=args.target)
+        if not done:
+            logger.info("No pending migrations")
 
         # Verify tables exist
         logger.info("\n" + "=" * 60)
@@ -220,15 +508,11 @@ def main():
         if args.counts:
             get_table_counts(conn)
 
-        if success:
-            logger.info("\n✓ Migration completed successfully!")
-            return 0
-        else:
-            logger.error("\n✗ Migration completed with errors")
-            return 1
+        logger.info(f"\n✓ Migration completed successfully! ({len(done)} applied)")
+        return 0
 
     except Exception as e:
-        logger.error(f"Migration failed: {e}")
+        logger.error(f"✗ Migration failed: {e}")
         return 1
 
     finally:
@@ -0,0 +1,1152 @@
+-- Maven Treasury Schema
+-- Real-time treasury tracking and market data storage
+-- Builds on 0002_financial.sql
+
+-- ============================================================================
+-- 1. TREASURY_STATE - Current state of MoHa treasury wallet
+-- ============================================================================
+CREATE TABLE IF NOT EXISTS maven_treasury_state (
+    id SERIAL PRIMARY KEY,
+
+    -- Wallet identification
+    wallet_address TEXT NOT NULL DEFAULT '0xF60c2792722fDae7A8Df69D1b83C40a837E55A4A',
+    wallet_type TEXT NOT NULL DEFAULT 'hyperliquid_api' CHECK (wallet_type IN ('hyperliquid_api', 'hyperliquid_main', 'evm')),
+
+    -- Balance tracking
+    account_value_usd NUMERIC(20,2) NOT NULL,
+    withdrawable_usd NUMERIC(20,2) NOT NULL,
+    margin_used_usd NUMERIC(20,2) DEFAULT 0,
+    unrealized_pnl_usd NUMERIC(20,2) DEFAULT 0,
+
+    -- Position summary
+    active_positions INTEGER DEFAULT 0,
+    positions_data JSONB DEFAULT '[]'::jsonb,
+
+    -- Change tracking
+    value_change_1h_usd NUMERIC(20,2),
+    value_change_24h_usd NUMERIC(20,2),
+    value_change_7d_usd NUMERIC(20,2),
+
+    -- Timestamps
+    snapshot_at TIMESTAMPTZ NOT NULL,
+    created_at TIMESTAMPTZ DEFAULT NOW()
+);
+
+-- Indexes
+CREATE INDEX IF NOT EXISTS idx_treasury_state_snapshot
+    ON maven_treasury_state(snapshot_at DESC);
+CREATE INDEX IF NOT EXISTS idx_treasury_state_wallet
+    ON maven_treasury_state(wallet_address);
+
+
+-- ============================================================================
+-- 2. MARKET_SNAPSHOTS - Hyperliquid market data captures
+-- ============================================================================
+-- Range-partitioned by snapshot_at into UTC days (maven_market_snapshots_pYYYYMMDD)
+-- so retention drops whole partitions instead of DELETEing rows, and lookups
+-- bounded on snapshot_at only touch the days they need. Partitions are made
+-- ahead of time by maven_market_snapshots_maintain(); rows for a day without
+-- one land in maven_market_snapshots_default until it is created.
+--
+-- Databases created before partitioning keep a plain table here (CREATE TABLE
+-- IF NOT EXISTS); convert them with `python database/partitions.py migrate`.
+CREATE TABLE IF NOT EXISTS maven_market_snapshots (
+    id BIGSERIAL,
+
+    -- Market identification
+    coin TEXT NOT NULL,
+    market_type TEXT NOT NULL DEFAULT 'perp' CHECK (market_type IN ('perp', 'spot')),
+
+    -- Price data
+    mid_price NUMERIC(20,8) NOT NULL,
+    mark_price NUMERIC(20,8),
+    index_price NUMERIC(20,8),
+
+    -- Funding (perps only)
+    funding_rate NUMERIC(20,10),
+    predicted_funding NUMERIC(20,10),
+
+    -- Volume/OI
+    volume_24h_usd NUMERIC(20,2),
+    open_interest_usd NUMERIC(20,2),
+
+    -- L2 summary
+    bid_depth_10_usd NUMERIC(20,2),
+    ask_depth_10_usd NUMERIC(20,2),
+    spread_bps NUMERIC(10,4),
+
+    -- Metadata
+    raw_data JSONB,
+
+    -- Timestamps
+    snapshot_at TIMESTAMPTZ NOT NULL,
+    created_at TIMESTAMPTZ DEFAULT NOW(),
+
+    -- The partition key has to be part of every unique constraint
+    PRIMARY KEY (id, snapshot_at)
+) PARTITION BY RANGE (snapshot_at);
+
+DO $$
+BEGIN
+    IF (SELECT relkind FROM pg_class WHERE oid = 'maven_market_snapshots'::regclass) = 'p' THEN
+        CREATE TABLE IF NOT EXISTS maven_market_snapshots_default
+            PARTITION OF maven_market_snapshots DEFAULT;
+    END IF;
+END $$;
+
+-- Indexes for fast querying (created on every partition)
+CREATE INDEX IF NOT EXISTS idx_market_snapshots_coin_time
+    ON maven_market_snapshots(coin, snapshot_at DESC);
+CREATE INDEX IF NOT EXISTS idx_market_snapshots_time
+    ON maven_market_snapshots(snapshot_at DESC);
+CREATE INDEX IF NOT EXISTS idx_market_snapshots_type
+    ON maven_market_snapshots(market_type);
+
+
+-- ============================================================================
+-- 3. CANDLE_DATA - OHLCV candle storage for analysis
+-- ============================================================================
+CREATE TABLE IF NOT EXISTS maven_candles (
+    id SERIAL PRIMARY KEY,
+
+    -- Identification
+    coin TEXT NOT NULL,
+    interval TEXT NOT NULL CHECK (interval IN ('1m', '5m', '15m', '1h', '4h', '1d')),
+
+    -- OHLCV
+    open_price NUMERIC(20,8) NOT NULL,
+    high_price NUMERIC(20,8) NOT NULL,
+    low_price NUMERIC(20,8) NOT NULL,
+    close_price NUMERIC(20,8) NOT NULL,
+    volume_usd NUMERIC(20,2) NOT NULL,
+
+    -- Derived
+    price_change_pct NUMERIC(10,4) GENERATED ALWAYS AS (
+        CASE
+            WHEN open_price > 0 THEN ((close_price - open_price) / open_price) * 100
+            ELSE 0
+        END
+    ) STORED,
+
+    -- Timestamps
+    candle_open_at TIMESTAMPTZ NOT NULL,
+    candle_close_at TIMESTAMPTZ NOT NULL,
+    created_at TIMESTAMPTZ DEFAULT NOW(),
+
+    -- Unique constraint
+    UNIQUE(coin, interval, candle_open_at)
+);
+
+-- Indexes
+CREATE INDEX IF NOT EXISTS idx_candles_coin_interval_time
+    ON maven_candles(coin, interval, candle_open_at DESC);
+
+
+-- ============================================================================
+-- 4. TRADING_SIGNALS - TA bot signals and Maven analysis signals
+-- ============================================================================
+CREATE TABLE IF NOT EXISTS maven_trading_signals (
+    id SERIAL PRIMARY KEY,
+
+    -- Signal identification
+    signal_source TEXT NOT NULL,  -- 'maven_rlm', 'ta_bot', 'observation_bot', 'manual'
+    source_bot_id INTEGER,
+
+    -- Signal details
+    coin TEXT NOT NULL,
+    signal_type TEXT NOT NULL CHECK (signal_type IN ('buy', 'sell', 'hold', 'alert')),
+    strength NUMERIC(5,2) CHECK (strength >= 0 AND strength <= 100),
+
+    -- Context
+    reasoning TEXT,
+    indicators_used TEXT[],
+    market_context JSONB,
+
+    -- Execution tracking
+    acted_upon BOOLEAN DEFAULT FALSE,
+    decision_id INTEGER REFERENCES maven_decisions(id) ON DELETE SET NULL,
+
+    -- Validity
+    valid_until TIMESTAMPTZ,
+    expired BOOLEAN DEFAULT FALSE,
+
+    -- Timestamps
+    generated_at TIMESTAMPTZ NOT NULL,
+    created_at TIMESTAMPTZ DEFAULT NOW()
+);
+
+-- Indexes
+CREATE INDEX IF NOT EXISTS idx_signals_coin_time
+    ON maven_trading_signals(coin, generated_at DESC);
+CREATE INDEX IF NOT EXISTS idx_signals_source
+    ON maven_trading_signals(signal_source);
+CREATE INDEX IF NOT EXISTS idx_signals_type
+    ON maven_trading_signals(signal_type);
+CREATE INDEX IF NOT EXISTS idx_signals_active
+    ON maven_trading_signals(coin, expired) WHERE NOT expired;
+
+
+-- ============================================================================
+-- 5. WATCHLIST - Coins Maven is actively monitoring
+-- ============================================================================
+CREATE TABLE IF NOT EXISTS maven_watchlist (
+    id SERIAL PRIMARY KEY,
+
+    -- Coin details
+    coin TEXT UNIQUE NOT NULL,
+    market_type TEXT NOT NULL DEFAULT 'perp',
+
+    -- Monitoring config
+    priority TEXT NOT NULL DEFAULT 'normal' CHECK (priority IN ('high', 'normal', 'low')),
+    snapshot_interval_minutes INTEGER DEFAULT 15,
+
+    -- Notes
+    watch_reason TEXT,
+    tags TEXT[],
+
+    -- Status
+    active BOOLEAN DEFAULT TRUE,
+
+    -- Timestamps
+    added_at TIMESTAMPTZ DEFAULT NOW(),
+    updated_at TIMESTAMPTZ DEFAULT NOW()
+);
+
+-- Default watchlist
+INSERT INTO maven_watchlist (coin, market_type, priority, watch_reason, tags) VALUES
+    ('BTC', 'perp', 'high', 'King of crypto, market leader', ARRAY['major', 'crypto']),
+    ('ETH', 'perp', 'high', 'ETH ecosystem, smart contracts', ARRAY['major', 'crypto']),
+    ('SOL', 'perp', 'high', 'High performance L1', ARRAY['major', 'crypto']),
+    ('NVDA', 'perp', 'high', 'AI chip leader, equity perp', ARRAY['equity', 'ai']),
+    ('TSLA', 'perp', 'normal', 'High volatility equity', ARRAY['equity', 'ev']),
+    ('COIN', 'perp', 'high', 'Crypto exposure via equity', ARRAY['equity', 'crypto']),
+    ('HYPE', 'perp', 'high', 'Hyperliquid native token', ARRAY['major', 'crypto', 'hl'])
+ON CONFLICT (coin) DO NOTHING;
+
+
+-- ============================================================================
+-- 6. TREASURY_ROLLUPS - Hourly and daily OHLC of account value
+-- ============================================================================
+-- Maintained row by row by the maven_treasury_rollup trigger below, so
+-- performance and change lookups read a few rollup rows instead of scanning
+-- maven_treasury_state. Buckets are UTC hours / days.
+CREATE TABLE IF NOT EXISTS maven_treasury_rollup_hourly (
+    bucket_start TIMESTAMPTZ PRIMARY KEY,
+
+    -- OHLC of account_value_usd within the bucket
+    open_value NUMERIC(20,2) NOT NULL,
+    high_value NUMERIC(20,2) NOT NULL,
+    low_value NUMERIC(20,2) NOT NULL,
+    close_value NUMERIC(20,2) NOT NULL,
+
+    -- Snapshot times behind open_value / close_value
+    open_at TIMESTAMPTZ NOT NULL,
+    close_at TIMESTAMPTZ NOT NULL,
+
+    snapshot_count BIGINT NOT NULL DEFAULT 0,
+    updated_at TIMESTAMPTZ DEFAULT NOW()
+);
+
+CREATE TABLE IF NOT EXISTS maven_treasury_rollup_daily (
+    LIKE maven_treasury_rollup_hourly INCLUDING DEFAULTS INCLUDING CONSTRAINTS,
+    PRIMARY KEY (bucket_start)
+);
+
+-- Start of the UTC hour/day containing p_at
+CREATE OR REPLACE FUNCTION maven_utc_trunc(p_unit TEXT, p_at TIMESTAMPTZ)
+RETURNS TIMESTAMPTZ AS $$
+    SELECT date_trunc(p_unit, p_at AT TIME ZONE 'UTC') AT TIME ZONE 'UTC'
+$$ LANGUAGE sql IMMUTABLE;
+
+-- Account value at the close of the newest hourly bucket that closed in
+-- [p_from, p_to); reads at most one rollup row per hour of the range
+CREATE OR REPLACE FUNCTION maven_treasury_close_between(p_from TIMESTAMPTZ, p_to TIMESTAMPTZ)
+RETURNS NUMERIC AS $$
+    SELECT close_value
+    FROM maven_treasury_rollup_hourly
+    WHERE bucket_start >= maven_utc_trunc('hour', p_from)
+      AND bucket_start < p_to
+      AND close_at >= p_from
+      AND close_at < p_to
+    ORDER BY bucket_start DESC
+    LIMIT 1
+$$ LANGUAGE sql STABLE;
+
+-- Fold one snapshot into its hourly and daily buckets
+CREATE OR REPLACE FUNCTION maven_treasury_rollup() RETURNS TRIGGER AS $$
+BEGIN
+    INSERT INTO maven_treasury_rollup_hourly AS r (
+        bucket_start, open_value, high_value, low_value, close_value,
+        open_at, close_at, snapshot_count
+    ) VALUES (
+        maven_utc_trunc('hour', NEW.snapshot_at),
+        NEW.account_value_usd, NEW.account_value_usd, NEW.account_value_usd, NEW.account_value_usd,
+        NEW.snapshot_at, NEW.snapshot_at, 1
+    )
+    ON CONFLICT (bucket_start) DO UPDATE SET
+        open_value = CASE WHEN EXCLUDED.open_at < r.open_at THEN EXCLUDED.open_value ELSE r.open_value END,
+        open_at = LEAST(r.open_at, EXCLUDED.open_at),
+        close_value = CASE WHEN EXCLUDED.close_at >= r.close_at THEN EXCLUDED.close_value ELSE r.close_value END,
+        close_at = GREATEST(r.close_at, EXCLUDED.close_at),
+        high_value = GREATEST(r.high_value, EXCLUDED.high_value),
+        low_value = LEAST(r.low_value, EXCLUDED.low_value),
+        snapshot_count = r.snapshot_count + 1,
+        updated_at = NOW();
+
+    INSERT INTO maven_treasury_rollup_daily AS r (
+        bucket_start, open_value, high_value, low_value, close_value,
+        open_at, close_at, snapshot_count
+    ) VALUES (
+        maven_utc_trunc('day', NEW.snapshot_at),
+        NEW.account_value_usd, NEW.account_value_usd, NEW.account_value_usd, NEW.account_value_usd,
+        NEW.snapshot_at, NEW.snapshot_at, 1
+    )
+    ON CONFLICT (bucket_start) DO UPDATE SET
+        open_value = CASE WHEN EXCLUDED.open_at < r.open_at THEN EXCLUDED.open_value ELSE r.open_value END,
+        open_at = LEAST(r.open_at, EXCLUDED.open_at),
+        close_value = CASE WHEN EXCLUDED.close_at >= r.close_at THEN EXCLUDED.close_value ELSE r.close_value END,
+        close_at = GREATEST(r.close_at, EXCLUDED.close_at),
+        high_value = GREATEST(r.high_value, EXCLUDED.high_value),
+        low_value = LEAST(r.low_value, EXCLUDED.low_value),
+        snapshot_count = r.snapshot_count + 1,
+        updated_at = NOW();
+
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS maven_treasury_state_rollup ON maven_treasury_state;
+CREATE TRIGGER maven_treasury_state_rollup
+    AFTER INSERT ON maven_treasury_state
+    FOR EACH ROW EXECUTE FUNCTION maven_treasury_rollup();
+
+-- Recompute both rollup tables from maven_treasury_state (after deleting or
+-- editing snapshots, which the insert trigger does not track)
+CREATE OR REPLACE FUNCTION maven_rebuild_treasury_rollups() RETURNS BIGINT AS $$
+DECLARE
+    v_buckets BIGINT;
+BEGIN
+    LOCK TABLE maven_treasury_state IN SHARE MODE;
+    DELETE FROM maven_treasury_rollup_hourly;
+    DELETE FROM maven_treasury_rollup_daily;
+
+    INSERT INTO maven_treasury_rollup_hourly (
+        bucket_start, open_value, high_value, low_value, close_value,
+        open_at, close_at, snapshot_count
+    )
+    SELECT
+        maven_utc_trunc('hour', snapshot_at),
+        (array_agg(account_value_usd ORDER BY snapshot_at ASC, id ASC))[1],
+        MAX(account_value_usd),
+        MIN(account_value_usd),
+        (array_agg(account_value_usd ORDER BY snapshot_at DESC, id DESC))[1],
+        MIN(snapshot_at),
+        MAX(snapshot_at),
+        COUNT(*)
+    FROM maven_treasury_state
+    GROUP BY 1;
+    GET DIAGNOSTICS v_buckets = ROW_COUNT;
+
+    INSERT INTO maven_treasury_rollup_daily (
+        bucket_start, open_value, high_value, low_value, close_value,
+        open_at, close_at, snapshot_count
+    )
+    SELECT
+        maven_utc_trunc('day', bucket_start),
+        (array_agg(open_value ORDER BY bucket_start ASC))[1],
+        MAX(high_value),
+        MIN(low_value),
+        (array_agg(close_value ORDER BY bucket_start DESC))[1],
+        MIN(open_at),
+        MAX(close_at),
+        SUM(snapshot_count)
+    FROM maven_treasury_rollup_hourly
+    GROUP BY 1;
+
+    RETURN v_buckets;
+END;
+$$ LANGUAGE plpgsql;
+
+-- First run against existing history: build the rollups once
+SELECT maven_rebuild_treasury_rollups()
+WHERE NOT EXISTS (SELECT 1 FROM maven_treasury_rollup_hourly)
+  AND EXISTS (SELECT 1 FROM maven_treasury_state);
+
+
+-- ============================================================================
+-- 7. MARKET_SNAPSHOT_PARTITIONS - Daily partitions and retention
+-- ============================================================================
+
+-- Daily partition holding snapshots taken at p_at
+CREATE OR REPLACE FUNCTION maven_market_snapshots_partition(p_at TIMESTAMPTZ)
+RETURNS TEXT AS $$
+    SELECT 'maven_market_snapshots_p' || to_char(p_at AT TIME ZONE 'UTC', 'YYYYMMDD')
+$$ LANGUAGE sql STABLE;
+
+-- Create the missing daily partitions covering [p_from, p_to). Each one is
+-- built as a standalone table, filled with its day's rows from the default
+-- partition (and from maven_market_snapshots_legacy while a pre-partitioning
+-- table is being migrated), checked, and only then attached: existing rows
+-- never go back through the insert triggers, and the parent is not locked
+-- while a large day is copied. Returns the number of partitions created.
+CREATE OR REPLACE FUNCTION maven_market_snapshots_create_partitions(p_from TIMESTAMPTZ, p_to TIMESTAMPTZ)
+RETURNS INTEGER AS $$
+DECLARE
+    v_day TIMESTAMPTZ := maven_utc_trunc('day', p_from);
+    v_next TIMESTAMPTZ;
+    v_name TEXT;
+    v_created INTEGER := 0;
+BEGIN
+    IF (SELECT relkind FROM pg_class WHERE oid = 'maven_market_snapshots'::regclass) <> 'p' THEN
+        RAISE NOTICE 'maven_market_snapshots is not partitioned yet; run database/partitions.py migrate';
+        RETURN 0;
+    END IF;
+
+    WHILE v_day < p_to LOOP
+        v_next := (v_day AT TIME ZONE 'UTC' + INTERVAL '1 day') AT TIME ZONE 'UTC';
+        v_name := maven_market_snapshots_partition(v_day);
+
+        IF to_regclass(v_name) IS NULL THEN
+            EXECUTE format('CREATE TABLE %I (LIKE maven_market_snapshots INCLUDING DEFAULTS INCLUDING CONSTRAINTS)',
+                           v_name);
+            EXECUTE format('WITH moved AS (
+                                DELETE FROM maven_market_snapshots_default
+                                WHERE snapshot_at >= %L AND snapshot_at < %L
+                                RETURNING *)
+                            INSERT INTO %I SELECT * FROM moved',
+                           v_day, v_next, v_name);
+            IF to_regclass('maven_market_snapshots_legacy') IS NOT NULL THEN
+                EXECUTE format('INSERT INTO %I SELECT * FROM maven_market_snapshots_legacy
+                                WHERE snapshot_at >= %L AND snapshot_at < %L',
+                               v_name, v_day, v_next);
+            END IF;
+
+            -- A matching CHECK lets ATTACH skip its own validation scan
+            EXECUTE format('ALTER TABLE %I ADD CONSTRAINT %I CHECK (snapshot_at >= %L AND snapshot_at < %L)',
+                           v_name, v_name || '_bound', v_day, v_next);
+            EXECUTE format('ALTER TABLE maven_market_snapshots ATTACH PARTITION %I FOR VALUES FROM (%L) TO (%L)',
+                           v_name, v_day, v_next);
+            EXECUTE format('ALTER TABLE %I DROP CONSTRAINT %I', v_name, v_name || '_bound');
+            v_created := v_created + 1;
+        END IF;
+
+        v_day := v_next;
+    END LOOP;
+
+    RETURN v_created;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Retention: drop the daily partitions that ended at or before p_before and
+-- delete older stragglers from the default partition. Returns the number of
+-- partitions dropped.
+CREATE OR REPLACE FUNCTION maven_market_snapshots_drop_partitions(p_before TIMESTAMPTZ)
+RETURNS INTEGER AS $$
+DECLARE
+    v_name TEXT;
+    v_dropped INTEGER := 0;
+BEGIN
+    IF (SELECT relkind FROM pg_class WHERE oid = 'maven_market_snapshots'::regclass) <> 'p' THEN
+        RETURN 0;
+    END IF;
+
+    FOR v_name IN
+        SELECT c.relname
+        FROM pg_inherits i
+        JOIN pg_class c ON c.oid = i.inhrelid
+        WHERE i.inhparent = 'maven_market_snapshots'::regclass
+          AND c.relname ~ '^maven_market_snapshots_p[0-9]{8}$'
+          AND (to_date(right(c.relname, 8), 'YYYYMMDD') + 1)::TIMESTAMP AT TIME ZONE 'UTC' <= p_before
+        ORDER BY c.relname
+    LOOP
+        EXECUTE format('DROP TABLE %I', v_name);
+        v_dropped := v_dropped + 1;
+    END LOOP;
+
+    DELETE FROM maven_market_snapshots_default WHERE snapshot_at < p_before;
+
+    RETURN v_dropped;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Periodic partition job (maven_api.maintenance, database/partitions.py):
+-- partitions from yesterday to p_premake_days ahead, then retention of
+-- p_retention_days whole days (0 keeps everything). Concurrent callers queue
+-- on an advisory lock and find nothing left to do.
+CREATE OR REPLACE FUNCTION maven_market_snapshots_maintain(
+    p_premake_days INTEGER DEFAULT 7,
+    p_retention_days INTEGER DEFAULT 90
+) RETURNS TABLE (created INTEGER, dropped INTEGER) AS $$
+BEGIN
+    PERFORM pg_advisory_xact_lock(hashtext('maven_market_snapshots_maintain'));
+
+    created := maven_market_snapshots_create_partitions(
+        NOW() - INTERVAL '1 day', NOW() + make_interval(days => p_premake_days));
+    dropped := 0;
+    IF p_retention_days > 0 THEN
+        -- Never drop snapshots the 5m bars have not been built from yet;
+        -- before the first 5m run there is no watermark and nothing is dropped
+        dropped := maven_market_snapshots_drop_partitions(LEAST(
+            maven_utc_trunc('day', NOW()) - make_interval(days => p_retention_days),
+            COALESCE((SELECT maven_utc_trunc('day', watermark) FROM maven_downsample_watermarks
+                      WHERE target = 'bars_5m'), '-infinity')));
+    END IF;
+    RETURN NEXT;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Partitions for the coming week on a fresh install
+SELECT maven_market_snapshots_create_partitions(NOW() - INTERVAL '1 day', NOW() + INTERVAL '7 days');
+
+
+-- ============================================================================
+-- 8. DOWNSAMPLING - 5m/1h/1d market bars and candles
+-- ============================================================================
+-- maven_market_bars rolls maven_market_snapshots up into 5m bars, then 5m
+-- into 1h and 1h into 1d. 1m maven_candles are rolled up into 5m/1h/1d
+-- candles in the same table. Each target advances from its watermark in
+-- maven_downsample_watermarks and only covers buckets that have closed, so
+-- raw data older than a watermark can be pruned (maven_api.maintenance runs
+-- this through database/downsample.py).
+CREATE TABLE IF NOT EXISTS maven_market_bars (
+    coin TEXT NOT NULL,
+    resolution TEXT NOT NULL CHECK (resolution IN ('5m', '1h', '1d')),
+    bucket_start TIMESTAMPTZ NOT NULL,
+
+    -- OHLC of mid_price
+    open_price NUMERIC(20,8) NOT NULL,
+    high_price NUMERIC(20,8) NOT NULL,
+    low_price NUMERIC(20,8) NOT NULL,
+    close_price NUMERIC(20,8) NOT NULL,
+
+    -- Mean funding over the snapshots that reported one
+    funding_rate_avg NUMERIC(20,10),
+    funding_samples INTEGER NOT NULL DEFAULT 0,
+
+    -- Last reported values in the bucket
+    open_interest_usd NUMERIC(20,2),
+    volume_24h_usd NUMERIC(20,2),
+
+    -- L2 summary: mean depth per side, thinnest side seen, spread
+    bid_depth_avg_usd NUMERIC(20,2),
+    ask_depth_avg_usd NUMERIC(20,2),
+    depth_min_usd NUMERIC(20,2),
+    spread_bps_avg NUMERIC(10,4),
+    spread_bps_max NUMERIC(10,4),
+
+    sample_count INTEGER NOT NULL,
+    PRIMARY KEY (coin, resolution, bucket_start)
+);
+
+CREATE INDEX IF NOT EXISTS idx_market_bars_resolution_time
+    ON maven_market_bars(resolution, bucket_start);
+
+CREATE TABLE IF NOT EXISTS maven_downsample_watermarks (
+    target TEXT PRIMARY KEY,            -- bars_5m, bars_1h, bars_1d, candles_5m, candles_1h, candles_1d
+    watermark TIMESTAMPTZ NOT NULL,     -- every bucket before this is final
+    updated_at TIMESTAMPTZ DEFAULT NOW()
+);
+
+CREATE OR REPLACE FUNCTION maven_resolution_interval(p_resolution TEXT)
+RETURNS INTERVAL AS $$
+    SELECT CASE p_resolution
+        WHEN '1m' THEN INTERVAL '1 minute'
+        WHEN '5m' THEN INTERVAL '5 minutes'
+        WHEN '15m' THEN INTERVAL '15 minutes'
+        WHEN '1h' THEN INTERVAL '1 hour'
+        WHEN '4h' THEN INTERVAL '4 hours'
+        WHEN '1d' THEN INTERVAL '1 day'
+    END
+$$ LANGUAGE sql IMMUTABLE;
+
+-- Start of the UTC-aligned bucket of p_resolution containing p_at
+CREATE OR REPLACE FUNCTION maven_bucket(p_resolution TEXT, p_at TIMESTAMPTZ)
+RETURNS TIMESTAMPTZ AS $$
+    SELECT date_bin(maven_resolution_interval(p_resolution), p_at, TIMESTAMPTZ '2000-01-01 00:00:00+00')
+$$ LANGUAGE sql IMMUTABLE;
+
+-- 5m bars from raw snapshots in [p_from, p_to) (bucket-aligned); returns bars written
+CREATE OR REPLACE FUNCTION maven_bars_from_snapshots(p_from TIMESTAMPTZ, p_to TIMESTAMPTZ)
+RETURNS INTEGER AS $$
+    WITH written AS (
+        INSERT INTO maven_market_bars (
+            coin, resolution, bucket_start,
+            open_price, high_price, low_price, close_price,
+            funding_rate_avg, funding_samples, open_interest_usd, volume_24h_usd,
+            bid_depth_avg_usd, ask_depth_avg_usd, depth_min_usd,
+            spread_bps_avg, spread_bps_max, sample_count
+        )
+        SELECT
+            coin, '5m', maven_bucket('5m', snapshot_at),
+            (array_agg(mid_price ORDER BY snapshot_at))[1],
+            MAX(mid_price),
+            MIN(mid_price),
+            (array_agg(mid_price ORDER BY snapshot_at DESC))[1],
+            AVG(funding_rate),
+            COUNT(funding_rate),
+            (array_agg(open_interest_usd ORDER BY snapshot_at DESC)
+                FILTER (WHERE open_interest_usd IS NOT NULL))[1],
+            (array_agg(volume_24h_usd ORDER BY snapshot_at DESC)
+                FILTER (WHERE volume_24h_usd IS NOT NULL))[1],
+            AVG(bid_depth_10_usd),
+            AVG(ask_depth_10_usd),
+            MIN(LEAST(bid_depth_10_usd, ask_depth_10_usd)),
+            AVG(spread_bps),
+            MAX(spread_bps),
+            COUNT(*)
+        FROM maven_market_snapshots
+        WHERE snapshot_at >= p_from AND snapshot_at < p_to
+        GROUP BY coin, maven_bucket('5m', snapshot_at)
+        ON CONFLICT (coin, resolution, bucket_start) DO UPDATE SET
+            open_price = EXCLUDED.open_price,
+            high_price = EXCLUDED.high_price,
+            low_price = EXCLUDED.low_price,
+            close_price = EXCLUDED.close_price,
+            funding_rate_avg = EXCLUDED.funding_rate_avg,
+            funding_samples = EXCLUDED.funding_samples,
+            open_interest_usd = EXCLUDED.open_interest_usd,
+            volume_24h_usd = EXCLUDED.volume_24h_usd,
+            bid_depth_avg_usd = EXCLUDED.bid_depth_avg_usd,
+            ask_depth_avg_usd = EXCLUDED.ask_depth_avg_usd,
+            depth_min_usd = EXCLUDED.depth_min_usd,
+            spread_bps_avg = EXCLUDED.spread_bps_avg,
+            spread_bps_max = EXCLUDED.spread_bps_max,
+            sample_count = EXCLUDED.sample_count
+        RETURNING 1
+    )
+    SELECT COUNT(*)::INTEGER FROM written
+$$ LANGUAGE sql;
+
+-- p_target bars from p_source bars in [p_from, p_to); means are weighted by
+-- the samples behind each source bar. Returns bars written.
+CREATE OR REPLACE FUNCTION maven_bars_rollup(p_source TEXT, p_target TEXT, p_from TIMESTAMPTZ, p_to TIMESTAMPTZ)
+RETURNS INTEGER AS $$
+    WITH written AS (
+        INSERT INTO maven_market_bars (
+            coin, resolution, bucket_start,
+            open_price, high_price, low_price, close_price,
+            funding_rate_avg, funding_samples, open_interest_usd, volume_24h_usd,
+            bid_depth_avg_usd, ask_depth_avg_usd, depth_min_usd,
+            spread_bps_avg, spread_bps_max, sample_count
+        )
+        SELECT
+            coin, p_target, maven_bucket(p_target, bucket_start),
+            (array_agg(open_price ORDER BY bucket_start))[1],
+            MAX(high_price),
+            MIN(low_price),
+            (array_agg(close_price ORDER BY bucket_start DESC))[1],
+            SUM(funding_rate_avg * funding_samples) / NULLIF(SUM(funding_samples), 0),
+            SUM(funding_samples),
+            (array_agg(open_interest_usd ORDER BY bucket_start DESC)
+                FILTER (WHERE open_interest_usd IS NOT NULL))[1],
+            (array_agg(volume_24h_usd ORDER BY bucket_start DESC)
+                FILTER (WHERE volume_24h_usd IS NOT NULL))[1],
+            SUM(bid_depth_avg_usd * sample_count)
+                / NULLIF(SUM(sample_count) FILTER (WHERE bid_depth_avg_usd IS NOT NULL), 0),
+            SUM(ask_depth_avg_usd * sample_count)
+                / NULLIF(SUM(sample_count) FILTER (WHERE ask_depth_avg_usd IS NOT NULL), 0),
+            MIN(depth_min_usd),
+            SUM(spread_bps_avg * sample_count)
+                / NULLIF(SUM(sample_count) FILTER (WHERE spread_bps_avg IS NOT NULL), 0),
+            MAX(spread_bps_max),
+            SUM(sample_count)
+        FROM maven_market_bars
+        WHERE resolution = p_source
+          AND bucket_start >= p_from AND bucket_start < p_to
+        GROUP BY coin, maven_bucket(p_target, bucket_start)
+        ON CONFLICT (coin, resolution, bucket_start) DO UPDATE SET
+            open_price = EXCLUDED.open_price,
+            high_price = EXCLUDED.high_price,
+            low_price = EXCLUDED.low_price,
+            close_price = EXCLUDED.close_price,
+            funding_rate_avg = EXCLUDED.funding_rate_avg,
+            funding_samples = EXCLUDED.funding_samples,
+            open_interest_usd = EXCLUDED.open_interest_usd,
+            volume_24h_usd = EXCLUDED.volume_24h_usd,
+            bid_depth_avg_usd = EXCLUDED.bid_depth_avg_usd,
+            ask_depth_avg_usd = EXCLUDED.ask_depth_avg_usd,
+            depth_min_usd = EXCLUDED.depth_min_usd,
+            spread_bps_avg = EXCLUDED.spread_bps_avg,
+            spread_bps_max = EXCLUDED.spread_bps_max,
+            sample_count = EXCLUDED.sample_count
+        RETURNING 1
+    )
+    SELECT COUNT(*)::INTEGER FROM written
+$$ LANGUAGE sql;
+
+-- p_target candles from p_source candles in [p_from, p_to). Candles already
+-- stored for p_target (e.g. fetched from the exchange) are left alone.
+-- Returns candles written.
+CREATE OR REPLACE FUNCTION maven_candles_rollup(p_source TEXT, p_target TEXT, p_from TIMESTAMPTZ, p_to TIMESTAMPTZ)
+RETURNS INTEGER AS $$
+    WITH written AS (
+        INSERT INTO maven_candles (
+            coin, interval, open_price, high_price, low_price, close_price, volume_usd,
+            candle_open_at, candle_close_at
+        )
+        SELECT
+            coin, p_target,
+            (array_agg(open_price ORDER BY candle_open_at))[1],
+            MAX(high_price),
+            MIN(low_price),
+            (array_agg(close_price ORDER BY candle_open_at DESC))[1],
+            SUM(volume_usd),
+            maven_bucket(p_target, candle_open_at),
+            maven_bucket(p_target, candle_open_at) + maven_resolution_interval(p_target)
+        FROM maven_candles
+        WHERE interval = p_source
+          AND candle_open_at >= p_from AND candle_open_at < p_to
+        GROUP BY coin, maven_bucket(p_target, candle_open_at)
+        ON CONFLICT (coin, interval, candle_open_at) DO NOTHING
+        RETURNING 1
+    )
+    SELECT COUNT(*)::INTEGER FROM written
+$$ LANGUAGE sql;
+
+-- Advance one target by at most p_max_buckets buckets. A bucket is final once
+-- it closed p_lag ago and, for 1h/1d, once its source target's watermark has
+-- passed it. The first run starts at the oldest source row. Call repeatedly
+-- (one transaction each) until caught_up.
+CREATE OR REPLACE FUNCTION maven_downsample_step(
+    p_target TEXT,
+    p_lag INTERVAL DEFAULT '2 minutes',
+    p_max_buckets INTEGER DEFAULT 288
+) RETURNS TABLE (rolled INTEGER, rolled_to TIMESTAMPTZ, caught_up BOOLEAN) AS $$
+DECLARE
+    v_kind TEXT := split_part(p_target, '_', 1);
+    v_res TEXT := split_part(p_target, '_', 2);
+    v_source TEXT;
+    v_limit TIMESTAMPTZ;
+    v_source_done TIMESTAMPTZ;
+    v_from TIMESTAMPTZ;
+    v_to TIMESTAMPTZ;
+BEGIN
+    v_source := CASE v_res WHEN '5m' THEN '1m' WHEN '1h' THEN '5m' WHEN '1d' THEN '1h' END;
+    IF v_kind NOT IN ('bars', 'candles') OR v_source IS NULL THEN
+        RAISE EXCEPTION 'unknown downsampling target %', p_target;
+    END IF;
+
+    v_limit := maven_bucket(v_res, NOW() - p_lag);
+    IF v_res <> '5m' THEN
+        SELECT maven_bucket(v_res, w.watermark) INTO v_source_done
+        FROM maven_downsample_watermarks w WHERE w.target = v_kind || '_' || v_source;
+        v_limit := CASE WHEN v_source_done IS NULL THEN NULL ELSE LEAST(v_limit, v_source_done) END;
+    END IF;
+
+    SELECT w.watermark INTO v_from FROM maven_downsample_watermarks w WHERE w.target = p_target;
+    IF v_from IS NULL THEN
+        IF p_target = 'bars_5m' THEN
+            SELECT MIN(snapshot_at) INTO v_from FROM maven_market_snapshots;
+        ELSIF v_kind = 'bars' THEN
+            SELECT MIN(bucket_start) INTO v_from FROM maven_market_bars WHERE resolution = v_source;
+        ELSE
+            SELECT MIN(candle_open_at) INTO v_from FROM maven_candles WHERE interval = v_source;
+        END IF;
+        v_from := maven_bucket(v_res, v_from);
+    END IF;
+
+    -- Nothing to read yet, or a cascaded target whose source has no watermark
+    IF v_from IS NULL OR v_limit IS NULL OR v_from >= v_limit THEN
+        RETURN QUERY SELECT 0, v_from, TRUE;
+        RETURN;
+    END IF;
+
+    v_to := LEAST(v_limit, v_from + maven_resolution_interval(v_res) * p_max_buckets);
+    rolled := CASE
+        WHEN p_target = 'bars_5m' THEN maven_bars_from_snapshots(v_from, v_to)
+        WHEN v_kind = 'bars' THEN maven_bars_rollup(v_source, v_res, v_from, v_to)
+        ELSE maven_candles_rollup(v_source, v_res, v_from, v_to)
+    END;
+
+    INSERT INTO maven_downsample_watermarks (target, watermark)
+    VALUES (p_target, v_to)
+    ON CONFLICT (target) DO UPDATE SET watermark = EXCLUDED.watermark, updated_at = NOW();
+
+    rolled_to := v_to;
+    caught_up := v_to >= v_limit;
+    RETURN NEXT;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Delete up to p_batch rows of raw 1m candles ('candles_1m') or 5m bars
+-- ('bars_5m') older than p_keep_days, never past the watermark of the target
+-- built from them. Call until it returns 0; returns rows deleted.
+CREATE OR REPLACE FUNCTION maven_downsample_prune(p_source TEXT, p_keep_days INTEGER, p_batch INTEGER DEFAULT 10000)
+RETURNS INTEGER AS $$
+DECLARE
+    v_cutoff TIMESTAMPTZ;
+    v_deleted INTEGER;
+BEGIN
+    SELECT LEAST(NOW() - make_interval(days => p_keep_days), w.watermark) INTO v_cutoff
+    FROM maven_downsample_watermarks w
+    WHERE w.target = CASE p_source WHEN 'candles_1m' THEN 'candles_5m' WHEN 'bars_5m' THEN 'bars_1h' END;
+    IF v_cutoff IS NULL OR p_keep_days <= 0 THEN
+        RETURN 0;
+    END IF;
+
+    IF p_source = 'candles_1m' THEN
+        DELETE FROM maven_candles WHERE id IN (
+            SELECT id FROM maven_candles
+            WHERE interval = '1m' AND candle_open_at < v_cutoff
+            LIMIT p_batch
+        );
+    ELSE
+        DELETE FROM maven_market_bars WHERE (coin, resolution, bucket_start) IN (
+            SELECT coin, resolution, bucket_start FROM maven_market_bars
+            WHERE resolution = '5m' AND bucket_start < v_cutoff
+            LIMIT p_batch
+        );
+    END IF;
+    GET DIAGNOSTICS v_deleted = ROW_COUNT;
+    RETURN v_deleted;
+END;
+$$ LANGUAGE plpgsql;
+
+
+-- ============================================================================
+-- 9. MARKET_LATEST - Last snapshot per coin
+-- ============================================================================
+-- One row per coin, upserted by the maven_market_snapshots_latest trigger on
+-- every snapshot insert, so "latest price" reads never touch snapshot history
+-- (maven_watchlist_prices, /api/watchlist). Older snapshots inserted late do
+-- not replace a newer row. Partition retention leaves it alone; after
+-- deleting or editing snapshots run SELECT maven_rebuild_market_latest();
+CREATE TABLE IF NOT EXISTS maven_market_latest (
+    coin TEXT PRIMARY KEY,
+    market_type TEXT NOT NULL,
+    snapshot_id BIGINT NOT NULL,
+
+    mid_price NUMERIC(20,8) NOT NULL,
+    mark_price NUMERIC(20,8),
+    index_price NUMERIC(20,8),
+    funding_rate NUMERIC(20,10),
+    predicted_funding NUMERIC(20,10),
+    volume_24h_usd NUMERIC(20,2),
+    open_interest_usd NUMERIC(20,2),
+    spread_bps NUMERIC(10,4),
+
+    snapshot_at TIMESTAMPTZ NOT NULL,
+    updated_at TIMESTAMPTZ DEFAULT NOW()
+);
+
+CREATE OR REPLACE FUNCTION maven_market_latest_upsert() RETURNS TRIGGER AS $$
+BEGIN
+    INSERT INTO maven_market_latest AS l (
+        coin, market_type, snapshot_id, mid_price, mark_price, index_price,
+        funding_rate, predicted_funding, volume_24h_usd, open_interest_usd,
+        spread_bps, snapshot_at
+    ) VALUES (
+        NEW.coin, NEW.market_type, NEW.id, NEW.mid_price, NEW.mark_price, NEW.index_price,
+        NEW.funding_rate, NEW.predicted_funding, NEW.volume_24h_usd, NEW.open_interest_usd,
+        NEW.spread_bps, NEW.snapshot_at
+    )
+    ON CONFLICT (coin) DO UPDATE SET
+        market_type = EXCLUDED.market_type,
+        snapshot_id = EXCLUDED.snapshot_id,
+        mid_price = EXCLUDED.mid_price,
+        mark_price = EXCLUDED.mark_price,
+        index_price = EXCLUDED.index_price,
+        funding_rate = EXCLUDED.funding_rate,
+        predicted_funding = EXCLUDED.predicted_funding,
+        volume_24h_usd = EXCLUDED.volume_24h_usd,
+        open_interest_usd = EXCLUDED.open_interest_usd,
+        spread_bps = EXCLUDED.spread_bps,
+        snapshot_at = EXCLUDED.snapshot_at,
+        updated_at = NOW()
+    WHERE l.snapshot_at <= EXCLUDED.snapshot_at;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS maven_market_snapshots_latest ON maven_market_snapshots;
+CREATE TRIGGER maven_market_snapshots_latest
+    AFTER INSERT ON maven_market_snapshots
+    FOR EACH ROW EXECUTE FUNCTION maven_market_latest_upsert();
+
+-- Recompute maven_market_latest from maven_market_snapshots
+CREATE OR REPLACE FUNCTION maven_rebuild_market_latest() RETURNS INTEGER AS $$
+DECLARE
+    v_rows INTEGER;
+BEGIN
+    LOCK TABLE maven_market_latest IN EXCLUSIVE MODE;
+    DELETE FROM maven_market_latest;
+    INSERT INTO maven_market_latest (
+        coin, market_type, snapshot_id, mid_price, mark_price, index_price,
+        funding_rate, predicted_funding, volume_24h_usd, open_interest_usd,
+        spread_bps, snapshot_at
+    )
+    SELECT DISTINCT ON (coin)
+        coin, market_type, id, mid_price, mark_price, index_price,
+        funding_rate, predicted_funding, volume_24h_usd, open_interest_usd,
+        spread_bps, snapshot_at
+    FROM maven_market_snapshots
+    ORDER BY coin, snapshot_at DESC, id DESC;
+    GET DIAGNOSTICS v_rows = ROW_COUNT;
+    RETURN v_rows;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Seed from existing history once
+SELECT maven_rebuild_market_latest()
+WHERE NOT EXISTS (SELECT 1 FROM maven_market_latest)
+  AND EXISTS (SELECT 1 FROM maven_market_snapshots);
+
+
+-- ============================================================================
+-- VIEWS - Quick access queries
+-- ============================================================================
+
+-- Current treasury status
+CREATE OR REPLACE VIEW maven_treasury_current AS
+SELECT
+    wallet_address,
+    account_value_usd,
+    withdrawable_usd,
+    margin_used_usd,
+    unrealized_pnl_usd,
+    active_positions,
+    positions_data,
+    value_change_24h_usd,
+    snapshot_at
+FROM maven_treasury_state
+ORDER BY snapshot_at DESC
+LIMIT 1;
+
+-- Latest prices for watchlist
+CREATE OR REPLACE VIEW maven_watchlist_prices AS
+SELECT
+    w.coin,
+    w.priority,
+    w.market_type,
+    m.mid_price,
+    m.funding_rate,
+    m.volume_24h_usd,
+    m.snapshot_at as price_updated_at
+FROM maven_watchlist w
+LEFT JOIN maven_market_latest m ON m.coin = w.coin
+WHERE w.active = TRUE
+ORDER BY w.priority DESC, w.coin;
+
+-- Active signals summary
+CREATE OR REPLACE VIEW maven_active_signals AS
+SELECT
+    coin,
+    signal_source,
+    signal_type,
+    strength,
+    reasoning,
+    generated_at,
+    valid_until
+FROM maven_trading_signals
+WHERE NOT expired
+    AND (valid_until IS NULL OR valid_until > NOW())
+ORDER BY strength DESC, generated_at DESC;
+
+
+-- ============================================================================
+-- FUNCTIONS - Treasury helpers
+-- ============================================================================
+
+-- Record treasury snapshot
+-- Change columns compare against the hourly rollups: 1h is the latest
+-- snapshot in the past hour; 24h and 7d are the latest hourly close between
+-- one hour either side of the target (24h: 25h-23h ago, as for the old
+-- [24h, 23h] window with an hour of slack so the hour buckets always cover it).
+CREATE OR REPLACE FUNCTION maven_record_treasury_snapshot(
+    p_account_value NUMERIC,
+    p_withdrawable NUMERIC,
+    p_margin_used NUMERIC,
+    p_unrealized_pnl NUMERIC,
+    p_positions JSONB
+) RETURNS INTEGER AS $$
+DECLARE
+    v_id INTEGER;
+    v_now TIMESTAMPTZ := NOW();
+    v_prev_value NUMERIC;
+    v_prev_24h NUMERIC;
+    v_prev_7d NUMERIC;
+BEGIN
+    v_prev_value := maven_treasury_close_between(v_now - INTERVAL '1 hour', v_now + INTERVAL '1 microsecond');
+    v_prev_24h := maven_treasury_close_between(v_now - INTERVAL '25 hours', v_now - INTERVAL '23 hours');
+    v_prev_7d := maven_treasury_close_between(v_now - INTERVAL '7 days 1 hour',
+                                              v_now - INTERVAL '6 days 23 hours');
+
+    -- Insert new snapshot (the rollup trigger folds it into its buckets)
+    INSERT INTO maven_treasury_state (
+        account_value_usd,
+        withdrawable_usd,
+        margin_used_usd,
+        unrealized_pnl_usd,
+        active_positions,
+        positions_data,
+        value_change_1h_usd,
+        value_change_24h_usd,
+        value_change_7d_usd,
+        snapshot_at
+    ) VALUES (
+        p_account_value,
+        p_withdrawable,
+        p_margin_used,
+        p_unrealized_pnl,
+        jsonb_array_length(p_positions),
+        p_positions,
+        CASE WHEN v_prev_value IS NOT NULL THEN p_account_value - v_prev_value ELSE NULL END,
+        CASE WHEN v_prev_24h IS NOT NULL THEN p_account_value - v_prev_24h ELSE NULL END,
+        CASE WHEN v_prev_7d IS NOT NULL THEN p_account_value - v_prev_7d ELSE NULL END,
+        v_now
+    ) RETURNING id INTO v_id;
+
+    RETURN v_id;
+END;
+$$ LANGUAGE plpgsql;
+
+
+-- Get treasury performance summary
+-- Answered from the rollups: the window starts at the UTC hour containing
+-- NOW() - p_days, whole days come from the daily table and the leading
+-- partial day from the hourly one, so cost depends on p_days, not on how
+-- many snapshots are stored.
+CREATE OR REPLACE FUNCTION maven_treasury_performance(p_days INTEGER DEFAULT 30)
+RETURNS TABLE(
+    start_value NUMERIC,
+    end_value NUMERIC,
+    absolute_change NUMERIC,
+    percentage_change NUMERIC,
+    high_water_mark NUMERIC,
+    low_water_mark NUMERIC,
+    snapshot_count BIGINT
+) AS $$
+#variable_conflict use_column
+DECLARE
+    v_from TIMESTAMPTZ := maven_utc_trunc('hour', NOW() - make_interval(days => p_days));
+    -- First UTC midnight at or after v_from
+    v_days_from TIMESTAMPTZ := maven_utc_trunc('day', v_from + INTERVAL '1 day' - INTERVAL '1 microsecond');
+BEGIN
+    RETURN QUERY
+    WITH parts AS (
+        SELECT h.open_at, h.open_value, h.high_value, h.low_value, h.snapshot_count
+        FROM maven_treasury_rollup_hourly h
+        WHERE h.bucket_start >= v_from AND h.bucket_start < v_days_from
+        UNION ALL
+        SELECT d.open_at, d.open_value, d.high_value, d.low_value, d.snapshot_count
+        FROM maven_treasury_rollup_daily d
+        WHERE d.bucket_start >= v_days_from
+    ),
+    window_stats AS (
+        SELECT
+            (SELECT p.open_value FROM parts p ORDER BY p.open_at ASC LIMIT 1) AS first_value,
+            (SELECT h.close_value FROM maven_treasury_rollup_hourly h
+             ORDER BY h.bucket_start DESC LIMIT 1) AS last_value,
+            MAX(parts.high_value) AS high_value,
+            MIN(parts.low_value) AS low_value,
+            COALESCE(SUM(parts.snapshot_count), 0)::BIGINT AS snapshots
+        FROM parts
+    )
+    SELECT
+        w.first_value,
+        w.last_value,
+        w.last_value - w.first_value,
+        CASE
+            WHEN w.first_value > 0 THEN ((w.last_value - w.first_value) / w.first_value) * 100
+            ELSE 0
+        END,
+        w.high_value,
+        w.low_value,
+        w.snapshots
+    FROM window_stats w;
+END;
+$$ LANGUAGE plpgsql;
+
+
+-- ============================================================================
+-- EVENT NOTIFICATIONS - pg_notify feed for the /api/stream SSE endpoint
+-- ============================================================================
+
+-- Publishes a compact JSON event on channel 'maven_events' for every new
+-- treasury snapshot, trading signal and watchlist-coin market snapshot.
+-- Keys must match the backlog queries in maven_api/stream.py.
+CREATE OR REPLACE FUNCTION maven_notify_event() RETURNS TRIGGER AS $$
+DECLARE
+    v_topic TEXT;
+    v_data JSON;
+BEGIN
+    IF TG_TABLE_NAME = 'maven_treasury_state' THEN
+        v_topic := 'treasury';
+        v_data := json_build_object(
+            'id', NEW.id,
+            'account_value_usd', NEW.account_value_usd,
+            'withdrawable_usd', NEW.withdrawable_usd,
+            'unrealized_pnl_usd', NEW.unrealized_pnl_usd,
+            'active_positions', NEW.active_positions,
+            'value_change_24h_usd', NEW.value_change_24h_usd,
+            'snapshot_at', NEW.snapshot_at
+        );
+    ELSIF TG_TABLE_NAME = 'maven_trading_signals' THEN
+        v_topic := 'signals';
+        v_data := json_build_object(
+            'id', NEW.id,
+            'coin', NEW.coin,
+            'source', NEW.signal_source,
+            'signal_type', NEW.signal_type,
+            'strength', NEW.strength,
+            'reasoning', left(NEW.reasoning, 1000),
+            'generated_at', NEW.generated_at,
+            'valid_until', NEW.valid_until
+        );
+    ELSIF TG_TABLE_NAME LIKE 'maven\_market\_snapshots%' THEN
+        -- Fired on the partition the row landed in
+        IF NOT EXISTS (SELECT 1 FROM maven_watchlist WHERE coin = NEW.coin AND active) THEN
+            RETURN NULL;
+        END IF;
+        v_topic := 'watchlist';
+        v_data := json_build_object(
+            'id', NEW.id,
+            'coin', NEW.coin,
+            'mid_price', NEW.mid_price,
+            'funding_rate', NEW.funding_rate,
+            'volume_24h_usd', NEW.volume_24h_usd,
+            'snapshot_at', NEW.snapshot_at
+        );
+    ELSE
+        RETURN NULL;
+    END IF;
+
+    PERFORM pg_notify('maven_events', json_build_object('topic', v_topic, 'data', v_data)::text);
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS maven_treasury_state_notify ON maven_treasury_state;
+CREATE TRIGGER maven_treasury_state_notify
+    AFTER INSERT ON maven_treasury_state
+    FOR EACH ROW EXECUTE FUNCTION maven_notify_event();
+
+DROP TRIGGER IF EXISTS maven_trading_signals_notify ON maven_trading_signals;
+CREATE TRIGGER maven_trading_signals_notify
+    AFTER INSERT ON maven_trading_signals
+    FOR EACH ROW EXECUTE FUNCTION maven_notify_event();
+
+DROP TRIGGER IF EXISTS maven_market_snapshots_notify ON maven_market_snapshots;
+CREATE TRIGGER maven_market_snapshots_notify
+    AFTER INSERT ON maven_market_snapshots
+    FOR EACH ROW EXECUTE FUNCTION maven_notify_event();
+
+
+-- ============================================================================
+-- COMMENTS
+-- ============================================================================
+
+COMMENT ON TABLE maven_treasury_state IS 'Real-time MoHa treasury wallet state snapshots';
+COMMENT ON TABLE maven_market_snapshots IS 'Hyperliquid market data captures for analysis, partitioned by UTC day';
+COMMENT ON TABLE maven_candles IS 'OHLCV candle data storage';
+COMMENT ON TABLE maven_trading_signals IS 'Trading signals from all sources (bots, Maven RLM, etc)';
+COMMENT ON TABLE maven_watchlist IS 'Coins Maven actively monitors';
+COMMENT ON TABLE maven_treasury_rollup_hourly IS 'Hourly OHLC of treasury account value (UTC), trigger-maintained';
+COMMENT ON TABLE maven_treasury_rollup_daily IS 'Daily OHLC of treasury account value (UTC), trigger-maintained';
+COMMENT ON TABLE maven_market_bars IS '5m/1h/1d bars downsampled from maven_market_snapshots';
+COMMENT ON TABLE maven_market_latest IS 'Latest market snapshot per coin, trigger-maintained';
+COMMENT ON TABLE maven_downsample_watermarks IS 'Progress of each downsampling target; buckets before the watermark are final';
+
+COMMENT ON VIEW maven_treasury_current IS 'Current treasury state (latest snapshot)';
+COMMENT ON VIEW maven_watchlist_prices IS 'Watchlist with latest prices';
+COMMENT ON VIEW maven_active_signals IS 'Non-expired trading signals';
@@ -0,0 +1,11 @@
+-- Index for the signal expiry sweeper (database/signal_expiry.py)
+-- migrate: no-transaction
+--
+-- Signals still marked active, by valid_until, so each sweep reads only the
+-- rows that have just run out. Swept rows leave the index. It is built
+-- concurrently because maven_trading_signals takes writes from the bots all
+-- the time.
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_signals_expiring
+    ON maven_trading_signals(valid_until)
+    WHERE NOT expired AND valid_until IS NOT NULL;
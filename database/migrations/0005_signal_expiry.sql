@@ -0,0 +1,73 @@
+-- Signal expiry and archiving (database/signal_expiry.py)
+--
+-- Nothing used to set maven_trading_signals.expired, so every read of active
+-- signals re-checked valid_until on rows that ran out long ago, and the
+-- partial indexes on NOT expired kept growing. The maintenance sweeper marks
+-- them expired in batches through idx_signals_expiring (0004) and, when
+-- MAVEN_SIGNAL_ARCHIVE_DAYS is set, moves expired signals older than that to
+-- maven_trading_signals_archive.
+
+-- Same columns as maven_trading_signals, in the same order, plus when the row
+-- was moved. A migration that adds a column to maven_trading_signals must add
+-- it here too.
+CREATE TABLE IF NOT EXISTS maven_trading_signals_archive (
+    LIKE maven_trading_signals INCLUDING CONSTRAINTS,
+    archived_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    PRIMARY KEY (id)
+);
+
+CREATE INDEX IF NOT EXISTS idx_signals_archive_coin_time
+    ON maven_trading_signals_archive(coin, generated_at DESC);
+
+-- Mark up to p_batch signals whose valid_until has passed as expired.
+-- Rows another transaction holds are left for the next sweep.
+CREATE OR REPLACE FUNCTION maven_expire_signals(p_batch INTEGER DEFAULT 5000)
+RETURNS INTEGER AS $$
+DECLARE
+    v_expired INTEGER;
+BEGIN
+    UPDATE maven_trading_signals SET expired = TRUE
+    WHERE id IN (
+        SELECT id FROM maven_trading_signals
+        WHERE NOT expired AND valid_until IS NOT NULL AND valid_until <= NOW()
+        ORDER BY valid_until
+        LIMIT p_batch
+        FOR UPDATE SKIP LOCKED
+    );
+    GET DIAGNOSTICS v_expired = ROW_COUNT;
+    RETURN v_expired;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Move up to p_batch expired signals whose validity ended more than
+-- p_keep_days ago to maven_trading_signals_archive. Oldest ids first, so the
+-- scan walks the primary key from the start of the table.
+CREATE OR REPLACE FUNCTION maven_archive_signals(p_keep_days INTEGER, p_batch INTEGER DEFAULT 5000)
+RETURNS INTEGER AS $$
+DECLARE
+    v_archived INTEGER;
+BEGIN
+    IF p_keep_days <= 0 THEN
+        RETURN 0;
+    END IF;
+
+    WITH moved AS (
+        DELETE FROM maven_trading_signals
+        WHERE id IN (
+            SELECT id FROM maven_trading_signals
+            WHERE expired AND valid_until < NOW() - make_interval(days => p_keep_days)
+            ORDER BY id
+            LIMIT p_batch
+            FOR UPDATE SKIP LOCKED
+        )
+        RETURNING *
+    )
+    INSERT INTO maven_trading_signals_archive
+    SELECT moved.*, NOW() FROM moved;
+    GET DIAGNOSTICS v_archived = ROW_COUNT;
+    RETURN v_archived;
+END;
+$$ LANGUAGE plpgsql;
+
+COMMENT ON TABLE maven_trading_signals_archive IS 'Expired trading signals moved out of maven_trading_signals after MAVEN_SIGNAL_ARCHIVE_DAYS';
+COMMENT ON VIEW maven_active_signals IS 'Non-expired trading signals; expired is set by the maintenance sweeper, valid_until covers the time between sweeps';
@@ -0,0 +1,32 @@
+-- Gap detection for the candle store (maven_api/candles.py)
+--
+-- Missing stretches of one candle series between p_from and p_to: before the
+-- first stored candle, and between neighbours more than one interval apart.
+-- Bounds are candle opens; a gap covers [gap_start, gap_end). Reads one
+-- series through idx_candles_coin_interval_time.
+CREATE OR REPLACE FUNCTION maven_candle_gaps(
+    p_coin TEXT,
+    p_interval TEXT,
+    p_from TIMESTAMPTZ,
+    p_to TIMESTAMPTZ
+)
+RETURNS TABLE(gap_start TIMESTAMPTZ, gap_end TIMESTAMPTZ) AS $$
+    WITH series AS (
+        SELECT candle_open_at,
+               LEAD(candle_open_at) OVER (ORDER BY candle_open_at) AS next_open
+        FROM maven_candles
+        WHERE coin = p_coin AND interval = p_interval
+          AND candle_open_at >= p_from AND candle_open_at <= p_to
+    )
+    SELECT g.gap_start, g.gap_end
+    FROM (
+        SELECT p_from AS gap_start, COALESCE(MIN(candle_open_at), p_to) AS gap_end
+        FROM series
+        UNION ALL
+        SELECT candle_open_at + maven_resolution_interval(p_interval), next_open
+        FROM series
+        WHERE next_open IS NOT NULL
+    ) g
+    WHERE g.gap_end > g.gap_start
+    ORDER BY g.gap_start
+$$ LANGUAGE sql STABLE;
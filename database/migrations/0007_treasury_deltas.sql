@@ -0,0 +1,103 @@
+-- Treasury snapshot deltas on whole rollup hours
+--
+-- maven_treasury_close_between() took the newest hourly bucket whose
+-- close_at fell inside a window with arbitrary bounds. The hour cut by the
+-- window's end usually closed past it and was skipped, and a snapshot
+-- backfilled into an hour that already had later rows never found its own
+-- hour, so its 1h change came from an older hour or was NULL.
+-- maven_record_treasury_snapshot() and the batch ingest (maven_api/ingest.py)
+-- also used different upper bounds.
+--
+-- Both now call maven_treasury_deltas():
+--   1h       the latest snapshot in the hour before the new row, read from
+--            maven_treasury_state (one backward step on
+--            idx_treasury_state_snapshot), since that hour's bucket is
+--            still open or, for a backfilled row, has rows after it;
+--   24h, 7d  the close of the latest hourly rollup bucket between an hour
+--            either side of the target. Windows are whole UTC hours, so a
+--            bucket is never cut and every close in it is before the row.
+
+-- Account value of the latest snapshot taken in [p_from, p_to)
+CREATE OR REPLACE FUNCTION maven_treasury_value_between(p_from TIMESTAMPTZ, p_to TIMESTAMPTZ)
+RETURNS NUMERIC AS $$
+    SELECT account_value_usd
+    FROM maven_treasury_state
+    WHERE snapshot_at >= p_from
+      AND snapshot_at < p_to
+    ORDER BY snapshot_at DESC
+    LIMIT 1
+$$ LANGUAGE sql STABLE;
+
+-- Close of the latest hourly bucket starting in [hour of p_from, hour of
+-- p_to); reads at most one rollup row per hour of the range
+CREATE OR REPLACE FUNCTION maven_treasury_close_between(p_from TIMESTAMPTZ, p_to TIMESTAMPTZ)
+RETURNS NUMERIC AS $$
+    SELECT close_value
+    FROM maven_treasury_rollup_hourly
+    WHERE bucket_start >= maven_utc_trunc('hour', p_from)
+      AND bucket_start < maven_utc_trunc('hour', p_to)
+    ORDER BY bucket_start DESC
+    LIMIT 1
+$$ LANGUAGE sql STABLE;
+
+-- Change columns for a snapshot worth p_value taken at p_at. NULL where
+-- there is nothing to compare with.
+CREATE OR REPLACE FUNCTION maven_treasury_deltas(
+    p_value NUMERIC,
+    p_at TIMESTAMPTZ,
+    OUT change_1h NUMERIC,
+    OUT change_24h NUMERIC,
+    OUT change_7d NUMERIC
+) AS $$
+    SELECT
+        p_value - maven_treasury_value_between(p_at - INTERVAL '1 hour', p_at),
+        p_value - maven_treasury_close_between(p_at - INTERVAL '25 hours', p_at - INTERVAL '23 hours'),
+        p_value - maven_treasury_close_between(p_at - INTERVAL '7 days 1 hour',
+                                               p_at - INTERVAL '6 days 23 hours')
+$$ LANGUAGE sql STABLE;
+
+CREATE OR REPLACE FUNCTION maven_record_treasury_snapshot(
+    p_account_value NUMERIC,
+    p_withdrawable NUMERIC,
+    p_margin_used NUMERIC,
+    p_unrealized_pnl NUMERIC,
+    p_positions JSONB
+) RETURNS INTEGER AS $$
+DECLARE
+    v_id INTEGER;
+    v_now TIMESTAMPTZ := NOW();
+    v_deltas RECORD;
+BEGIN
+    SELECT * INTO v_deltas FROM maven_treasury_deltas(p_account_value, v_now);
+
+    -- Insert new snapshot (the rollup trigger folds it into its buckets)
+    INSERT INTO maven_treasury_state (
+        account_value_usd,
+        withdrawable_usd,
+        margin_used_usd,
+        unrealized_pnl_usd,
+        active_positions,
+        positions_data,
+        value_change_1h_usd,
+        value_change_24h_usd,
+        value_change_7d_usd,
+        snapshot_at
+    ) VALUES (
+        p_account_value,
+        p_withdrawable,
+        p_margin_used,
+        p_unrealized_pnl,
+        jsonb_array_length(p_positions),
+        p_positions,
+        v_deltas.change_1h,
+        v_deltas.change_24h,
+        v_deltas.change_7d,
+        v_now
+    ) RETURNING id INTO v_id;
+
+    RETURN v_id;
+END;
+$$ LANGUAGE plpgsql;
+
+COMMENT ON FUNCTION maven_treasury_deltas(NUMERIC, TIMESTAMPTZ) IS
+    'Snapshot change columns (1h raw, 24h/7d from hourly rollups); shared by maven_record_treasury_snapshot() and the batch ingest';
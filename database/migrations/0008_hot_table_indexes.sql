@@ -0,0 +1,15 @@
+-- Indexes on the ingest tables, built without blocking writes
+-- migrate: no-transaction
+--
+-- maven_trading_signals and maven_candles take writes all the time, and a
+-- database created before the migration runner already holds their rows.
+-- A plain CREATE INDEX would hold off every insert for the whole build, so
+-- these are built concurrently rather than in 0003.
+
+-- Keyset pagination of /api/signals without a coin filter
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_signals_active_time
+    ON maven_trading_signals(generated_at DESC, id DESC) WHERE NOT expired;
+
+-- Raw 1m candles are found and pruned by interval and time
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_candles_interval_time
+    ON maven_candles(interval, candle_open_at);
@@ -0,0 +1,295 @@
+#!/usr/bin/env python3
+"""
+Daily partitions for maven_market_snapshots.
+
+database/migrations/0003_treasury.sql creates maven_market_snapshots range-
+partitioned by UTC day, with SQL functions that create partitions ahead of
+time and drop expired ones. The API runs those hourly (maven_api.maintenance);
+this script runs them by hand and converts databases that still have the
+original unpartitioned table.
+
+    migrate   1. In one short transaction: rename the plain table (and its
+                 indexes) to maven_market_snapshots_legacy, create the
+                 partitioned table in its place with the same columns, id
+                 sequence, indexes and triggers, and partitions from
+                 yesterday on (filled from the legacy table). Writers wait on
+                 the table lock for the length of this step only.
+              2. Copy older days from the legacy table, one partition per
+                 transaction, newest first. Days past the retention window
+                 are not copied. Rerunning `migrate` resumes here.
+              3. With --drop-legacy, drop the legacy table once every legacy
+                 row inside the retention window is in the partitioned table.
+    maintain  Create upcoming partitions and drop expired ones now.
+    status    List partitions with row estimates and sizes.
+
+Environment:
+    MAVEN_SNAPSHOT_RETENTION_DAYS  Days of snapshots kept (default 90; 0 keeps everything)
+    MAVEN_SNAPSHOT_PREMAKE_DAYS    Days of partitions created ahead (default 7)
+
+Usage:
+    python database/partitions.py migrate [--drop-legacy]
+    python database/partitions.py maintain
+    python database/partitions.py status
+"""
+import argparse
+import logging
+import os
+import sys
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+import psycopg2
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from database.connection import DB_CONFIG  # noqa: E402
+
+
+logger = logging.getLogger(__name__)
+
+RETENTION_DAYS = int(os.getenv('MAVEN_SNAPSHOT_RETENTION_DAYS', 90))
+PREMAKE_DAYS = int(os.getenv('MAVEN_SNAPSHOT_PREMAKE_DAYS', 7))
+
+TABLE = 'maven_market_snapshots'
+LEGACY_TABLE = 'maven_market_snapshots_legacy'
+
+
+def maintain(conn, premake_days=None, retention_days=None):
+    """
+    Create partitions through `premake_days` ahead and drop days older than
+    `retention_days`. Does not commit.
+
+    Returns:
+        dict: {'created': n, 'dropped': n}
+    """
+    premake_days = PREMAKE_DAYS if premake_days is None else premake_days
+    retention_days = RETENTION_DAYS if retention_days is None else retention_days
+    cursor = conn.cursor()
+    cursor.execute("SELECT created, dropped FROM maven_market_snapshots_maintain(%s, %s)",
+                   (premake_days, retention_days))
+    created, dropped = cursor.fetchone()
+    return {'created': created, 'dropped': dropped}
+
+
+def is_partitioned(cursor):
+    cursor.execute("SELECT relkind FROM pg_class WHERE oid = to_regclass(%s)", (TABLE,))
+    row = cursor.fetchone()
+    return row is not None and row[0] == 'p'
+
+
+def legacy_exists(cursor):
+    cursor.execute("SELECT to_regclass(%s) IS NOT NULL", (LEGACY_TABLE,))
+    return cursor.fetchone()[0]
+
+
+def retention_cutoff(retention_days):
+    """Start of the oldest UTC day kept, or None when keeping everything."""
+    if retention_days <= 0:
+        return None
+    today = datetime.now(timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0)
+    return today - timedelta(days=retention_days)
+
+
+def swap_tables(conn):
+    """Step 1: put a partitioned table in place of the plain one. Commits."""
+    cursor = conn.cursor()
+    cursor.execute(f"LOCK TABLE {TABLE} IN ACCESS EXCLUSIVE MODE")
+
+    # Index and trigger definitions to recreate on the new table; they name
+    # the table, which keeps its name. The primary key is redefined below
+    # because it has to include the partition key.
+    cursor.execute("""
+        SELECT c.relname, pg_get_indexdef(i.indexrelid), i.indisprimary
+        FROM pg_index i
+        JOIN pg_class c ON c.oid = i.indexrelid
+        WHERE i.indrelid = to_regclass(%s)
+    """, (TABLE,))
+    indexes = cursor.fetchall()
+    cursor.execute("""
+        SELECT tgname, pg_get_triggerdef(oid)
+        FROM pg_trigger
+        WHERE tgrelid = to_regclass(%s) AND NOT tgisinternal
+    """, (TABLE,))
+    triggers = cursor.fetchall()
+
+    cursor.execute(f"ALTER TABLE {TABLE} RENAME TO {LEGACY_TABLE}")
+    for name, _ in triggers:
+        cursor.execute(f'DROP TRIGGER "{name}" ON {LEGACY_TABLE}')
+    # Free the index and primary key names for the new table
+    for name, _, _ in indexes:
+        cursor.execute(f'ALTER INDEX "{name}" RENAME TO "{name}_legacy"')
+
+    # Same columns, defaults and id sequence; the sequence moves to the new
+    # table so dropping the legacy one later leaves it alone
+    cursor.execute(f"""
+        CREATE TABLE {TABLE} (
+            LIKE {LEGACY_TABLE} INCLUDING DEFAULTS INCLUDING CONSTRAINTS,
+            PRIMARY KEY (id, snapshot_at)
+        ) PARTITION BY RANGE (snapshot_at)
+    """)
+    cursor.execute(f"ALTER TABLE {TABLE} ALTER COLUMN id TYPE BIGINT")
+    cursor.execute("SELECT pg_get_serial_sequence(%s, 'id')", (LEGACY_TABLE,))
+    sequence = cursor.fetchone()[0]
+    if sequence:
+        cursor.execute(f"ALTER SEQUENCE {sequence} AS BIGINT OWNED BY {TABLE}.id")
+
+    for _, definition, primary in indexes:
+        if not primary:
+            cursor.execute(definition)
+    for _, definition in triggers:
+        cursor.execute(definition)
+    cursor.execute(f"CREATE TABLE IF NOT EXISTS {TABLE}_default PARTITION OF {TABLE} DEFAULT")
+    cursor.execute("""
+        SELECT maven_market_snapshots_create_partitions(
+            NOW() - INTERVAL '1 day', NOW() + make_interval(days => %s))
+    """, (PREMAKE_DAYS,))
+    conn.commit()
+    logger.info(f"✓ {TABLE} is partitioned; old rows are in {LEGACY_TABLE}")
+
+
+def copy_legacy_days(conn, retention_days=None):
+    """
+    Step 2: one partition per legacy day inside the retention window, newest
+    first, each in its own transaction.
+
+    Returns:
+        int: Partitions created
+    """
+    retention_days = RETENTION_DAYS if retention_days is None else retention_days
+    cursor = conn.cursor()
+    cursor.execute(f"""
+        SELECT maven_utc_trunc('day', MIN(snapshot_at)), maven_utc_trunc('day', MAX(snapshot_at))
+        FROM {LEGACY_TABLE}
+    """)
+    first_day, last_day = cursor.fetchone()
+    conn.commit()
+    if first_day is None:
+        return 0
+
+    cutoff = retention_cutoff(retention_days)
+    if cutoff is not None:
+        first_day = max(first_day, cutoff)
+
+    created = 0
+    day = last_day
+    while day >= first_day:
+        cursor.execute("SELECT maven_market_snapshots_create_partitions(%s, %s)",
+                       (day, day + timedelta(days=1)))
+        made = cursor.fetchone()[0]
+        conn.commit()
+        if made:
+            logger.info(f"  ✓ {day:%Y-%m-%d}")
+        created += made
+        day -= timedelta(days=1)
+    return created
+
+
+def verify_copy(conn, retention_days=None):
+    """
+    Compare legacy rows inside the retention window with their copies.
+
+    Returns:
+        tuple: (legacy_rows, copied_rows)
+    """
+    retention_days = RETENTION_DAYS if retention_days is None else retention_days
+    cutoff = retention_cutoff(retention_days) or datetime(1970, 1, 1, tzinfo=timezone.utc)
+    cursor = conn.cursor()
+    cursor.execute(f"""
+        SELECT COUNT(*), COALESCE(MAX(id), 0) FROM {LEGACY_TABLE} WHERE snapshot_at >= %s
+    """, (cutoff,))
+    legacy_rows, max_id = cursor.fetchone()
+    cursor.execute(f"""
+        SELECT COUNT(*) FROM {TABLE} WHERE snapshot_at >= %s AND id <= %s
+    """, (cutoff, max_id))
+    copied_rows = cursor.fetchone()[0]
+    conn.commit()
+    return legacy_rows, copied_rows
+
+
+def migrate(conn, retention_days=None, drop_legacy=False):
+    """
+    Convert a plain maven_market_snapshots to daily partitions, or resume an
+    interrupted conversion.
+
+    Returns:
+        bool: True when the copy is complete
+    """
+    cursor = conn.cursor()
+    if not is_partitioned(cursor):
+        swap_tables(conn)
+    elif not legacy_exists(cursor):
+        logger.info(f"{TABLE} is already partitioned; nothing to migrate")
+        return True
+
+    created = copy_legacy_days(conn, retention_days)
+    logger.info(f"Created {created} partition(s) from {LEGACY_TABLE}")
+
+    legacy_rows, copied_rows = verify_copy(conn, retention_days)
+    if copied_rows != legacy_rows:
+        logger.error(f"✗ {copied_rows} of {legacy_rows} legacy rows in the retention window "
+                     f"were copied; keeping {LEGACY_TABLE}")
+        return False
+    logger.info(f"✓ All {legacy_rows} legacy rows in the retention window were copied")
+
+    if drop_legacy:
+        cursor.execute(f"DROP TABLE {LEGACY_TABLE}")
+        conn.commit()
+        logger.info(f"✓ Dropped {LEGACY_TABLE}")
+    return True
+
+
+def partition_status(conn):
+    """Partitions of maven_market_snapshots with row estimates and sizes."""
+    cursor = conn.cursor()
+    cursor.execute("""
+        SELECT c.relname, pg_get_expr(c.relpartbound, c.oid), c.reltuples::BIGINT,
+               pg_total_relation_size(c.oid)
+        FROM pg_inherits i
+        JOIN pg_class c ON c.oid = i.inhrelid
+        WHERE i.inhparent = to_regclass(%s)
+        ORDER BY c.relname
+    """, (TABLE,))
+    rows = cursor.fetchall()
+    conn.commit()
+    return [{'partition': name, 'bounds': bounds, 'rows_estimate': max(rows_estimate, 0),
+             'bytes': size}
+            for name, bounds, rows_estimate, size in rows]
+
+
+def main():
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
+    parser = argparse.ArgumentParser(description='maven_market_snapshots partition management')
+    parser.add_argument('command', choices=['migrate', 'maintain', 'status'])
+    parser.add_argument('--retention-days', type=int, default=RETENTION_DAYS,
+                        help='Days of snapshots kept (0 keeps everything)')
+    parser.add_argument('--premake-days', type=int, default=PREMAKE_DAYS)
+    parser.add_argument('--drop-legacy', action='store_true',
+                        help='Drop maven_market_snapshots_legacy once the copy is verified')
+    args = parser.parse_args()
+
+    conn = psycopg2.connect(**DB_CONFIG)
+    try:
+        if args.command == 'migrate':
+            return 0 if migrate(conn, args.retention_days, args.drop_legacy) else 1
+        if args.command == 'maintain':
+            result = maintain(conn, args.premake_days, args.retention_days)
+            conn.commit()
+            logger.info(f"Created {result['created']} and dropped {result['dropped']} partition(s)")
+            return 0
+        for part in partition_status(conn):
+            print(f"{part['partition']:<40} {part['rows_estimate']:>12} rows "
+                  f"{part['bytes'] / 1024 / 1024:>10.1f} MB  {part['bounds']}")
+        return 0
+    except Exception as e:
+        conn.rollback()
+        logger.error(f"✗ {args.command} failed: {e}")
+        return 1
+    finally:
+        conn.close()
+
+
+if __name__ == '__main__':
+    sys.exit(main())
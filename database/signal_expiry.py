@@ -0,0 +1,57 @@
+"""
+Expiry sweeping and archiving of trading signals.
+
+Signals carry a valid_until; the maintenance job (maven_api.maintenance)
+sets `expired` on those that ran out, through the partial index
+idx_signals_expiring, so the indexes on NOT expired behind
+maven_active_signals and /api/signals only hold live signals. With
+MAVEN_SIGNAL_ARCHIVE_DAYS set, expired signals whose validity ended that many
+days ago are moved to maven_trading_signals_archive. The SQL side is
+database/migrations/0004_signal_expiry_index.sql and 0005_signal_expiry.sql.
+
+Environment:
+    MAVEN_SIGNAL_EXPIRY_BATCH   Rows updated (or moved) per transaction (default 5000)
+    MAVEN_SIGNAL_ARCHIVE_DAYS   Archive expired signals after this many days (default 0: never)
+"""
+import os
+
+
+EXPIRY_BATCH = int(os.getenv('MAVEN_SIGNAL_EXPIRY_BATCH', 5000))
+ARCHIVE_DAYS = int(os.getenv('MAVEN_SIGNAL_ARCHIVE_DAYS', 0))
+
+# Batches per step in one job run; a large backlog is worked off over
+# several runs
+MAX_BATCHES = 20
+
+
+def _batched(conn, sql, params, batch, max_batches):
+    cursor = conn.cursor()
+    total = 0
+    for _ in range(max_batches):
+        cursor.execute(sql, params)
+        rows = cursor.fetchone()[0]
+        conn.commit()
+        total += rows
+        if rows < batch:
+            break
+    return total
+
+
+def run(conn, batch=None, archive_days=None, max_batches=None):
+    """
+    Mark signals past valid_until as expired, then archive old expired ones.
+    Commits after each batch.
+
+    Returns:
+        dict: {'expired': rows, 'archived': rows}
+    """
+    batch = batch or EXPIRY_BATCH
+    archive_days = ARCHIVE_DAYS if archive_days is None else archive_days
+    max_batches = max_batches or MAX_BATCHES
+
+    expired = _batched(conn, "SELECT maven_expire_signals(%s)", (batch,), batch, max_batches)
+    archived = 0
+    if archive_days > 0:
+        archived = _batched(conn, "SELECT maven_archive_signals(%s, %s)", (archive_days, batch),
+                            batch, max_batches)
+    return {'expired': expired, 'archived': archived}
@@ -0,0 +1 @@
+"""Maven API support - request plumbing shared by the Flask app."""
@@ -0,0 +1,235 @@
+"""
+Read-through response cache for hot Maven API endpoints.
+
+Responses are stored in Redis (REDIS_HOST / REDIS_PORT / REDIS_DB) under one
+hash per endpoint namespace, with the query string as the field:
+
+    maven:cache:<namespace>  ->  { <query string>: <expires_at>|<json body> }
+
+Invalidating a namespace is a single DEL, so write endpoints can drop exactly
+the data they changed. When Redis is unreachable the cache degrades to a
+per-process in-memory store while the shared 'redis' circuit breaker
+(database.circuit, also fed by the health probes) is open.
+
+Requests routed to the primary (X-Read-Primary, the read-your-writes cookie
+or use_primary(); see maven_api.sessions) skip the cache in both directions:
+a client that just wrote must not get a response cached before its write,
+or one filled from a replica that has not replayed it yet.
+
+Usage:
+    from maven_api.cache import cached, invalidate
+
+    @app.route('/api/watchlist')
+    @cached('watchlist')
+    def get_watchlist(): ...
+
+    invalidate('watchlist')   # after a successful write
+"""
+import functools
+import logging
+import os
+import threading
+import time
+
+from flask import Response, request
+
+from database.circuit import OPEN, CircuitOpenError, get_breaker
+from maven_api.sessions import reads_primary
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = 'maven:cache:'
+
+# Per-namespace TTLs in seconds
+CACHE_TTLS = {
+    'treasury_state': int(os.getenv('CACHE_TTL_TREASURY_STATE', 15)),
+    'watchlist': int(os.getenv('CACHE_TTL_WATCHLIST', 30)),
+    'signals': int(os.getenv('CACHE_TTL_SIGNALS', 10)),
+}
+
+REDIS_CONFIG = {
+    'host': os.getenv('REDIS_HOST', 'redis'),
+    'port': int(os.getenv('REDIS_PORT', 6379)),
+    'db': int(os.getenv('REDIS_DB', 0)),
+    'socket_connect_timeout': float(os.getenv('REDIS_CONNECT_TIMEOUT', 0.25)),
+    'socket_timeout': float(os.getenv('REDIS_SOCKET_TIMEOUT', 0.25)),
+}
+
+
+class ResponseCache:
+    """Redis-backed cache with an in-process fallback and hit/miss counters."""
+
+    def __init__(self, redis_client=None, enabled=True, breaker=None):
+        self.enabled = enabled
+        self._redis = redis_client
+        self._breaker = breaker or get_breaker('redis')
+        self._local = {}  # namespace -> {field: (expires_at, body)}
+        self._lock = threading.Lock()
+        self._stats = {}
+
+    # -------------------------------------------------------------------------
+    # Redis plumbing
+    # -------------------------------------------------------------------------
+
+    def _client(self):
+        """Return the Redis client, or None while the redis circuit is open."""
+        try:
+            self._breaker.before_call()
+        except CircuitOpenError:
+            return None
+        if self._redis is None:
+            try:
+                import redis
+                self._redis = redis.Redis(**REDIS_CONFIG)
+            except Exception as e:
+                self._mark_down(e)
+                return None
+        return self._redis
+
+    def _mark_up(self):
+        self._breaker.record_success()
+
+    def _mark_down(self, error):
+        logger.warning(f"Redis cache call failed, using in-process fallback: {error}")
+        self._breaker.record_failure(error)
+
+    def _count(self, namespace, stat):
+        with self._lock:
+            counters = self._stats.setdefault(
+                namespace, {'hits': 0, 'misses': 0, 'invalidations': 0, 'fallback': 0}
+            )
+            counters[stat] += 1
+
+    # -------------------------------------------------------------------------
+    # Public API
+    # -------------------------------------------------------------------------
+
+    def get(self, namespace, field):
+        """Return the cached body for (namespace, field), or None."""
+        client = self._client()
+        if client is not None:
+            try:
+                raw = client.hget(KEY_PREFIX + namespace, field)
+                self._mark_up()
+                if raw is not None:
+                    expires_at, _, body = raw.partition(b'|')
+                    if float(expires_at) > time.time():
+                        self._count(namespace, 'hits')
+                        return body
+                self._count(namespace, 'misses')
+                return None
+            except Exception as e:
+                self._mark_down(e)
+
+        self._count(namespace, 'fallback')
+        with self._lock:
+            entry = self._local.get(namespace, {}).get(field)
+        if entry and entry[0] > time.time():
+            self._count(namespace, 'hits')
+            return entry[1]
+        self._count(namespace, 'misses')
+        return None
+
+    def set(self, namespace, field, body, ttl):
+        """Store a body for `ttl` seconds."""
+        expires_at = time.time() + ttl
+        client = self._client()
+        if client is not None:
+            try:
+                key = KEY_PREFIX + namespace
+                pipe = client.pipeline()
+                pipe.hset(key, field, f"{expires_at:.3f}|".encode() + body)
+                pipe.expire(key, ttl)
+                pipe.execute()
+                self._mark_up()
+                return
+            except Exception as e:
+                self._mark_down(e)
+
+        with self._lock:
+            self._local.setdefault(namespace, {})[field] = (expires_at, body)
+
+    def invalidate(self, *namespaces):
+        """Drop every cached entry in the given namespaces."""
+        for namespace in namespaces:
+            self._count(namespace, 'invalidations')
+            with self._lock:
+                self._local.pop(namespace, None)
+
+        client = self._client() if namespaces else None
+        if client is not None:
+            try:
+                client.delete(*(KEY_PREFIX + ns for ns in namespaces))
+                self._mark_up()
+            except Exception as e:
+                self._mark_down(e)
+
+    def stats(self):
+        """Hit/miss counters per namespace plus backend status."""
+        with self._lock:
+            namespaces = {ns: dict(c) for ns, c in self._stats.items()}
+        hits = sum(c['hits'] for c in namespaces.values())
+        misses = sum(c['misses'] for c in namespaces.values())
+        return {
+            'enabled': self.enabled,
+            'backend': 'local' if self._breaker.state == OPEN else 'redis',
+            'hits': hits,
+            'misses': misses,
+            'hit_ratio': hits / (hits + misses) if hits + misses else 0.0,
+            'ttls': CACHE_TTLS,
+            'namespaces': namespaces,
+        }
+
+
+response_cache = ResponseCache(enabled=os.getenv('MAVEN_CACHE_ENABLED', '1') == '1')
+
+
+def invalidate(*namespaces):
+    """Invalidate namespaces on the shared response cache."""
+    response_cache.invalidate(*namespaces)
+
+
+def cached(namespace, ttl=None):
+    """
+    Decorator: serve a GET view from the cache, filling it on a miss.
+
+    Only 200 responses are stored. The query string is part of the key so
+    differently parameterised requests do not collide. Requests that read
+    from the primary bypass the cache (X-Cache: BYPASS).
+    """
+    def decorator(view):
+        @functools.wraps(view)
+        def wrapper(*args, **kwargs):
+            if not response_cache.enabled:
+                return view(*args, **kwargs)
+            if reads_primary():
+                return _bypass(view(*args, **kwargs))
+
+            field = request.query_string.decode() or '_'
+            body = response_cache.get(namespace, field)
+            if body is not None:
+                response = Response(body, mimetype='application/json')
+                response.headers['X-Cache'] = 'HIT'
+                return response
+
+            response = view(*args, **kwargs)
+            if not isinstance(response, Response):
+                return response
+            if reads_primary():
+                # The handler called use_primary(); its result is not for everyone
+                return _bypass(response)
+            if response.status_code == 200 and not response.direct_passthrough:
+                response_cache.set(
+                    namespace, field, response.get_data(),
+                    ttl if ttl is not None else CACHE_TTLS.get(namespace, 10)
+                )
+            response.headers['X-Cache'] = 'MISS'
+            return response
+        return wrapper
+    return decorator
+
+
+def _bypass(response):
+    if isinstance(response, Response):
+        response.headers['X-Cache'] = 'BYPASS'
+    return response
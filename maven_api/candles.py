@@ -0,0 +1,294 @@
+"""
+Candle store: Hyperliquid candles for every watchlist coin in maven_candles.
+
+Two maintenance jobs (maven_api.maintenance) keep one series per active
+watchlist coin and interval in MAVEN_CANDLE_INTERVALS:
+
+    candles      Incremental: each series that is due - a candle has opened
+                 since its last stored one - from that candle_open_at
+                 (re-fetched, since it was probably stored while still open)
+                 to now; a new series starts at its backfill horizon.
+    candle_gaps  Backfill and repair: maven_candle_gaps() lists the stretches
+                 missing between the horizon and the last stored candle, and
+                 each one is fetched again.
+
+Fetched candles are COPYed into a temporary staging table and merged into
+maven_candles with ON CONFLICT on (coin, interval, candle_open_at), one
+commit per Hyperliquid request. A candle that changed since it was stored
+is updated.
+
+Hyperliquid serves only the latest 5000 candles of each interval, so a
+series' horizon is the shorter of that and MAVEN_CANDLE_BACKFILL_DAYS (and,
+for 1m, MAVEN_CANDLES_1M_RETENTION_DAYS, so pruned candles are not fetched
+back). Each job run makes at most MAVEN_CANDLE_MAX_REQUESTS requests, through
+the hyperliquid circuit breaker; the stalest series, counted in intervals
+since their last candle opened, go first, and a backlog is worked off over
+several runs. A stretch the exchange has no candles for
+(before a listing, no trades) is asked for again on each gap scan.
+
+volume_usd is Hyperliquid's base volume times the close price.
+
+Environment:
+    MAVEN_CANDLE_INTERVALS       Comma-separated (default 1m,5m,15m,1h,4h,1d; empty disables)
+    MAVEN_CANDLE_BACKFILL_DAYS   History kept complete per series (default 90)
+    MAVEN_CANDLE_MAX_REQUESTS    Hyperliquid requests per job run (default 100)
+"""
+import csv
+import io
+import logging
+import os
+from datetime import datetime, timedelta, timezone
+
+import requests
+
+from database.circuit import get_breaker
+from database.downsample import CANDLES_1M_RETENTION_DAYS
+from maven_api.health import HYPERLIQUID_INFO_URL
+
+
+logger = logging.getLogger(__name__)
+
+INTERVAL_SECONDS = {'1m': 60, '5m': 300, '15m': 900, '1h': 3600, '4h': 14400, '1d': 86400}
+
+INTERVALS = tuple(i.strip() for i in os.getenv('MAVEN_CANDLE_INTERVALS', '1m,5m,15m,1h,4h,1d').split(',')
+                  if i.strip() in INTERVAL_SECONDS)
+BACKFILL_DAYS = int(os.getenv('MAVEN_CANDLE_BACKFILL_DAYS', 90))
+MAX_REQUESTS = int(os.getenv('MAVEN_CANDLE_MAX_REQUESTS', 100))
+REQUEST_TIMEOUT = 10
+
+# Candles per Hyperliquid response, and per interval it keeps at all
+PAGE_CANDLES = 5000
+
+hyperliquid_breaker = get_breaker('hyperliquid')
+
+STAGING_SQL = """
+    CREATE TEMP TABLE IF NOT EXISTS maven_candles_staging (
+        coin TEXT,
+        interval TEXT,
+        open_ms BIGINT,
+        close_ms BIGINT,
+        open_price NUMERIC,
+        high_price NUMERIC,
+        low_price NUMERIC,
+        close_price NUMERIC,
+        volume NUMERIC
+    ) ON COMMIT DELETE ROWS
+"""
+
+COPY_SQL = """
+    COPY maven_candles_staging (coin, interval, open_ms, close_ms, open_price, high_price,
+                                low_price, close_price, volume)
+    FROM STDIN WITH (FORMAT csv)
+"""
+
+MERGE_SQL = """
+    INSERT INTO maven_candles (coin, interval, open_price, high_price, low_price, close_price,
+                               volume_usd, candle_open_at, candle_close_at)
+    SELECT DISTINCT ON (coin, interval, open_ms)
+           coin, interval, open_price, high_price, low_price, close_price,
+           round(volume * close_price, 2), to_timestamp(open_ms / 1000.0), to_timestamp(close_ms / 1000.0)
+    FROM maven_candles_staging
+    ORDER BY coin, interval, open_ms
+    ON CONFLICT (coin, interval, candle_open_at) DO UPDATE SET
+        open_price = EXCLUDED.open_price,
+        high_price = EXCLUDED.high_price,
+        low_price = EXCLUDED.low_price,
+        close_price = EXCLUDED.close_price,
+        volume_usd = EXCLUDED.volume_usd,
+        candle_close_at = EXCLUDED.candle_close_at
+    WHERE (maven_candles.open_price, maven_candles.high_price, maven_candles.low_price,
+           maven_candles.close_price, maven_candles.volume_usd)
+        IS DISTINCT FROM (EXCLUDED.open_price, EXCLUDED.high_price, EXCLUDED.low_price,
+                          EXCLUDED.close_price, EXCLUDED.volume_usd)
+"""
+
+# Every series with its newest stored candle, stalest first: new series, then
+# by how many intervals have passed since that candle opened
+SERIES_SQL = """
+    SELECT coin, interval, last_open
+    FROM (
+        SELECT w.coin, i.interval, i.seconds,
+               (SELECT MAX(c.candle_open_at) FROM maven_candles c
+                WHERE c.coin = w.coin AND c.interval = i.interval) AS last_open
+        FROM maven_watchlist w
+        CROSS JOIN unnest(%s::text[], %s::int[]) AS i(interval, seconds)
+        WHERE w.active
+    ) series
+    ORDER BY EXTRACT(EPOCH FROM (%s::timestamptz - last_open)) / seconds DESC NULLS FIRST,
+             coin, interval
+"""
+
+
+def _floor(at, interval):
+    step = INTERVAL_SECONDS[interval]
+    return datetime.fromtimestamp(int(at.timestamp()) // step * step, tz=timezone.utc)
+
+
+def _ms(at):
+    return int(at.timestamp() * 1000)
+
+
+def horizon(interval, now=None):
+    """Open of the oldest candle kept complete for `interval`."""
+    now = now or datetime.now(timezone.utc)
+    days = BACKFILL_DAYS
+    if interval == '1m' and CANDLES_1M_RETENTION_DAYS:
+        days = min(days, CANDLES_1M_RETENTION_DAYS)
+    span = min(timedelta(days=days), timedelta(seconds=INTERVAL_SECONDS[interval] * (PAGE_CANDLES - 1)))
+    return _floor(now - span, interval)
+
+
+def fetch_candles(coin, interval, start, end, timeout=REQUEST_TIMEOUT):
+    """
+    Hyperliquid candles of one series opening in [start, end).
+
+    Returns:
+        list: candleSnapshot dicts ({'t', 'T', 'o', 'h', 'l', 'c', 'v', ...})
+    """
+    hyperliquid_breaker.before_call()
+    try:
+        response = requests.post(HYPERLIQUID_INFO_URL, json={
+            'type': 'candleSnapshot',
+            'req': {'coin': coin, 'interval': interval,
+                    'startTime': _ms(start), 'endTime': _ms(end) - 1},
+        }, timeout=timeout)
+        response.raise_for_status()
+        candles = response.json()
+    except (requests.RequestException, ValueError) as e:
+        hyperliquid_breaker.record_failure(e)
+        raise
+    hyperliquid_breaker.record_success()
+    return [c for c in candles or [] if _ms(start) <= c['t'] < _ms(end)]
+
+
+def store(conn, coin, interval, candles):
+    """
+    COPY candles into staging and merge them into maven_candles. Does not
+    commit; committing empties the staging table.
+
+    Returns:
+        int: Candles inserted or changed
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for c in candles:
+        writer.writerow((coin, interval, c['t'], c['T'], c['o'], c['h'], c['l'], c['c'], c['v']))
+    buffer.seek(0)
+
+    cursor = conn.cursor()
+    cursor.execute(STAGING_SQL)
+    cursor.copy_expert(COPY_SQL, buffer)
+    cursor.execute(MERGE_SQL)
+    return cursor.rowcount
+
+
+class _Budget:
+    """Hyperliquid requests left in one job run."""
+
+    def __init__(self, requests_left):
+        self.left = requests_left
+
+    def take(self):
+        if self.left <= 0:
+            return False
+        self.left -= 1
+        return True
+
+
+def fill(conn, coin, interval, start, end, budget):
+    """
+    Fetch and store [start, end) one page at a time, committing each page.
+
+    Returns:
+        tuple: (candles inserted or changed, True when the whole range was fetched)
+    """
+    window = timedelta(seconds=INTERVAL_SECONDS[interval] * PAGE_CANDLES)
+    stored = 0
+    while start < end and budget.take():
+        page_end = min(end, start + window)
+        candles = fetch_candles(coin, interval, start, page_end)
+        if candles:
+            stored += store(conn, coin, interval, candles)
+            conn.commit()
+        start = page_end
+    return stored, start >= end
+
+
+def _series(conn, now):
+    cursor = conn.cursor()
+    cursor.execute(SERIES_SQL, (list(INTERVALS), [INTERVAL_SECONDS[i] for i in INTERVALS], now))
+    rows = cursor.fetchall()
+    conn.commit()
+    return rows
+
+
+def due(interval, last_open, now):
+    """True once a series has a candle newer than its last stored one (or none stored)."""
+    return last_open is None or last_open + timedelta(seconds=INTERVAL_SECONDS[interval]) <= now
+
+
+def sync(conn, now=None, max_requests=None):
+    """
+    Bring every due series up to now from its last stored candle.
+
+    A series whose last stored candle is still open is left until the next
+    one opens; that fetch also brings the stored candle up to its close.
+
+    Returns:
+        dict: {'series': n, 'due': n, 'stored': candles, 'requests': n, 'complete': bool}
+    """
+    now = now or datetime.now(timezone.utc)
+    max_requests = max_requests or MAX_REQUESTS
+    budget = _Budget(max_requests)
+    series = _series(conn, now)
+    pending = [(coin, interval, last_open) for coin, interval, last_open in series
+               if due(interval, last_open, now)]
+    stored = 0
+    complete = True
+    for coin, interval, last_open in pending:
+        start = horizon(interval, now)
+        if last_open is not None:
+            start = max(start, last_open)
+        added, finished = fill(conn, coin, interval, start, now, budget)
+        stored += added
+        if not finished:
+            complete = False
+            break
+    return {'series': len(series), 'due': len(pending), 'stored': stored,
+            'requests': max_requests - budget.left, 'complete': complete}
+
+
+def fill_gaps(conn, now=None, max_requests=None):
+    """
+    Backfill each series to its horizon and re-fetch holes in it.
+
+    Returns:
+        dict: {'gaps': n, 'stored': candles, 'requests': n, 'complete': bool}
+    """
+    now = now or datetime.now(timezone.utc)
+    max_requests = max_requests or MAX_REQUESTS
+    budget = _Budget(max_requests)
+    cursor = conn.cursor()
+    gaps = 0
+    stored = 0
+    complete = True
+    for coin, interval, last_open in _series(conn, now):
+        if last_open is None:
+            continue  # sync() starts new series at the horizon
+        cursor.execute("SELECT gap_start, gap_end FROM maven_candle_gaps(%s, %s, %s, %s)",
+                       (coin, interval, horizon(interval, now), last_open))
+        found = cursor.fetchall()
+        conn.commit()
+        for gap_start, gap_end in found:
+            gaps += 1
+            added, finished = fill(conn, coin, interval, gap_start, gap_end, budget)
+            stored += added
+            if not finished:
+                complete = False
+                break
+        if not complete:
+            break
+    if stored:
+        logger.info(f"🕯️ Filled {gaps} candle gap(s), {stored} candle(s)")
+    return {'gaps': gaps, 'stored': stored,
+            'requests': max_requests - budget.left, 'complete': complete}
@@ -0,0 +1,68 @@
+"""
+Gunicorn configuration for serving the Maven Flask API in production.
+
+Each worker imports app.py itself (no preload), so every worker owns exactly
+one connection pool. Workers are threaded (gthread) so a worker with N threads
+can serve N requests at once; keep DB pool maxconn >= MAVEN_API_THREADS.
+Each open /api/stream client holds one of those threads, so streams are
+capped per worker by MAVEN_STREAM_MAX_CLIENTS (default half the threads).
+
+Environment:
+    MAVEN_API_PORT          Listen port (default 5002)
+    MAVEN_API_WORKERS       Worker processes (default 2 * CPUs + 1, max 8)
+    MAVEN_API_THREADS       Threads per worker (default 4)
+    MAVEN_API_TIMEOUT       Hard request timeout in seconds (default 60)
+    MAVEN_API_GRACEFUL      Seconds workers get to finish on restart (default 30)
+    MAVEN_API_MAX_REQUESTS  Recycle a worker after this many requests (default 0 = never)
+
+Graceful restart: send SIGHUP to the master (`supervisorctl signal HUP flask_api`).
+"""
+import multiprocessing
+import os
+
+
+bind = f"0.0.0.0:{os.getenv('MAVEN_API_PORT', '5002')}"
+workers = int(os.getenv('MAVEN_API_WORKERS', min(multiprocessing.cpu_count() * 2 + 1, 8)))
+worker_class = 'gthread'
+threads = int(os.getenv('MAVEN_API_THREADS', 4))
+timeout = int(os.getenv('MAVEN_API_TIMEOUT', 60))
+graceful_timeout = int(os.getenv('MAVEN_API_GRACEFUL', 30))
+keepalive = 5
+max_requests = int(os.getenv('MAVEN_API_MAX_REQUESTS', 0))
+max_requests_jitter = max_requests // 10
+preload_app = False
+
+accesslog = '-'
+errorlog = '-'
+loglevel = os.getenv('MAVEN_API_LOG_LEVEL', 'info')
+
+
+def post_worker_init(worker):
+    """Warm this worker's connection pool before it accepts traffic."""
+    from database.connection import POOL_CONFIG, warm_pool
+
+    if POOL_CONFIG['maxconn'] < threads:
+        worker.log.warning(
+            f"DB pool maxconn ({POOL_CONFIG['maxconn']}) is below threads per worker ({threads}); "
+            "requests may wait for connections"
+        )
+    elif POOL_CONFIG['minconn'] < threads:
+        worker.log.warning(
+            f"DB pool minconn ({POOL_CONFIG['minconn']}) is below threads per worker ({threads}); "
+            "connections returned past it are closed and lose their prepared statements"
+        )
+    warm_pool()
+
+
+def worker_exit(server, worker):
+    """Let in-flight notification sends, inbox batches and maintenance jobs finish, then close the worker's pool."""
+    from database.connection import reset_pool
+    from maven_api import inbox, maintenance, notifications
+
+    if notifications.dispatcher is not None:
+        notifications.dispatcher.stop()
+    if inbox.ingester is not None:
+        inbox.ingester.stop()
+    if maintenance.scheduler is not None:
+        maintenance.scheduler.stop()
+    reset_pool()
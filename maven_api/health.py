@@ -0,0 +1,209 @@
+"""
+Background dependency health probes for the Maven API.
+
+/health used to return a constant. A monitor thread now probes each
+dependency every MAVEN_HEALTH_INTERVAL seconds and caches the result, so
+health requests never wait on a slow or dead dependency:
+
+    postgres     SELECT 1 on a fresh connection (not a pooled one)
+    redis        PING
+    hyperliquid  POST /info {"type": "allMids"}
+    email        HEAD on the motherhaven.app email API (any non-5xx answer)
+
+Each probe also reports to that dependency's circuit breaker
+(database.circuit), which is what lets a recovered Postgres close the
+circuit before any request has to gamble on it.
+
+/health stays cheap and always 200 for orchestration; /health?deep=1
+returns the cached per-dependency status, latency and breaker state, and
+says 'degraded' if anything is down.
+
+Usage:
+    from maven_api import health
+
+    health.init_app(app)          # starts the probe thread
+    health.monitor.snapshot()     # cached results
+"""
+import logging
+import os
+import threading
+import time
+from datetime import datetime, timezone
+
+from database.circuit import breaker_states, get_breaker
+
+
+logger = logging.getLogger(__name__)
+
+INTERVAL_SECONDS = float(os.getenv('MAVEN_HEALTH_INTERVAL', 15))
+PROBE_TIMEOUT = float(os.getenv('MAVEN_HEALTH_TIMEOUT', 3))
+HYPERLIQUID_INFO_URL = os.getenv('HYPERLIQUID_INFO_URL', 'https://api.hyperliquid.xyz/info')
+
+
+# =============================================================================
+# Probes - each raises on failure
+# =============================================================================
+
+def probe_postgres(timeout=PROBE_TIMEOUT):
+    import psycopg2
+    from database.connection import DB_CONFIG
+
+    config = dict(DB_CONFIG, connect_timeout=max(1, int(timeout)))
+    conn = psycopg2.connect(**config)
+    try:
+        cursor = conn.cursor()
+        cursor.execute("SELECT 1")
+        cursor.fetchone()
+        cursor.close()
+    finally:
+        conn.close()
+
+
+def probe_redis(timeout=PROBE_TIMEOUT):
+    import redis
+    from maven_api.cache import REDIS_CONFIG
+
+    config = dict(REDIS_CONFIG, socket_connect_timeout=timeout, socket_timeout=timeout)
+    client = redis.Redis(**config)
+    try:
+        client.ping()
+    finally:
+        client.close()
+
+
+def probe_hyperliquid(timeout=PROBE_TIMEOUT):
+    import requests
+
+    response = requests.post(HYPERLIQUID_INFO_URL, json={'type': 'allMids'}, timeout=timeout)
+    response.raise_for_status()
+
+
+def probe_email(timeout=PROBE_TIMEOUT):
+    import requests
+    from maven_mcp import tools
+
+    # The send endpoint only accepts POST; reaching it without a 5xx is enough
+    response = requests.head(tools.EMAIL_API_URL, timeout=timeout)
+    if response.status_code >= 500:
+        raise RuntimeError(f"HTTP {response.status_code}")
+
+
+DEFAULT_PROBES = {
+    'postgres': probe_postgres,
+    'redis': probe_redis,
+    'hyperliquid': probe_hyperliquid,
+    'email': probe_email,
+}
+
+
+# =============================================================================
+# Monitor
+# =============================================================================
+
+class HealthMonitor:
+    """Runs probes on an interval and caches their results."""
+
+    def __init__(self, probes=None, interval=None, timeout=None):
+        self.probes = dict(DEFAULT_PROBES if probes is None else probes)
+        self.interval = interval or INTERVAL_SECONDS
+        self.timeout = timeout or PROBE_TIMEOUT
+        self._results = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def check(self, name):
+        """Run one probe now, cache and return its result."""
+        breaker = get_breaker(name)
+        started = time.perf_counter()
+        try:
+            self.probes[name](timeout=self.timeout)
+        except Exception as e:
+            error = str(e) or type(e).__name__
+            breaker.record_failure(error)
+        else:
+            error = None
+            breaker.record_success()
+        result = {
+            'status': 'down' if error else 'up',
+            'latency_ms': round((time.perf_counter() - started) * 1000, 1),
+            'checked_at': datetime.now(timezone.utc).isoformat(),
+            'error': error,
+            '_monotonic': time.monotonic(),
+        }
+        with self._lock:
+            self._results[name] = result
+        return result
+
+    def check_all(self):
+        """Probe every dependency concurrently; a dead one costs one timeout, not four."""
+        threads = [threading.Thread(target=self.check, args=(name,), daemon=True)
+                   for name in self.probes]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(self.timeout + 1)
+
+    def snapshot(self, max_age=None):
+        """
+        Cached results with breaker state and age.
+
+        Results older than `max_age` seconds (default: two intervals, i.e.
+        the monitor thread is not running) are refreshed first.
+        """
+        max_age = self.interval * 2 if max_age is None else max_age
+        now = time.monotonic()
+        with self._lock:
+            stale = [name for name in self.probes
+                     if now - self._results.get(name, {}).get('_monotonic', -1e9) > max_age]
+        if stale:
+            self.check_all()
+
+        breakers = breaker_states()
+        now = time.monotonic()
+        with self._lock:
+            results = {}
+            for name in self.probes:
+                result = dict(self._results.get(name, {'status': 'unknown'}))
+                checked = result.pop('_monotonic', None)
+                result['age_seconds'] = round(now - checked, 1) if checked is not None else None
+                result['circuit'] = breakers.get(name, {}).get('state', 'closed')
+                results[name] = result
+        return results
+
+    def start(self):
+        if self._thread is not None:
+            return self
+        self._stop.clear()
+
+        def _run():
+            while not self._stop.is_set():
+                try:
+                    self.check_all()
+                except Exception as e:
+                    logger.error(f"Health probe error: {e}")
+                self._stop.wait(self.interval)
+
+        self._thread = threading.Thread(target=_run, name='maven-health', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(self.timeout + 1)
+            self._thread = None
+
+
+# Process-wide monitor, created by init_app()
+monitor = None
+
+
+def init_app(app, start=True, probes=None):
+    """Create the process monitor and (optionally) start probing."""
+    global monitor
+    monitor = HealthMonitor(probes)
+    app.extensions['maven_health'] = monitor
+    if start:
+        monitor.start()
+    return monitor
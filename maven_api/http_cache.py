@@ -0,0 +1,91 @@
+"""
+HTTP validators (ETag / Last-Modified) for file-backed endpoints.
+
+Validators are derived from os.stat() only, so a matching If-None-Match or
+If-Modified-Since is answered with 304 Not Modified without opening the file.
+
+Usage:
+    from maven_api.http_cache import conditional, file_validator
+
+    @app.route('/api/mcp/identity')
+    @conditional(lambda: file_validator(IDENTITY_PATH))
+    def mcp_identity(): ...
+"""
+import functools
+import hashlib
+import os
+from datetime import datetime, timezone
+
+from flask import Response, make_response, request
+
+
+# Seconds clients may reuse a response before revalidating
+MCP_CACHE_MAX_AGE = int(os.getenv('MAVEN_MCP_CACHE_MAX_AGE', 5))
+
+
+def _stat_token(st):
+    return f"{st.st_size:x}-{st.st_mtime_ns:x}"
+
+
+def file_validator(path):
+    """
+    Build (etag, last_modified) for a single file from its size and mtime.
+
+    Returns:
+        tuple or None: None if the file does not exist
+    """
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return _stat_token(st), datetime.fromtimestamp(st.st_mtime, tz=timezone.utc)
+
+
+def _not_modified(etag, last_modified):
+    """True if the request's conditional headers match the current validators."""
+    if request.if_none_match:
+        return request.if_none_match.contains_weak(etag)
+    if request.if_modified_since and last_modified:
+        return last_modified.replace(microsecond=0) <= request.if_modified_since
+    return False
+
+
+def _apply_headers(response, etag, last_modified, max_age):
+    response.set_etag(etag, weak=True)
+    if last_modified:
+        response.last_modified = last_modified
+    response.headers['Cache-Control'] = f'public, max-age={max_age}, must-revalidate'
+    return response
+
+
+def conditional(validator, max_age=None):
+    """
+    Decorator: answer conditional GETs from `validator()` before running the view.
+
+    `validator` returns (etag, last_modified) or None. The query string is
+    folded into the ETag so e.g. ?lines=10 and ?lines=50 validate separately.
+    Only 200 responses get validator headers.
+    """
+    if max_age is None:
+        max_age = MCP_CACHE_MAX_AGE
+
+    def decorator(view):
+        @functools.wraps(view)
+        def wrapper(*args, **kwargs):
+            validators = validator()
+            if validators is None:
+                return view(*args, **kwargs)
+
+            etag, last_modified = validators
+            if request.query_string:
+                etag = f"{etag}-{hashlib.sha1(request.query_string).hexdigest()[:12]}"
+
+            if _not_modified(etag, last_modified):
+                return _apply_headers(Response(status=304), etag, last_modified, max_age)
+
+            response = make_response(view(*args, **kwargs))
+            if response.status_code == 200:
+                _apply_headers(response, etag, last_modified, max_age)
+            return response
+        return wrapper
+    return decorator
@@ -0,0 +1,498 @@
+"""
+Durable, deduplicating ingestion for the /api/email/incoming webhook.
+
+The webhook used to write a JSON file, append to session_log.md and insert
+into Postgres before answering, and every retried delivery produced another
+file. Now it only enqueues:
+
+    record, duplicate = inbox.store.enqueue(payload)
+
+enqueue() commits the email to an SQLite database (inbox/inbox.sqlite3,
+synchronous=FULL) before the webhook is acknowledged, deduplicated on a key
+that is the sender's Message-ID when the payload carries one and otherwise
+a SHA-256 of the sender, subject, bodies and receivedAt. A redelivery of
+the same email returns the stored record and enqueues nothing.
+
+An ingester thread then claims queued emails in batches and for each batch:
+
+- writes the git-first JSON file (same shape as before, one per email);
+- appends all session-log entries in one write and inserts them into
+  maven_memory with one multi-row INSERT (tools._log_events). Each entry is
+  stamped with the email's receivedAt and carries its dedupe key, so a batch
+  replayed after a crash between the log write and mark_ingested() skips
+  the entries that already made it into the log.
+
+    queued --claim--> processing --done--> ingested
+                                 --error--> queued (retried) / failed
+
+Claims are leases, as in the notification spool, so several gunicorn
+workers can run ingesters over the same database. An FTS5 index over
+subject, sender and text body backs /api/email/inbox searches. Existing
+inbox/email_*.json files are imported into the index once.
+"""
+import hashlib
+import json
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+
+logger = logging.getLogger(__name__)
+
+INBOX_FILENAME = 'inbox.sqlite3'
+
+BATCH_SIZE = int(os.getenv('MAVEN_INBOX_BATCH_SIZE', 50))
+MAX_ATTEMPTS = int(os.getenv('MAVEN_INBOX_MAX_ATTEMPTS', 5))
+# Longest the ingester sleeps before checking for emails from other workers
+POLL_SECONDS = float(os.getenv('MAVEN_INBOX_POLL_SECONDS', 2))
+
+STATUSES = ('queued', 'processing', 'ingested', 'failed')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS emails (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    dedupe_key TEXT NOT NULL UNIQUE,
+    message_id TEXT,
+    status TEXT NOT NULL CHECK (status IN ('queued', 'processing', 'ingested', 'failed')),
+    created_at REAL NOT NULL,
+    from_email TEXT NOT NULL COLLATE NOCASE,
+    from_name TEXT NOT NULL DEFAULT '',
+    subject TEXT NOT NULL,
+    text_content TEXT NOT NULL DEFAULT '',
+    html_content TEXT NOT NULL DEFAULT '',
+    received_at TEXT NOT NULL,
+    filename TEXT NOT NULL,
+    duplicates INTEGER NOT NULL DEFAULT 0,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    claimed_until REAL,
+    last_error TEXT,
+    ingested_at REAL
+);
+
+CREATE INDEX IF NOT EXISTS idx_emails_status ON emails(status, seq);
+CREATE INDEX IF NOT EXISTS idx_emails_created ON emails(created_at, seq);
+CREATE INDEX IF NOT EXISTS idx_emails_from ON emails(from_email, created_at);
+
+CREATE VIRTUAL TABLE IF NOT EXISTS emails_fts USING fts5(
+    subject, from_email, from_name, text_content,
+    content='emails', content_rowid='seq'
+);
+
+CREATE TRIGGER IF NOT EXISTS trg_emails_fts_insert AFTER INSERT ON emails
+BEGIN
+    INSERT INTO emails_fts (rowid, subject, from_email, from_name, text_content)
+    VALUES (NEW.seq, NEW.subject, NEW.from_email, NEW.from_name, NEW.text_content);
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_emails_fts_delete AFTER DELETE ON emails
+BEGIN
+    INSERT INTO emails_fts (emails_fts, rowid, subject, from_email, from_name, text_content)
+    VALUES ('delete', OLD.seq, OLD.subject, OLD.from_email, OLD.from_name, OLD.text_content);
+END;
+
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+_COLUMNS = ('seq', 'dedupe_key', 'message_id', 'status', 'created_at', 'from_email',
+            'from_name', 'subject', 'text_content', 'html_content', 'received_at',
+            'filename', 'duplicates', 'attempts', 'last_error', 'ingested_at')
+_SELECT = f"SELECT {', '.join('emails.' + c for c in _COLUMNS)} FROM emails"
+
+_TOKEN = re.compile(r'\w+', re.UNICODE)
+
+
+def dedupe_key(email):
+    """Message-ID if the payload has one, else a hash of its content."""
+    message_id = (email.get('messageId') or email.get('message_id') or '').strip()
+    if message_id:
+        return f"mid:{message_id}"
+    digest = hashlib.sha256()
+    for field in ('from', 'subject', 'textContent', 'htmlContent', 'receivedAt'):
+        digest.update(str(email.get(field) or '').encode())
+        digest.update(b'\0')
+    return f"sha256:{digest.hexdigest()}"
+
+
+def _filename(created_at, from_email, key):
+    """email_<utc time>_<sender>_<key hash>.json - unique per dedupe key."""
+    stamp = datetime.fromtimestamp(created_at, timezone.utc).strftime('%Y%m%d_%H%M%S')
+    safe_from = from_email.replace('@', '_at_').replace('.', '_')[:30]
+    return f"email_{stamp}_{safe_from}_{hashlib.sha1(key.encode()).hexdigest()[:8]}.json"
+
+
+def _match_query(text):
+    """Free text -> FTS5 query matching every word (as a prefix)."""
+    tokens = _TOKEN.findall(text)
+    return ' '.join(f'"{token}"*' for token in tokens) or None
+
+
+def _to_record(row):
+    record = dict(zip(_COLUMNS, row))
+    record['processed'] = record['status'] == 'ingested'
+    return record
+
+
+class InboxStore:
+    """SQLite-backed incoming email queue and search index."""
+
+    def __init__(self, directory, lease_seconds=120.0):
+        self.directory = Path(directory)
+        self.path = self.directory / INBOX_FILENAME
+        self.lease_seconds = lease_seconds
+        self._local = threading.local()
+        self._init_lock = threading.Lock()
+        self._ready = False
+
+    def _conn(self):
+        """One connection per thread; created (with the schema) on first use."""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=10, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=FULL")
+            with self._init_lock:
+                if not self._ready:
+                    conn.executescript(SCHEMA)
+                    self._ready = True
+            self._local.conn = conn
+        return conn
+
+    def _write(self, fn):
+        """Run fn(conn) inside BEGIN IMMEDIATE ... COMMIT."""
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            result = fn(conn)
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+        return result
+
+    # -------------------------------------------------------------------------
+    # Queue
+    # -------------------------------------------------------------------------
+
+    def enqueue(self, email, now=None):
+        """
+        Durably store a webhook payload unless it was seen before.
+
+        Returns (record, duplicate). For a duplicate the stored record is
+        returned and its `duplicates` counter bumped.
+        """
+        # Whole microseconds, so created_at survives a pagination cursor
+        now = datetime.fromtimestamp(time.time() if now is None else now).timestamp()
+        key = dedupe_key(email)
+        from_email = email.get('from') or 'unknown'
+
+        def insert(conn):
+            cursor = conn.execute(
+                """
+                INSERT OR IGNORE INTO emails (dedupe_key, message_id, status, created_at,
+                                              from_email, from_name, subject, text_content,
+                                              html_content, received_at, filename)
+                VALUES (?, ?, 'queued', ?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                (key, email.get('messageId') or email.get('message_id'), now, from_email,
+                 email.get('fromName') or '', email.get('subject') or '(No Subject)',
+                 email.get('textContent') or '', email.get('htmlContent') or '',
+                 email.get('receivedAt') or datetime.fromtimestamp(now, timezone.utc).isoformat(),
+                 _filename(now, from_email, key)),
+            )
+            if cursor.rowcount == 0:
+                conn.execute("UPDATE emails SET duplicates = duplicates + 1 WHERE dedupe_key = ?",
+                             (key,))
+                return True
+            return False
+
+        duplicate = self._write(insert)
+        return self.get(key), duplicate
+
+    def claim(self, limit=BATCH_SIZE, now=None):
+        """Claim up to `limit` queued emails (oldest first), reclaiming expired leases."""
+        now = time.time() if now is None else now
+
+        def claim(conn):
+            conn.execute(
+                "UPDATE emails SET status = 'queued', claimed_until = NULL "
+                "WHERE status = 'processing' AND claimed_until < ?", (now,)
+            )
+            seqs = [row[0] for row in conn.execute(
+                "SELECT seq FROM emails WHERE status = 'queued' ORDER BY seq LIMIT ?", (limit,)
+            )]
+            conn.executemany(
+                "UPDATE emails SET status = 'processing', claimed_until = ?, "
+                "attempts = attempts + 1 WHERE seq = ?",
+                [(now + self.lease_seconds, seq) for seq in seqs],
+            )
+            return seqs
+
+        seqs = self._write(claim)
+        if not seqs:
+            return []
+        rows = self._conn().execute(
+            f"{_SELECT} WHERE seq IN ({', '.join('?' for _ in seqs)}) ORDER BY seq", seqs
+        ).fetchall()
+        return [_to_record(row) for row in rows]
+
+    def mark_ingested(self, seqs):
+        now = time.time()
+        self._write(lambda conn: conn.executemany(
+            "UPDATE emails SET status = 'ingested', claimed_until = NULL, last_error = NULL, "
+            "ingested_at = ? WHERE seq = ? AND status = 'processing'",
+            [(now, seq) for seq in seqs],
+        ))
+
+    def release(self, seqs, error, max_attempts=None):
+        """Return claimed emails to the queue, or fail those out of attempts."""
+        max_attempts = MAX_ATTEMPTS if max_attempts is None else max_attempts
+        self._write(lambda conn: conn.executemany(
+            "UPDATE emails SET claimed_until = NULL, last_error = ?, "
+            "status = CASE WHEN attempts >= ? THEN 'failed' ELSE 'queued' END "
+            "WHERE seq = ? AND status = 'processing'",
+            [(error, max_attempts, seq) for seq in seqs],
+        ))
+
+    # -------------------------------------------------------------------------
+    # Reads
+    # -------------------------------------------------------------------------
+
+    def get(self, key):
+        row = self._conn().execute(f"{_SELECT} WHERE dedupe_key = ?", (key,)).fetchone()
+        return _to_record(row) if row else None
+
+    def counts(self):
+        counts = dict.fromkeys(STATUSES, 0)
+        counts.update(self._conn().execute(
+            "SELECT status, COUNT(*) FROM emails GROUP BY status"
+        ).fetchall())
+        return counts
+
+    def search(self, query=None, sender=None, limit=50, before=None):
+        """
+        Emails newest first, optionally full-text matched and/or by sender.
+
+        `query` matches every word (prefixes too) in subject, sender or text
+        body. `before` is a (created datetime, seq) key from the previous
+        page, as decoded by maven_api.pagination; pass limit + 1 to detect
+        more.
+        """
+        where, params = [], []
+        match = _match_query(query) if query else None
+        if match:
+            where.append("emails.seq IN (SELECT rowid FROM emails_fts WHERE emails_fts MATCH ?)")
+            params.append(match)
+        if sender:
+            where.append("emails.from_email = ?")
+            params.append(sender)
+        if before is not None:
+            where.append("(emails.created_at, emails.seq) < (?, ?)")
+            params += [before[0].timestamp(), before[1]]
+        sql = f"{_SELECT} {'WHERE ' + ' AND '.join(where) if where else ''} " \
+              f"ORDER BY emails.created_at DESC, emails.seq DESC LIMIT ?"
+        rows = self._conn().execute(sql, (*params, limit)).fetchall()
+        return [_to_record(row) for row in rows]
+
+    # -------------------------------------------------------------------------
+    # Migration
+    # -------------------------------------------------------------------------
+
+    def migrate_json(self):
+        """Index the legacy inbox/email_*.json files once, as already ingested."""
+        files = sorted(self.directory.glob('email_*.json')) if self.directory.exists() else []
+
+        def migrate(conn):
+            if conn.execute("SELECT 1 FROM meta WHERE key = 'json_migrated'").fetchone():
+                return 0
+            imported = 0
+            for path in files:
+                try:
+                    with open(path) as f:
+                        data = json.load(f)
+                    logged = datetime.fromisoformat(data.get('logged_at') or data['received_at'])
+                except (OSError, ValueError, KeyError) as e:
+                    logger.error(f"Skipping unreadable inbox file {path.name}: {e}")
+                    continue
+                email = {
+                    'from': data.get('from'), 'subject': data.get('subject'),
+                    'textContent': data.get('text_content'), 'htmlContent': data.get('html_content'),
+                    'receivedAt': data.get('received_at'),
+                }
+                cursor = conn.execute(
+                    """
+                    INSERT OR IGNORE INTO emails (dedupe_key, status, created_at, from_email,
+                                                  from_name, subject, text_content, html_content,
+                                                  received_at, filename, ingested_at)
+                    VALUES (?, 'ingested', ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                    """,
+                    (dedupe_key(email), logged.timestamp(), data.get('from') or 'unknown',
+                     data.get('from_name') or '', data.get('subject') or '(No Subject)',
+                     data.get('text_content') or '', data.get('html_content') or '',
+                     data.get('received_at') or logged.isoformat(), path.name, logged.timestamp()),
+                )
+                imported += cursor.rowcount
+            conn.execute("INSERT INTO meta (key, value) VALUES ('json_migrated', ?)",
+                         (datetime.now().isoformat(),))
+            return imported
+
+        imported = self._write(migrate)
+        if imported:
+            logger.info(f"Indexed {imported} legacy inbox file(s) into {self.path}")
+        return imported
+
+
+class InboxIngester:
+    """Background thread that writes queued emails to git and the database."""
+
+    def __init__(self, store, log_events, batch_size=None):
+        """
+        Args:
+            store: InboxStore
+            log_events: callable(events) -> dict like maven_mcp.tools._log_events
+            batch_size: Emails per batch
+        """
+        self.store = store
+        self.log_events = log_events
+        self.batch_size = batch_size or BATCH_SIZE
+        self._cond = threading.Condition()
+        self._thread = None
+        self._stopping = False
+        self._stats = {'batches': 0, 'ingested': 0, 'errors': 0, 'batch_seconds_max': 0.0}
+
+    def notify(self):
+        """Wake the ingester after an enqueue."""
+        with self._cond:
+            self._cond.notify()
+
+    def start(self):
+        if self._thread is not None:
+            return self
+        self.store.migrate_json()
+        self._stopping = False
+        self._thread = threading.Thread(target=self._run, name='maven-inbox', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self, timeout=5.0):
+        with self._cond:
+            self._stopping = True
+            self._cond.notify_all()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    @property
+    def running(self):
+        return self._thread is not None
+
+    def stats(self):
+        with self._cond:
+            stats = dict(self._stats)
+        stats['inbox'] = self.store.counts()
+        stats['running'] = self.running
+        return stats
+
+    def _run(self):
+        while True:
+            with self._cond:
+                if self._stopping:
+                    return
+            try:
+                processed = self.process_batch()
+            except Exception as e:
+                logger.error(f"Inbox ingest error: {e}")
+                processed = 0
+            if processed < self.batch_size:
+                with self._cond:
+                    if not self._stopping:
+                        self._cond.wait(POLL_SECONDS)
+
+    def process_batch(self):
+        """Ingest one batch of queued emails; returns how many were claimed."""
+        records = self.store.claim(self.batch_size)
+        if not records:
+            return 0
+        started = time.monotonic()
+        seqs = [r['seq'] for r in records]
+        try:
+            for record in records:
+                self._write_file(record)
+            result = self.log_events([
+                {
+                    'event_type': 'email_received',
+                    'content': f"Email from {r['from_name'] or r['from_email']}: {r['subject']}",
+                    'metadata': {'from': r['from_email'], 'subject': r['subject'],
+                                 'file': r['filename'], 'received_at': r['received_at']},
+                    'timestamp': r['received_at'],
+                    'dedupe_key': r['dedupe_key'],
+                }
+                for r in records
+            ])
+            if not result.get('success'):
+                raise RuntimeError(result.get('error') or 'session log write failed')
+        except Exception as e:
+            self.store.release(seqs, str(e))
+            with self._cond:
+                self._stats['errors'] += 1
+            raise
+
+        self.store.mark_ingested(seqs)
+        elapsed = time.monotonic() - started
+        with self._cond:
+            self._stats['batches'] += 1
+            self._stats['ingested'] += len(records)
+            self._stats['batch_seconds_max'] = max(self._stats['batch_seconds_max'], elapsed)
+        logger.info(f"📨 Ingested {len(records)} email(s) in {elapsed * 1000:.0f} ms")
+        return len(records)
+
+    def _write_file(self, record):
+        """Git-first JSON copy; rewriting after a crash produces the same file."""
+        path = self.store.directory / record['filename']
+        tmp = path.with_suffix('.json.tmp')
+        with open(tmp, 'w') as f:
+            json.dump({
+                'from': record['from_email'],
+                'from_name': record['from_name'],
+                'subject': record['subject'],
+                'text_content': record['text_content'],
+                'html_content': record['html_content'],
+                'received_at': record['received_at'],
+                'message_id': record['message_id'],
+                'processed': False,
+                'logged_at': datetime.fromtimestamp(record['created_at'], timezone.utc).isoformat(),
+            }, f, indent=2)
+        os.replace(tmp, path)
+
+
+# Process-wide store and ingester, created by init_app()
+store = None
+ingester = None
+
+
+def init_app(app, directory, log_events, start=True):
+    """
+    Create the process inbox store and ingester for a Flask app.
+
+    Args:
+        app: Flask application (stored in app.extensions)
+        directory: Inbox directory (.moha/maven/inbox)
+        log_events: Batch session-log writer, normally maven_mcp.tools._log_events.
+            With None, emails are stored and indexed but not ingested.
+        start: Start the ingester thread now
+    """
+    global store, ingester
+    store = InboxStore(directory)
+    ingester = InboxIngester(store, log_events)
+    app.extensions['maven_inbox'] = ingester
+    if start and log_events is not None:
+        ingester.start()
+    return ingester
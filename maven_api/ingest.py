@@ -0,0 +1,221 @@
+"""
+Batch ingestion for trading signals and treasury snapshots.
+
+Bots that emit hundreds of rows per scan post them as one array. The whole
+batch is validated before touching the database, then written with a single
+multi-row INSERT (psycopg2 execute_values) inside one transaction.
+
+Validation returns per-row errors as [{'index': i, 'errors': [...]}] so the
+caller can see exactly which rows to fix.
+"""
+import json
+import os
+from datetime import datetime
+from typing import Any, Dict, List, Tuple
+
+from psycopg2.extras import execute_values
+
+
+MAX_BATCH_ROWS = int(os.getenv('MAVEN_MAX_BATCH_ROWS', 5000))
+
+SIGNAL_TYPES = ('buy', 'sell', 'hold', 'alert')
+
+
+class BatchError(ValueError):
+    """Raised when a batch payload is malformed as a whole (not per row)."""
+
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.status = status
+
+
+def unpack_batch(payload, key: str) -> Tuple[List[Any], bool]:
+    """
+    Accept either a bare JSON array or {"<key>": [...], "allow_partial": bool}.
+
+    Returns:
+        tuple: (rows, allow_partial)
+    """
+    allow_partial = False
+    if isinstance(payload, dict):
+        allow_partial = bool(payload.get('allow_partial', False))
+        payload = payload.get(key)
+    if not isinstance(payload, list):
+        raise BatchError(f"Request body must be a JSON array or an object with a '{key}' array")
+    if not payload:
+        raise BatchError('Batch is empty')
+    if len(payload) > MAX_BATCH_ROWS:
+        raise BatchError(f'Batch has {len(payload)} rows; maximum is {MAX_BATCH_ROWS}', status=413)
+    return payload, allow_partial
+
+
+def _number(row, field, errors, default=None, minimum=None, maximum=None):
+    value = row.get(field, default)
+    if value is None:
+        return None
+    if isinstance(value, bool) or not isinstance(value, (int, float, str)):
+        errors.append(f"'{field}' must be a number")
+        return None
+    try:
+        value = float(value)
+    except ValueError:
+        errors.append(f"'{field}' must be a number")
+        return None
+    if minimum is not None and value < minimum or maximum is not None and value > maximum:
+        errors.append(f"'{field}' must be between {minimum} and {maximum}")
+    return value
+
+
+def _timestamp(row, field, errors):
+    value = row.get(field)
+    if value is None:
+        return None
+    try:
+        return datetime.fromisoformat(str(value).replace('Z', '+00:00'))
+    except ValueError:
+        errors.append(f"'{field}' must be an ISO 8601 timestamp")
+        return None
+
+
+def validate_signal(row) -> Tuple[tuple, List[str]]:
+    """Validate one signal dict; return (insert values, errors)."""
+    if not isinstance(row, dict):
+        return None, ['row must be an object']
+    errors = []
+
+    coin = row.get('coin')
+    if not isinstance(coin, str) or not coin.strip():
+        errors.append("'coin' is required")
+    signal_type = row.get('signal_type')
+    if signal_type not in SIGNAL_TYPES:
+        errors.append(f"'signal_type' must be one of {', '.join(SIGNAL_TYPES)}")
+    strength = _number(row, 'strength', errors, default=50, minimum=0, maximum=100)
+    indicators = row.get('indicators', [])
+    if not isinstance(indicators, list) or not all(isinstance(i, str) for i in indicators):
+        errors.append("'indicators' must be a list of strings")
+    market_context = row.get('market_context', {})
+    if not isinstance(market_context, dict):
+        errors.append("'market_context' must be an object")
+    bot_id = row.get('bot_id')
+    if bot_id is not None and (isinstance(bot_id, bool) or not isinstance(bot_id, int)):
+        errors.append("'bot_id' must be an integer")
+    valid_until = _timestamp(row, 'valid_until', errors)
+    generated_at = _timestamp(row, 'generated_at', errors)
+
+    if errors:
+        return None, errors
+    return (
+        row.get('source', 'manual'),
+        bot_id,
+        coin.strip().upper(),
+        signal_type,
+        strength,
+        row.get('reasoning', ''),
+        indicators,
+        json.dumps(market_context),
+        valid_until,
+        generated_at,
+    ), []
+
+
+def validate_snapshot(row) -> Tuple[tuple, List[str]]:
+    """Validate one treasury snapshot dict; return (insert values, errors)."""
+    if not isinstance(row, dict):
+        return None, ['row must be an object']
+    errors = []
+
+    if row.get('account_value') is None:
+        errors.append("'account_value' is required")
+    account_value = _number(row, 'account_value', errors, minimum=0)
+    withdrawable = _number(row, 'withdrawable', errors, default=0)
+    margin_used = _number(row, 'margin_used', errors, default=0)
+    unrealized_pnl = _number(row, 'unrealized_pnl', errors, default=0)
+    positions = row.get('positions', [])
+    if not isinstance(positions, list):
+        errors.append("'positions' must be a list")
+    snapshot_at = _timestamp(row, 'snapshot_at', errors)
+
+    if errors:
+        return None, errors
+    return (
+        account_value, withdrawable, margin_used, unrealized_pnl,
+        json.dumps(positions), snapshot_at,
+    ), []
+
+
+def validate_batch(rows, validator) -> Tuple[List[Tuple[int, tuple]], List[Dict[str, Any]]]:
+    """
+    Run `validator` over every row.
+
+    Returns:
+        tuple: ([(index, values), ...] for valid rows, [{'index', 'errors'}, ...])
+    """
+    valid, invalid = [], []
+    for index, row in enumerate(rows):
+        values, errors = validator(row)
+        if errors:
+            invalid.append({'index': index, 'errors': errors})
+        else:
+            valid.append((index, values))
+    return valid, invalid
+
+
+def insert_signals(cursor, values: List[tuple]) -> List[int]:
+    """Insert validated signal rows in one statement; return ids in input order."""
+    rows = execute_values(cursor, """
+        INSERT INTO maven_trading_signals
+        (signal_source, source_bot_id, coin, signal_type, strength, reasoning,
+         indicators_used, market_context, valid_until, generated_at)
+        VALUES %s
+        RETURNING id
+    """, values,
+        template="(%s, %s, %s, %s, %s, %s, %s::text[], %s::jsonb, %s::timestamptz, COALESCE(%s::timestamptz, NOW()))",
+        page_size=len(values),
+        fetch=True
+    )
+    return [row[0] for row in rows]
+
+
+def insert_snapshots(cursor, values: List[tuple]) -> List[int]:
+    """
+    Insert validated treasury snapshots in one statement; return ids in input order.
+
+    Change columns come from maven_treasury_deltas(), as in
+    maven_record_treasury_snapshot(), relative to the row's own snapshot_at,
+    so backfilled rows get the change against the snapshots before them.
+    Rows in the same batch do not see each other for these deltas.
+
+    Ids are drawn from the id sequence next to each row's input position,
+    since INSERT ... SELECT does not promise to return rows in the SELECT's
+    order; the result is sorted on that position here.
+    """
+    rows = execute_values(cursor, """
+        WITH v AS (
+            SELECT nextval(pg_get_serial_sequence('maven_treasury_state', 'id')) AS id,
+                   ord, account_value, withdrawable, margin_used, unrealized_pnl, positions,
+                   COALESCE(snapshot_at, NOW()) AS snapshot_at
+            FROM (VALUES %s) AS raw(ord, account_value, withdrawable, margin_used,
+                                    unrealized_pnl, positions, snapshot_at)
+        ), inserted AS (
+            INSERT INTO maven_treasury_state (
+                id, account_value_usd, withdrawable_usd, margin_used_usd, unrealized_pnl_usd,
+                active_positions, positions_data,
+                value_change_1h_usd, value_change_24h_usd, value_change_7d_usd,
+                snapshot_at
+            )
+            SELECT
+                v.id, v.account_value, v.withdrawable, v.margin_used, v.unrealized_pnl,
+                jsonb_array_length(v.positions), v.positions,
+                d.change_1h, d.change_24h, d.change_7d,
+                v.snapshot_at
+            FROM v
+            CROSS JOIN LATERAL maven_treasury_deltas(v.account_value, v.snapshot_at) d
+            RETURNING id
+        )
+        SELECT v.id, v.ord FROM v JOIN inserted USING (id)
+    """, [(i,) + row for i, row in enumerate(values)],
+        template="(%s, %s::numeric, %s::numeric, %s::numeric, %s::numeric, %s::jsonb, %s::timestamptz)",
+        page_size=len(values),
+        fetch=True
+    )
+    return [row_id for row_id, _ in sorted(rows, key=lambda row: row[1])]
@@ -0,0 +1,235 @@
+"""
+Scheduled database maintenance for the Maven API.
+
+Housekeeping that keeps the hot tables bounded runs here, from one daemon
+thread per worker, instead of from cron:
+
+    snapshot_partitions  maven_market_snapshots daily partitions ahead of
+                         time, and retention by dropping expired days
+                         (database.partitions)
+    downsample           5m/1h/1d market bars and candles from their
+                         watermarks, and pruning of raw data past its
+                         horizon (database.downsample)
+    signal_expiry        expired flag on trading signals past valid_until,
+                         and optional archiving (database.signal_expiry)
+    candles              watchlist candles from Hyperliquid, each series
+                         from its last stored candle (maven_api.candles)
+    candle_gaps          backfill to the horizon and refetch of holes
+
+Every run takes a Postgres advisory lock named after the job, so with
+several gunicorn workers a job never runs twice at once; a worker that finds
+the lock taken counts the run as skipped. Jobs must therefore be idempotent
+and cheap when there is nothing to do. Runs are also skipped while the
+database circuit is open.
+
+Usage:
+    from maven_api import maintenance
+
+    maintenance.init_app(app)                    # starts the scheduler thread
+    maintenance.scheduler.run('snapshot_partitions')
+    maintenance.scheduler.stats()
+"""
+import logging
+import os
+import threading
+import time
+from datetime import datetime, timezone
+
+from database.connection import db_ready, get_db_connection
+
+
+logger = logging.getLogger(__name__)
+
+PARTITION_INTERVAL = float(os.getenv('MAVEN_PARTITION_INTERVAL', 3600))
+DOWNSAMPLE_INTERVAL = float(os.getenv('MAVEN_DOWNSAMPLE_INTERVAL', 300))
+SIGNAL_EXPIRY_INTERVAL = float(os.getenv('MAVEN_SIGNAL_EXPIRY_INTERVAL', 60))
+CANDLE_SYNC_INTERVAL = float(os.getenv('MAVEN_CANDLE_SYNC_INTERVAL', 60))
+CANDLE_GAP_INTERVAL = float(os.getenv('MAVEN_CANDLE_GAP_INTERVAL', 3600))
+
+# Startup delay so a fleet of freshly started workers does not all hit the
+# database in the same second
+START_DELAY = float(os.getenv('MAVEN_MAINTENANCE_START_DELAY', 30))
+
+
+def _snapshot_partitions(conn):
+    from database import partitions
+    return partitions.maintain(conn)
+
+
+def _downsample(conn):
+    from database import downsample
+    return downsample.run(conn)
+
+
+def _signal_expiry(conn):
+    from database import signal_expiry
+    return signal_expiry.run(conn)
+
+
+def _candles(conn):
+    from maven_api import candles
+    return candles.sync(conn)
+
+
+def _candle_gaps(conn):
+    from maven_api import candles
+    return candles.fill_gaps(conn)
+
+
+DEFAULT_JOBS = {
+    'snapshot_partitions': (_snapshot_partitions, PARTITION_INTERVAL),
+    'downsample': (_downsample, DOWNSAMPLE_INTERVAL),
+    'signal_expiry': (_signal_expiry, SIGNAL_EXPIRY_INTERVAL),
+    'candles': (_candles, CANDLE_SYNC_INTERVAL),
+    'candle_gaps': (_candle_gaps, CANDLE_GAP_INTERVAL),
+}
+
+
+class MaintenanceScheduler:
+    """Runs registered jobs on their intervals under advisory locks."""
+
+    def __init__(self, jobs=None, start_delay=None):
+        """
+        Args:
+            jobs: {name: (func, interval_seconds)}; func(conn) returns a
+                JSON-able result and may commit along the way
+            start_delay: Seconds before the first round of runs
+        """
+        self.start_delay = START_DELAY if start_delay is None else start_delay
+        self._jobs = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        for name, (func, interval) in (DEFAULT_JOBS if jobs is None else jobs).items():
+            self.add(name, func, interval)
+
+    def add(self, name, func, interval):
+        with self._lock:
+            self._jobs[name] = {
+                'func': func,
+                'interval': interval,
+                'next_run': 0.0,
+                'stats': {'runs': 0, 'skipped': 0, 'errors': 0, 'last_run_at': None,
+                          'last_seconds': None, 'last_result': None, 'last_error': None},
+            }
+
+    def run(self, name):
+        """
+        Run one job now.
+
+        Returns:
+            dict: {'status': 'ok' | 'skipped' | 'error', ...}
+        """
+        job = self._jobs[name]
+        if not db_ready():
+            return self._record(name, {'status': 'skipped', 'reason': 'database circuit open'})
+
+        key = f'maven_maintenance:{name}'
+        started = time.perf_counter()
+        try:
+            with get_db_connection(owner=f'maintenance:{name}') as conn:
+                cursor = conn.cursor()
+                cursor.execute("SELECT pg_try_advisory_lock(hashtext(%s))", (key,))
+                if not cursor.fetchone()[0]:
+                    conn.rollback()
+                    return self._record(name, {'status': 'skipped', 'reason': 'running elsewhere'})
+                try:
+                    result = job['func'](conn)
+                    conn.commit()
+                except Exception:
+                    conn.rollback()
+                    raise
+                finally:
+                    try:
+                        cursor.execute("SELECT pg_advisory_unlock(hashtext(%s))", (key,))
+                    except Exception as e:
+                        logger.warning(f"Could not release maintenance lock for {name}: {e}")
+        except Exception as e:
+            logger.error(f"Maintenance job {name} failed: {e}")
+            return self._record(name, {'status': 'error', 'error': str(e)})
+
+        elapsed = time.perf_counter() - started
+        logger.info(f"🧹 Maintenance {name}: {result} ({elapsed:.2f}s)")
+        return self._record(name, {'status': 'ok', 'result': result, 'seconds': round(elapsed, 3)})
+
+    def _record(self, name, outcome):
+        with self._lock:
+            stats = self._jobs[name]['stats']
+            if outcome['status'] == 'skipped':
+                stats['skipped'] += 1
+                return outcome
+            stats['runs'] += 1
+            stats['last_run_at'] = datetime.now(timezone.utc).isoformat()
+            if outcome['status'] == 'error':
+                stats['errors'] += 1
+                stats['last_error'] = outcome['error']
+            else:
+                stats['last_result'] = outcome['result']
+                stats['last_seconds'] = outcome['seconds']
+        return outcome
+
+    def run_due(self, now=None):
+        """Run every job whose interval has elapsed; returns seconds until the next one is due."""
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            due = [name for name, job in self._jobs.items() if job['next_run'] <= now]
+            for name in due:
+                self._jobs[name]['next_run'] = now + self._jobs[name]['interval']
+        for name in due:
+            if self._stop.is_set():
+                break
+            self.run(name)
+        with self._lock:
+            if not self._jobs:
+                return 60.0
+            return max(0.0, min(job['next_run'] for job in self._jobs.values()) - time.monotonic())
+
+    def stats(self):
+        with self._lock:
+            jobs = {name: dict(job['stats'], interval=job['interval'])
+                    for name, job in self._jobs.items()}
+        return {'running': self.running, 'jobs': jobs}
+
+    @property
+    def running(self):
+        return self._thread is not None
+
+    def start(self):
+        if self._thread is not None:
+            return self
+        self._stop.clear()
+
+        def _run():
+            if self._stop.wait(self.start_delay):
+                return
+            while not self._stop.is_set():
+                try:
+                    wait = self.run_due()
+                except Exception as e:
+                    logger.error(f"Maintenance scheduler error: {e}")
+                    wait = 60.0
+                self._stop.wait(wait)
+
+        self._thread = threading.Thread(target=_run, name='maven-maintenance', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self, timeout=5.0):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+
+# Process-wide scheduler, created by init_app()
+scheduler = None
+
+
+def init_app(app, start=True, jobs=None):
+    """Create the process scheduler and (optionally) start it."""
+    global scheduler
+    scheduler = MaintenanceScheduler(jobs)
+    app.extensions['maven_maintenance'] = scheduler
+    if start:
+        scheduler.start()
+    return scheduler
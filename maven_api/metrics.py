@@ -0,0 +1,377 @@
+"""
+Per-route request metrics for the Maven Flask API, exposed at /metrics.
+
+For every request the middleware records, keyed by the URL rule (so
+/api/x/<id> is one series, not one per id) and method:
+
+    maven_http_requests_total{route,method,status}       counter
+    maven_http_request_duration_seconds{route,method}    histogram
+    maven_http_request_db_seconds_total{route,method}    counter
+
+DB time is the time spent inside cursor.execute() on pooled connections
+(database.connection.TimedCursor). /metrics also reports connection pool
+gauges from database.connection.get_pool_stats(), labelled by worker.
+
+Under gunicorn every worker process keeps its own counters, and a scrape
+lands on one worker. Each worker therefore pushes a snapshot to Redis every
+MAVEN_METRICS_SHARE_SECONDS (off the request path), and /metrics sums the
+snapshots of all live workers. Without Redis, /metrics shows the answering
+worker only.
+
+The recording path is two perf_counter() calls, one request-proxy lookup
+and a short locked update - a few microseconds per request
+(benchmarks/bench_metrics.py).
+The text format is rendered by hand; no prometheus_client dependency.
+
+Usage:
+    from maven_api import metrics
+
+    metrics.init_app(app)   # registers the hooks and the /metrics route
+"""
+import bisect
+import json
+import logging
+import os
+import socket
+import threading
+import time
+
+from flask import Response, request
+
+from database.circuit import CircuitOpenError, get_breaker
+from database.connection import get_pool_stats, reset_query_time
+
+
+# Histogram upper bounds in seconds (+Inf is implicit)
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+# Pool stats exported as gauges / counters: (stats key, metric name, type, help)
+POOL_METRICS = (
+    ('maxconn', 'maven_db_pool_max_connections', 'gauge', 'Pool size limit'),
+    ('in_use', 'maven_db_pool_in_use', 'gauge', 'Connections checked out'),
+    ('idle', 'maven_db_pool_idle', 'gauge', 'Open connections waiting in the pool'),
+    ('utilization', 'maven_db_pool_utilization', 'gauge', 'in_use / maxconn'),
+    ('in_use_max', 'maven_db_pool_in_use_max', 'gauge', 'Peak connections checked out'),
+    ('checkouts', 'maven_db_pool_checkouts_total', 'counter', 'Connections checked out'),
+    ('timeouts', 'maven_db_pool_timeouts_total', 'counter', 'Checkouts that timed out'),
+    ('wait_seconds_total', 'maven_db_pool_wait_seconds_total', 'counter', 'Time spent waiting for a connection'),
+    ('wait_seconds_max', 'maven_db_pool_wait_seconds_max', 'gauge', 'Longest wait for a connection'),
+    ('hold_seconds_total', 'maven_db_pool_hold_seconds_total', 'counter', 'Time connections were held'),
+    ('hold_seconds_max', 'maven_db_pool_hold_seconds_max', 'gauge', 'Longest time a connection was held'),
+)
+
+SHARE_KEY_PREFIX = 'maven:metrics:'
+SHARE_SECONDS = float(os.getenv('MAVEN_METRICS_SHARE_SECONDS', 5))
+SHARE_ENABLED = os.getenv('MAVEN_METRICS_SHARED', 'true').lower() == 'true'
+
+logger = logging.getLogger(__name__)
+
+
+class _RouteSeries:
+    """Counters for one (route, method) pair."""
+
+    __slots__ = ('statuses', 'buckets', 'duration_sum', 'count', 'db_seconds')
+
+    def __init__(self):
+        self.statuses = {}
+        self.buckets = [0] * (len(BUCKETS) + 1)
+        self.duration_sum = 0.0
+        self.count = 0
+        self.db_seconds = 0.0
+
+
+class RequestMetrics:
+    """Thread-safe registry of per-route request series."""
+
+    def __init__(self):
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, route, method, status, duration, db_seconds=0.0):
+        """Record one finished request."""
+        bucket = bisect.bisect_left(BUCKETS, duration)
+        key = (route, method)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = _RouteSeries()
+            series.statuses[status] = series.statuses.get(status, 0) + 1
+            series.buckets[bucket] += 1
+            series.duration_sum += duration
+            series.count += 1
+            series.db_seconds += db_seconds
+
+    def snapshot(self):
+        """Copy of every series as {(route, method): dict}."""
+        with self._lock:
+            return {
+                key: {
+                    'statuses': dict(s.statuses),
+                    'buckets': list(s.buckets),
+                    'duration_sum': s.duration_sum,
+                    'count': s.count,
+                    'db_seconds': s.db_seconds,
+                }
+                for key, s in self._series.items()
+            }
+
+    def reset(self):
+        with self._lock:
+            self._series.clear()
+
+
+registry = RequestMetrics()
+
+
+# =============================================================================
+# Exposition
+# =============================================================================
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _labels(**labels):
+    return '{' + ','.join(f'{k}="{_escape(v)}"' for k, v in labels.items()) + '}'
+
+
+def merge(snapshots):
+    """Sum several registry snapshots into one."""
+    merged = {}
+    for snapshot in snapshots:
+        for key, s in snapshot.items():
+            into = merged.get(key)
+            if into is None:
+                merged[key] = {
+                    'statuses': dict(s['statuses']),
+                    'buckets': list(s['buckets']),
+                    'duration_sum': s['duration_sum'],
+                    'count': s['count'],
+                    'db_seconds': s['db_seconds'],
+                }
+                continue
+            for status, count in s['statuses'].items():
+                into['statuses'][status] = into['statuses'].get(status, 0) + count
+            into['buckets'] = [a + b for a, b in zip(into['buckets'], s['buckets'])]
+            into['duration_sum'] += s['duration_sum']
+            into['count'] += s['count']
+            into['db_seconds'] += s['db_seconds']
+    return merged
+
+
+def render(snapshot, pools):
+    """
+    Render request and pool metrics in the Prometheus text format.
+
+    Args:
+        snapshot: Merged registry snapshot
+        pools: {worker id: get_pool_stats() dict}
+    """
+    lines = [
+        '# HELP maven_http_requests_total Requests handled, by route, method and status.',
+        '# TYPE maven_http_requests_total counter',
+    ]
+    for (route, method), s in sorted(snapshot.items()):
+        for status, count in sorted(s['statuses'].items()):
+            lines.append(f"maven_http_requests_total{_labels(route=route, method=method, status=status)} {count}")
+
+    lines += [
+        '# HELP maven_http_request_duration_seconds Request latency, by route and method.',
+        '# TYPE maven_http_request_duration_seconds histogram',
+    ]
+    for (route, method), s in sorted(snapshot.items()):
+        cumulative = 0
+        for bound, count in zip(BUCKETS + ('+Inf',), s['buckets']):
+            cumulative += count
+            lines.append(
+                f"maven_http_request_duration_seconds_bucket"
+                f"{_labels(route=route, method=method, le=bound)} {cumulative}"
+            )
+        labels = _labels(route=route, method=method)
+        lines.append(f"maven_http_request_duration_seconds_sum{labels} {s['duration_sum']:.6f}")
+        lines.append(f"maven_http_request_duration_seconds_count{labels} {s['count']}")
+
+    lines += [
+        '# HELP maven_http_request_db_seconds_total Time spent in database queries, by route and method.',
+        '# TYPE maven_http_request_db_seconds_total counter',
+    ]
+    for (route, method), s in sorted(snapshot.items()):
+        lines.append(
+            f"maven_http_request_db_seconds_total{_labels(route=route, method=method)} {s['db_seconds']:.6f}"
+        )
+
+    pools = {worker: stats for worker, stats in pools.items() if stats.get('initialized')}
+    for key, name, kind, help_text in POOL_METRICS:
+        if not pools:
+            break
+        lines += [f'# HELP {name} {help_text}.', f'# TYPE {name} {kind}']
+        for worker, stats in sorted(pools.items()):
+            lines.append(f"{name}{_labels(worker=worker)} {stats[key]}")
+
+    return '\n'.join(lines) + '\n'
+
+
+# =============================================================================
+# Cross-worker sharing
+# =============================================================================
+
+WORKER_ID = f"{socket.gethostname()}:{os.getpid()}"
+
+
+def _encode(snapshot, pool_stats):
+    return json.dumps({
+        'series': [[route, method, s] for (route, method), s in snapshot.items()],
+        'pool': pool_stats,
+    })
+
+
+def _decode(raw):
+    data = json.loads(raw)
+    snapshot = {}
+    for route, method, s in data['series']:
+        s['statuses'] = {int(k): v for k, v in s['statuses'].items()}
+        snapshot[(route, method)] = s
+    return snapshot, data.get('pool', {})
+
+
+class SharedSnapshots:
+    """
+    Publishes this worker's snapshot to Redis and reads every worker's.
+
+    Keys expire after three share intervals, so workers that exit drop out
+    of the totals (their counters reset, which rate() tolerates). Nothing is
+    shared while the 'redis' circuit breaker is open.
+    """
+
+    def __init__(self, worker_id=WORKER_ID, redis_client=None, interval=None, breaker=None):
+        self.worker_id = worker_id
+        self.interval = interval or SHARE_SECONDS
+        self._redis = redis_client
+        self._breaker = breaker or get_breaker('redis')
+
+    def _client(self):
+        try:
+            self._breaker.before_call()
+        except CircuitOpenError:
+            return None
+        if self._redis is None:
+            try:
+                import redis
+                from maven_api.cache import REDIS_CONFIG
+                self._redis = redis.Redis(**REDIS_CONFIG)
+            except Exception as e:
+                self._mark_down(e)
+                return None
+        return self._redis
+
+    def _mark_down(self, error):
+        logger.debug(f"Metrics sharing unavailable: {error}")
+        self._breaker.record_failure(error)
+
+    def push(self, snapshot, pool_stats):
+        client = self._client()
+        if client is None:
+            return False
+        try:
+            client.set(SHARE_KEY_PREFIX + self.worker_id, _encode(snapshot, pool_stats),
+                       ex=max(1, int(self.interval * 3)))
+            self._breaker.record_success()
+            return True
+        except Exception as e:
+            self._mark_down(e)
+            return False
+
+    def collect(self):
+        """Return {worker id: (snapshot, pool stats)} for the other live workers."""
+        client = self._client()
+        if client is None:
+            return {}
+        try:
+            keys = [k for k in client.scan_iter(match=SHARE_KEY_PREFIX + '*', count=100)]
+            values = client.mget(keys) if keys else []
+        except Exception as e:
+            self._mark_down(e)
+            return {}
+        self._breaker.record_success()
+        workers = {}
+        for key, raw in zip(keys, values):
+            worker = (key.decode() if isinstance(key, bytes) else key)[len(SHARE_KEY_PREFIX):]
+            if raw is None or worker == self.worker_id:
+                continue
+            try:
+                workers[worker] = _decode(raw)
+            except (ValueError, KeyError, TypeError):
+                continue
+        return workers
+
+    def start(self):
+        """Push this worker's snapshot every interval from a daemon thread."""
+        def _run():
+            while True:
+                time.sleep(self.interval)
+                self.push(registry.snapshot(), get_pool_stats())
+
+        thread = threading.Thread(target=_run, name='maven-metrics-share', daemon=True)
+        thread.start()
+        return thread
+
+
+shared = SharedSnapshots() if SHARE_ENABLED else None
+
+
+def collect_all():
+    """Merged request snapshot and per-worker pool stats across workers."""
+    snapshots = [registry.snapshot()]
+    pools = {WORKER_ID: get_pool_stats()}
+    if shared is not None:
+        for worker, (snapshot, pool_stats) in shared.collect().items():
+            snapshots.append(snapshot)
+            pools[worker] = pool_stats
+    return merge(snapshots), pools
+
+
+# =============================================================================
+# Flask integration
+# =============================================================================
+
+# Request start time per thread. A gthread worker runs one request per
+# thread at a time, and a thread-local is several times cheaper to touch
+# than flask.g or the request proxy on this hot path.
+_clock = threading.local()
+
+
+def _start_timer():
+    reset_query_time()
+    _clock.start = time.perf_counter()
+
+
+def _record(response):
+    started = getattr(_clock, 'start', None)
+    if started is not None:
+        _clock.start = None
+        req = request._get_current_object()
+        rule = req.url_rule
+        registry.observe(
+            rule.rule if rule is not None else 'unmatched',
+            req.method,
+            response.status_code,
+            time.perf_counter() - started,
+            reset_query_time(),
+        )
+    return response
+
+
+def metrics_endpoint():
+    """Prometheus scrape endpoint."""
+    return Response(render(*collect_all()), mimetype=CONTENT_TYPE)
+
+
+def init_app(app, path='/metrics'):
+    """Register the timing hooks and the scrape route on a Flask app."""
+    app.before_request(_start_timer)
+    app.after_request(_record)
+    app.add_url_rule(path, 'metrics', metrics_endpoint, methods=['GET'])
+    if shared is not None:
+        shared.start()
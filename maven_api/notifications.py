@@ -0,0 +1,346 @@
+"""
+Background dispatcher for outbound notification email.
+
+/api/notifications/send used to call the email API inside the request
+thread (up to a 15 s timeout) and, on failure, drop a JSON file that nothing
+ever retried. Now the endpoint only enqueues:
+
+    id = notifications.dispatcher.enqueue(recipient, subject, html, text, opportunities)
+
+Messages live in the indexed spool (maven_api/spool.py), committed before
+enqueue() returns, so a queued message survives a crash or restart. A small
+pool of daemon threads claims due messages and records every attempt:
+
+    pending --send ok--> sent
+    pending --retryable error--> pending (next_attempt_at = now + backoff)
+    pending --permanent error, max attempts or too old--> failed
+
+Backoff is exponential with jitter: attempt n waits between half and all of
+min(MAX_DELAY, BASE_DELAY * 2**(n-1)) seconds, so retries after an outage
+spread out instead of arriving together. While the 'email' circuit breaker
+(database.circuit, fed by the sends and the health probe) is open, claimed
+messages go back to pending until it may close, without using an attempt.
+
+Every gunicorn worker runs a dispatcher over the same spool. Claims are
+atomic in the spool, so two workers never send the same message; idle
+workers poll for messages enqueued by other processes every POLL_SECONDS.
+
+Scanner alerts are coalesced rather than mailed one call at a time:
+
+    dispatcher.coalesce(recipient, opportunities, threshold)
+
+buffers each opportunity under digest_key() (asset + signal), merging
+repeats, and DIGEST_WINDOW_SECONDS after the first one arrives the sending
+threads render everything buffered for that recipient into one digest. At
+most DIGEST_MAX_PER_HOUR digests go to a recipient per hour; past the cap
+the buffer keeps merging until the next slot. Rendering happens once per
+digest instead of once per scan tick.
+"""
+import logging
+import os
+import random
+import threading
+import time
+
+from database.circuit import get_breaker
+from maven_api.spool import NotificationSpool
+
+
+logger = logging.getLogger(__name__)
+
+DISPATCH_WORKERS = int(os.getenv('MAVEN_NOTIFY_WORKERS', 2))
+MAX_ATTEMPTS = int(os.getenv('MAVEN_NOTIFY_MAX_ATTEMPTS', 8))
+BASE_DELAY = float(os.getenv('MAVEN_NOTIFY_BASE_DELAY', 2))
+MAX_DELAY = float(os.getenv('MAVEN_NOTIFY_MAX_DELAY', 300))
+# Alerts older than this are marked failed instead of sent late
+MAX_AGE_SECONDS = float(os.getenv('MAVEN_NOTIFY_MAX_AGE', 24 * 3600))
+# Longest an idle worker sleeps before checking the spool again
+POLL_SECONDS = float(os.getenv('MAVEN_NOTIFY_POLL_SECONDS', 2))
+# Alert coalescing; a window of 0 sends every /send call on its own
+DIGEST_WINDOW_SECONDS = float(os.getenv('MAVEN_NOTIFY_DIGEST_WINDOW', 120))
+DIGEST_MAX_PER_HOUR = int(os.getenv('MAVEN_NOTIFY_DIGEST_MAX_PER_HOUR', 6))
+# Send unsent legacy signal_*.json notifications when they are imported
+RESEND_LEGACY = os.getenv('MAVEN_NOTIFY_RESEND_LEGACY', 'false').lower() == 'true'
+
+
+def backoff_delay(attempts, base=None, cap=None, rand=random.random):
+    """Seconds to wait before retry number `attempts` (1-based), with jitter."""
+    base = BASE_DELAY if base is None else base
+    cap = MAX_DELAY if cap is None else cap
+    delay = min(cap, base * (2 ** (attempts - 1)))
+    return delay / 2 + rand() * delay / 2
+
+
+def digest_key(opportunity):
+    """Dedupe key for an opportunity: the asset plus what kind of signal it is."""
+    signal = (opportunity.get('opportunity_type') or opportunity.get('direction')
+              or opportunity.get('signal_type') or '')
+    return f"{str(opportunity.get('asset', '')).upper()}:{str(signal).lower()}"
+
+
+class NotificationDispatcher:
+    """Worker pool that sends spooled notifications with retry backoff."""
+
+    def __init__(self, spool, send, workers=None, max_attempts=None, sender=None,
+                 render=None, window=None, max_per_hour=None, breaker=None):
+        """
+        Args:
+            spool: NotificationSpool
+            send: callable(**email kwargs) -> dict like maven_mcp.tools._send_email
+            workers: Number of sending threads
+            max_attempts: Attempts before a message is marked failed
+            sender: (from_name, from_email) for outgoing mail
+            render: callable(opportunities, threshold) -> (subject, html, text)
+                for digests; without it coalesce() is unavailable
+            window: Digest window in seconds
+            max_per_hour: Digests per recipient per hour (0 = no cap)
+            breaker: CircuitBreaker consulted before each send (default: 'email')
+        """
+        self.spool = spool
+        self.send = send
+        self.workers = workers or DISPATCH_WORKERS
+        self.max_attempts = max_attempts or MAX_ATTEMPTS
+        self.render = render
+        self.window = DIGEST_WINDOW_SECONDS if window is None else window
+        self.max_per_hour = DIGEST_MAX_PER_HOUR if max_per_hour is None else max_per_hour
+        self.from_name, self.from_email = sender or ('Maven', 'maven@motherhaven.app')
+        self.breaker = breaker or get_breaker('email')
+        self._cond = threading.Condition()
+        self._threads = []
+        self._stopping = False
+        self._in_flight = 0
+        self._stats = {
+            'enqueued': 0,
+            'sent': 0,
+            'failed': 0,
+            'retries': 0,
+            'deferred': 0,
+            'digests': 0,
+            'coalesced': 0,
+            'send_seconds_total': 0.0,
+            'send_seconds_max': 0.0,
+            'delivery_seconds_total': 0.0,
+            'delivery_seconds_max': 0.0,
+        }
+
+    # -------------------------------------------------------------------------
+    # Public API
+    # -------------------------------------------------------------------------
+
+    def enqueue(self, recipient, subject, html_content, text_content, opportunities):
+        """Persist a message and wake a worker; returns the message id."""
+        record = self.spool.add(recipient, subject, html_content, text_content, opportunities)
+        with self._cond:
+            self._stats['enqueued'] += 1
+            self._cond.notify()
+        return record['id']
+
+    @property
+    def coalescing(self):
+        """True when coalesce() will be flushed by running threads."""
+        return self.render is not None and self.window > 0 and bool(self._threads)
+
+    def coalesce(self, recipient, opportunities, threshold):
+        """
+        Buffer opportunities for the recipient's next digest.
+
+        Returns {'new', 'merged', 'digest_at'}: how many were new to the
+        buffer, how many merged into an already-buffered asset/signal, and
+        the earliest time (epoch seconds) the digest can go out.
+        """
+        items = [(digest_key(opp), opp) for opp in opportunities]
+        new, merged = self.spool.buffer(recipient, items, threshold)
+        with self._cond:
+            self._stats['coalesced'] += merged
+            self._cond.notify()
+        return {
+            'new': new,
+            'merged': merged,
+            'digest_at': self.spool.next_digest_due(self.window, self.max_per_hour),
+        }
+
+    def start(self):
+        """Import legacy JSON files once and start the sending threads."""
+        if self._threads:
+            return self
+        self.spool.migrate_json(resend=RESEND_LEGACY)
+        self._stopping = False
+        for i in range(self.workers):
+            thread = threading.Thread(target=self._run, name=f'maven-notify-{i}', daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        logger.info(f"Notification dispatcher started ({self.workers} workers, "
+                    f"{self.spool.counts().get('pending', 0)} pending)")
+        return self
+
+    def stop(self, timeout=5.0):
+        """Stop the threads; unsent messages stay pending in the spool."""
+        with self._cond:
+            self._stopping = True
+            self._cond.notify_all()
+        deadline = time.monotonic() + timeout
+        for thread in self._threads:
+            thread.join(max(0.0, deadline - time.monotonic()))
+        self._threads = []
+
+    def stats(self):
+        with self._cond:
+            stats = dict(self._stats)
+            stats['in_flight'] = self._in_flight
+        counts = self.spool.counts()
+        stats['depth'] = counts.get('pending', 0) + counts.get('sending', 0)
+        stats['spool'] = counts
+        attempts = stats['sent'] + stats['failed'] + stats['retries']
+        stats['send_seconds_avg'] = stats['send_seconds_total'] / attempts if attempts else 0.0
+        stats['delivery_seconds_avg'] = (
+            stats['delivery_seconds_total'] / stats['sent'] if stats['sent'] else 0.0
+        )
+        next_due = self.spool.next_due()
+        stats['next_attempt_in'] = max(0.0, next_due - time.time()) if next_due is not None else None
+        stats['workers'] = len(self._threads)
+        stats['buffered'] = self.spool.buffered()
+        return stats
+
+    # -------------------------------------------------------------------------
+    # Worker loop
+    # -------------------------------------------------------------------------
+
+    def _next(self):
+        """Claim the next due message, waiting as needed; None when stopping."""
+        while True:
+            with self._cond:
+                if self._stopping:
+                    return None
+            self._flush_digests()
+            record = self.spool.claim_due()
+            if record is not None:
+                with self._cond:
+                    self._in_flight += 1
+                return record
+            dues = [self.spool.next_due()]
+            if self.render is not None:
+                dues.append(self.spool.next_digest_due(self.window, self.max_per_hour))
+            dues = [due for due in dues if due is not None]
+            wait = min([POLL_SECONDS] + [due - time.time() for due in dues])
+            with self._cond:
+                if not self._stopping and wait > 0:
+                    self._cond.wait(wait)
+
+    def _flush_digests(self):
+        if self.render is None:
+            return
+        try:
+            due = self.spool.next_digest_due(self.window, self.max_per_hour)
+            if due is None or due > time.time():
+                return
+            ids = self.spool.flush_digests(self.render, self.window, self.max_per_hour)
+        except Exception as e:
+            logger.error(f"Digest flush error: {e}")
+            return
+        if ids:
+            with self._cond:
+                self._stats['digests'] += len(ids)
+            logger.info(f"📧 Queued {len(ids)} alert digest(s)")
+
+    def _run(self):
+        while True:
+            record = self._next()
+            if record is None:
+                return
+            try:
+                self._attempt(record)
+            except Exception as e:
+                logger.error(f"Notification {record['id']} dispatch error: {e}")
+            finally:
+                with self._cond:
+                    self._in_flight -= 1
+                    self._cond.notify_all()
+
+    def _attempt(self, record):
+        message_id = record['id']
+        if time.time() - record['created_at'] > MAX_AGE_SECONDS:
+            self.spool.mark_failed(message_id, 'expired before delivery')
+            self._record('failed', 0.0)
+            logger.warning(f"Notification {message_id} expired before delivery")
+            return
+
+        if not self.breaker.allows():
+            self._defer(message_id, self.breaker.snapshot()['retry_in'], 'email circuit open')
+            return
+
+        started = time.monotonic()
+        result = self.send(
+            to=record['recipient'],
+            subject=record['subject'],
+            html_content=record.get('html_content'),
+            text_content=record.get('text_content'),
+            from_name=self.from_name,
+            from_email=self.from_email,
+        )
+        elapsed = time.monotonic() - started
+
+        if result.get('success'):
+            self.spool.mark_sent(message_id)
+            self._record('sent', elapsed, time.time() - record['created_at'])
+            logger.info(f"✅ Notification {message_id} sent to {record['recipient']}")
+            return
+
+        error = result.get('error')
+        if result.get('circuit_open'):
+            # Another worker's failure opened the circuit after the check above
+            self._defer(message_id, result.get('retry_after', 0.0), error)
+            return
+        if not result.get('retryable') or record['attempts'] >= self.max_attempts:
+            self.spool.mark_failed(message_id, error)
+            self._record('failed', elapsed)
+            logger.error(f"❌ Notification {message_id} failed after "
+                         f"{record['attempts']} attempt(s): {error}")
+            return
+
+        self.spool.mark_retry(message_id, time.time() + backoff_delay(record['attempts']), error)
+        self._record('retries', elapsed)
+        logger.warning(f"Notification {message_id} attempt {record['attempts']} failed "
+                       f"({error}); retrying")
+
+    def _defer(self, message_id, retry_after, error):
+        """Put a claimed message back untried until the email circuit may close."""
+        self.spool.mark_retry(message_id, time.time() + max(retry_after, BASE_DELAY), error,
+                              attempted=False)
+        with self._cond:
+            self._stats['deferred'] += 1
+        logger.debug(f"Notification {message_id} deferred: {error}")
+
+    def _record(self, outcome, send_seconds, delivery_seconds=None):
+        with self._cond:
+            self._stats[outcome] += 1
+            self._stats['send_seconds_total'] += send_seconds
+            self._stats['send_seconds_max'] = max(self._stats['send_seconds_max'], send_seconds)
+            if delivery_seconds is not None:
+                self._stats['delivery_seconds_total'] += delivery_seconds
+                self._stats['delivery_seconds_max'] = max(
+                    self._stats['delivery_seconds_max'], delivery_seconds
+                )
+
+
+# Process-wide dispatcher, created by init_app()
+dispatcher = None
+
+
+def init_app(app, directory, send, render=None, start=True):
+    """
+    Create the process dispatcher for a Flask app.
+
+    Args:
+        app: Flask application (the dispatcher is stored in app.extensions)
+        directory: Notifications directory
+        send: Email send callable, normally maven_mcp.tools._send_email. With
+            None, messages are still spooled for manual pickup.
+        render: Digest renderer, see NotificationDispatcher
+        start: Start the sending threads now
+    """
+    global dispatcher
+    dispatcher = NotificationDispatcher(NotificationSpool(directory), send, render=render)
+    app.extensions['maven_notifications'] = dispatcher
+    if start and send is not None:
+        dispatcher.start()
+    return dispatcher
@@ -0,0 +1,86 @@
+"""
+Keyset (cursor) pagination helpers for list endpoints.
+
+Pages are ordered newest first on a (timestamp, id) key. The cursor handed
+to clients is an opaque token encoding the key of the last row returned; the
+next page is fetched with
+
+    WHERE ts <= %(ts)s AND (ts, id) < (%(ts)s, %(id)s)
+    ORDER BY ts DESC, id DESC
+    LIMIT <limit + 1>
+
+so the database seeks straight into the timestamp index instead of skipping
+OFFSET rows, and deep pages cost the same as the first one. The redundant
+``ts <= ...`` bound lets a single-column timestamp index serve the row
+comparison. One extra row is fetched to tell whether another page exists.
+
+Usage:
+    limit, after = page_args(request.args, default=20)
+    where, params = keyset_clause('decided_at', 'id', after)
+    rows = fetch(where, params, limit + 1)
+    rows, next_cursor = paginate(rows, limit, key=lambda r: (r[8], r[0]))
+"""
+import base64
+import binascii
+from datetime import datetime
+
+
+MAX_PAGE_SIZE = 200
+
+
+def encode_cursor(sort_value, row_id):
+    """Opaque token for the (timestamp, id) key of a row."""
+    raw = f"{sort_value.isoformat()}|{int(row_id)}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_cursor(token):
+    """Inverse of encode_cursor; raises ValueError for tampered tokens."""
+    try:
+        raw = base64.urlsafe_b64decode(token + '=' * (-len(token) % 4)).decode()
+        sort_value, row_id = raw.rsplit('|', 1)
+        return datetime.fromisoformat(sort_value), int(row_id)
+    except (binascii.Error, UnicodeDecodeError, ValueError) as e:
+        raise ValueError(f"Invalid cursor: {token!r}") from e
+
+
+def page_args(args, default=20, maximum=MAX_PAGE_SIZE):
+    """
+    Read ?limit= and ?cursor= from a request's args.
+
+    Returns (limit, after) where after is None or a decoded (timestamp, id)
+    key. Raises ValueError for a bad cursor or non-positive limit.
+    """
+    limit = args.get('limit', default, type=int)
+    if limit < 1:
+        raise ValueError("limit must be a positive integer")
+    limit = min(limit, maximum)
+    token = args.get('cursor')
+    return limit, decode_cursor(token) if token else None
+
+
+def keyset_clause(ts_column, id_column, after):
+    """
+    SQL condition selecting rows strictly after ``after`` in DESC order.
+
+    Returns (sql, params); sql is 'TRUE' on the first page so callers can
+    always AND it in.
+    """
+    if after is None:
+        return "TRUE", []
+    ts, row_id = after
+    sql = f"{ts_column} <= %s AND ({ts_column}, {id_column}) < (%s, %s)"
+    return sql, [ts, ts, row_id]
+
+
+def paginate(rows, limit, key):
+    """
+    Trim a limit+1 fetch to one page.
+
+    Returns (rows, next_cursor); next_cursor is None on the last page.
+    ``key`` maps a row to its (timestamp, id) sort key.
+    """
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    return rows, encode_cursor(*key(rows[-1]))
@@ -0,0 +1,276 @@
+"""
+Admission control and per-client rate limiting for the Maven Flask API.
+
+One bot hammering /api/signals could hold every pooled connection and starve
+everything else. Each request now passes two checks before its handler runs:
+
+1. Token bucket per client and route class. The client is the X-API-Key
+   header when present (hashed, never stored raw), otherwise the remote
+   address. GET/HEAD are 'read', everything else is 'write', and each class
+   has its own rate (tokens per second) and burst. Buckets live in Redis
+   (one small hash per client, updated by a Lua script), so the limit holds
+   across all gunicorn workers. While the shared 'redis' circuit breaker is
+   open the worker falls back to in-process buckets, which makes the limit
+   per worker until Redis returns.
+   Over the limit: 429 with Retry-After.
+
+2. Concurrency per route class, per worker. A worker's DB pool is its own,
+   so this cap is local: a request waits at most ADMISSION_WAIT seconds for
+   a slot, then gets 503 with Retry-After. The default read and write caps
+   add up to the pool size, so reads can never take every connection.
+
+Shedding happens before any DB work, so an overloaded worker answers
+rejected requests in microseconds and admitted requests keep a bounded
+latency (benchmarks/bench_admission.py).
+
+/health, /metrics and the SSE stream are exempt: they spend no tokens and
+take no concurrency slot. A stream would otherwise hold a slot for its whole
+connection; open streams are capped per worker by MAVEN_STREAM_MAX_CLIENTS
+(maven_api.stream) instead.
+
+Usage:
+    from maven_api import ratelimit
+
+    ratelimit.init_app(app)
+"""
+import hashlib
+import logging
+import os
+import threading
+import time
+
+from flask import jsonify, request
+
+from database.circuit import CircuitOpenError, get_breaker
+
+logger = logging.getLogger(__name__)
+
+ENABLED = os.getenv('MAVEN_RATE_LIMIT_ENABLED', 'true').lower() == 'true'
+
+# (tokens per second, burst) per route class
+LIMITS = {
+    'read': (float(os.getenv('MAVEN_RATE_LIMIT_READ_RPS', 20)),
+             float(os.getenv('MAVEN_RATE_LIMIT_READ_BURST', 40))),
+    'write': (float(os.getenv('MAVEN_RATE_LIMIT_WRITE_RPS', 5)),
+              float(os.getenv('MAVEN_RATE_LIMIT_WRITE_BURST', 20))),
+}
+
+# In-flight requests per route class, per worker
+CONCURRENCY = {
+    'read': int(os.getenv('MAVEN_ADMISSION_READ_CONCURRENCY', 6)),
+    'write': int(os.getenv('MAVEN_ADMISSION_WRITE_CONCURRENCY', 4)),
+}
+# Seconds a request may wait for a concurrency slot before being shed
+ADMISSION_WAIT = float(os.getenv('MAVEN_ADMISSION_WAIT', 0.05))
+
+EXEMPT_PATHS = ('/health', '/metrics', '/api/stream')
+
+KEY_PREFIX = 'maven:ratelimit:'
+
+# Refill, take `cost` tokens if available, and report the wait otherwise.
+# Returns {allowed, retry_after seconds as a string} (Lua numbers would be
+# truncated to integers on the way out).
+_BUCKET_LUA = """
+local rate = tonumber(ARGV[1])
+local burst = tonumber(ARGV[2])
+local now = tonumber(ARGV[3])
+local cost = tonumber(ARGV[4])
+local state = redis.call('HMGET', KEYS[1], 't', 'ts')
+local tokens = tonumber(state[1])
+local ts = tonumber(state[2])
+if tokens == nil then
+    tokens = burst
+    ts = now
+end
+tokens = math.min(burst, tokens + math.max(0, now - ts) * rate)
+local allowed = 0
+local retry = 0
+if tokens >= cost then
+    tokens = tokens - cost
+    allowed = 1
+else
+    retry = (cost - tokens) / rate
+end
+redis.call('HSET', KEYS[1], 't', tokens, 'ts', now)
+redis.call('PEXPIRE', KEYS[1], math.ceil(burst / rate * 1000) + 1000)
+return {allowed, tostring(retry)}
+"""
+
+
+def route_class(method):
+    return 'read' if method in ('GET', 'HEAD', 'OPTIONS') else 'write'
+
+
+def client_id(req):
+    """Stable client identity: hashed API key, else remote address."""
+    api_key = req.headers.get('X-API-Key')
+    if api_key:
+        return 'key:' + hashlib.sha256(api_key.encode()).hexdigest()[:16]
+    return 'ip:' + (req.remote_addr or 'unknown')
+
+
+class TokenBuckets:
+    """Token buckets in Redis with an in-process fallback."""
+
+    # Local buckets kept before idle ones are pruned, and how long a bucket
+    # must be idle to be pruned (well past any burst / rate refill time)
+    LOCAL_MAX = 10000
+    IDLE_SECONDS = 300
+
+    def __init__(self, redis_client=None, breaker=None):
+        self._redis = redis_client
+        self._script = None
+        self._breaker = breaker or get_breaker('redis')
+        self._local = {}  # key -> (tokens, ts)
+        self._lock = threading.Lock()
+
+    def _client(self):
+        try:
+            self._breaker.before_call()
+        except CircuitOpenError:
+            return None
+        if self._redis is None:
+            try:
+                import redis
+                from maven_api.cache import REDIS_CONFIG
+                self._redis = redis.Redis(**REDIS_CONFIG)
+            except Exception as e:
+                self._mark_down(e)
+                return None
+        return self._redis
+
+    def _mark_down(self, error):
+        logger.warning(f"Rate limiter call to Redis failed, using per-worker buckets: {error}")
+        self._breaker.record_failure(error)
+
+    def hit(self, key, rate, burst, cost=1.0, now=None):
+        """Take `cost` tokens from `key`; returns (allowed, retry_after seconds)."""
+        now = time.time() if now is None else now
+        client = self._client()
+        if client is not None:
+            try:
+                if self._script is None:
+                    self._script = client.register_script(_BUCKET_LUA)
+                allowed, retry = self._script(keys=[KEY_PREFIX + key], args=[rate, burst, now, cost])
+                self._breaker.record_success()
+                return bool(int(allowed)), float(retry)
+            except Exception as e:
+                self._mark_down(e)
+        return self._hit_local(key, rate, burst, cost, now)
+
+    def _hit_local(self, key, rate, burst, cost, now):
+        with self._lock:
+            tokens, ts = self._local.get(key, (burst, now))
+            tokens = min(burst, tokens + max(0.0, now - ts) * rate)
+            if tokens >= cost:
+                self._local[key] = (tokens - cost, now)
+                allowed, retry = True, 0.0
+            else:
+                self._local[key] = (tokens, now)
+                allowed, retry = False, (cost - tokens) / rate
+            if len(self._local) > self.LOCAL_MAX:
+                self._prune(now)
+            return allowed, retry
+
+    def _prune(self, now):
+        """Drop idle buckets; they have refilled and carry no state."""
+        for key, (_, ts) in list(self._local.items()):
+            if now - ts > self.IDLE_SECONDS:
+                del self._local[key]
+
+
+class AdmissionController:
+    """Per-request rate limit and concurrency check with counters."""
+
+    def __init__(self, buckets=None, limits=None, concurrency=None, wait=None, enabled=None):
+        self.buckets = buckets or TokenBuckets()
+        self.limits = dict(LIMITS if limits is None else limits)
+        self.concurrency = dict(CONCURRENCY if concurrency is None else concurrency)
+        self.wait = ADMISSION_WAIT if wait is None else wait
+        self.enabled = ENABLED if enabled is None else enabled
+        self._slots = {cls: threading.BoundedSemaphore(n) for cls, n in self.concurrency.items()}
+        self._in_flight = {cls: 0 for cls in self.concurrency}
+        self._lock = threading.Lock()
+        self._stats = {cls: {'admitted': 0, 'rate_limited': 0, 'shed': 0} for cls in self.concurrency}
+
+    def _count(self, cls, stat):
+        with self._lock:
+            self._stats[cls][stat] += 1
+
+    def admit(self, client, cls):
+        """
+        Returns (None, None) when admitted (a slot is then held until
+        release(cls)), else (status, retry_after) for the rejection.
+        """
+        rate, burst = self.limits[cls]
+        allowed, retry_after = self.buckets.hit(f"{cls}:{client}", rate, burst)
+        if not allowed:
+            self._count(cls, 'rate_limited')
+            return 429, retry_after
+
+        if not self._slots[cls].acquire(timeout=self.wait):
+            self._count(cls, 'shed')
+            return 503, 1.0
+        with self._lock:
+            self._in_flight[cls] += 1
+            self._stats[cls]['admitted'] += 1
+        return None, None
+
+    def release(self, cls):
+        with self._lock:
+            self._in_flight[cls] -= 1
+        self._slots[cls].release()
+
+    def stats(self):
+        with self._lock:
+            return {
+                cls: dict(self._stats[cls], in_flight=self._in_flight[cls],
+                          concurrency=self.concurrency[cls],
+                          rate=self.limits[cls][0], burst=self.limits[cls][1])
+                for cls in self._stats
+            }
+
+
+controller = AdmissionController()
+
+
+# =============================================================================
+# Flask integration
+# =============================================================================
+
+# Route class whose slot this thread holds for the current request
+_held = threading.local()
+
+
+def _before():
+    if not controller.enabled or request.path.startswith(EXEMPT_PATHS):
+        return None
+    cls = route_class(request.method)
+    status, retry_after = controller.admit(client_id(request), cls)
+    if status is None:
+        _held.cls = cls
+        return None
+    error = 'Rate limit exceeded' if status == 429 else 'Server busy, retry shortly'
+    response = jsonify({'error': error, 'retry_after': round(retry_after, 3)})
+    response.status_code = status
+    response.headers['Retry-After'] = str(max(1, int(retry_after + 0.999)))
+    return response
+
+
+def _teardown(exc=None):
+    cls = getattr(_held, 'cls', None)
+    if cls is not None:
+        _held.cls = None
+        controller.release(cls)
+
+
+def stats_endpoint():
+    """Admission counters for this worker."""
+    return jsonify(controller.stats())
+
+
+def init_app(app, stats_path='/api/ratelimit/stats'):
+    """Register the admission hooks and the stats route on a Flask app."""
+    app.before_request(_before)
+    app.teardown_request(_teardown)
+    app.add_url_rule(stats_path, 'ratelimit_stats', stats_endpoint, methods=['GET'])
@@ -0,0 +1,72 @@
+"""
+Maven API launcher.
+
+Starts the Flask API either under gunicorn (production) or with the Flask
+development server (development), chosen by MAVEN_SERVER_MODE.
+
+Usage:
+    python -m maven_api.serve                      # production (default)
+    MAVEN_SERVER_MODE=development python -m maven_api.serve
+    python -m maven_api.serve --mode development --port 5010
+"""
+import argparse
+import os
+import sys
+from pathlib import Path
+
+
+ROOT_DIR = Path(__file__).parent.parent
+GUNICORN_CONF = Path(__file__).parent / 'gunicorn_conf.py'
+
+
+def run_production(port):
+    """Replace this process with a gunicorn master serving app:app."""
+    os.environ['MAVEN_API_PORT'] = str(port)
+    os.chdir(ROOT_DIR)
+    args = [
+        sys.executable, '-m', 'gunicorn',
+        '--config', str(GUNICORN_CONF),
+        'app:app',
+    ]
+    os.execv(sys.executable, args)
+
+
+def run_development(port):
+    """Run the single-process Flask dev server (reloader follows FLASK_DEBUG)."""
+    sys.path.insert(0, str(ROOT_DIR))
+    from app import app
+
+    debug = os.getenv('FLASK_DEBUG', '1') == '1'
+    app.run(host='0.0.0.0', port=port, debug=debug, threaded=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Run the Maven Flask API')
+    parser.add_argument(
+        '--mode',
+        choices=['production', 'development'],
+        default=os.getenv('MAVEN_SERVER_MODE', 'production'),
+        help='production = gunicorn workers, development = Flask dev server'
+    )
+    parser.add_argument(
+        '--port',
+        type=int,
+        default=int(os.getenv('MAVEN_API_PORT', 5002)),
+        help='Port to listen on (default: MAVEN_API_PORT or 5002)'
+    )
+    args = parser.parse_args()
+
+    print("=" * 70)
+    print("💎 MAVEN SERVICE STARTING 💎")
+    print("=" * 70)
+    print(f"Flask API: http://0.0.0.0:{args.port} ({args.mode})")
+    print("=" * 70, flush=True)
+
+    if args.mode == 'production':
+        run_production(args.port)
+    else:
+        run_development(args.port)
+
+
+if __name__ == '__main__':
+    main()
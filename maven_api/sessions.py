@@ -0,0 +1,133 @@
+"""
+Request-scoped database sessions for the Maven Flask API.
+
+Each request checks out at most one pooled connection, lazily, on the first
+call to get_request_connection(). The connection is bound to flask.g and is
+always returned to the pool in the app-context teardown, whether the handler
+succeeded, returned an error response or raised.
+
+Usage:
+    from maven_api.sessions import init_app, get_request_connection
+
+    init_app(app)
+
+    @app.route('/api/things')
+    def things():
+        conn = get_request_connection()
+        cursor = conn.cursor()
+        ...
+
+GET, HEAD and OPTIONS requests read from a replica (see DB_REPLICA_DSNS in
+database.connection) unless the client asks for the primary with an
+X-Read-Primary header or the maven_read_primary cookie, or the handler
+calls use_primary() before its first query. A successful write request
+that used the database sets that cookie for DB_READ_YOUR_WRITES_SECONDS,
+so a browser reads its own writes; other clients send the header.
+"""
+import logging
+
+from flask import g, request, has_request_context
+
+from database.connection import REPLICA_CONFIG, checkout, get_router, release, start_leak_detector
+
+
+logger = logging.getLogger(__name__)
+
+_G_KEY = 'maven_db_conn'
+_G_PRIMARY = 'maven_db_primary'
+_G_WROTE = 'maven_db_wrote'
+
+READ_METHODS = ('GET', 'HEAD', 'OPTIONS')
+READ_PRIMARY_COOKIE = 'maven_read_primary'
+READ_PRIMARY_HEADER = 'X-Read-Primary'
+
+
+def use_primary():
+    """Serve the rest of this request from the primary (call before get_request_connection())."""
+    setattr(g, _G_PRIMARY, True)
+
+
+def _readonly():
+    """True if the current request may read from a replica."""
+    if not has_request_context() or request.method not in READ_METHODS:
+        return False
+    return not (g.get(_G_PRIMARY)
+                or request.headers.get(READ_PRIMARY_HEADER)
+                or request.cookies.get(READ_PRIMARY_COOKIE))
+
+
+def reads_primary():
+    """True if the current request's reads go to the primary rather than a replica."""
+    return not _readonly()
+
+
+def get_request_connection():
+    """
+    Get the connection bound to the current request, checking one out if needed.
+
+    The checkout is labelled with the request endpoint so the pool's leak
+    detector can name the handler that is holding it.
+
+    Raises:
+        psycopg2.pool.PoolError: If no connection frees up within the checkout timeout
+        database.circuit.CircuitOpenError: While the database circuit is open
+    """
+    conn = g.get(_G_KEY)
+    if conn is None:
+        owner = None
+        if has_request_context():
+            owner = f"{request.method} {request.endpoint or request.path}"
+            setattr(g, _G_WROTE, request.method not in READ_METHODS)
+        conn = checkout(owner=owner, readonly=_readonly())
+        setattr(g, _G_KEY, conn)
+    return conn
+
+
+def release_request_connection(exc=None):
+    """
+    Return the request's connection to the pool.
+
+    Commits on success and rolls back if the request raised, mirroring
+    database.connection.get_db_connection(). A connection that is closed,
+    or cannot even be rolled back, is discarded instead of pooled.
+    """
+    conn = g.pop(_G_KEY, None)
+    if conn is None:
+        return
+
+    broken = False
+    try:
+        if exc is None:
+            conn.commit()
+        else:
+            conn.rollback()
+    except Exception as e:
+        logger.warning(f"Failed to finish request transaction: {e}")
+        try:
+            conn.rollback()
+        except Exception:
+            broken = True
+    finally:
+        release(conn, close=broken or bool(conn.closed))
+
+
+def mark_read_primary(response):
+    """After a successful write request, keep the client's reads on the primary for a while."""
+    if g.get(_G_WROTE) and response.status_code < 400 and get_router() is not None:
+        response.set_cookie(READ_PRIMARY_COOKIE, '1', httponly=True, samesite='Lax',
+                            max_age=int(REPLICA_CONFIG['read_your_writes_seconds']))
+    return response
+
+
+def init_app(app, leak_detector=True):
+    """
+    Register the session teardown and read-your-writes cookie with a Flask app.
+
+    Args:
+        app: Flask application
+        leak_detector: Start the background leak detector thread
+    """
+    app.teardown_appcontext(release_request_connection)
+    app.after_request(mark_read_primary)
+    if leak_detector:
+        start_leak_detector()
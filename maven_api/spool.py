@@ -0,0 +1,478 @@
+"""
+Indexed notification spool.
+
+Notifications used to be one signal_<second>.json file each, so two alerts
+in the same second overwrote each other, and every pending check globbed
+and parsed the whole directory. The spool keeps them in a SQLite database
+next to the old files (notifications/spool.sqlite3):
+
+- ids are uuid4-based, so they never collide;
+- (status, next_attempt_at) and (status, created_at, seq) indexes serve the
+  due-message lookup and paged listings;
+- a status_counts table kept by triggers gives O(1) counts per status;
+- every state change is one conditional UPDATE inside a write transaction,
+  so it is atomic across threads and gunicorn worker processes.
+
+    pending --claim--> sending --sent--> sent
+                              --retry--> pending
+                              --fail---> failed
+
+A claim is a lease: if the process dies mid-send, the message returns to
+pending once `claimed_until` passes.
+
+Existing signal_*.json files are imported once (migrate_json); the files
+themselves are left in place because they are git-tracked history. Ones that
+were never sent are imported as failed, not pending, so the dispatcher does
+not mail out old alerts on first start, unless resending is asked for.
+
+The digest_items table buffers opportunities per recipient, one row per
+dedupe key, until flush_digests() turns them into a single 'digest'
+notification.
+"""
+import json
+import logging
+import sqlite3
+import threading
+import time
+import uuid
+from datetime import datetime
+from pathlib import Path
+
+
+logger = logging.getLogger(__name__)
+
+SPOOL_FILENAME = 'spool.sqlite3'
+
+STATUS_PENDING = 'pending'
+STATUS_SENDING = 'sending'
+STATUS_SENT = 'sent'
+STATUS_FAILED = 'failed'
+STATUSES = (STATUS_PENDING, STATUS_SENDING, STATUS_SENT, STATUS_FAILED)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS notifications (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    id TEXT NOT NULL UNIQUE,
+    type TEXT NOT NULL,
+    status TEXT NOT NULL CHECK (status IN ('pending', 'sending', 'sent', 'failed')),
+    created_at REAL NOT NULL,
+    recipient TEXT NOT NULL,
+    subject TEXT NOT NULL,
+    html_content TEXT,
+    text_content TEXT,
+    opportunities TEXT NOT NULL DEFAULT '[]',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    next_attempt_at REAL NOT NULL,
+    claimed_until REAL,
+    last_error TEXT,
+    sent_at REAL
+);
+
+CREATE INDEX IF NOT EXISTS idx_notifications_due
+    ON notifications(status, next_attempt_at);
+CREATE INDEX IF NOT EXISTS idx_notifications_list
+    ON notifications(status, created_at, seq);
+
+CREATE TABLE IF NOT EXISTS status_counts (
+    status TEXT PRIMARY KEY,
+    n INTEGER NOT NULL
+);
+INSERT OR IGNORE INTO status_counts (status, n) VALUES
+    ('pending', 0), ('sending', 0), ('sent', 0), ('failed', 0);
+
+CREATE TRIGGER IF NOT EXISTS trg_notifications_insert AFTER INSERT ON notifications
+BEGIN
+    UPDATE status_counts SET n = n + 1 WHERE status = NEW.status;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_notifications_status AFTER UPDATE OF status ON notifications
+WHEN OLD.status <> NEW.status
+BEGIN
+    UPDATE status_counts SET n = n - 1 WHERE status = OLD.status;
+    UPDATE status_counts SET n = n + 1 WHERE status = NEW.status;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_notifications_delete AFTER DELETE ON notifications
+BEGIN
+    UPDATE status_counts SET n = n - 1 WHERE status = OLD.status;
+END;
+
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+
+-- Opportunities waiting to be coalesced into a per-recipient digest
+CREATE TABLE IF NOT EXISTS digest_items (
+    recipient TEXT NOT NULL,
+    key TEXT NOT NULL,
+    opportunity TEXT NOT NULL,
+    confidence REAL NOT NULL,
+    threshold REAL NOT NULL,
+    first_seen REAL NOT NULL,
+    last_seen REAL NOT NULL,
+    hits INTEGER NOT NULL DEFAULT 1,
+    PRIMARY KEY (recipient, key)
+);
+
+CREATE INDEX IF NOT EXISTS idx_notifications_recipient
+    ON notifications(recipient, type, created_at);
+"""
+
+_COLUMNS = ('seq', 'id', 'type', 'status', 'created_at', 'recipient', 'subject',
+            'html_content', 'text_content', 'opportunities', 'attempts',
+            'next_attempt_at', 'claimed_until', 'last_error', 'sent_at')
+_SELECT = f"SELECT {', '.join(_COLUMNS)} FROM notifications"
+
+
+def _iso(ts):
+    return datetime.fromtimestamp(ts).isoformat() if ts is not None else None
+
+
+def _to_record(row):
+    """Row -> dict in the shape of the old JSON files, plus spool fields."""
+    record = dict(zip(_COLUMNS, row))
+    record['opportunities'] = json.loads(record['opportunities'])
+    record['timestamp'] = _iso(record['created_at'])
+    record['sent'] = record['status'] == STATUS_SENT
+    record['sent_at'] = _iso(record['sent_at'])
+    return record
+
+
+class NotificationSpool:
+    """SQLite-backed notification store shared by all worker processes."""
+
+    def __init__(self, directory, lease_seconds=120.0):
+        self.directory = Path(directory)
+        self.path = self.directory / SPOOL_FILENAME
+        self.lease_seconds = lease_seconds
+        self._local = threading.local()
+        self._init_lock = threading.Lock()
+        self._ready = False
+
+    # -------------------------------------------------------------------------
+    # Connection plumbing
+    # -------------------------------------------------------------------------
+
+    def _conn(self):
+        """One connection per thread; created (with the schema) on first use."""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=10, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=FULL")
+            with self._init_lock:
+                if not self._ready:
+                    conn.executescript(SCHEMA)
+                    self._ready = True
+            self._local.conn = conn
+        return conn
+
+    def _write(self, fn):
+        """Run fn(conn) inside BEGIN IMMEDIATE ... COMMIT."""
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            result = fn(conn)
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+        return result
+
+    # -------------------------------------------------------------------------
+    # Writes
+    # -------------------------------------------------------------------------
+
+    @staticmethod
+    def _insert(conn, now, recipient, subject, html_content, text_content, opportunities, type):
+        # Whole microseconds, so a created_at survives the datetime round trip
+        # through a pagination cursor unchanged
+        now = datetime.fromtimestamp(now).timestamp()
+        message_id = uuid.uuid4().hex
+        conn.execute(
+            """
+            INSERT INTO notifications (id, type, status, created_at, recipient, subject,
+                                       html_content, text_content, opportunities, next_attempt_at)
+            VALUES (?, ?, 'pending', ?, ?, ?, ?, ?, ?, ?)
+            """,
+            (message_id, type, now, recipient, subject, html_content, text_content,
+             json.dumps(opportunities, default=str), now),
+        )
+        return message_id
+
+    def add(self, recipient, subject, html_content, text_content, opportunities,
+            type='high_confidence_signal'):
+        """Insert a new pending notification and return its record."""
+        now = time.time()
+        message_id = self._write(lambda conn: self._insert(
+            conn, now, recipient, subject, html_content, text_content, opportunities, type
+        ))
+        return self.get(message_id)
+
+    def claim_due(self, now=None):
+        """
+        Atomically move the most overdue pending message to 'sending'.
+
+        Expired leases are returned to pending first. Returns the claimed
+        record (attempts already incremented) or None.
+        """
+        now = time.time() if now is None else now
+
+        def claim(conn):
+            conn.execute(
+                "UPDATE notifications SET status = 'pending', claimed_until = NULL "
+                "WHERE status = 'sending' AND claimed_until < ?", (now,)
+            )
+            row = conn.execute(
+                "SELECT id FROM notifications WHERE status = 'pending' AND next_attempt_at <= ? "
+                "ORDER BY next_attempt_at LIMIT 1", (now,)
+            ).fetchone()
+            if row is None:
+                return None
+            conn.execute(
+                "UPDATE notifications SET status = 'sending', claimed_until = ?, "
+                "attempts = attempts + 1 WHERE id = ? AND status = 'pending'",
+                (now + self.lease_seconds, row[0]),
+            )
+            return row[0]
+
+        message_id = self._write(claim)
+        return self.get(message_id) if message_id else None
+
+    def _finish(self, message_id, status, uncount=False, **fields):
+        assignments = ''.join(f", {k} = ?" for k in fields)
+        if uncount:
+            assignments += ", attempts = attempts - 1"
+        sql = (f"UPDATE notifications SET status = ?, claimed_until = NULL{assignments} "
+               f"WHERE id = ? AND status = 'sending'")
+        cursor = self._write(lambda conn: conn.execute(
+            sql, (status, *fields.values(), message_id)
+        ))
+        return cursor.rowcount == 1
+
+    def mark_sent(self, message_id):
+        return self._finish(message_id, STATUS_SENT, sent_at=time.time(), last_error=None)
+
+    def mark_retry(self, message_id, next_attempt_at, error, attempted=True):
+        """Back to pending; attempted=False hands back a claim that sent nothing, uncounted."""
+        return self._finish(message_id, STATUS_PENDING, uncount=not attempted,
+                            next_attempt_at=next_attempt_at, last_error=error)
+
+    def mark_failed(self, message_id, error):
+        return self._finish(message_id, STATUS_FAILED, last_error=error)
+
+    # -------------------------------------------------------------------------
+    # Reads
+    # -------------------------------------------------------------------------
+
+    def get(self, message_id):
+        row = self._conn().execute(f"{_SELECT} WHERE id = ?", (message_id,)).fetchone()
+        return _to_record(row) if row else None
+
+    def counts(self):
+        """{status: count}, read from the trigger-maintained counts table."""
+        return dict(self._conn().execute("SELECT status, n FROM status_counts").fetchall())
+
+    def next_due(self):
+        """Earliest next_attempt_at among pending messages, or None."""
+        row = self._conn().execute(
+            "SELECT MIN(next_attempt_at) FROM notifications WHERE status = 'pending'"
+        ).fetchone()
+        return row[0]
+
+    def list(self, statuses, limit=50, after=None):
+        """
+        Messages in the given statuses, oldest first.
+
+        `after` is a (created datetime, seq) key from the previous page, as
+        decoded by maven_api.pagination; pass limit + 1 to detect more.
+        """
+        placeholders = ', '.join('?' for _ in statuses)
+        params = list(statuses)
+        keyset = ''
+        if after is not None:
+            keyset = "AND (created_at, seq) > (?, ?)"
+            params += [after[0].timestamp(), after[1]]
+        rows = self._conn().execute(
+            f"{_SELECT} WHERE status IN ({placeholders}) {keyset} "
+            f"ORDER BY created_at, seq LIMIT ?",
+            (*params, limit),
+        ).fetchall()
+        return [_to_record(row) for row in rows]
+
+    # -------------------------------------------------------------------------
+    # Digests
+    # -------------------------------------------------------------------------
+
+    def buffer(self, recipient, items, threshold, now=None):
+        """
+        Hold opportunities for the recipient's next digest.
+
+        `items` is a list of (dedupe key, opportunity). An opportunity whose
+        key is already buffered is merged into it: the hit count goes up and
+        the higher-confidence version is kept. Returns (new, merged).
+        """
+        now = time.time() if now is None else now
+
+        def add_items(conn):
+            new = 0
+            for key, opportunity in items:
+                exists = conn.execute(
+                    "SELECT 1 FROM digest_items WHERE recipient = ? AND key = ?", (recipient, key)
+                ).fetchone()
+                new += exists is None
+                conn.execute(
+                    """
+                    INSERT INTO digest_items (recipient, key, opportunity, confidence, threshold,
+                                              first_seen, last_seen)
+                    VALUES (?, ?, ?, ?, ?, ?, ?)
+                    ON CONFLICT (recipient, key) DO UPDATE SET
+                        hits = hits + 1,
+                        last_seen = excluded.last_seen,
+                        opportunity = CASE WHEN excluded.confidence >= confidence
+                                           THEN excluded.opportunity ELSE opportunity END,
+                        confidence = MAX(confidence, excluded.confidence),
+                        threshold = MIN(threshold, excluded.threshold)
+                    """,
+                    (recipient, key, json.dumps(opportunity, default=str),
+                     float(opportunity.get('maven_confidence') or 0), threshold, now, now),
+                )
+            return new
+
+        new = self._write(add_items)
+        return new, len(items) - new
+
+    def _digest_due(self, conn, recipient, first_seen, now, window, max_per_hour):
+        """When the recipient's buffered digest may go out: window end, or later if capped."""
+        due = first_seen + window
+        if max_per_hour:
+            recent = conn.execute(
+                "SELECT created_at FROM notifications WHERE recipient = ? AND type = 'digest' "
+                "AND created_at > ? ORDER BY created_at DESC LIMIT ?",
+                (recipient, now - 3600, max_per_hour),
+            ).fetchall()
+            if len(recent) >= max_per_hour:
+                due = max(due, recent[-1][0] + 3600)
+        return due
+
+    def next_digest_due(self, window, max_per_hour=None, now=None):
+        """Earliest time any buffered digest may be flushed, or None."""
+        now = time.time() if now is None else now
+        conn = self._conn()
+        rows = conn.execute(
+            "SELECT recipient, MIN(first_seen) FROM digest_items GROUP BY recipient"
+        ).fetchall()
+        dues = [self._digest_due(conn, r, first, now, window, max_per_hour) for r, first in rows]
+        return min(dues) if dues else None
+
+    def flush_digests(self, render, window, max_per_hour=None, now=None):
+        """
+        Turn every due buffer into one pending 'digest' notification.
+
+        A buffer is due `window` seconds after its first opportunity arrived,
+        unless the recipient already got max_per_hour digests in the last
+        hour; it then keeps absorbing opportunities until the cap allows.
+        `render(opportunities, threshold)` returns (subject, html, text) and
+        runs inside the write transaction, so a buffer is either still
+        buffered or queued - never lost or sent twice. Returns the new ids.
+        """
+        now = time.time() if now is None else now
+
+        def flush(conn):
+            ids = []
+            buffered = conn.execute(
+                "SELECT recipient, MIN(first_seen) FROM digest_items GROUP BY recipient"
+            ).fetchall()
+            for recipient, first_seen in buffered:
+                if self._digest_due(conn, recipient, first_seen, now, window, max_per_hour) > now:
+                    continue
+                rows = conn.execute(
+                    "SELECT opportunity, hits, threshold FROM digest_items WHERE recipient = ? "
+                    "ORDER BY confidence DESC, first_seen", (recipient,)
+                ).fetchall()
+                opportunities = []
+                for raw, hits, _ in rows:
+                    opportunity = json.loads(raw)
+                    opportunity['alert_count'] = hits
+                    opportunities.append(opportunity)
+                threshold = min(row[2] for row in rows)
+                subject, html_content, text_content = render(opportunities, threshold)
+                conn.execute("DELETE FROM digest_items WHERE recipient = ?", (recipient,))
+                ids.append(self._insert(conn, now, recipient, subject, html_content,
+                                        text_content, opportunities, 'digest'))
+            return ids
+
+        return self._write(flush)
+
+    def buffered(self):
+        """Number of opportunities waiting for a digest."""
+        return self._conn().execute("SELECT COUNT(*) FROM digest_items").fetchone()[0]
+
+    # -------------------------------------------------------------------------
+    # Migration
+    # -------------------------------------------------------------------------
+
+    def migrate_json(self, resend=False):
+        """
+        Import the legacy signal_*.json files once.
+
+        Each file keeps its name (minus .json) as id. Unsent ones are
+        imported as failed, or as pending (sent by the dispatcher) with
+        resend=True. Runs in a single transaction and records completion in
+        the meta table, so later starts - in any worker - skip it.
+        """
+        files = sorted(self.directory.glob('signal_*.json')) if self.directory.exists() else []
+
+        def migrate(conn):
+            if conn.execute("SELECT 1 FROM meta WHERE key = 'json_migrated'").fetchone():
+                return 0
+            imported = 0
+            for path in files:
+                try:
+                    with open(path) as f:
+                        data = json.load(f)
+                    created = datetime.fromisoformat(data['timestamp']).timestamp()
+                except (OSError, ValueError, KeyError) as e:
+                    logger.error(f"Skipping unreadable notification {path.name}: {e}")
+                    continue
+                sent = bool(data.get('sent'))
+                status = data.get('status') if data.get('status') in STATUSES else None
+                status = STATUS_SENT if sent else (status or STATUS_PENDING)
+                last_error = data.get('last_error')
+                if status in (STATUS_PENDING, STATUS_SENDING):
+                    status = STATUS_PENDING if resend else STATUS_FAILED
+                    if not resend:
+                        last_error = 'legacy notification, not resent on import'
+                sent_at = data.get('sent_at')
+                if sent_at:
+                    try:
+                        sent_at = datetime.fromisoformat(sent_at.replace('Z', '+00:00')).timestamp()
+                    except ValueError:
+                        sent_at = None
+                # Some old files hold a repr() string here; it is kept as a JSON string
+                opportunities = json.dumps(data.get('opportunities', []), default=str)
+                cursor = conn.execute(
+                    """
+                    INSERT OR IGNORE INTO notifications
+                        (id, type, status, created_at, recipient, subject, html_content,
+                         text_content, opportunities, attempts, next_attempt_at, last_error, sent_at)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                    """,
+                    (path.stem, data.get('type', 'high_confidence_signal'), status, created,
+                     data.get('recipient', ''), data.get('subject', ''), data.get('html_content'),
+                     data.get('text_content'), opportunities, data.get('attempts', 0),
+                     data.get('next_attempt_at', created), last_error,
+                     sent_at if sent else None),
+                )
+                imported += cursor.rowcount
+            conn.execute(
+                "INSERT INTO meta (key, value) VALUES ('json_migrated', ?)", (datetime.now().isoformat(),)
+            )
+            return imported
+
+        imported = self._write(migrate)
+        if imported:
+            logger.info(f"Imported {imported} legacy notification file(s) into {self.path}")
+        return imported
@@ -0,0 +1,454 @@
+"""
+Server-Sent Events feed for treasury, signal and watchlist updates.
+
+Writes are announced by Postgres itself: AFTER INSERT triggers on
+maven_treasury_state, maven_trading_signals and maven_market_snapshots call
+pg_notify('maven_events', ...) (see database/migrations/0003_treasury.sql), so
+rows written by any process - this API, moha-bot, the watchlist loop - reach
+every subscriber. Each worker process holds ONE listening connection and fans
+events out to its SSE clients through per-client queues, instead of every
+dashboard polling the REST endpoints.
+
+Event ids are a cursor over all three tables, e.g. ``t12.s40.w9001`` (last
+treasury / signal / market snapshot id seen). A reconnecting client sends it
+back as Last-Event-ID and the missed rows are replayed from the database
+before live events resume, so resume works across workers and restarts.
+
+Row ids are handed out before commit, so two concurrent inserts can commit
+(and NOTIFY) in the opposite order. Each stream therefore holds live events
+for MAVEN_STREAM_REORDER_MS and releases them in id order: the cursor only
+moves past an id once every lower id that commits within that window has
+been sent. A row that commits later still is sent when it arrives, without
+moving the cursor back; only a reconnect in between can miss it.
+
+Usage:
+    from maven_api import stream
+
+    sub = stream.broker.subscribe(('signals',), coins={'BTC'})
+    for chunk in stream.event_stream(sub, cursor, backlog): ...
+"""
+import json
+import logging
+import os
+import heapq
+import queue
+import select
+import threading
+import time
+from datetime import date, datetime
+from decimal import Decimal
+
+
+logger = logging.getLogger(__name__)
+
+CHANNEL = 'maven_events'
+
+TOPICS = ('treasury', 'signals', 'watchlist')
+
+# Cursor prefix per topic: "t<id>.s<id>.w<id>"
+_CURSOR_KEYS = {'treasury': 't', 'signals': 's', 'watchlist': 'w'}
+_CURSOR_TOPICS = {v: k for k, v in _CURSOR_KEYS.items()}
+
+# Seconds between keep-alive comments on an idle stream
+HEARTBEAT_SECONDS = float(os.getenv('MAVEN_STREAM_HEARTBEAT', 15))
+# Rows replayed per topic on resume; older gaps fall back to the REST endpoints
+BACKLOG_LIMIT = int(os.getenv('MAVEN_STREAM_BACKLOG', 500))
+# Events buffered per client before a slow client is disconnected
+QUEUE_SIZE = int(os.getenv('MAVEN_STREAM_QUEUE', 1000))
+# How long live events are held so a lower id committing just after a higher
+# one is still sent first, in milliseconds
+REORDER_SECONDS = int(os.getenv('MAVEN_STREAM_REORDER_MS', 500)) / 1000
+# Reconnect delay suggested to EventSource clients, in milliseconds
+RETRY_MS = int(os.getenv('MAVEN_STREAM_RETRY_MS', 3000))
+# Open streams per worker process. Each holds a gthread worker thread for as
+# long as its client stays connected, so the default leaves half of
+# MAVEN_API_THREADS free for the REST API
+MAX_CLIENTS = int(os.getenv('MAVEN_STREAM_MAX_CLIENTS',
+                            max(1, int(os.getenv('MAVEN_API_THREADS', 4)) // 2)))
+
+# Event keys per topic; must match the json_build_object keys in
+# maven_notify_event() and the column order of BACKLOG_SQL
+BACKLOG_COLUMNS = {
+    'treasury': ('id', 'account_value_usd', 'withdrawable_usd', 'unrealized_pnl_usd',
+                 'active_positions', 'value_change_24h_usd', 'snapshot_at'),
+    'signals': ('id', 'coin', 'source', 'signal_type', 'strength', 'reasoning',
+                'generated_at', 'valid_until'),
+    'watchlist': ('id', 'coin', 'mid_price', 'funding_rate', 'volume_24h_usd', 'snapshot_at'),
+}
+
+BACKLOG_SQL = {
+    'treasury': """
+        SELECT id, account_value_usd, withdrawable_usd, unrealized_pnl_usd,
+               active_positions, value_change_24h_usd, snapshot_at
+        FROM maven_treasury_state
+        WHERE id > %s
+        ORDER BY id
+        LIMIT %s
+    """,
+    'signals': """
+        SELECT id, coin, signal_source, signal_type, strength,
+               left(reasoning, 1000), generated_at, valid_until
+        FROM maven_trading_signals
+        WHERE id > %s
+        ORDER BY id
+        LIMIT %s
+    """,
+    'watchlist': """
+        SELECT ms.id, ms.coin, ms.mid_price, ms.funding_rate,
+               ms.volume_24h_usd, ms.snapshot_at
+        FROM maven_market_snapshots ms
+        JOIN maven_watchlist w ON w.coin = ms.coin AND w.active
+        WHERE ms.id > %s
+        ORDER BY ms.id
+        LIMIT %s
+    """,
+}
+
+LATEST_IDS_SQL = """
+    SELECT
+        (SELECT COALESCE(MAX(id), 0) FROM maven_treasury_state),
+        (SELECT COALESCE(MAX(id), 0) FROM maven_trading_signals),
+        (SELECT COALESCE(MAX(id), 0) FROM maven_market_snapshots)
+"""
+
+# Queued to a subscription to end its stream (overflow or lost LISTEN)
+_CLOSE = object()
+
+
+# =============================================================================
+# Parsing and formatting
+# =============================================================================
+
+def parse_topics(value):
+    """Parse a comma separated ?topics= value; empty means all topics."""
+    if not value:
+        return TOPICS
+    topics = tuple(t.strip() for t in value.split(',') if t.strip())
+    unknown = [t for t in topics if t not in TOPICS]
+    if unknown:
+        raise ValueError(f"Unknown topics: {', '.join(unknown)}")
+    return topics
+
+
+def parse_cursor(value):
+    """
+    Parse a Last-Event-ID such as ``t12.s40.w9001`` into {topic: id}.
+
+    Returns None for a missing or malformed id, so the caller starts fresh.
+    """
+    if not value:
+        return None
+    cursor = {}
+    try:
+        for part in value.strip().split('.'):
+            topic = _CURSOR_TOPICS[part[0]]
+            cursor[topic] = int(part[1:])
+    except (KeyError, IndexError, ValueError):
+        return None
+    if set(cursor) != set(TOPICS):
+        return None
+    return cursor
+
+
+def format_cursor(cursor):
+    return '.'.join(f"{_CURSOR_KEYS[t]}{cursor[t]}" for t in TOPICS)
+
+
+def _json_default(value):
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def format_event(cursor, topic, data):
+    """Render one SSE frame."""
+    payload = json.dumps(data, default=_json_default, separators=(',', ':'))
+    return f"id: {format_cursor(cursor)}\nevent: {topic}\ndata: {payload}\n\n"
+
+
+# =============================================================================
+# Database helpers
+# =============================================================================
+
+def latest_cursor(conn):
+    """Cursor pointing at the newest row of every topic."""
+    with conn.cursor() as cur:
+        cur.execute(LATEST_IDS_SQL)
+        row = cur.fetchone()
+    return dict(zip(TOPICS, (int(v or 0) for v in row)))
+
+
+def load_backlog(conn, cursor, topics, limit=None):
+    """
+    Fetch rows written after ``cursor`` for the given topics.
+
+    Returns [(topic, data)] ordered by id within each topic.
+    """
+    limit = limit or BACKLOG_LIMIT
+    events = []
+    with conn.cursor() as cur:
+        for topic in topics:
+            cur.execute(BACKLOG_SQL[topic], (cursor[topic], limit))
+            columns = BACKLOG_COLUMNS[topic]
+            events.extend((topic, dict(zip(columns, row))) for row in cur.fetchall())
+    return events
+
+
+# =============================================================================
+# Broker
+# =============================================================================
+
+class Subscription:
+    """One SSE client: topic/coin filters plus a bounded event queue."""
+
+    def __init__(self, topics, coins=None, maxsize=None):
+        self.topics = frozenset(topics)
+        self.coins = frozenset(coins) if coins else None
+        self.queue = queue.Queue(maxsize=maxsize or QUEUE_SIZE)
+
+    def wants(self, topic, data):
+        if topic not in self.topics:
+            return False
+        if self.coins is not None and 'coin' in data:
+            return data['coin'] in self.coins
+        return True
+
+    def offer(self, item):
+        """Queue an event; returns False if the client has fallen behind."""
+        try:
+            self.queue.put_nowait(item)
+            return True
+        except queue.Full:
+            return False
+
+    def close(self):
+        """End the stream; the client reconnects and resumes from the database."""
+        try:
+            self.queue.put_nowait(_CLOSE)
+        except queue.Full:
+            # Drain one slot so the sentinel always fits
+            try:
+                self.queue.get_nowait()
+            except queue.Empty:
+                pass
+            self.queue.put_nowait(_CLOSE)
+
+
+class StreamsFull(Exception):
+    """Raised by EventBroker.subscribe() when this worker serves max_clients streams already."""
+
+
+class EventBroker:
+    """
+    Fans pg_notify events out to in-process subscriptions.
+
+    The LISTEN connection is opened lazily on the first subscription and
+    kept by a daemon thread that reconnects with back-off. When the listener
+    reconnects, events may have been missed, so every open stream is closed
+    and clients resume from their Last-Event-ID.
+    """
+
+    def __init__(self, listen=True, reconnect_seconds=5.0, max_clients=None):
+        self.listen = listen
+        self.reconnect_seconds = reconnect_seconds
+        self.max_clients = max_clients or MAX_CLIENTS
+        self._subs = set()
+        self._lock = threading.Lock()
+        self._thread = None
+        self._stats = {'published': 0, 'dropped_clients': 0, 'reconnects': 0, 'rejected': 0}
+
+    def subscribe(self, topics, coins=None):
+        """Register a client; raises StreamsFull past max_clients."""
+        sub = Subscription(topics, coins)
+        with self._lock:
+            if len(self._subs) >= self.max_clients:
+                self._stats['rejected'] += 1
+                raise StreamsFull(f"{len(self._subs)} event streams already open on this worker")
+            self._subs.add(sub)
+            if self.listen and self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._listen_forever, name='maven-event-listener', daemon=True
+                )
+                self._thread.start()
+        return sub
+
+    def unsubscribe(self, sub):
+        with self._lock:
+            self._subs.discard(sub)
+
+    def publish(self, topic, data):
+        """Deliver an event to every matching subscription in this process."""
+        with self._lock:
+            subs = list(self._subs)
+            self._stats['published'] += 1
+        for sub in subs:
+            if sub.wants(topic, data) and not sub.offer((topic, data)):
+                logger.warning("SSE client fell behind; closing stream")
+                self.unsubscribe(sub)
+                sub.close()
+                with self._lock:
+                    self._stats['dropped_clients'] += 1
+
+    def close_all(self):
+        with self._lock:
+            subs = list(self._subs)
+            self._subs.clear()
+        for sub in subs:
+            sub.close()
+
+    def stats(self):
+        with self._lock:
+            return dict(self._stats, subscribers=len(self._subs), max_clients=self.max_clients,
+                        listening=self._thread is not None and self._thread.is_alive())
+
+    def dispatch(self, payload):
+        """Handle one raw pg_notify payload."""
+        try:
+            message = json.loads(payload)
+            topic, data = message['topic'], message['data']
+        except (ValueError, KeyError, TypeError) as e:
+            logger.warning(f"Ignoring malformed {CHANNEL} payload: {e}")
+            return
+        if topic in TOPICS:
+            self.publish(topic, data)
+
+    # -------------------------------------------------------------------------
+    # LISTEN loop
+    # -------------------------------------------------------------------------
+
+    def _listen_forever(self):
+        first = True
+        while True:
+            try:
+                if not first:
+                    with self._lock:
+                        self._stats['reconnects'] += 1
+                    self.close_all()
+                first = False
+                self._listen_once()
+            except Exception as e:
+                logger.error(f"Event listener error: {e}")
+            time.sleep(self.reconnect_seconds)
+
+    def _listen_once(self):
+        import psycopg2
+        from database.connection import DB_CONFIG
+
+        conn = psycopg2.connect(**DB_CONFIG)
+        try:
+            conn.autocommit = True
+            with conn.cursor() as cur:
+                cur.execute(f"LISTEN {CHANNEL}")
+            logger.info(f"Listening on {CHANNEL}")
+            while True:
+                if select.select([conn], [], [], HEARTBEAT_SECONDS) == ([], [], []):
+                    continue
+                conn.poll()
+                while conn.notifies:
+                    self.dispatch(conn.notifies.pop(0).payload)
+        finally:
+            conn.close()
+
+
+broker = EventBroker(listen=os.getenv('MAVEN_STREAM_ENABLED', 'true').lower() == 'true')
+
+
+# =============================================================================
+# SSE generator
+# =============================================================================
+
+class _Reorder:
+    """
+    Live events held for `hold` seconds and released in id order per topic.
+
+    Remembers the ids it sent recently, so a live copy of a backlog row is
+    dropped while a row that committed late (below the cursor, never sent)
+    still goes out.
+    """
+
+    def __init__(self, cursor, hold):
+        self.cursor = dict(cursor)
+        self.hold = hold
+        self._pending = []
+        self._sent = {topic: {} for topic in TOPICS}
+        self._remember = max(BACKLOG_LIMIT, QUEUE_SIZE)
+
+    def sent(self, topic, event_id):
+        """Record an id as sent; False if it was sent already."""
+        sent = self._sent[topic]
+        if event_id in sent:
+            return False
+        sent[event_id] = None
+        if len(sent) > self._remember:
+            del sent[next(iter(sent))]
+        self.cursor[topic] = max(self.cursor[topic], event_id)
+        return True
+
+    def add(self, topic, data, now):
+        heapq.heappush(self._pending, (now + self.hold, int(data['id']), topic, data))
+
+    def wait(self, now, default):
+        """Seconds until the next held event is due (at most `default`)."""
+        if not self._pending:
+            return default
+        return max(0.0, min(default, min(due for due, *_ in self._pending) - now))
+
+    def release(self, now):
+        """
+        Yield (topic, data) for held events whose window has passed, and every
+        lower id of the same topic held with them, in id order.
+        """
+        due = {}
+        for due_at, event_id, topic, _ in self._pending:
+            if due_at <= now:
+                due[topic] = max(due.get(topic, event_id), event_id)
+        if not due:
+            return
+        ready = sorted((event_id, topic, data) for _, event_id, topic, data in self._pending
+                       if event_id <= due.get(topic, -1))
+        self._pending = [item for item in self._pending if item[1] > due.get(item[2], -1)]
+        heapq.heapify(self._pending)
+        for event_id, topic, data in ready:
+            if self.sent(topic, event_id):
+                yield topic, data
+
+
+def event_stream(sub, cursor, backlog=(), heartbeat=None, reorder=None):
+    """
+    Yield SSE frames: the replayed backlog, then live events.
+
+    Live events are held for `reorder` seconds (REORDER_SECONDS) and sent in
+    id order; ones already sent from the backlog are skipped. The
+    subscription is released when the client goes away.
+    """
+    heartbeat = heartbeat or HEARTBEAT_SECONDS
+    held = _Reorder(cursor, REORDER_SECONDS if reorder is None else reorder)
+    try:
+        yield f"retry: {RETRY_MS}\n\n"
+        for topic, data in backlog:
+            held.sent(topic, int(data['id']))
+            if sub.wants(topic, data):
+                yield format_event(held.cursor, topic, data)
+        idle_since = time.monotonic()
+        while True:
+            now = time.monotonic()
+            for topic, data in held.release(now):
+                idle_since = now
+                yield format_event(held.cursor, topic, data)
+            try:
+                item = sub.queue.get(timeout=held.wait(now, heartbeat))
+            except queue.Empty:
+                if time.monotonic() - idle_since >= heartbeat:
+                    idle_since = time.monotonic()
+                    yield ": keepalive\n\n"
+                continue
+            if item is _CLOSE:
+                for topic, data in held.release(float('inf')):
+                    yield format_event(held.cursor, topic, data)
+                return
+            topic, data = item
+            held.add(topic, data, time.monotonic())
+    finally:
+        broker.unsubscribe(sub)
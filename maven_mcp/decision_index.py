@@ -0,0 +1,152 @@
+"""
+In-memory index of decision record files, newest first.
+
+Both the MCP resource (maven://decisions) and the Flask mirror endpoint need
+"the latest N decisions". Listing, stat-ing and sorting the whole directory
+on every read is O(total decisions); this index is built once per process,
+kept sorted by decision timestamp, and only rescanned when the directory's
+own mtime changes (i.e. a file was added, removed or renamed). Rescans diff
+the listing against the index, so only new names are parsed and inserted.
+
+Usage:
+    from maven_mcp.decision_index import get_decision_index
+
+    index = get_decision_index(PATHS["decisions_dir"], prefix="decision_")
+    for path in index.latest(10):
+        ...
+"""
+import bisect
+import hashlib
+import os
+import re
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+
+# decision_YYYYMMDD_HHMMSS.md (as written by tools._record_decision)
+_FILENAME_TIME = re.compile(r"(\d{8})_(\d{6})")
+
+# Directory mtimes younger than this are not trusted as "unchanged"
+_RACY_SECONDS = 2.0
+
+
+def _sort_key(directory: Path, name: str) -> Tuple[str, str]:
+    """
+    Sortable UTC timestamp (YYYYMMDDHHMMSS) from the filename, falling back
+    to the file's mtime for names that do not carry one.
+    """
+    match = _FILENAME_TIME.search(name)
+    if match:
+        return match.group(1) + match.group(2), name
+    try:
+        mtime = os.stat(directory / name).st_mtime
+    except OSError:
+        mtime = 0.0
+    return time.strftime("%Y%m%d%H%M%S", time.gmtime(mtime)), name
+
+
+class DecisionIndex:
+    """Sorted, incrementally refreshed view of one decisions directory."""
+
+    def __init__(self, directory, prefix: str = "", suffix: str = ".md"):
+        self.directory = Path(directory)
+        self.prefix = prefix
+        self.suffix = suffix
+        self._keys: List[Tuple[str, str]] = []  # ascending (timestamp, name)
+        self._names: Dict[str, Tuple[str, str]] = {}
+        self._dir_mtime_ns = None
+        self._lock = threading.Lock()
+
+    def _matches(self, name: str) -> bool:
+        return name.startswith(self.prefix) and name.endswith(self.suffix)
+
+    def refresh(self) -> bool:
+        """
+        Sync with the directory if its mtime changed.
+
+        Returns:
+            bool: True if the index was rescanned
+        """
+        try:
+            mtime_ns = os.stat(self.directory).st_mtime_ns
+        except OSError:
+            with self._lock:
+                self._keys, self._names, self._dir_mtime_ns = [], {}, None
+            return False
+
+        if mtime_ns == self._dir_mtime_ns:
+            return False
+
+        with self._lock:
+            if mtime_ns == self._dir_mtime_ns:
+                return False
+            current = {
+                entry.name for entry in os.scandir(self.directory)
+                if self._matches(entry.name) and entry.is_file()
+            }
+            for name in self._names.keys() - current:
+                key = self._names.pop(name)
+                idx = bisect.bisect_left(self._keys, key)
+                if idx < len(self._keys) and self._keys[idx] == key:
+                    del self._keys[idx]
+            added = [_sort_key(self.directory, name) for name in current - self._names.keys()]
+            self._names.update((key[1], key) for key in added)
+            if len(added) > 64:
+                self._keys = sorted(self._keys + added)
+            else:
+                for key in added:
+                    bisect.insort(self._keys, key)
+            # A change in the same mtime tick as this scan would be invisible,
+            # so keep rescanning until the directory mtime is safely in the past
+            racy = time.time() - mtime_ns / 1e9 < _RACY_SECONDS
+            self._dir_mtime_ns = None if racy else mtime_ns
+        return True
+
+    def latest(self, limit: int) -> List[Path]:
+        """Paths of the `limit` newest decisions, newest first."""
+        self.refresh()
+        with self._lock:
+            keys = self._keys[-limit:] if limit > 0 else []
+        return [self.directory / name for _, name in reversed(keys)]
+
+    def __len__(self) -> int:
+        self.refresh()
+        return len(self._keys)
+
+    def validator(self, limit: int):
+        """
+        (etag, None) covering the index state and the `limit` newest files.
+
+        Costs one directory stat plus `limit` file stats, so conditional
+        requests stay O(limit) however many decisions exist.
+
+        Returns:
+            tuple or None: None if the directory does not exist
+        """
+        if not self.directory.exists():
+            return None
+        self.refresh()
+        digest = hashlib.sha1(f"{self._dir_mtime_ns}:{len(self)}".encode())
+        for path in self.latest(limit):
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            digest.update(f"{path.name}\0{st.st_size:x}-{st.st_mtime_ns:x}\n".encode())
+        return digest.hexdigest()[:32], None
+
+
+_indexes: Dict[Tuple[str, str, str], DecisionIndex] = {}
+_indexes_lock = threading.Lock()
+
+
+def get_decision_index(directory, prefix: str = "", suffix: str = ".md") -> DecisionIndex:
+    """Get the process-wide index for a directory (created on first use)."""
+    key = (str(directory), prefix, suffix)
+    index = _indexes.get(key)
+    if index is None:
+        with _indexes_lock:
+            index = _indexes.setdefault(key, DecisionIndex(directory, prefix, suffix))
+    return index
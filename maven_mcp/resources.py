@@ -19,6 +19,7 @@ from typing import List
 from mcp.types import Resource, TextContent
 
 from .config import PATHS
+from .decision_index import get_decision_index
 
 
 logger = logging.getLogger(__name__)
@@ -129,7 +130,7 @@ def _read_decisions() -> str:
         if not decisions_dir.exists():
             return "# Maven Decisions\n\nNo decisions directory found."
 
-        decision_files = sorted(decisions_dir.glob("decision_*.md"), reverse=True)[:10]
+        decision_files = get_decision_index(decisions_dir, prefix="decision_").latest(10)
 
         if not decision_files:
             return "# Maven Decisions\n\nNo decision records yet."
@@ -0,0 +1,212 @@
+"""
+Random-access reader for Maven's append-only session log.
+
+session_log.md only ever grows (see tools._log_event), so reading it whole to
+show the latest events gets slower and hungrier forever. These helpers seek
+from the end (or binary-search by timestamp) and read only the bytes they
+return, so cost depends on the size of the answer, not the size of the log.
+
+Every entry starts with a header line written by _log_event:
+
+    ## [2026-01-19T04:34:23.123456+00:00] EVENT_TYPE
+
+All functions return a LogSlice whose `next_cursor` is a byte offset that can
+be passed back as `after` to fetch only what was appended since.
+"""
+import os
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Optional
+
+
+ENTRY_MARKER = b"\n## ["
+CHUNK_SIZE = 64 * 1024
+# Upper bound on bytes returned by a single read_after() call
+MAX_PAGE_BYTES = int(os.getenv("MAVEN_LOG_PAGE_BYTES", 1024 * 1024))
+
+
+@dataclass
+class LogSlice:
+    """A contiguous byte range of the log, decoded."""
+    text: str
+    start: int
+    next_cursor: int
+    size: int
+    reset: bool = False
+
+
+def _rfind_nth(f, end: int, needle: bytes, n: int) -> Optional[int]:
+    """Offset of the n-th last occurrence of `needle` before `end`, or None."""
+    pos = end
+    found = 0
+    carry = b""
+    while pos > 0:
+        read = min(CHUNK_SIZE, pos)
+        pos -= read
+        f.seek(pos)
+        buf = f.read(read) + carry
+        idx = len(buf)
+        while True:
+            idx = buf.rfind(needle, 0, idx)
+            if idx < 0:
+                break
+            found += 1
+            if found == n:
+                return pos + idx
+        carry = buf[:len(needle) - 1]
+    return None
+
+
+def _find_next(f, start: int, end: int, needle: bytes) -> Optional[int]:
+    """Offset of the first occurrence of `needle` at or after `start`, or None."""
+    pos = start
+    carry = b""
+    while pos < end:
+        f.seek(pos)
+        buf = f.read(min(CHUNK_SIZE, end - pos))
+        if not buf:
+            break
+        window = carry + buf
+        idx = window.find(needle)
+        if idx >= 0:
+            return pos - len(carry) + idx
+        carry = window[-(len(needle) - 1):]
+        pos += len(buf)
+    return None
+
+
+def find_all(path, needles) -> set:
+    """Those of `needles` (bytes) that occur anywhere in the log, in one chunked pass."""
+    needles = set(needles)
+    found = set()
+    if not needles or not os.path.exists(path):
+        return found
+    overlap = max(len(n) for n in needles) - 1
+    with open(path, "rb") as f:
+        carry = b""
+        while needles - found:
+            buf = f.read(CHUNK_SIZE)
+            if not buf:
+                break
+            window = carry + buf
+            found.update(n for n in needles - found if n in window)
+            carry = window[-overlap:] if overlap else b""
+    return found
+
+
+def _read(f, start: int, end: int) -> str:
+    f.seek(start)
+    return f.read(end - start).decode("utf-8", errors="replace")
+
+
+def tail_lines(path, n: int) -> LogSlice:
+    """Return the last `n` lines (like content.splitlines()[-n:])."""
+    with open(path, "rb") as f:
+        size = f.seek(0, os.SEEK_END)
+        end = size
+        if end and _read(f, end - 1, end) == "\n":
+            end -= 1
+        idx = _rfind_nth(f, end, b"\n", n) if n > 0 else end - 1
+        start = idx + 1 if idx is not None else 0
+        return LogSlice(_read(f, start, end), start, size, size)
+
+
+def tail_entries(path, n: int) -> LogSlice:
+    """Return the last `n` log entries, starting at an entry header."""
+    with open(path, "rb") as f:
+        size = f.seek(0, os.SEEK_END)
+        idx = _rfind_nth(f, size, ENTRY_MARKER, n) if n > 0 else size - 1
+        start = idx + 1 if idx is not None else 0
+        return LogSlice(_read(f, start, size), start, size, size)
+
+
+def _parse_header_time(f, offset: int) -> Optional[datetime]:
+    """Parse the timestamp of the entry header starting at `offset` ('## [')."""
+    f.seek(offset + 4)
+    raw = f.read(64)
+    close = raw.find(b"]")
+    if close < 0:
+        return None
+    try:
+        return _as_utc(datetime.fromisoformat(raw[:close].decode()))
+    except ValueError:
+        return None
+
+
+def _as_utc(value: datetime) -> datetime:
+    return value.replace(tzinfo=timezone.utc) if value.tzinfo is None else value
+
+
+def last_entry_time(path) -> Optional[datetime]:
+    """Timestamp of the newest entry header, or None for a missing/empty log."""
+    if not os.path.exists(path):
+        return None
+    with open(path, "rb") as f:
+        size = f.seek(0, os.SEEK_END)
+        marker = _rfind_nth(f, size, ENTRY_MARKER, 1)
+        return _parse_header_time(f, marker + 1) if marker is not None else None
+
+
+def find_offset_after(path, after: datetime) -> int:
+    """
+    Byte offset of the first entry logged strictly after `after`.
+
+    Binary-searches the file on entry headers, relying on the log being
+    appended in time order. Returns the file size if nothing is newer.
+    """
+    after = _as_utc(after)
+    with open(path, "rb") as f:
+        size = f.seek(0, os.SEEK_END)
+        lo, hi = 0, size
+        while lo < hi:
+            mid = (lo + hi) // 2
+            marker = _find_next(f, max(mid - 1, 0), size, ENTRY_MARKER)
+            if marker is None:
+                hi = mid
+                continue
+            stamp = _parse_header_time(f, marker + 1)
+            if stamp is None or stamp <= after:
+                lo = marker + 2
+            else:
+                hi = mid
+        marker = _find_next(f, max(lo - 1, 0), size, ENTRY_MARKER)
+        return marker + 1 if marker is not None else size
+
+
+def read_after(path, cursor, max_bytes: Optional[int] = None) -> LogSlice:
+    """
+    Return entries appended after `cursor` (a byte offset or a datetime).
+
+    At most `max_bytes` are returned, cut at an entry boundary when possible;
+    keep calling with `next_cursor` until it equals `size` to drain a backlog.
+    A cursor past EOF means the log was rewritten, so reading restarts at 0.
+    """
+    if max_bytes is None:
+        max_bytes = MAX_PAGE_BYTES
+
+    if isinstance(cursor, datetime):
+        start = find_offset_after(path, cursor)
+    else:
+        start = int(cursor)
+
+    with open(path, "rb") as f:
+        size = f.seek(0, os.SEEK_END)
+        reset = start > size or start < 0
+        if reset:
+            start = 0
+
+        end = min(size, start + max_bytes)
+        if end < size:
+            f.seek(start)
+            boundary = f.read(end - start).rfind(ENTRY_MARKER)
+            if boundary > 0:
+                end = start + boundary + 1
+        return LogSlice(_read(f, start, end), start, end, size, reset)
+
+
+def parse_cursor(value: str):
+    """Interpret an `after` query value as a byte offset (digits) or ISO timestamp."""
+    value = value.strip()
+    if value.isdigit():
+        return int(value)
+    return _as_utc(datetime.fromisoformat(value.replace("Z", "+00:00")))
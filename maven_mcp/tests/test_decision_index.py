@@ -0,0 +1,92 @@
+"""
+Unit tests for the in-memory decision index.
+
+Run with: python -m pytest maven_mcp/tests/test_decision_index.py -v
+"""
+import os
+
+import pytest
+
+from maven_mcp import decision_index
+from maven_mcp.decision_index import DecisionIndex
+
+
+@pytest.fixture
+def decisions_dir(tmp_path):
+    """A decisions directory with five records written out of order."""
+    directory = tmp_path / "decisions"
+    directory.mkdir()
+    for stamp in ("20260103_120000", "20260101_080000", "20260105_090000",
+                  "20260102_000000", "20260104_235959"):
+        (directory / f"decision_{stamp}.md").write_text(f"# {stamp}")
+    (directory / ".gitkeep").write_text("")
+    return directory
+
+
+@pytest.fixture(autouse=True)
+def trust_mtimes(monkeypatch):
+    """Treat fresh directory mtimes as stable so caching is observable."""
+    monkeypatch.setattr(decision_index, "_RACY_SECONDS", 0)
+
+
+def _bump_mtime(directory):
+    st = os.stat(directory)
+    os.utime(directory, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+
+
+class TestDecisionIndex:
+    """Tests for ordering, caching and incremental refresh."""
+
+    def test_latest_sorted_by_decision_timestamp(self, decisions_dir):
+        index = DecisionIndex(decisions_dir)
+
+        names = [p.name for p in index.latest(3)]
+
+        assert names == [
+            "decision_20260105_090000.md",
+            "decision_20260104_235959.md",
+            "decision_20260103_120000.md",
+        ]
+        assert len(index) == 5
+
+    def test_unchanged_directory_is_not_rescanned(self, decisions_dir):
+        index = DecisionIndex(decisions_dir)
+        assert index.refresh() is True
+        assert index.refresh() is False
+
+    def test_added_and_removed_files(self, decisions_dir):
+        index = DecisionIndex(decisions_dir)
+        index.latest(1)
+
+        (decisions_dir / "decision_20260201_000000.md").write_text("new")
+        (decisions_dir / "decision_20260105_090000.md").unlink()
+        _bump_mtime(decisions_dir)
+
+        names = [p.name for p in index.latest(2)]
+        assert names == ["decision_20260201_000000.md", "decision_20260104_235959.md"]
+        assert len(index) == 5
+
+    def test_prefix_filter(self, decisions_dir):
+        (decisions_dir / "notes.md").write_text("not a decision")
+
+        assert len(DecisionIndex(decisions_dir, prefix="decision_")) == 5
+        assert len(DecisionIndex(decisions_dir)) == 6
+
+    def test_validator_changes_when_recent_file_edited(self, decisions_dir):
+        index = DecisionIndex(decisions_dir)
+        before = index.validator(2)
+
+        newest = decisions_dir / "decision_20260105_090000.md"
+        newest.write_text("# edited, longer content")
+
+        assert index.validator(2) != before
+
+    def test_missing_directory(self, tmp_path):
+        index = DecisionIndex(tmp_path / "missing")
+        assert index.latest(10) == []
+        assert index.validator(10) is None
+
+    def test_shared_instance_per_directory(self, decisions_dir):
+        a = decision_index.get_decision_index(decisions_dir, prefix="decision_")
+        b = decision_index.get_decision_index(str(decisions_dir), prefix="decision_")
+        assert a is b
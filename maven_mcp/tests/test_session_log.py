@@ -0,0 +1,110 @@
+"""
+Unit tests for the session log tail/cursor reader.
+
+Run with: python -m pytest maven_mcp/tests/test_session_log.py -v
+"""
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from maven_mcp import session_log
+
+
+BASE_TIME = datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+
+def _entry(i):
+    stamp = (BASE_TIME + timedelta(minutes=i)).isoformat()
+    return f"\n## [{stamp}] OBSERVATION\n\nEvent {i}\n\n---\n"
+
+
+@pytest.fixture
+def log_file(tmp_path):
+    """A session log with 200 entries, one minute apart."""
+    path = tmp_path / "session_log.md"
+    path.write_text(
+        "# Maven Session Log\n\nCreated: now\n\n---\n" + "".join(_entry(i) for i in range(200)),
+        encoding="utf-8"
+    )
+    return path
+
+
+@pytest.fixture(autouse=True)
+def small_chunks(monkeypatch):
+    """Force multi-chunk scans so chunk boundaries are exercised."""
+    monkeypatch.setattr(session_log, "CHUNK_SIZE", 97)
+
+
+# =============================================================================
+# Tests: tail reads
+# =============================================================================
+
+class TestTail:
+    """Tests for tail_lines and tail_entries."""
+
+    def test_tail_lines_matches_splitlines(self, log_file):
+        content = log_file.read_text(encoding="utf-8")
+        for n in (1, 5, 37, 10_000):
+            expected = "\n".join(content.splitlines()[-n:])
+            assert session_log.tail_lines(log_file, n).text == expected
+
+    def test_tail_entries_starts_at_header(self, log_file):
+        result = session_log.tail_entries(log_file, 3)
+
+        assert result.text.startswith("## [")
+        assert result.text.count("## [") == 3
+        assert "Event 197" in result.text and "Event 199" in result.text
+        assert result.next_cursor == log_file.stat().st_size
+
+    def test_tail_entries_more_than_exist(self, log_file):
+        result = session_log.tail_entries(log_file, 1000)
+        assert result.start == 0
+        assert result.text.startswith("# Maven Session Log")
+
+
+# =============================================================================
+# Tests: cursors
+# =============================================================================
+
+class TestCursor:
+    """Tests for read_after with byte offsets and timestamps."""
+
+    def test_offset_cursor_returns_only_new_entries(self, log_file):
+        cursor = session_log.tail_entries(log_file, 1).next_cursor
+        with open(log_file, "a", encoding="utf-8") as f:
+            f.write(_entry(200))
+
+        result = session_log.read_after(log_file, cursor)
+
+        assert "Event 200" in result.text
+        assert "Event 199" not in result.text
+        assert result.next_cursor == log_file.stat().st_size
+
+    def test_timestamp_cursor(self, log_file):
+        result = session_log.read_after(log_file, BASE_TIME + timedelta(minutes=196, seconds=30))
+
+        assert result.text.startswith("## [")
+        assert "Event 196" not in result.text
+        assert result.text.count("## [") == 3
+
+    def test_timestamp_after_everything(self, log_file):
+        result = session_log.read_after(log_file, BASE_TIME + timedelta(days=1))
+        assert result.text == ""
+
+    def test_page_cut_at_entry_boundary(self, log_file):
+        first = session_log.read_after(log_file, 0, max_bytes=500)
+        second = session_log.read_after(log_file, first.next_cursor, max_bytes=500)
+
+        assert first.next_cursor < first.size
+        assert second.text.startswith("## [")
+
+    def test_cursor_past_eof_resets(self, log_file):
+        result = session_log.read_after(log_file, 10**12, max_bytes=100)
+        assert result.reset is True
+        assert result.start == 0
+
+    def test_parse_cursor(self):
+        assert session_log.parse_cursor("1234") == 1234
+        assert session_log.parse_cursor("2026-01-01T00:00:00Z") == BASE_TIME
+        with pytest.raises(ValueError):
+            session_log.parse_cursor("yesterday")
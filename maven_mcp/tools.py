@@ -19,12 +19,14 @@ Tools:
 import json
 import logging
 import os
+from datetime import datetime, timezone
 from typing import List, Dict, Any, Optional
 
 import requests
 from mcp.types import Tool, TextContent
 
 from .config import PATHS, get_iso_timestamp, deep_merge, ensure_directories, GIT_REMOTE_CONFIG
+from .session_log import find_all, last_entry_time
 
 # RLM imports for recursive language model capabilities
 try:
@@ -36,15 +38,26 @@ except ImportError as e:
 
 # Database imports for dual persistence
 try:
-    from database.connection import get_db_connection
+    from database.connection import db_ready, get_async_pool, get_db_connection
     DB_AVAILABLE = True
 except ImportError:
     DB_AVAILABLE = False
     logging.warning("Database connection not available - will only persist to git")
 
+# Circuit breaker shared with the API's health probe and notification dispatcher
+try:
+    from database.circuit import CircuitOpenError, get_breaker
+    email_breaker = get_breaker('email')
+except ImportError:
+    email_breaker = None
+
 
 logger = logging.getLogger(__name__)
 
+# motherhaven.app email API (overridable for staging and tests)
+EMAIL_API_URL = os.getenv('EMAIL_API_URL', 'https://motherhaven.app/api/email/send')
+EMAIL_API_TIMEOUT = float(os.getenv('EMAIL_API_TIMEOUT', 15))
+
 
 # =============================================================================
 # Tool Definitions
@@ -309,7 +322,65 @@ TOOLS: List[Tool] = [
 # Tool Implementation Functions
 # =============================================================================
 
-def _log_event(event_type: str, content: str, metadata: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+def _format_log_entry(timestamp: str, event_type: str, content: str,
+                      metadata: Optional[Dict[str, Any]] = None) -> str:
+    """One session_log.md entry (header, content, optional metadata, rule)."""
+    log_entry = f"\n## [{timestamp}] {event_type.upper()}\n\n{content}\n"
+    if metadata:
+        log_entry += f"\n**Metadata:** {json.dumps(metadata)}\n"
+    return log_entry + "\n---\n"
+
+
+_MEMORY_INSERT = """
+    INSERT INTO maven_memory (
+        event_type, description, metadata
+    ) VALUES (%s, %s, %s)
+    RETURNING id
+"""
+
+_DECISION_INSERT = """
+    INSERT INTO maven_decisions (
+        git_filename, decision_type, asset, action, reasoning,
+        confidence, risk_level, metadata, decided_at
+    ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
+    RETURNING id
+"""
+
+
+async def _db_insert(sql: str, params: tuple) -> tuple:
+    """
+    Run one INSERT ... RETURNING id on the asyncio pool.
+
+    The MCP servers call this from their tool coroutines, so a slow or
+    unreachable Postgres suspends only that call instead of the event loop.
+    Async connections autocommit, so the row is committed on return.
+
+    Returns:
+        (id, error): id is None when the row was not written
+    """
+    if not DB_AVAILABLE:
+        return None, None
+    if not db_ready():
+        # Circuit open: Postgres is known to be down, don't wait on a connect
+        return None, "database unavailable (circuit open)"
+    pool = get_async_pool()
+    try:
+        async with pool.connection() as conn:
+            cursor = await pool.execute(conn, sql, params)
+            db_id = cursor.fetchone()[0]
+            cursor.close()
+            return db_id, None
+    except Exception as e:
+        logger.warning(f"Failed to write to database: {e}")
+        return None, str(e)
+
+
+def _log_event(
+    event_type: str,
+    content: str,
+    metadata: Optional[Dict[str, Any]] = None,
+    write_db: bool = True
+) -> Dict[str, Any]:
     """
     Append an event to the session log AND database (dual persistence).
 
@@ -320,6 +391,8 @@ def _log_event(event_type: str, content: str, metadata: Optional[Dict[str, Any]]
         event_type: Type of event
         content: Event content
         metadata: Optional metadata
+        write_db: False to leave the maven_memory row to the caller
+            (_log_event_async writes it on the asyncio pool)
 
     Returns:
         dict: Result with success, message, error keys
@@ -328,12 +401,7 @@ def _log_event(event_type: str, content: str, metadata: Optional[Dict[str, Any]]
         ensure_directories()
 
         timestamp = get_iso_timestamp()
-        log_entry = f"\n## [{timestamp}] {event_type.upper()}\n\n{content}\n"
-
-        if metadata:
-            log_entry += f"\n**Metadata:** {json.dumps(metadata)}\n"
-
-        log_entry += "\n---\n"
+        log_entry = _format_log_entry(timestamp, event_type, content, metadata)
 
         # 1. GIT-FIRST: Append to session log (source of truth)
         session_log = PATHS["session_log"]
@@ -349,16 +417,16 @@ def _log_event(event_type: str, content: str, metadata: Optional[Dict[str, Any]]
         # 2. POSTGRES: Write to maven_memory for queryability
         db_id = None
         db_error = None
-        if DB_AVAILABLE:
+        if not write_db:
+            pass
+        elif DB_AVAILABLE and not db_ready():
+            # Circuit open: Postgres is known to be down, don't wait on a connect
+            db_error = "database unavailable (circuit open)"
+        elif DB_AVAILABLE:
             try:
                 with get_db_connection() as conn:
                     cursor = conn.cursor()
-                    cursor.execute("""
-                        INSERT INTO maven_memory (
-                            event_type, description, metadata
-                        ) VALUES (%s, %s, %s)
-                        RETURNING id
-                    """, (
+                    cursor.execute(_MEMORY_INSERT, (
                         event_type, content,
                         json.dumps(metadata) if metadata else '{}'
                     ))
@@ -387,6 +455,142 @@ def _log_event(event_type: str, content: str, metadata: Optional[Dict[str, Any]]
         }
 
 
+async def _log_event_async(
+    event_type: str,
+    content: str,
+    metadata: Optional[Dict[str, Any]] = None
+) -> Dict[str, Any]:
+    """_log_event for the MCP tool coroutines: the database write goes through the asyncio pool."""
+    result = _log_event(event_type, content, metadata, write_db=False)
+    if result["success"]:
+        db_id, _ = await _db_insert(_MEMORY_INSERT, (
+            event_type, content,
+            json.dumps(metadata) if metadata else '{}'
+        ))
+        if db_id is not None:
+            logger.info(f"Event logged to database: id={db_id}")
+        result.update(db_id=db_id, db_persisted=db_id is not None)
+    return result
+
+
+def _dedupe_marker(key: str) -> bytes:
+    """How a dedupe_key appears in an entry's metadata line."""
+    return json.dumps({"dedupe_key": key})[1:-1].encode()
+
+
+def _entry_times(events: List[Dict[str, Any]], session_log) -> List[str]:
+    """
+    Header timestamps for a batch: each event's own `timestamp` (default now).
+
+    Times in the future are capped at now and earlier ones raised to the
+    previous entry's, since session_log.find_offset_after() binary-searches
+    on headers and needs them in order. Callers that need the exact time
+    keep it in the metadata too (the inbox ingester stores received_at).
+    """
+    now = datetime.now(timezone.utc)
+    floor = last_entry_time(session_log)
+    stamps = []
+    for e in events:
+        try:
+            stamp = datetime.fromisoformat(str(e["timestamp"]).replace("Z", "+00:00"))
+            stamp = min(stamp if stamp.tzinfo else stamp.replace(tzinfo=timezone.utc), now)
+        except (KeyError, ValueError):
+            stamp = now
+        if floor is not None and stamp < floor:
+            stamp = floor
+        floor = stamp
+        stamps.append(stamp.isoformat())
+    return stamps
+
+
+def _log_events(events: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Batch form of _log_event for background ingestion.
+
+    All entries are appended to the session log in one write and inserted
+    into maven_memory with one multi-row INSERT. As with _log_event the log
+    file is the source of truth and the database write is best-effort.
+
+    An event's optional `timestamp` is used for its header (default: now;
+    see _entry_times).
+    An optional `dedupe_key` is stored in its metadata, and events whose key
+    is already in the log are skipped, so replaying a batch that was written
+    before a crash does not log it twice.
+
+    Args:
+        events: [{'event_type', 'content', 'metadata', 'timestamp', 'dedupe_key'}, ...]
+
+    Returns:
+        dict: Result with success, count, skipped, db_ids, db_persisted, error keys
+    """
+    if not events:
+        return {"success": True, "count": 0, "skipped": 0, "db_ids": [], "db_persisted": True,
+                "error": None}
+    try:
+        ensure_directories()
+
+        session_log = PATHS["session_log"]
+        logged = find_all(session_log, [_dedupe_marker(e["dedupe_key"])
+                                        for e in events if e.get("dedupe_key")])
+        skipped = 0
+        if logged:
+            fresh = [e for e in events
+                     if not e.get("dedupe_key") or _dedupe_marker(e["dedupe_key"]) not in logged]
+            skipped = len(events) - len(fresh)
+            events = fresh
+            logger.info(f"Skipping {skipped} event(s) already in the session log")
+        if not events:
+            return {"success": True, "count": 0, "skipped": skipped, "db_ids": [],
+                    "db_persisted": True, "error": None}
+
+        stamps = _entry_times(events, session_log)
+        events = [dict(e, metadata=dict(e.get("metadata") or {}, dedupe_key=e["dedupe_key"]))
+                  if e.get("dedupe_key") else e for e in events]
+        log_text = "".join(
+            _format_log_entry(stamp, e["event_type"], e["content"], e.get("metadata"))
+            for stamp, e in zip(stamps, events)
+        )
+
+        if not session_log.exists():
+            log_text = f"# Maven Session Log\n\nCreated: {get_iso_timestamp()}\n\n---\n" + log_text
+        with open(session_log, "a", encoding="utf-8") as f:
+            f.write(log_text)
+
+        db_ids = []
+        if DB_AVAILABLE and db_ready():
+            try:
+                from psycopg2.extras import execute_values
+
+                with get_db_connection() as conn:
+                    cursor = conn.cursor()
+                    db_ids = [row[0] for row in execute_values(cursor, """
+                        INSERT INTO maven_memory (event_type, description, metadata)
+                        VALUES %s
+                        RETURNING id
+                    """, [
+                        (e["event_type"], e["content"], json.dumps(e.get("metadata") or {}))
+                        for e in events
+                    ], fetch=True)]
+                    cursor.close()
+                    logger.info(f"{len(db_ids)} events logged to database")
+            except Exception as e:
+                logger.warning(f"Failed to write events to database: {e}")
+
+        return {
+            "success": True,
+            "count": len(events),
+            "skipped": skipped,
+            "db_ids": db_ids,
+            "db_persisted": len(db_ids) == len(events),
+            "error": None
+        }
+    except Exception as e:
+        error_msg = f"Failed to log events: {e}"
+        logger.error(error_msg)
+        return {"success": False, "count": 0, "skipped": 0, "db_ids": [], "db_persisted": False,
+                "error": error_msg}
+
+
 def _update_identity(updates: Dict[str, Any]) -> Dict[str, Any]:
     """
     Update identity.json with new data using deep merge.
@@ -451,7 +655,8 @@ def _record_decision(
     confidence: float,
     risk_level: str,
     asset: Optional[str] = None,
-    metadata: Optional[Dict[str, Any]] = None
+    metadata: Optional[Dict[str, Any]] = None,
+    write_db: bool = True
 ) -> Dict[str, Any]:
     """
     Record a decision in the decisions directory AND database (dual persistence).
@@ -467,6 +672,8 @@ def _record_decision(
         risk_level: Risk assessment (low, medium, high, critical)
         asset: Optional asset or portfolio involved
         metadata: Optional additional metadata
+        write_db: False to leave the maven_decisions row to the caller
+            (_record_decision_async writes it on the asyncio pool)
 
     Returns:
         dict: Result with success, message, data, error keys
@@ -509,17 +716,16 @@ def _record_decision(
         # 3. POSTGRES: Write to database for queryability
         db_id = None
         db_error = None
-        if DB_AVAILABLE:
+        if not write_db:
+            pass
+        elif DB_AVAILABLE and not db_ready():
+            # Circuit open: Postgres is known to be down, don't wait on a connect
+            db_error = "database unavailable (circuit open)"
+        elif DB_AVAILABLE:
             try:
                 with get_db_connection() as conn:
                     cursor = conn.cursor()
-                    cursor.execute("""
-                        INSERT INTO maven_decisions (
-                            git_filename, decision_type, asset, action, reasoning,
-                            confidence, risk_level, metadata, decided_at
-                        ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
-                        RETURNING id
-                    """, (
+                    cursor.execute(_DECISION_INSERT, (
                         filename, decision_type, asset, action, reasoning,
                         confidence, risk_level,
                         json.dumps(metadata) if metadata else '{}',
@@ -538,6 +744,7 @@ def _record_decision(
             "message": f"Recorded {decision_type} decision at {timestamp}",
             "data": {
                 "filename": filename,
+                "recorded_at": timestamp,
                 "decision_type": decision_type,
                 "confidence": confidence,
                 "risk_level": risk_level,
@@ -558,6 +765,32 @@ def _record_decision(
         }
 
 
+async def _record_decision_async(
+    decision_type: str,
+    action: str,
+    reasoning: str,
+    confidence: float,
+    risk_level: str,
+    asset: Optional[str] = None,
+    metadata: Optional[Dict[str, Any]] = None
+) -> Dict[str, Any]:
+    """_record_decision for the MCP tool coroutines: the database write goes through the asyncio pool."""
+    result = _record_decision(decision_type, action, reasoning, confidence, risk_level,
+                              asset, metadata, write_db=False)
+    if result["success"]:
+        data = result["data"]
+        db_id, db_error = await _db_insert(_DECISION_INSERT, (
+            data["filename"], decision_type, asset, action, reasoning,
+            confidence, risk_level,
+            json.dumps(metadata) if metadata else '{}',
+            data["recorded_at"]
+        ))
+        if db_id is not None:
+            logger.info(f"Decision recorded to database: id={db_id}")
+        data.update(db_id=db_id, db_persisted=db_id is not None, db_error=db_error)
+    return result
+
+
 def _get_current_decision_count() -> int:
     """Get the current total_decisions count from identity.json."""
     try:
@@ -898,7 +1131,13 @@ def _send_email(
         from_email: Sender email address (optional, defaults to 'maven@motherhaven.app')
 
     Returns:
-        dict: Result with success, message, data, error keys
+        dict: Result with success, message, data, error keys. Failures also
+        carry 'retryable': True for connect timeouts, connection errors, 429
+        and 5xx responses, where the same request may succeed later. A read
+        timeout is not retryable: the API may already have sent the email,
+        and it takes no idempotency key to dedupe a resend. While the
+        'email' circuit is open nothing is sent and the result also has
+        'circuit_open': True and 'retry_after' seconds.
     """
     try:
         # Validate that at least one content type is provided
@@ -944,13 +1183,36 @@ def _send_email(
         if from_email:
             payload['fromEmail'] = from_email
 
-        # Make API request with 15s timeout
-        response = requests.post(
-            "https://motherhaven.app/api/email/send",
-            headers=headers,
-            json=payload,
-            timeout=15
-        )
+        if email_breaker is not None:
+            try:
+                email_breaker.before_call()
+            except CircuitOpenError as e:
+                return {
+                    "success": False,
+                    "message": None,
+                    "data": None,
+                    "error": str(e),
+                    "retryable": True,
+                    "circuit_open": True,
+                    "retry_after": e.retry_after
+                }
+
+        try:
+            response = requests.post(
+                EMAIL_API_URL,
+                headers=headers,
+                json=payload,
+                timeout=EMAIL_API_TIMEOUT
+            )
+        except requests.exceptions.RequestException as e:
+            if email_breaker is not None:
+                email_breaker.record_failure(e)
+            raise
+        if email_breaker is not None:
+            if response.status_code >= 500:
+                email_breaker.record_failure(f"HTTP {response.status_code}")
+            else:
+                email_breaker.record_success()
 
         # Handle response
         if response.status_code == 200:
@@ -1004,17 +1266,30 @@ def _send_email(
                 "success": False,
                 "message": None,
                 "data": None,
-                "error": f"API request failed with status {response.status_code}"
+                "error": f"API request failed with status {response.status_code}",
+                "retryable": response.status_code == 429 or response.status_code >= 500
             }
 
+    except requests.exceptions.ReadTimeout:
+        error_msg = (f"Email API did not answer within {EMAIL_API_TIMEOUT:g} seconds; "
+                     f"the email may have been sent")
+        logger.error(error_msg)
+        return {
+            "success": False,
+            "message": None,
+            "data": None,
+            "error": error_msg,
+            "retryable": False
+        }
     except requests.exceptions.Timeout:
-        error_msg = "Email API request timed out after 15 seconds"
+        error_msg = f"Email API connection timed out after {EMAIL_API_TIMEOUT:g} seconds"
         logger.error(error_msg)
         return {
             "success": False,
             "message": None,
             "data": None,
-            "error": error_msg
+            "error": error_msg,
+            "retryable": True
         }
     except requests.exceptions.RequestException as e:
         error_msg = f"Email API request failed: {e}"
@@ -1023,7 +1298,8 @@ def _send_email(
             "success": False,
             "message": None,
             "data": None,
-            "error": error_msg
+            "error": error_msg,
+            "retryable": True
         }
     except Exception as e:
         error_msg = f"Failed to send email: {e}"
@@ -1146,7 +1422,7 @@ async def call_tool(name: str, arguments: Dict[str, Any]) -> TextContent:
                 "error": "'event_type' and 'content' are required parameters"
             }
         else:
-            result = _log_event(
+            result = await _log_event_async(
                 event_type=event_type,
                 content=content,
                 metadata=arguments.get("metadata")
@@ -1201,7 +1477,7 @@ async def call_tool(name: str, arguments: Dict[str, Any]) -> TextContent:
                 "error": f"Missing required parameters: {', '.join(missing)}"
             }
         else:
-            result = _record_decision(
+            result = await _record_decision_async(
                 decision_type=decision_type,
                 action=action,
                 reasoning=reasoning,
@@ -1350,7 +1626,7 @@ def register_tools(mcp_server) -> None:
         metadata: Optional[Dict[str, Any]] = None
     ) -> str:
         """Append an event to Maven's session log for memory persistence."""
-        result = _log_event(event_type, content, metadata)
+        result = await _log_event_async(event_type, content, metadata)
         return json.dumps(result, indent=2)
 
     @mcp_server.tool()
@@ -1370,7 +1646,7 @@ def register_tools(mcp_server) -> None:
         metadata: Optional[Dict[str, Any]] = None
     ) -> str:
         """Record a financial decision and increment the decision counter."""
-        result = _record_decision(
+        result = await _record_decision_async(
             decision_type=decision_type,
             action=action,
             reasoning=reasoning,
@@ -10,10 +10,11 @@ import json
 import os
 import logging
 import sys
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 from typing import Any, Dict, List, Optional
 
 import iso8601
+import requests
 from hyperliquid.info import Info
 from hyperliquid.utils import constants
 from mcp.server.fastmcp import FastMCP, Context
@@ -29,6 +30,15 @@ logger = logging.getLogger(__name__)
 # Initialize Hyperliquid Info client (mainnet)
 info = Info(constants.MAINNET_API_URL, skip_ws=True)
 
+# Maven API; its candle store keeps watchlist coins' candles in Postgres
+MAVEN_API_URL = os.environ.get("MAVEN_API_URL", "http://maven:5002")
+STORED_CANDLES_TIMEOUT = 3
+
+INTERVAL_MS = {
+    "1m": 60_000, "5m": 300_000, "15m": 900_000,
+    "1h": 3_600_000, "4h": 14_400_000, "1d": 86_400_000,
+}
+
 # Create MCP server
 mcp = FastMCP(
     name="Maven Hyperliquid",
@@ -89,6 +99,67 @@ async def get_l2_snapshot(coin: str, ctx: Context = None) -> str:
         return json.dumps({"error": f"Failed to fetch L2 snapshot for {coin}: {str(e)}"})
 
 
+def _stored_candles(coin: str, interval: str, start_ms: int, end_ms: int) -> Optional[List[Dict[str, Any]]]:
+    """
+    Candles from Maven's candle store, shaped like Hyperliquid's candleSnapshot.
+
+    Returns None unless the store covers [start_ms, end_ms) without holes up
+    to the current candle (coin not on the watchlist, API down, ...), so the
+    caller falls back to Hyperliquid. Stored candles have no trade count
+    ("n"), and "v" is derived from the stored USD volume.
+    """
+    step = INTERVAL_MS.get(interval)
+    if step is None:
+        return None
+    try:
+        response = requests.get(
+            f"{MAVEN_API_URL}/api/market/{coin}/candles",
+            params={
+                "start": datetime.fromtimestamp(start_ms / 1000, tz=timezone.utc).isoformat(),
+                "end": datetime.fromtimestamp(end_ms / 1000, tz=timezone.utc).isoformat(),
+                "resolution": interval,
+            },
+            timeout=STORED_CANDLES_TIMEOUT,
+        )
+        response.raise_for_status()
+        body = response.json()
+    except Exception as e:
+        logger.info(f"Stored candles unavailable for {coin} {interval}: {e}")
+        return None
+
+    points = body.get("points") or []
+    if not points or body.get("truncated"):
+        return None
+    opens = [int(iso8601.parse_date(p["time"]).timestamp() * 1000) for p in points]
+    if (opens[0] > start_ms + step or opens[-1] < end_ms - 2 * step
+            or len(opens) < (opens[-1] - opens[0]) // step + 1):
+        return None
+
+    candles = []
+    for t, p in zip(opens, points):
+        close = p["close"] or 0
+        candles.append({
+            "t": t,
+            "T": t + step - 1,
+            "s": coin,
+            "i": interval,
+            "o": str(p["open"]),
+            "h": str(p["high"]),
+            "l": str(p["low"]),
+            "c": str(p["close"]),
+            "v": str(round((p["volume_usd"] or 0) / close, 8)) if close else "0",
+        })
+    return candles
+
+
+def _candles(coin: str, interval: str, start_ms: int, end_ms: int) -> List[Dict[str, Any]]:
+    """Stored candles when the store covers the range, else straight from Hyperliquid."""
+    stored = _stored_candles(coin, interval, start_ms, end_ms)
+    if stored is not None:
+        return stored
+    return info.candles_snapshot(coin, interval, start_ms, end_ms)
+
+
 @mcp.tool()
 async def get_candles(
     coin: str,
@@ -99,6 +170,9 @@ async def get_candles(
     """
     Get candlestick data for a coin.
 
+    Watchlist coins are served from Maven's candle store; other coins (or
+    ranges the store does not cover) are fetched from Hyperliquid.
+
     Args:
         coin: Trading symbol (e.g., 'BTC', 'ETH', 'NVDA')
         interval: Candle interval ('1m', '5m', '15m', '1h', '4h', '1d')
@@ -107,7 +181,7 @@ async def get_candles(
     try:
         end_ms = int(datetime.now().timestamp() * 1000)
         start_ms = int((datetime.now() - timedelta(hours=lookback_hours)).timestamp() * 1000)
-        data = info.candles_snapshot(coin, interval, start_ms, end_ms)
+        data = _candles(coin, interval, start_ms, end_ms)
         return json.dumps(data)
     except Exception as e:
         return json.dumps({"error": f"Failed to fetch candles for {coin}: {str(e)}"})
@@ -342,7 +416,7 @@ async def analyze_coin(coin: str, ctx: Context = None) -> str:
         # Get 4h candles for last 24h
         end_ms = int(datetime.now().timestamp() * 1000)
         start_ms = int((datetime.now() - timedelta(hours=24)).timestamp() * 1000)
-        candles = info.candles_snapshot(coin, "4h", start_ms, end_ms)
+        candles = _candles(coin, "4h", start_ms, end_ms)
 
         # Get funding for last 24h
         funding = info.funding_history(coin, start_ms, end_ms)
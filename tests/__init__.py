@@ -0,0 +1 @@
+"""Tests for the Maven Flask API and database layer."""
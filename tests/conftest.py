@@ -0,0 +1,268 @@
+"""
+Shared fixtures for the Maven API and database tests.
+
+The fake_db fixture swaps psycopg2.connect for an in-memory stand-in so the
+real InstrumentedConnectionPool (and everything built on it) can be exercised
+without a PostgreSQL server.
+"""
+import json
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import psycopg2
+import pytest
+from psycopg2 import extensions
+
+# Keep app.py's background threads (notification sending, inbox ingestion,
+# health probes, Redis metric sharing, maintenance jobs) from starting on
+# import; tests build their own instances.
+os.environ.setdefault("MAVEN_NOTIFY_DISPATCHER", "false")
+os.environ.setdefault("MAVEN_INBOX_INGESTER", "false")
+os.environ.setdefault("MAVEN_HEALTH_PROBES", "false")
+os.environ.setdefault("MAVEN_MAINTENANCE", "false")
+# Rate limiting is exercised by tests/test_ratelimit.py with its own limiter
+os.environ.setdefault("MAVEN_RATE_LIMIT_ENABLED", "false")
+os.environ.setdefault("MAVEN_METRICS_SHARED", "false")
+# Plain execute() so tests can match on the query text; the prepared
+# statement tests in tests/test_db_sessions.py turn the cache back on
+os.environ.setdefault("DB_STATEMENT_CACHE_SIZE", "0")
+
+
+class FakeCursor:
+    """Cursor that answers queries from the owning FakeDatabase."""
+
+    def __init__(self, db, connection):
+        self._db = db
+        self.connection = connection
+        self._rows = []
+        self.rowcount = 0
+
+    def mogrify(self, template, args):
+        """Rough stand-in used by psycopg2.extras.execute_values."""
+        if isinstance(template, bytes):
+            template = template.decode()
+        return (template % tuple(repr(a) for a in args)).encode()
+
+    def copy_expert(self, sql, file):
+        """Records COPY ... FROM STDIN with the data read from `file` as its params."""
+        self._db.executed.append((sql, file.read()))
+
+    def execute(self, sql, params=None):
+        if isinstance(sql, bytes):
+            sql = sql.decode()
+        self._db.executed.append((sql, params))
+        if self.connection.broken:
+            raise psycopg2.OperationalError("server closed the connection unexpectedly")
+        if sql.startswith("PREPARE "):
+            name, _, body = sql[len("PREPARE "):].partition(" AS ")
+            self.connection.prepared[name] = body
+            sql = ""
+        elif sql.startswith("EXECUTE "):
+            sql = self.connection.prepared[sql.split()[1]]
+        self._rows = list(self._db.rows_for(sql, params)) if sql else []
+        self.rowcount = len(self._rows)
+
+    def fetchone(self):
+        return self._rows.pop(0) if self._rows else None
+
+    def fetchall(self):
+        rows, self._rows = self._rows, []
+        return rows
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class _Info:
+    transaction_status = extensions.TRANSACTION_STATUS_IDLE
+
+
+class FakeConnection:
+    """Just enough of a psycopg2 connection for the pool and handlers."""
+
+    def __init__(self, db, **kwargs):
+        self._db = db
+        self.kwargs = kwargs
+        self.closed = 0
+        self.encoding = "UTF8"
+        self.info = _Info()
+        self.commits = 0
+        self.rollbacks = 0
+        self.prepared = {}
+        # Set to simulate a connection the server dropped while it sat idle
+        self.broken = False
+        self.async_ = kwargs.get("async_", 0)
+
+    def cursor(self, *args, **kwargs):
+        return FakeCursor(self._db, self)
+
+    # Async-mode API: every operation completes immediately
+    def poll(self):
+        return extensions.POLL_OK
+
+    def isexecuting(self):
+        return False
+
+    def fileno(self):
+        return -1
+
+    def commit(self):
+        self.commits += 1
+
+    def rollback(self):
+        self.rollbacks += 1
+
+    def close(self):
+        self.closed = 1
+
+
+class FakeDatabase:
+    """
+    Records executed SQL and returns canned rows.
+
+    Register responses with `db.respond(fragment, rows)`; the first fragment
+    found in the SQL text wins. A callable may be given instead of rows and
+    is called with (sql, params).
+    """
+
+    def __init__(self):
+        self.responses = []
+        self.executed = []
+        self.connections = []
+
+    def respond(self, fragment, rows):
+        self.responses.insert(0, (fragment, rows))
+
+    def rows_for(self, sql, params):
+        for fragment, rows in self.responses:
+            if fragment in sql:
+                return rows(sql, params) if callable(rows) else rows
+        return []
+
+    def connect(self, *args, **kwargs):
+        conn = FakeConnection(self, **kwargs)
+        self.connections.append(conn)
+        return conn
+
+
+@pytest.fixture
+def fake_db(monkeypatch):
+    """Route psycopg2.connect to a FakeDatabase and start with a fresh pool."""
+    import psycopg2
+    from database import connection
+
+    db = FakeDatabase()
+    monkeypatch.setattr(psycopg2, "connect", db.connect)
+    monkeypatch.setattr(connection, "_pool", None)
+    monkeypatch.setattr(connection, "_async_pool", None)
+    connection.db_breaker.reset()
+    yield db
+    connection.db_breaker.reset()
+    if connection._pool is not None and not connection._pool.closed:
+        connection._pool.closeall()
+
+
+@pytest.fixture
+def small_pool(fake_db, monkeypatch):
+    """A two-connection pool, so contention shows up quickly."""
+    from database import connection
+
+    monkeypatch.setitem(connection.POOL_CONFIG, "maxconn", 2)
+    monkeypatch.setitem(connection.POOL_CONFIG, "checkout_timeout", 5)
+    return connection.get_pool()
+
+
+@pytest.fixture
+def client(fake_db, monkeypatch):
+    """Flask test client for app.py backed by the fake database and an empty local cache."""
+    import app as maven_app
+    from database.circuit import CircuitBreaker
+    from maven_api import cache
+
+    redis_down = CircuitBreaker("redis", failure_threshold=1, reset_seconds=float("inf"))
+    redis_down.record_failure("not used in tests")
+    monkeypatch.setattr(cache.response_cache, "_breaker", redis_down)
+    monkeypatch.setattr(cache.response_cache, "_local", {})
+    monkeypatch.setattr(cache.response_cache, "_stats", {})
+
+    maven_app.app.config["TESTING"] = True
+    with maven_app.app.test_client() as client:
+        yield client
+
+
+@pytest.fixture
+def maven_data_dir(tmp_path, monkeypatch):
+    """Point app.py's git-first data directory at a temporary tree."""
+    import app as maven_app
+
+    data_dir = tmp_path / ".moha" / "maven"
+    (data_dir / "decisions").mkdir(parents=True)
+    monkeypatch.setattr(maven_app, "MAVEN_DATA_DIR", str(data_dir))
+    return data_dir
+
+
+class FakeEmailServer:
+    """
+    Local stand-in for the motherhaven.app email API.
+
+    Queue responses with `server.responses.append((status, body))`; once
+    they run out every request succeeds. Received payloads are kept in
+    `server.requests`. `server.delay` slows every response down.
+    """
+
+    def __init__(self):
+        self.responses = []
+        self.requests = []
+        self.delay = 0.0
+        self._lock = threading.Lock()
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length", 0))
+                payload = json.loads(self.rfile.read(length) or b"{}")
+                with server._lock:
+                    server.requests.append(payload)
+                    status, body = (server.responses.pop(0) if server.responses
+                                    else (200, {"success": True, "message_id": f"m{len(server.requests)}"}))
+                time.sleep(server.delay)
+                raw = json.dumps(body).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(raw)))
+                self.end_headers()
+                self.wfile.write(raw)
+
+            def log_message(self, *args):
+                pass
+
+        self._httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self._httpd.server_port}/api/email/send"
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+
+    def close(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+
+@pytest.fixture
+def email_server(monkeypatch):
+    """Run a FakeEmailServer and point maven_mcp.tools._send_email at it (fresh email circuit)."""
+    from database.circuit import CircuitBreaker
+    from maven_mcp import tools
+
+    server = FakeEmailServer()
+    monkeypatch.setattr(tools, "EMAIL_API_URL", server.url)
+    monkeypatch.setattr(tools, "email_breaker", CircuitBreaker("email"))
+    monkeypatch.setenv("EMAIL_API_SECRET", "test-secret")
+    yield server
+    server.close()
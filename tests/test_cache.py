@@ -0,0 +1,175 @@
+"""
+Tests for the read-through response cache.
+
+Run with: python -m pytest tests/test_cache.py -v
+"""
+from database.circuit import CircuitBreaker
+
+
+class FakeRedis:
+    """Minimal in-memory stand-in for the redis-py calls the cache makes."""
+
+    def __init__(self, fail=False):
+        self.fail = fail
+        self.hashes = {}
+        self.deleted = []
+
+    def _check(self):
+        if self.fail:
+            raise ConnectionError("redis down")
+
+    def hget(self, key, field):
+        self._check()
+        return self.hashes.get(key, {}).get(field)
+
+    def hset(self, key, field, value):
+        self._check()
+        self.hashes.setdefault(key, {})[field] = value
+
+    def expire(self, key, ttl):
+        self._check()
+
+    def delete(self, *keys):
+        self._check()
+        for key in keys:
+            self.deleted.append(key)
+            self.hashes.pop(key, None)
+
+    def pipeline(self):
+        return self
+
+    def execute(self):
+        return []
+
+
+WATCHLIST_ROW = ("BTC", "high", "perp", 50000, 0.0001, 1e9, None)
+
+
+# =============================================================================
+# Tests: ResponseCache
+# =============================================================================
+
+class TestResponseCache:
+    """Tests for the cache backends and counters."""
+
+    def test_redis_hit_and_miss(self):
+        from maven_api.cache import ResponseCache
+
+        cache = ResponseCache(redis_client=FakeRedis())
+        assert cache.get("watchlist", "_") is None
+        cache.set("watchlist", "_", b'{"count": 1}', ttl=30)
+
+        assert cache.get("watchlist", "_") == b'{"count": 1}'
+        stats = cache.stats()
+        assert stats["hits"] == 1
+        assert stats["misses"] == 1
+        assert stats["backend"] == "redis"
+
+    def test_expired_entry_is_a_miss(self):
+        from maven_api.cache import ResponseCache
+
+        cache = ResponseCache(redis_client=FakeRedis())
+        cache.set("signals", "_", b"{}", ttl=-1)
+        assert cache.get("signals", "_") is None
+
+    def test_invalidate_deletes_only_namespace(self):
+        from maven_api.cache import ResponseCache
+
+        redis = FakeRedis()
+        cache = ResponseCache(redis_client=redis)
+        cache.set("signals", "_", b"{}", ttl=30)
+        cache.set("watchlist", "_", b"{}", ttl=30)
+
+        cache.invalidate("signals")
+
+        assert redis.deleted == ["maven:cache:signals"]
+        assert cache.get("watchlist", "_") == b"{}"
+
+    def test_falls_back_to_local_when_redis_down(self):
+        from maven_api.cache import ResponseCache
+
+        redis = FakeRedis(fail=True)
+        breaker = CircuitBreaker("redis", failure_threshold=1, reset_seconds=60)
+        cache = ResponseCache(redis_client=redis, breaker=breaker)
+        cache.set("treasury_state", "_", b'{"v": 1}', ttl=30)
+        redis.fail = False
+
+        assert cache.get("treasury_state", "_") == b'{"v": 1}'
+        assert cache.stats()["backend"] == "local"
+        assert cache.stats()["namespaces"]["treasury_state"]["fallback"] >= 1
+
+
+# =============================================================================
+# Tests: cached endpoints
+# =============================================================================
+
+class TestCachedEndpoints:
+    """Tests for caching and invalidation wired into app.py."""
+
+    def test_second_read_is_served_from_cache(self, client, fake_db):
+        fake_db.respond("maven_watchlist_prices", [WATCHLIST_ROW])
+
+        first = client.get("/api/watchlist")
+        queries = len(fake_db.executed)
+        second = client.get("/api/watchlist")
+
+        assert first.headers["X-Cache"] == "MISS"
+        assert second.headers["X-Cache"] == "HIT"
+        assert second.get_json() == first.get_json()
+        assert len(fake_db.executed) == queries
+
+    def test_errors_are_not_cached(self, client, fake_db):
+        def boom(sql, params):
+            raise RuntimeError("db down")
+
+        fake_db.respond("FROM maven_trading_signals", boom)
+        assert client.get("/api/signals").status_code == 500
+
+        fake_db.respond("FROM maven_trading_signals", [])
+        response = client.get("/api/signals")
+        assert response.status_code == 200
+        assert response.headers["X-Cache"] == "MISS"
+
+    def test_post_watchlist_invalidates_watchlist_only(self, client, fake_db):
+        fake_db.respond("maven_watchlist_prices", [WATCHLIST_ROW])
+        fake_db.respond("FROM maven_trading_signals", [])
+        fake_db.respond("INSERT INTO maven_watchlist", [(7,)])
+        client.get("/api/watchlist")
+        client.get("/api/signals")
+
+        assert client.post("/api/watchlist", json={"coin": "eth"}).status_code == 200
+
+        assert client.get("/api/watchlist").headers["X-Cache"] == "MISS"
+        assert client.get("/api/signals").headers["X-Cache"] == "HIT"
+
+    def test_post_signal_invalidates_signals(self, client, fake_db):
+        fake_db.respond("FROM maven_trading_signals", [])
+        fake_db.respond("INSERT INTO maven_trading_signals", [(3,)])
+        client.get("/api/signals")
+
+        client.post("/api/signals", json={"coin": "btc", "signal_type": "buy"})
+
+        assert client.get("/api/signals").headers["X-Cache"] == "MISS"
+
+    def test_stats_endpoint(self, client, fake_db):
+        client.get("/api/signals")
+        client.get("/api/signals")
+
+        stats = client.get("/api/cache/stats").get_json()
+        assert stats["namespaces"]["signals"]["hits"] == 1
+        assert stats["namespaces"]["signals"]["misses"] == 1
+
+    def test_reads_routed_to_the_primary_skip_the_cache(self, client, fake_db):
+        fake_db.respond("maven_watchlist_prices", [WATCHLIST_ROW])
+        client.get("/api/watchlist")
+
+        queries = len(fake_db.executed)
+        by_header = client.get("/api/watchlist", headers={"X-Read-Primary": "1"})
+        client.set_cookie("maven_read_primary", "1")
+        by_cookie = client.get("/api/watchlist")
+
+        assert by_header.headers["X-Cache"] == by_cookie.headers["X-Cache"] == "BYPASS"
+        assert len(fake_db.executed) > queries
+        stats = client.get("/api/cache/stats").get_json()
+        assert stats["namespaces"]["watchlist"]["hits"] == 0
+        assert stats["namespaces"]["watchlist"]["misses"] == 1
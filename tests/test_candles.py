@@ -0,0 +1,131 @@
+"""
+Tests for the candle store (maven_api.candles).
+
+Run with: python -m pytest tests/test_candles.py -v
+"""
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from maven_api import candles
+from maven_api.maintenance import DEFAULT_JOBS
+
+
+NOW = datetime(2026, 3, 1, 12, 30, 15, tzinfo=timezone.utc)
+
+
+def candle(open_at, interval="1h", close="101"):
+    t = int(open_at.timestamp() * 1000)
+    step = candles.INTERVAL_SECONDS[interval] * 1000
+    return {"t": t, "T": t + step - 1, "s": "BTC", "i": interval,
+            "o": "100", "h": "102", "l": "99", "c": close, "v": "12.5", "n": 40}
+
+
+@pytest.fixture
+def fetched(monkeypatch):
+    """Replace Hyperliquid with one candle per request; records (coin, interval, start, end)."""
+    calls = []
+
+    def fetch(coin, interval, start, end):
+        calls.append((coin, interval, start, end))
+        return [candle(start, interval)]
+
+    monkeypatch.setattr(candles, "fetch_candles", fetch)
+    return calls
+
+
+class TestCandleStore:
+    """Tests for horizons, staging and the sync/gap jobs."""
+
+    def test_horizon_is_bounded_by_what_hyperliquid_keeps(self, monkeypatch):
+        monkeypatch.setattr(candles, "BACKFILL_DAYS", 90)
+        monkeypatch.setattr(candles, "CANDLES_1M_RETENTION_DAYS", 30)
+
+        assert candles.horizon("1d", NOW) == datetime(2025, 12, 1, tzinfo=timezone.utc)
+        # 1m: 4999 minutes back, not 30 days
+        assert NOW - candles.horizon("1m", NOW) < timedelta(days=3, hours=12)
+        assert candles.horizon("4h", NOW).hour % 4 == 0
+
+    def test_store_copies_into_staging_then_merges(self, fake_db):
+        conn = fake_db.connect()
+        at = datetime(2026, 3, 1, 11, tzinfo=timezone.utc)
+
+        candles.store(conn, "BTC", "1h", [candle(at), candle(at + timedelta(hours=1))])
+
+        (staging, _), (copy, data), (merge, _) = fake_db.executed
+        assert "CREATE TEMP TABLE IF NOT EXISTS maven_candles_staging" in staging
+        assert "FROM STDIN" in copy
+        assert data.splitlines()[0] == f"BTC,1h,{candle(at)['t']},{candle(at)['T']},100,102,99,101,12.5"
+        assert "ON CONFLICT (coin, interval, candle_open_at) DO UPDATE" in merge
+        assert conn.commits == 0
+
+    def test_sync_resumes_each_series_from_its_last_candle(self, fake_db, fetched):
+        last = NOW - timedelta(hours=3)
+        fake_db.respond("FROM maven_watchlist w", [("ETH", "1h", None), ("BTC", "1h", last)])
+        conn = fake_db.connect()
+
+        result = candles.sync(conn, now=NOW)
+
+        assert fetched == [("ETH", "1h", candles.horizon("1h", NOW), NOW),
+                           ("BTC", "1h", last, NOW)]
+        assert result["complete"] and result["requests"] == 2
+        copies = [sql for sql, _ in fake_db.executed if "FROM STDIN" in sql]
+        assert len(copies) == conn.commits - 1  # plus the series query
+
+    def test_request_budget_stops_a_run_early(self, fake_db, fetched, monkeypatch):
+        monkeypatch.setattr(candles, "BACKFILL_DAYS", 365)
+        fake_db.respond("FROM maven_watchlist w", [("ETH", "5m", None), ("BTC", "5m", None)])
+
+        result = candles.sync(fake_db.connect(), now=NOW, max_requests=1)
+
+        assert len(fetched) == 1
+        assert result == {"series": 2, "due": 2, "stored": 0, "requests": 1, "complete": False}
+
+    def test_sync_skips_series_whose_last_candle_is_still_open(self, fake_db, fetched, monkeypatch):
+        monkeypatch.setattr(candles, "INTERVALS", ("1m", "1d"))
+        day = candles._floor(NOW, "1d")
+        minute = candles._floor(NOW, "1m") - timedelta(minutes=2)
+        fake_db.respond("FROM maven_watchlist w", [("BTC", "1m", minute), ("BTC", "1d", day)])
+
+        result = candles.sync(fake_db.connect(), now=NOW)
+
+        # Today's daily candle is still open; the 1m series is two candles behind
+        assert fetched == [("BTC", "1m", minute, NOW)]
+        assert (result["series"], result["due"]) == (2, 1)
+        series_query = next(params for sql, params in fake_db.executed if "maven_watchlist w" in sql)
+        assert series_query == (["1m", "1d"], [60, 86400], NOW)
+
+    def test_fill_gaps_fetches_each_hole(self, fake_db, fetched):
+        last = NOW - timedelta(hours=1)
+        hole = (NOW - timedelta(hours=10), NOW - timedelta(hours=8))
+        fake_db.respond("FROM maven_watchlist w", [("BTC", "1h", last), ("SOL", "1h", None)])
+        fake_db.respond("maven_candle_gaps", [hole])
+
+        result = candles.fill_gaps(fake_db.connect(), now=NOW)
+
+        assert fetched == [("BTC", "1h", *hole)]
+        assert result["gaps"] == 1
+        gap_query = next(params for sql, params in fake_db.executed if "maven_candle_gaps" in sql)
+        assert gap_query == ("BTC", "1h", candles.horizon("1h", NOW), last)
+
+    def test_fetch_keeps_candles_inside_the_range(self, email_server, monkeypatch):
+        # Any JSON POST endpoint will do as Hyperliquid's /info
+        monkeypatch.setattr(candles, "HYPERLIQUID_INFO_URL", email_server.url)
+        start = datetime(2026, 3, 1, 10, tzinfo=timezone.utc)
+        email_server.responses.append((200, [candle(start - timedelta(hours=1)), candle(start),
+                                             candle(start + timedelta(hours=1))]))
+
+        got = candles.fetch_candles("BTC", "1h", start, start + timedelta(hours=1))
+
+        assert [c["t"] for c in got] == [candle(start)["t"]]
+        assert email_server.requests[0]["type"] == "candleSnapshot"
+        assert email_server.requests[0]["req"]["endTime"] == candle(start)["T"]
+
+    def test_jobs_are_scheduled(self):
+        assert {"candles", "candle_gaps"} <= set(DEFAULT_JOBS)
+
+    def test_candles_endpoint_serves_backfilled_resolutions(self, client, fake_db):
+        response = client.get("/api/market/btc/candles?resolution=4h")
+        assert response.status_code == 200
+        assert fake_db.executed[-1][1][:2] == ("BTC", "4h")
+        assert client.get("/api/market/btc/history?resolution=4h").status_code == 400
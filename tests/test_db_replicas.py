@@ -0,0 +1,160 @@
+"""
+Tests for read replica routing (database.connection.ReplicaRouter) and the
+API's read-your-writes handling (maven_api.sessions).
+
+Run with: python -m pytest tests/test_db_replicas.py -v
+"""
+import threading
+
+import psycopg2
+import pytest
+
+from database import connection
+from maven_api import sessions
+
+
+@pytest.fixture
+def replicas(fake_db, monkeypatch):
+    """Two replicas in front of the fake database; connections carry their host in .kwargs."""
+    monkeypatch.setattr(connection, "REPLICA_DSNS",
+                        ["host=replica1 port=5433", "postgresql://replica2:5434/maven_data"])
+    monkeypatch.setattr(connection, "_router", None)
+    monkeypatch.setattr(connection, "_last_write", threading.local())
+    router = connection.get_router()
+    for replica in router.replicas:
+        replica.breaker.reset()
+    yield router
+    router.close()
+    for replica in router.replicas:
+        replica.breaker.reset()
+
+
+def host(conn):
+    return conn.kwargs["host"]
+
+
+class TestReplicaRouter:
+    """Tests for choosing a server for each checkout."""
+
+    def test_replica_dsns_are_completed_from_db_config(self):
+        config = connection.replica_config("postgresql://replica2:5434/analytics")
+
+        assert (config["host"], config["port"], config["database"]) == ("replica2", 5434, "analytics")
+        assert config["user"] == connection.DB_CONFIG["user"]
+        assert config["password"] == connection.DB_CONFIG["password"]
+
+    def test_reads_rotate_over_replicas_and_writes_use_the_primary(self, replicas):
+        reads = [connection.checkout(owner="test", readonly=True) for _ in range(3)]
+        write = connection.checkout(owner="test")
+
+        assert [host(c) for c in reads] == ["replica1", "replica2", "replica1"]
+        assert host(write) == connection.DB_CONFIG["host"]
+
+        for conn in reads + [write]:
+            connection.release(conn)
+        assert all(r.pool.stats()["in_use"] == 0 for r in replicas.replicas)
+        assert connection.get_pool().stats()["in_use"] == 0
+        assert connection.get_pool_stats()["replicas"]["replica_checkouts"] == 3
+
+    def test_lagging_replica_is_skipped_until_it_catches_up(self, fake_db, replicas, monkeypatch):
+        lag = [30.0]
+        fake_db.respond("pg_is_in_recovery", lambda sql, params: [(lag[0],)])
+        monkeypatch.setitem(connection.REPLICA_CONFIG, "lag_check_seconds", 60)
+
+        first = connection.checkout(readonly=True)
+        second = connection.checkout(readonly=True)
+
+        # Both replicas measured 30s behind: reads went to the primary
+        assert {host(first), host(second)} == {connection.DB_CONFIG["host"]}
+        assert [r.lag_seconds for r in replicas.replicas] == [30.0, 30.0]
+        assert replicas.stats()["lag_skips"] == 4
+        measured = len(fake_db.executed)
+
+        # Not re-measured (or even contacted) until the check is due
+        connection.release(first)
+        connection.release(second)
+        assert host(connection.checkout(readonly=True)) == connection.DB_CONFIG["host"]
+        assert len(fake_db.executed) == measured
+
+        lag[0] = 0.5
+        monkeypatch.setitem(connection.REPLICA_CONFIG, "lag_check_seconds", 0)
+        assert host(connection.checkout(readonly=True)).startswith("replica")
+
+    def test_unreachable_replica_is_skipped_and_its_circuit_opens(self, fake_db, replicas, monkeypatch):
+        def connect(*args, **kwargs):
+            if kwargs.get("host") == "replica1":
+                raise psycopg2.OperationalError("could not connect to server")
+            return fake_db.connect(*args, **kwargs)
+
+        monkeypatch.setattr(psycopg2, "connect", connect)
+        replica1 = replicas.replicas[0]
+
+        hosts = [host(connection.checkout(readonly=True)) for _ in range(6)]
+
+        assert hosts == ["replica2"] * 6
+        assert replica1.breaker.state == "open"
+        assert replicas.stats()["errors"] == replica1.breaker.failure_threshold
+
+    def test_no_usable_replica_falls_back_to_the_primary(self, replicas):
+        for replica in replicas.replicas:
+            for _ in range(replica.breaker.failure_threshold):
+                replica.breaker.record_failure("down")
+
+        conn = connection.checkout(readonly=True)
+
+        assert host(conn) == connection.DB_CONFIG["host"]
+        assert replicas.stats()["primary_fallbacks"] == 1
+
+    def test_a_thread_reads_its_own_writes_from_the_primary(self, replicas):
+        with connection.get_db_connection(owner="test") as conn:
+            assert host(conn) == connection.DB_CONFIG["host"]
+
+        with connection.get_db_connection(readonly=True) as conn:
+            assert host(conn) == connection.DB_CONFIG["host"]
+
+        seen = []
+        other = threading.Thread(target=lambda: seen.append(host(connection.checkout(readonly=True))))
+        other.start()
+        other.join()
+        assert seen[0].startswith("replica")
+
+
+class TestRequestRouting:
+    """Tests for which server an API request reads from."""
+
+    @pytest.fixture
+    def released(self, monkeypatch):
+        hosts = []
+
+        def release(conn, close=False):
+            hosts.append(host(conn))
+            connection.release(conn, close=close)
+
+        monkeypatch.setattr(sessions, "release", release)
+        return hosts
+
+    def test_get_reads_from_a_replica_unless_told_otherwise(self, client, replicas, released):
+        assert client.get("/api/signals").status_code == 200
+        assert client.get("/api/signals?coin=BTC", headers={"X-Read-Primary": "1"}).status_code == 200
+
+        assert released == ["replica1", connection.DB_CONFIG["host"]]
+
+    def test_a_write_keeps_the_client_on_the_primary(self, client, fake_db, replicas, released):
+        fake_db.respond("INSERT INTO maven_watchlist", [(7,)])
+
+        response = client.post("/api/watchlist", json={"coin": "btc"})
+        assert response.status_code in (200, 201)
+        assert "maven_read_primary=1" in response.headers["Set-Cookie"]
+
+        client.get("/api/watchlist")
+
+        assert released == [connection.DB_CONFIG["host"]] * 2
+
+    def test_stream_backlog_is_read_from_the_primary(self, client, replicas, released, monkeypatch):
+        from maven_api import stream
+
+        monkeypatch.setattr(stream, "latest_cursor", lambda db: {})
+        monkeypatch.setattr(stream, "event_stream", lambda *args: iter(()))
+
+        assert client.get("/api/stream").status_code == 200
+        assert released == [connection.DB_CONFIG["host"]]
@@ -0,0 +1,391 @@
+"""
+Tests for request-scoped DB sessions and the instrumented connection pool.
+
+Run with: python -m pytest tests/test_db_sessions.py -v
+"""
+import asyncio
+import json
+import logging
+import threading
+from datetime import datetime, timezone
+
+import pytest
+from psycopg2.pool import PoolError
+
+
+TREASURY_ROW = (
+    "0xabc", 1000, 900, 100, 5, 1, [], 10, datetime(2026, 1, 1, tzinfo=timezone.utc)
+)
+
+
+# =============================================================================
+# Tests: InstrumentedConnectionPool
+# =============================================================================
+
+class TestInstrumentedPool:
+    """Tests for pool checkout accounting and blocking behaviour."""
+
+    def test_stats_track_in_use_and_hold_time(self, small_pool):
+        conn = small_pool.getconn(owner="test")
+        stats = small_pool.stats()
+        assert stats["in_use"] == 1
+        assert stats["checkouts"] == 1
+
+        small_pool.putconn(conn)
+        stats = small_pool.stats()
+        assert stats["in_use"] == 0
+        assert stats["hold_seconds_total"] >= 0
+
+    def test_exhausted_pool_times_out(self, small_pool):
+        held = [small_pool.getconn(), small_pool.getconn()]
+
+        with pytest.raises(PoolError):
+            small_pool.getconn(timeout=0.05)
+        assert small_pool.stats()["timeouts"] == 1
+
+        for conn in held:
+            small_pool.putconn(conn)
+
+    def test_waiter_gets_connection_when_released(self, small_pool):
+        held = [small_pool.getconn(), small_pool.getconn()]
+        got = []
+
+        waiter = threading.Thread(target=lambda: got.append(small_pool.getconn(timeout=2)))
+        waiter.start()
+        small_pool.putconn(held.pop())
+        waiter.join(timeout=2)
+
+        assert len(got) == 1
+        assert small_pool.stats()["wait_seconds_max"] > 0
+        small_pool.putconn(got[0])
+        small_pool.putconn(held.pop())
+
+    def test_leak_detector_names_owner(self, small_pool, caplog):
+        from database import connection
+
+        conn = small_pool.getconn(owner="GET treasury_state")
+        with caplog.at_level(logging.WARNING, logger="database.connection"):
+            leaks = connection.check_for_leaks(threshold=0)
+
+        assert leaks[0][0] == "GET treasury_state"
+        assert "GET treasury_state" in caplog.text
+        small_pool.putconn(conn)
+
+
+class TestPoolLifecycle:
+    """Tests for per-worker pool warm-up and reset."""
+
+    def test_warm_pool_round_trips(self, fake_db):
+        from database import connection
+
+        assert connection.warm_pool() is True
+        assert ("SELECT 1", None) in fake_db.executed
+        assert connection.get_pool_stats()["in_use"] == 0
+
+    def test_reset_pool_closes_connections(self, fake_db):
+        from database import connection
+
+        connection.warm_pool()
+        connection.reset_pool()
+
+        assert connection._pool is None
+        assert all(conn.closed for conn in fake_db.connections)
+
+
+class TestConnectionHealth:
+    """Tests for lifetime recycling, checkout validation and session options."""
+
+    @pytest.fixture
+    def pool(self, fake_db):
+        from database import connection
+
+        pool = connection.InstrumentedConnectionPool(
+            1, 2, checkout_timeout=1, max_lifetime=60, validate_idle=0, host="fake"
+        )
+        yield pool
+        pool.closeall()
+
+    def test_old_connections_are_recycled(self, pool, fake_db):
+        conn = pool.getconn()
+        pool.putconn(conn)
+        pool._opened[id(conn)] -= 61
+
+        fresh = pool.getconn()
+        assert fresh is not conn
+        assert conn.closed
+        assert pool.stats()["recycled"] == 1
+        pool.putconn(fresh)
+
+    def test_dropped_idle_connection_is_replaced(self, pool, fake_db):
+        conn = pool.getconn()
+        pool.putconn(conn)
+        conn.broken = True
+
+        fresh = pool.getconn()
+        assert fresh is not conn and conn.closed
+        assert pool.stats()["validation_failures"] == 1
+        assert pool.stats()["in_use"] == 1
+        pool.putconn(fresh)
+
+    def test_idle_connections_pinged_only_past_threshold(self, pool, fake_db):
+        pool.validate_idle = 3600
+        pool.putconn(pool.getconn())
+        pool.putconn(pool.getconn())
+        assert ("SELECT 1", None) not in fake_db.executed
+
+    def test_pool_sessions_get_statement_timeout(self, fake_db, monkeypatch):
+        from database import connection
+
+        monkeypatch.setitem(connection.POOL_CONFIG, "statement_timeout_ms", 1500)
+        connection.warm_pool()
+        assert fake_db.connections[0].kwargs["options"] == "-c statement_timeout=1500"
+
+
+class TestPreparedStatements:
+    """Tests for execute_prepared() and the per-connection statement cache."""
+
+    @pytest.fixture
+    def prepared(self, fake_db, monkeypatch):
+        from database import connection
+
+        monkeypatch.setitem(connection.POOL_CONFIG, "statement_cache_size", 2)
+        return connection
+
+    @staticmethod
+    def statements(fake_db, verb):
+        return [sql for sql, _ in fake_db.executed if sql.startswith(verb)]
+
+    def test_prepared_once_per_connection(self, prepared, fake_db):
+        fake_db.respond("maven_treasury_current", [TREASURY_ROW])
+        sql = "SELECT * FROM maven_decisions WHERE decided_at <= %s AND id < %s LIMIT %s"
+
+        with prepared.get_db_connection() as conn:
+            cursor = conn.cursor()
+            for _ in range(3):
+                prepared.execute_prepared(cursor, "decisions_page", sql, (TREASURY_ROW[8], 5, 21))
+            prepared.execute_prepared(cursor, "treasury", "SELECT * FROM maven_treasury_current")
+            assert cursor.fetchone() == TREASURY_ROW
+
+        prepares = self.statements(fake_db, "PREPARE")
+        assert len(prepares) == 2
+        assert "decided_at <= $1 AND id < $2 LIMIT $3" in prepares[0]
+        name = prepared.statement_name("decisions_page", sql)
+        assert (f"EXECUTE {name} (%s, %s, %s)", (TREASURY_ROW[8], 5, 21)) in fake_db.executed
+        assert prepared.statement_cache.stats()["hits"] >= 2
+
+    def test_least_recently_used_statement_is_deallocated(self, prepared, fake_db):
+        with prepared.get_db_connection() as conn:
+            cursor = conn.cursor()
+            for table in ("a", "b", "a", "c"):
+                prepared.execute_prepared(cursor, table, f"SELECT * FROM {table}")
+
+        evicted = prepared.statement_name("b", "SELECT * FROM b")
+        assert self.statements(fake_db, "DEALLOCATE") == [f"DEALLOCATE {evicted}"]
+
+    def test_new_connection_prepares_again(self, prepared, fake_db):
+        with prepared.get_db_connection() as conn:
+            prepared.execute_prepared(conn.cursor(), "w", "SELECT * FROM maven_watchlist_prices")
+        prepared.reset_pool()
+        with prepared.get_db_connection() as conn:
+            prepared.execute_prepared(conn.cursor(), "w", "SELECT * FROM maven_watchlist_prices")
+
+        assert len(self.statements(fake_db, "PREPARE")) == 2
+
+    def test_disabled_cache_runs_plain_sql(self, fake_db):
+        from database import connection
+
+        with connection.get_db_connection() as conn:
+            connection.execute_prepared(conn.cursor(), "w", "SELECT 2")
+        assert ("SELECT 2", None) in fake_db.executed
+        assert not self.statements(fake_db, "PREPARE")
+
+    def test_hot_endpoints_use_prepared_statements(self, prepared, client, fake_db):
+        fake_db.respond("maven_treasury_current", [TREASURY_ROW])
+
+        body = client.get("/api/treasury/state").get_json()
+        client.get("/api/watchlist")
+        client.get("/api/decisions")
+
+        assert body["wallet_address"] == "0xabc"
+        assert len(self.statements(fake_db, "EXECUTE")) == 3
+
+
+class TestAsyncPool:
+    """Tests for the asyncio pool used by the MCP servers."""
+
+    @pytest.fixture
+    def pool(self, fake_db, monkeypatch):
+        from database import connection
+
+        monkeypatch.setitem(connection.POOL_CONFIG, "statement_cache_size", 4)
+        return connection.AsyncConnectionPool(minconn=1, maxconn=1, checkout_timeout=0.05,
+                                              max_lifetime=60, validate_idle=-1, host="fake")
+
+    def test_connections_are_async_and_reused(self, pool, fake_db):
+        async def scenario():
+            async with pool.connection() as conn:
+                first = conn
+                cursor = await pool.execute_prepared(conn, "w", "SELECT * FROM maven_watchlist_prices")
+                cursor.fetchall()
+            async with pool.connection() as conn:
+                await pool.execute_prepared(conn, "w", "SELECT * FROM maven_watchlist_prices")
+                return first, conn
+
+        first, second = asyncio.run(scenario())
+
+        assert first is second and first.async_ == 1
+        assert len([sql for sql, _ in fake_db.executed if sql.startswith("PREPARE")]) == 1
+        assert pool.stats()["checkouts"] == 2 and pool.stats()["in_use"] == 0
+
+    def test_checkout_times_out_when_exhausted(self, pool):
+        async def scenario():
+            held = await pool.getconn()
+            try:
+                with pytest.raises(PoolError):
+                    await pool.getconn()
+            finally:
+                pool.putconn(held)
+
+        asyncio.run(scenario())
+        assert pool.stats()["timeouts"] == 1
+
+    def test_expired_connection_is_replaced(self, pool, fake_db):
+        async def scenario():
+            conn = await pool.getconn()
+            pool.putconn(conn)
+            pool._opened[id(conn)] -= 61
+            fresh = await pool.getconn()
+            pool.putconn(fresh)
+            return conn, fresh
+
+        old, fresh = asyncio.run(scenario())
+        assert old.closed and fresh is not old
+        assert pool.stats()["recycled"] == 1
+
+    def test_mcp_tools_write_through_the_async_pool(self, pool, fake_db, tmp_path, monkeypatch):
+        from database import connection
+        from maven_mcp import tools
+
+        base = tools.PATHS["base"]
+        for key, path in list(tools.PATHS.items()):
+            monkeypatch.setitem(tools.PATHS, key, tmp_path / path.relative_to(base))
+        monkeypatch.setattr(tools, "DB_AVAILABLE", True)
+        monkeypatch.setattr(connection, "_async_pool", pool)
+        monkeypatch.setattr(tools, "get_db_connection", None)  # the threaded pool must not be used
+        fake_db.respond("INSERT INTO maven_memory", [(7,)])
+        fake_db.respond("INSERT INTO maven_decisions", [(9,)])
+
+        async def scenario():
+            event = await tools.call_tool("maven_log_event", {"event_type": "observation",
+                                                              "content": "BTC funding flipped"})
+            decision = await tools.call_tool("maven_record_decision", {
+                "decision_type": "hold", "action": "Hold BTC", "reasoning": "Funding neutral",
+                "confidence": 60, "risk_level": "low"})
+            return json.loads(event.text), json.loads(decision.text)
+
+        event, decision = asyncio.run(scenario())
+
+        assert event["db_id"] == 7 and event["db_persisted"]
+        assert decision["data"]["db_id"] == 9 and decision["data"]["db_error"] is None
+        assert "BTC funding flipped" in tools.PATHS["session_log"].read_text()
+        assert all(conn.async_ == 1 for conn in fake_db.connections)
+        assert pool.stats()["checkouts"] == 2 and pool.stats()["in_use"] == 0
+
+
+# =============================================================================
+# Tests: Flask request sessions
+# =============================================================================
+
+class TestRequestSessions:
+    """Tests that app.py returns connections at the end of each request."""
+
+    def test_connection_returned_after_request(self, client, fake_db):
+        from database import connection
+
+        fake_db.respond("maven_treasury_current", [TREASURY_ROW])
+        response = client.get("/api/treasury/state")
+
+        assert response.status_code == 200
+        assert response.get_json()["account_value_usd"] == 1000
+        assert connection.get_pool_stats()["in_use"] == 0
+
+    def test_connection_returned_after_handler_error(self, client, fake_db):
+        from database import connection
+
+        def boom(sql, params):
+            raise RuntimeError("query failed")
+
+        fake_db.respond("maven_watchlist_prices", boom)
+        response = client.get("/api/watchlist")
+
+        assert response.status_code == 500
+        assert connection.get_pool_stats()["in_use"] == 0
+
+    def test_broken_connection_is_closed_not_pooled(self, client, fake_db, monkeypatch):
+        import psycopg2
+        from database import connection
+        from maven_api import sessions
+        from maven_api.cache import response_cache
+
+        monkeypatch.setattr(response_cache, "enabled", False)
+        released = []
+
+        def release(conn, close=False):
+            released.append(close)
+            connection.release(conn, close=close)
+
+        def lost(self):
+            raise psycopg2.OperationalError("server closed the connection unexpectedly")
+
+        monkeypatch.setattr(sessions, "release", release)
+        fake_db.respond("maven_watchlist_prices", [])
+        assert client.get("/api/watchlist").status_code == 200
+
+        monkeypatch.setattr(type(fake_db.connect()), "commit", lost)
+        monkeypatch.setattr(type(fake_db.connect()), "rollback", lost)
+        client.get("/api/watchlist")
+
+        assert released == [False, True]
+        assert connection.get_pool_stats()["in_use"] == 0
+        assert sum(conn.closed for conn in fake_db.connections) >= 1
+
+    def test_pool_stats_endpoint(self, client, fake_db):
+        client.get("/api/signals")
+        stats = client.get("/api/db/pool").get_json()
+
+        assert stats["initialized"] is True
+        assert stats["checkouts"] >= 1
+        assert stats["in_use"] == 0
+
+    def test_thousands_of_requests_on_small_pool(self, small_pool, client, fake_db, monkeypatch):
+        """Load test: 2,000 requests from 8 threads against a 2-connection pool."""
+        from maven_api.cache import response_cache
+
+        monkeypatch.setattr(response_cache, "enabled", False)
+        fake_db.respond("maven_treasury_current", [TREASURY_ROW])
+        fake_db.respond("maven_watchlist_prices", [])
+        statuses = []
+        lock = threading.Lock()
+
+        import app as maven_app
+
+        def worker():
+            with maven_app.app.test_client() as c:
+                for i in range(250):
+                    url = "/api/treasury/state" if i % 2 else "/api/watchlist"
+                    code = c.get(url).status_code
+                    with lock:
+                        statuses.append(code)
+
+        threads = [threading.Thread(target=worker) for _ in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        stats = small_pool.stats()
+        assert len(statuses) == 2000
+        assert set(statuses) == {200}
+        assert stats["in_use"] == 0
+        assert stats["timeouts"] == 0
+        assert stats["in_use_max"] <= 2
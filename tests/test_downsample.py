@@ -0,0 +1,136 @@
+"""
+Tests for downsampled market history (database.downsample).
+
+Run with: python -m pytest tests/test_downsample.py -v
+"""
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+
+import pytest
+
+from database import downsample
+
+
+NOW = datetime(2026, 3, 1, 12, 0, tzinfo=timezone.utc)
+
+
+class TestPickResolution:
+    """Tests for choosing the stored resolution behind a range query."""
+
+    @pytest.mark.parametrize("span, step, expected", [
+        (timedelta(hours=1), None, "raw"),         # 7.2 s per point
+        (timedelta(days=2), None, "5m"),           # 346 s per point
+        (timedelta(days=30), None, "1h"),          # 86 min per point
+        (timedelta(days=1000), None, "1d"),        # 48 h per point
+        (timedelta(days=2), 4 * 3600, "1h"),       # 4h requested -> coarsest no wider is 1h
+        (timedelta(days=2), 900, "5m"),
+    ])
+    def test_coarsest_resolution_no_wider_than_step(self, span, step, expected):
+        assert downsample.pick_resolution("bars", NOW - span, NOW, step=step, now=NOW) == expected
+
+    def test_goes_coarser_where_finer_data_was_pruned(self, monkeypatch):
+        monkeypatch.setattr(downsample, "SNAPSHOT_RETENTION_DAYS", 90)
+        monkeypatch.setattr(downsample, "BARS_5M_RETENTION_DAYS", 365)
+        start = NOW - timedelta(days=100)
+
+        assert downsample.pick_resolution("bars", start, start + timedelta(hours=1),
+                                          now=NOW) == "5m"
+        old = NOW - timedelta(days=400)
+        assert downsample.pick_resolution("bars", old, old + timedelta(hours=1), now=NOW) == "1h"
+
+    def test_candles_start_at_one_minute(self, monkeypatch):
+        monkeypatch.setattr(downsample, "CANDLES_1M_RETENTION_DAYS", 30)
+        assert downsample.pick_resolution("candles", NOW - timedelta(hours=4), NOW,
+                                          now=NOW) == "1m"
+        assert downsample.pick_resolution("candles", NOW - timedelta(days=31), NOW - timedelta(days=30, hours=20),
+                                          now=NOW) == "5m"
+
+    @pytest.mark.parametrize("value, seconds", [("15m", 900), ("4h", 14400), ("1d", 86400), ("90", 90)])
+    def test_parse_step(self, value, seconds):
+        assert downsample.parse_step(value) == seconds
+
+    def test_parse_step_rejects_garbage(self):
+        with pytest.raises(ValueError):
+            downsample.parse_step("soon")
+
+
+class TestDownsampleJob:
+    """Tests for the watermark stepping loop."""
+
+    def test_steps_each_target_until_caught_up_then_prunes(self, fake_db):
+        steps = {"bars_5m": [(288, False), (40, True)]}
+
+        def step(sql, params):
+            queue = steps.get(params[0])
+            return [queue.pop(0)] if queue else [(0, True)]
+
+        fake_db.respond("maven_downsample_step", step)
+        fake_db.respond("maven_downsample_prune", lambda sql, params: [(0,)])
+        conn = fake_db.connect()
+
+        result = downsample.run(conn, lag_seconds=60)
+
+        assert result["rolled"]["bars_5m"] == 328
+        assert result["rolled"]["candles_1d"] == 0
+        targets = [params[0] for sql, params in fake_db.executed if "maven_downsample_step" in sql]
+        assert targets[:3] == ["bars_5m", "bars_5m", "bars_1h"]
+        assert result["pruned"] == {"candles_1m": 0, "bars_5m": 0}
+        assert conn.commits == len(fake_db.executed)
+
+    def test_prunes_in_batches(self, fake_db, monkeypatch):
+        monkeypatch.setattr(downsample, "PRUNE_BATCH", 2)
+        batches = [(2,), (2,), (1,)]
+        fake_db.respond("maven_downsample_step", [(0, True)])
+        fake_db.respond("maven_downsample_prune",
+                        lambda sql, params: [batches.pop(0) if params[0] == "candles_1m" else (0,)])
+
+        result = downsample.run(fake_db.connect())
+
+        assert result["pruned"]["candles_1m"] == 5
+
+
+class TestHistoryEndpoints:
+    """Tests for /api/market/<coin>/history and /candles."""
+
+    def test_history_from_bars(self, client, fake_db):
+        bucket = datetime(2026, 3, 1, 11, 0, tzinfo=timezone.utc)
+        fake_db.respond("FROM maven_market_bars", [
+            (bucket, Decimal("100"), Decimal("110"), Decimal("95"), Decimal("105"),
+             Decimal("0.0001"), Decimal("5000000"), None, Decimal("250000"), Decimal("240000"),
+             Decimal("1.5")),
+        ])
+
+        response = client.get("/api/market/btc/history"
+                              "?start=2026-02-01T00:00:00Z&end=2026-03-01T12:00:00Z&step=1h")
+        body = response.get_json()
+
+        assert response.status_code == 200
+        assert body["coin"] == "BTC"
+        assert body["resolution"] == "1h"
+        assert body["points"][0]["close"] == 105.0
+        assert body["points"][0]["volume_24h_usd"] is None
+        sql, params = fake_db.executed[-1]
+        assert "FROM maven_market_bars" in sql
+        assert params[:2] == ("BTC", "1h")
+
+    def test_candles_with_forced_resolution(self, client, fake_db):
+        response = client.get("/api/market/eth/candles?resolution=1d")
+        assert response.status_code == 200
+        assert response.get_json()["resolution"] == "1d"
+        assert "FROM maven_candles" in fake_db.executed[-1][0]
+
+    def test_truncated_when_over_row_limit(self, client, fake_db, monkeypatch):
+        monkeypatch.setattr(downsample, "HISTORY_ROW_LIMIT", 2)
+        at = datetime(2026, 3, 1, tzinfo=timezone.utc)
+        fake_db.respond("FROM maven_market_snapshots",
+                        [(at, Decimal("1"), Decimal("1"), Decimal("1"), Decimal("1"),
+                          None, None, None, None, None, None)] * 3)
+
+        body = client.get("/api/market/btc/history?resolution=raw").get_json()
+
+        assert body["count"] == 2 and body["truncated"] is True
+
+    @pytest.mark.parametrize("query", ["step=soon", "resolution=15m",
+                                       "start=2026-03-02T00:00:00Z&end=2026-03-01T00:00:00Z"])
+    def test_bad_params_are_400(self, client, fake_db, query):
+        assert client.get(f"/api/market/btc/history?{query}").status_code == 400
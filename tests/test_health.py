@@ -0,0 +1,167 @@
+"""
+Tests for circuit breakers, dependency health probes and /health.
+
+Run with: python -m pytest tests/test_health.py -v
+"""
+import time
+
+import psycopg2
+import pytest
+
+from database import connection
+from database.circuit import CircuitBreaker, CircuitOpenError
+from maven_api import health
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestCircuitBreaker:
+    """Tests for the closed -> open -> half-open cycle."""
+
+    @pytest.fixture
+    def clock(self):
+        return FakeClock()
+
+    @pytest.fixture
+    def breaker(self, clock):
+        return CircuitBreaker("dep", failure_threshold=3, reset_seconds=30, clock=clock)
+
+    def test_opens_after_consecutive_failures(self, breaker):
+        breaker.record_failure("boom")
+        breaker.record_failure("boom")
+        breaker.record_success()
+        breaker.record_failure("boom")
+        breaker.record_failure("boom")
+        assert breaker.state == "closed"
+
+        breaker.record_failure("boom")
+        assert breaker.state == "open"
+        with pytest.raises(CircuitOpenError) as exc:
+            breaker.before_call()
+        assert exc.value.retry_after == 30
+        assert breaker.snapshot()["rejected"] == 1
+
+    def test_half_open_admits_one_trial(self, breaker, clock):
+        for _ in range(3):
+            breaker.record_failure("boom")
+        clock.now += 30
+        assert breaker.state == "half_open"
+
+        breaker.before_call()
+        assert not breaker.allows()
+        with pytest.raises(CircuitOpenError):
+            breaker.before_call()
+
+        breaker.record_failure("still down")
+        assert breaker.state == "open"
+        clock.now += 30
+        breaker.before_call()
+        breaker.record_success()
+        assert breaker.state == "closed"
+
+
+class TestDatabaseBreaker:
+    """Tests for fail-fast checkouts."""
+
+    @pytest.fixture
+    def db_down(self, fake_db, monkeypatch):
+        calls = []
+
+        def refuse(*args, **kwargs):
+            calls.append(kwargs)
+            raise psycopg2.OperationalError("could not connect to server")
+
+        monkeypatch.setattr(psycopg2, "connect", refuse)
+        return calls
+
+    def test_checkouts_fail_fast_once_open(self, db_down):
+        for _ in range(connection.db_breaker.failure_threshold):
+            with pytest.raises(psycopg2.OperationalError):
+                connection.checkout()
+        attempts = len(db_down)
+
+        assert not connection.db_ready()
+        with pytest.raises(CircuitOpenError):
+            connection.checkout()
+        assert len(db_down) == attempts
+
+    def test_connections_use_a_bounded_connect_timeout(self, db_down):
+        with pytest.raises(psycopg2.OperationalError):
+            connection.checkout()
+        assert db_down[0]["connect_timeout"] == connection.DB_CONFIG["connect_timeout"]
+
+    def test_handlers_answer_503_while_open(self, client, db_down):
+        for _ in range(connection.db_breaker.failure_threshold):
+            with pytest.raises(psycopg2.OperationalError):
+                connection.checkout()
+
+        started = time.monotonic()
+        response = client.get("/api/decisions")
+        assert response.status_code == 503
+        assert time.monotonic() - started < 0.5
+
+    def test_breaker_errors_map_to_503_with_retry_after(self):
+        import app as maven_app
+
+        with maven_app.app.test_request_context("/"):
+            response, status = maven_app.circuit_open(CircuitOpenError("email", 12.4))
+        assert status == 503
+        assert response.headers["Retry-After"] == "12"
+        assert response.get_json()["dependency"] == "email"
+
+
+class TestHealth:
+    """Tests for cached probes and /health."""
+
+    @pytest.fixture
+    def monitor(self, monkeypatch):
+        calls = {"postgres": 0, "email": 0}
+
+        def postgres(timeout):
+            calls["postgres"] += 1
+
+        def email(timeout):
+            calls["email"] += 1
+            raise RuntimeError("HTTP 502")
+
+        m = health.HealthMonitor({"postgres": postgres, "email": email}, interval=60)
+        monkeypatch.setattr(health, "monitor", m)
+        m.calls = calls
+        yield m
+        from database.circuit import get_breaker
+        get_breaker("email").reset()
+
+    def test_results_are_cached(self, monitor):
+        first = monitor.snapshot()
+        second = monitor.snapshot()
+
+        assert monitor.calls == {"postgres": 1, "email": 1}
+        assert first["postgres"]["status"] == "up"
+        assert second["email"] == dict(second["email"], status="down", error="HTTP 502")
+        assert second["postgres"]["latency_ms"] >= 0
+
+    def test_failed_probes_open_the_circuit(self, monitor):
+        for _ in range(3):
+            monitor.check("email")
+        assert monitor.snapshot()["email"]["circuit"] == "open"
+
+    def test_shallow_health_probes_nothing(self, client, monitor):
+        body = client.get("/health").get_json()
+        assert body["status"] == "healthy"
+        assert "dependencies" not in body
+        assert monitor.calls == {"postgres": 0, "email": 0}
+
+    def test_deep_health_reports_each_dependency(self, client, monitor):
+        response = client.get("/health?deep=1")
+        body = response.get_json()
+
+        assert response.status_code == 200
+        assert body["status"] == "degraded"
+        assert set(body["dependencies"]) == {"postgres", "email"}
+        assert body["dependencies"]["postgres"]["circuit"] == "closed"
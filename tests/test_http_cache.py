@@ -0,0 +1,84 @@
+"""
+Tests for ETag / Last-Modified handling on the /api/mcp/* endpoints.
+
+Run with: python -m pytest tests/test_http_cache.py -v
+"""
+import json
+import os
+from unittest.mock import patch
+
+
+class TestConditionalFileEndpoints:
+    """Tests for single-file endpoints (identity, memory, infrastructure, trading-setup)."""
+
+    def test_etag_and_cache_control_present(self, client, maven_data_dir):
+        (maven_data_dir / "identity.json").write_text(json.dumps({"name": "Maven"}))
+
+        response = client.get("/api/mcp/identity")
+
+        assert response.status_code == 200
+        assert response.headers["ETag"].startswith('W/"')
+        assert "Last-Modified" in response.headers
+        assert "max-age" in response.headers["Cache-Control"]
+
+    def test_matching_etag_returns_304_without_reading(self, client, maven_data_dir):
+        (maven_data_dir / "infrastructure.json").write_text(json.dumps({"a": 1}))
+        etag = client.get("/api/mcp/infrastructure").headers["ETag"]
+
+        with patch("builtins.open", side_effect=AssertionError("file was read")):
+            response = client.get("/api/mcp/infrastructure", headers={"If-None-Match": etag})
+
+        assert response.status_code == 304
+        assert response.data == b""
+        assert response.headers["ETag"] == etag
+
+    def test_if_modified_since_returns_304(self, client, maven_data_dir):
+        (maven_data_dir / "TRADING_SETUP.md").write_text("# Setup")
+        last_modified = client.get("/api/mcp/trading-setup").headers["Last-Modified"]
+
+        response = client.get("/api/mcp/trading-setup", headers={"If-Modified-Since": last_modified})
+
+        assert response.status_code == 304
+
+    def test_changed_file_gets_new_etag(self, client, maven_data_dir):
+        path = maven_data_dir / "session_log.md"
+        path.write_text("# Log\n")
+        etag = client.get("/api/mcp/memory").headers["ETag"]
+
+        path.write_text("# Log\n\nmore\n")
+        os.utime(path, ns=(0, 10**18))
+        response = client.get("/api/mcp/memory", headers={"If-None-Match": etag})
+
+        assert response.status_code == 200
+        assert response.headers["ETag"] != etag
+
+    def test_query_string_changes_etag(self, client, maven_data_dir):
+        (maven_data_dir / "session_log.md").write_text("a\nb\nc\n")
+
+        full = client.get("/api/mcp/memory").headers["ETag"]
+        tail = client.get("/api/mcp/memory?lines=1").headers["ETag"]
+
+        assert full != tail
+
+    def test_missing_file_has_no_validators(self, client, maven_data_dir):
+        response = client.get("/api/mcp/identity")
+
+        assert response.status_code == 200
+        assert "ETag" not in response.headers
+
+
+class TestConditionalDecisions:
+    """Tests for the directory-based decisions endpoint."""
+
+    def test_new_decision_changes_etag(self, client, maven_data_dir):
+        decisions = maven_data_dir / "decisions"
+        (decisions / "decision_20260101_000000.md").write_text("# One")
+        etag = client.get("/api/mcp/decisions/recent").headers["ETag"]
+
+        assert client.get("/api/mcp/decisions/recent", headers={"If-None-Match": etag}).status_code == 304
+
+        (decisions / "decision_20260102_000000.md").write_text("# Two")
+        response = client.get("/api/mcp/decisions/recent", headers={"If-None-Match": etag})
+
+        assert response.status_code == 200
+        assert response.get_json()["count"] == 2
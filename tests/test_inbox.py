@@ -0,0 +1,232 @@
+"""
+Tests for the incoming email queue, ingester and /api/email/* endpoints.
+
+Run with: python -m pytest tests/test_inbox.py -v
+"""
+import json
+import time
+
+import pytest
+
+from maven_api import inbox
+from maven_api.inbox import InboxIngester, InboxStore
+
+
+EMAIL = {
+    "from": "Boss@Example.com",
+    "fromName": "The Boss",
+    "subject": "Quarterly treasury review",
+    "textContent": "Please send the rebalancing plan before Friday.",
+    "htmlContent": "<p>Please send the rebalancing plan before Friday.</p>",
+    "receivedAt": "2026-01-19T04:34:23Z",
+}
+
+
+class FakeLog:
+    """Records batches passed to log_events; fails while `failing` is set."""
+
+    def __init__(self):
+        self.batches = []
+        self.failing = False
+
+    def __call__(self, events):
+        if self.failing:
+            return {"success": False, "error": "disk full"}
+        self.batches.append(events)
+        return {"success": True, "count": len(events), "db_ids": [], "db_persisted": False}
+
+
+@pytest.fixture
+def store(tmp_path):
+    return InboxStore(tmp_path / "inbox")
+
+
+@pytest.fixture
+def log():
+    return FakeLog()
+
+
+@pytest.fixture
+def ingester(store, log):
+    return InboxIngester(store, log, batch_size=10)
+
+
+class TestStore:
+    """Tests for durable enqueue and dedupe."""
+
+    def test_redelivery_is_deduplicated(self, store):
+        first, duplicate = store.enqueue(EMAIL)
+        again, duplicate_again = store.enqueue(dict(EMAIL))
+
+        assert (duplicate, duplicate_again) == (False, True)
+        assert again["seq"] == first["seq"]
+        assert again["duplicates"] == 1
+        assert store.counts()["queued"] == 1
+
+    def test_message_id_wins_over_content(self, store):
+        store.enqueue(dict(EMAIL, messageId="<a@mail>"))
+        _, duplicate = store.enqueue(dict(EMAIL, messageId="<a@mail>", receivedAt="later"))
+        _, other = store.enqueue(dict(EMAIL, messageId="<b@mail>"))
+
+        assert duplicate and not other
+
+    def test_different_content_is_a_new_email(self, store):
+        store.enqueue(EMAIL)
+        record, duplicate = store.enqueue(dict(EMAIL, subject="Another"))
+        assert not duplicate
+        assert record["filename"].startswith("email_") and record["filename"].endswith(".json")
+        assert store.counts()["queued"] == 2
+
+
+class TestIngester:
+    """Tests for batched ingestion."""
+
+    def test_batch_writes_files_and_one_log_call(self, store, ingester, log):
+        records = [store.enqueue(dict(EMAIL, subject=f"Mail {i}"))[0] for i in range(3)]
+
+        assert ingester.process_batch() == 3
+        assert len(log.batches) == 1 and len(log.batches[0]) == 3
+        assert log.batches[0][0]["event_type"] == "email_received"
+        assert log.batches[0][0]["metadata"]["file"] == records[0]["filename"]
+        saved = json.loads((store.directory / records[0]["filename"]).read_text())
+        assert saved["subject"] == "Mail 0" and saved["from"] == "Boss@Example.com"
+        assert store.counts()["ingested"] == 3
+        assert ingester.process_batch() == 0
+
+    def test_failed_batch_is_retried_then_failed(self, store, ingester, log, monkeypatch):
+        monkeypatch.setattr(inbox, "MAX_ATTEMPTS", 2)
+        store.enqueue(EMAIL)
+        log.failing = True
+
+        with pytest.raises(RuntimeError):
+            ingester.process_batch()
+        assert store.counts()["queued"] == 1
+
+        log.failing = False
+        assert ingester.process_batch() == 1
+        assert store.counts()["ingested"] == 1
+
+        record, _ = store.enqueue(dict(EMAIL, subject="Unlucky"))
+        log.failing = True
+        for _ in range(2):
+            with pytest.raises(RuntimeError):
+                ingester.process_batch()
+        assert store.get(record["dedupe_key"])["status"] == "failed"
+        assert store.get(record["dedupe_key"])["last_error"] == "disk full"
+
+    def test_expired_claims_are_reclaimed(self, store):
+        store.enqueue(EMAIL)
+        assert len(store.claim(now=time.time())) == 1
+        assert store.claim() == []
+        assert len(store.claim(now=time.time() + store.lease_seconds + 1)) == 1
+
+    def test_legacy_files_are_indexed_once(self, store):
+        store.directory.mkdir(parents=True)
+        (store.directory / "email_20260119_043423_old.json").write_text(json.dumps({
+            "from": "old@example.com", "subject": "Legacy hello", "text_content": "hi",
+            "received_at": "2026-01-19T04:34:23", "logged_at": "2026-01-19T04:34:24",
+        }))
+
+        assert store.migrate_json() == 1
+        assert store.migrate_json() == 0
+        assert [r["subject"] for r in store.search("legacy")] == ["Legacy hello"]
+        assert store.counts()["ingested"] == 1
+
+
+class TestSessionLog:
+    """Tests for the batch written by tools._log_events."""
+
+    @pytest.fixture
+    def session_log(self, tmp_path, monkeypatch):
+        from maven_mcp import tools
+
+        for key in ("base", "personas_dir", "decisions_dir", "milestones_dir"):
+            monkeypatch.setitem(tools.PATHS, key, tmp_path / "maven" / key)
+        monkeypatch.setitem(tools.PATHS, "session_log", tmp_path / "maven" / "session_log.md")
+        monkeypatch.setattr(tools, "DB_AVAILABLE", False)
+        return tools
+
+    def test_entries_carry_each_emails_received_time(self, store, session_log):
+        store.enqueue(dict(EMAIL, subject="First", receivedAt="2026-01-19T04:34:23Z"))
+        store.enqueue(dict(EMAIL, subject="Second", receivedAt="2026-01-19T05:00:00+00:00"))
+
+        InboxIngester(store, session_log._log_events).process_batch()
+
+        text = session_log.PATHS["session_log"].read_text()
+        assert "## [2026-01-19T04:34:23+00:00] EMAIL_RECEIVED" in text
+        assert "## [2026-01-19T05:00:00+00:00] EMAIL_RECEIVED" in text
+
+    def test_batch_replayed_after_a_crash_is_not_logged_twice(self, tmp_path, session_log, monkeypatch):
+        store = InboxStore(tmp_path / "inbox", lease_seconds=0)
+        store.enqueue(dict(EMAIL, subject="Once"))
+        ingester = InboxIngester(store, session_log._log_events)
+
+        def crash(seqs):
+            raise KeyboardInterrupt  # the process dies before marking the batch
+
+        mark_ingested = store.mark_ingested
+        monkeypatch.setattr(store, "mark_ingested", crash)
+        with pytest.raises(KeyboardInterrupt):
+            ingester.process_batch()
+        monkeypatch.setattr(store, "mark_ingested", mark_ingested)
+        store.enqueue(dict(EMAIL, subject="Twice"))
+
+        assert ingester.process_batch() == 2
+        text = (tmp_path / "maven" / "session_log.md").read_text()
+        assert text.count("EMAIL_RECEIVED") == 2
+        assert text.count(": Once\n") == 1 and text.count(": Twice\n") == 1
+        assert store.counts()["ingested"] == 2
+
+
+class TestSearch:
+    """Tests for the full-text inbox index."""
+
+    def test_words_prefixes_and_sender(self, store):
+        store.enqueue(EMAIL)
+        store.enqueue(dict(EMAIL, **{"from": "bot@example.com", "subject": "Funding alert",
+                                     "textContent": "BTC funding flipped"}))
+
+        assert [r["subject"] for r in store.search("rebal friday")] == ["Quarterly treasury review"]
+        assert [r["subject"] for r in store.search("funding")] == ["Funding alert"]
+        assert [r["subject"] for r in store.search(sender="boss@example.com")] == [
+            "Quarterly treasury review"]
+        assert store.search('"; DROP') == []
+
+
+class TestEndpoints:
+    """Tests for /api/email/incoming and /api/email/inbox."""
+
+    @pytest.fixture
+    def app_inbox(self, store, ingester, monkeypatch):
+        monkeypatch.setattr(inbox, "store", store)
+        monkeypatch.setattr(inbox, "ingester", ingester)
+        return store
+
+    def test_webhook_acks_once_and_queues(self, client, app_inbox):
+        first = client.post("/api/email/incoming", json=EMAIL)
+        retry = client.post("/api/email/incoming", json=EMAIL)
+
+        assert first.status_code == 202
+        assert first.get_json()["duplicate"] is False
+        assert retry.status_code == 200
+        assert retry.get_json()["duplicate"] is True
+        assert retry.get_json()["filename"] == first.get_json()["filename"]
+        assert app_inbox.counts()["queued"] == 1
+
+    def test_empty_body_is_400(self, client, app_inbox):
+        assert client.post("/api/email/incoming", json={}).status_code == 400
+
+    def test_inbox_search_pages_newest_first(self, client, app_inbox):
+        for i in range(5):
+            app_inbox.enqueue(dict(EMAIL, subject=f"Report {i}"))
+
+        first = client.get("/api/email/inbox?q=report&limit=3").get_json()
+        second = client.get(f"/api/email/inbox?q=report&limit=3&cursor={first['next_cursor']}").get_json()
+
+        subjects = [e["subject"] for e in first["emails"] + second["emails"]]
+        assert subjects == [f"Report {i}" for i in range(4, -1, -1)]
+        assert second["next_cursor"] is None
+        assert first["ingest"]["inbox"]["queued"] == 5
+
+    def test_bad_cursor_is_400(self, client, app_inbox):
+        assert client.get("/api/email/inbox?cursor=zzz").status_code == 400
@@ -0,0 +1,90 @@
+"""
+Tests for the batch ingestion endpoints.
+
+Run with: python -m pytest tests/test_ingest.py -v
+"""
+
+
+def _ids_for(marker):
+    """Fake RETURNING id: one row per VALUES tuple (counted via a template cast)."""
+    def rows(sql, params):
+        return [(i + 1,) for i in range(sql.count(marker))]
+    return rows
+
+
+def _signal(coin="btc", **extra):
+    row = {"coin": coin, "signal_type": "buy", "strength": 80, "indicators": ["rsi"]}
+    row.update(extra)
+    return row
+
+
+class TestSignalsBatch:
+    """Tests for POST /api/signals/batch."""
+
+    def test_inserts_all_rows_in_one_statement(self, client, fake_db):
+        fake_db.respond("INSERT INTO maven_trading_signals", _ids_for("::text[]"))
+        batch = [_signal(coin) for coin in ("btc", "eth", "sol")]
+
+        response = client.post("/api/signals/batch", json=batch)
+        body = response.get_json()
+
+        assert response.status_code == 200
+        assert body["inserted"] == 3
+        assert body["signal_ids"] == [1, 2, 3]
+        inserts = [sql for sql, _ in fake_db.executed if "INSERT INTO maven_trading_signals" in sql]
+        assert len(inserts) == 1
+        assert "'BTC'" in inserts[0]
+
+    def test_invalid_rows_reject_whole_batch(self, client, fake_db):
+        batch = [_signal(), {"coin": "eth", "signal_type": "moon"}, _signal(strength=150)]
+
+        response = client.post("/api/signals/batch", json=batch)
+        body = response.get_json()
+
+        assert response.status_code == 400
+        assert [r["index"] for r in body["rejected"]] == [1, 2]
+        assert "signal_type" in body["rejected"][0]["errors"][0]
+        assert not any("INSERT" in sql for sql, _ in fake_db.executed)
+
+    def test_allow_partial_inserts_valid_rows(self, client, fake_db):
+        fake_db.respond("INSERT INTO maven_trading_signals", _ids_for("::text[]"))
+        batch = {"signals": [_signal(), {"signal_type": "buy"}, _signal("sol")], "allow_partial": True}
+
+        body = client.post("/api/signals/batch", json=batch).get_json()
+
+        assert body["inserted"] == 2
+        assert body["indexes"] == [0, 2]
+        assert body["rejected"][0]["index"] == 1
+
+    def test_rejects_non_array_and_oversized(self, client, fake_db, monkeypatch):
+        from maven_api import ingest
+
+        assert client.post("/api/signals/batch", json={"coin": "btc"}).status_code == 400
+        assert client.post("/api/signals/batch", json=[]).status_code == 400
+
+        monkeypatch.setattr(ingest, "MAX_BATCH_ROWS", 2)
+        assert client.post("/api/signals/batch", json=[_signal()] * 3).status_code == 413
+
+
+class TestSnapshotsBatch:
+    """Tests for POST /api/treasury/snapshots/batch."""
+
+    def test_inserts_snapshots(self, client, fake_db):
+        # (id, input position) pairs, deliberately not in input order
+        fake_db.respond("INSERT INTO maven_treasury_state", [(2, 1), (1, 0)])
+        batch = [
+            {"account_value": 1000, "positions": [{"coin": "BTC"}], "snapshot_at": "2026-01-01T00:00:00Z"},
+            {"account_value": 1010},
+        ]
+
+        body = client.post("/api/treasury/snapshots/batch", json=batch).get_json()
+
+        assert body["success"] is True
+        assert body["snapshot_ids"] == [1, 2]
+
+    def test_validation_errors(self, client, fake_db):
+        batch = [{"withdrawable": 5}, {"account_value": "lots"}, {"account_value": 1, "snapshot_at": "soon"}]
+
+        body = client.post("/api/treasury/snapshots/batch", json=batch).get_json()
+
+        assert [r["index"] for r in body["rejected"]] == [0, 1, 2]
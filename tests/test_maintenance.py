@@ -0,0 +1,150 @@
+"""
+Tests for scheduled maintenance jobs and snapshot partition management.
+
+Run with: python -m pytest tests/test_maintenance.py -v
+"""
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from database import connection, partitions
+from maven_api import maintenance
+from maven_api.maintenance import MaintenanceScheduler
+
+
+def executed_sql(fake_db):
+    return [" ".join(sql.split()) for sql, _ in fake_db.executed]
+
+
+class TestMaintenanceScheduler:
+    """Tests for locking, outcomes and intervals."""
+
+    def test_job_runs_under_advisory_lock(self, fake_db):
+        fake_db.respond("pg_try_advisory_lock", [(True,)])
+        calls = []
+        scheduler = MaintenanceScheduler({"tidy": (lambda conn: calls.append(conn) or {"n": 1}, 60)})
+
+        outcome = scheduler.run("tidy")
+
+        assert outcome["status"] == "ok" and outcome["result"] == {"n": 1}
+        sql = executed_sql(fake_db)
+        assert sql[0] == "SELECT pg_try_advisory_lock(hashtext(%s))"
+        assert sql[-1] == "SELECT pg_advisory_unlock(hashtext(%s))"
+        assert fake_db.executed[0][1] == ("maven_maintenance:tidy",)
+        assert len(calls) == 1
+        assert scheduler.stats()["jobs"]["tidy"]["last_result"] == {"n": 1}
+
+    def test_skips_when_another_worker_holds_the_lock(self, fake_db):
+        fake_db.respond("pg_try_advisory_lock", [(False,)])
+        scheduler = MaintenanceScheduler({"tidy": (lambda conn: pytest.fail("ran"), 60)})
+
+        assert scheduler.run("tidy") == {"status": "skipped", "reason": "running elsewhere"}
+        stats = scheduler.stats()["jobs"]["tidy"]
+        assert (stats["runs"], stats["skipped"]) == (0, 1)
+
+    def test_failed_job_rolls_back_and_releases_lock(self, fake_db):
+        fake_db.respond("pg_try_advisory_lock", [(True,)])
+
+        def broken(conn):
+            raise RuntimeError("boom")
+
+        scheduler = MaintenanceScheduler({"tidy": (broken, 60)})
+        outcome = scheduler.run("tidy")
+
+        assert outcome == {"status": "error", "error": "boom"}
+        assert executed_sql(fake_db)[-1] == "SELECT pg_advisory_unlock(hashtext(%s))"
+        assert any(conn.rollbacks >= 1 for conn in fake_db.connections)
+        assert scheduler.stats()["jobs"]["tidy"]["errors"] == 1
+
+    def test_skips_while_database_circuit_is_open(self, fake_db, monkeypatch):
+        monkeypatch.setattr(maintenance, "db_ready", lambda: False)
+        scheduler = MaintenanceScheduler({"tidy": (lambda conn: pytest.fail("ran"), 60)})
+
+        assert scheduler.run("tidy")["status"] == "skipped"
+        assert fake_db.executed == []
+
+    def test_run_due_honours_each_interval(self, fake_db):
+        fake_db.respond("pg_try_advisory_lock", [(True,)])
+        runs = []
+        scheduler = MaintenanceScheduler({
+            "fast": (lambda conn: runs.append("fast"), 10),
+            "slow": (lambda conn: runs.append("slow"), 100),
+        })
+
+        scheduler.run_due(now=1000.0)
+        scheduler.run_due(now=1005.0)
+        scheduler.run_due(now=1010.0)
+
+        assert runs == ["fast", "slow", "fast"]
+
+    def test_stats_endpoint(self, client, fake_db):
+        body = client.get("/api/maintenance/stats").get_json()
+        assert body["running"] is False
+        assert "snapshot_partitions" in body["jobs"]
+
+
+class TestSnapshotPartitions:
+    """Tests for database.partitions against the fake database."""
+
+    def test_maintain_calls_sql_job(self, fake_db):
+        fake_db.respond("maven_market_snapshots_maintain", [(2, 1)])
+        with connection.get_db_connection() as conn:
+            result = partitions.maintain(conn, premake_days=3, retention_days=30)
+
+        assert result == {"created": 2, "dropped": 1}
+        assert fake_db.executed[-1][1] == (3, 30)
+
+    def test_migrate_swaps_then_copies_days_in_retention(self, fake_db):
+        today = datetime.now(timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0)
+        fake_db.respond("SELECT relkind", [("r",)])
+        fake_db.respond("FROM pg_index i", [
+            ("maven_market_snapshots_pkey",
+             "CREATE UNIQUE INDEX maven_market_snapshots_pkey ON public.maven_market_snapshots USING btree (id)",
+             True),
+            ("idx_market_snapshots_time",
+             "CREATE INDEX idx_market_snapshots_time ON public.maven_market_snapshots USING btree (snapshot_at DESC)",
+             False),
+        ])
+        fake_db.respond("FROM pg_trigger", [
+            ("maven_market_snapshots_notify",
+             "CREATE TRIGGER maven_market_snapshots_notify AFTER INSERT ON public.maven_market_snapshots "
+             "FOR EACH ROW EXECUTE FUNCTION maven_notify_change()"),
+        ])
+        fake_db.respond("pg_get_serial_sequence", [("public.maven_market_snapshots_id_seq",)])
+        fake_db.respond("MIN(snapshot_at)", [(today - timedelta(days=10), today)])
+        fake_db.respond("maven_market_snapshots_create_partitions", [(1,)])
+        fake_db.respond("COUNT(*), COALESCE(MAX(id), 0)", [(500, 42)])
+        fake_db.respond("SELECT COUNT(*) FROM maven_market_snapshots WHERE", [(500,)])
+        conn = fake_db.connect()
+
+        assert partitions.migrate(conn, retention_days=3, drop_legacy=True)
+
+        sql = executed_sql(fake_db)
+        swap = sql.index("ALTER TABLE maven_market_snapshots RENAME TO maven_market_snapshots_legacy")
+        lock = next(i for i, s in enumerate(sql) if s.startswith("LOCK TABLE maven_market_snapshots"))
+        assert lock < sql.index(next(s for s in sql if "FROM pg_index i" in s)) < swap
+        assert 'DROP TRIGGER "maven_market_snapshots_notify" ON maven_market_snapshots_legacy' in sql
+        assert 'ALTER INDEX "maven_market_snapshots_pkey" RENAME TO "maven_market_snapshots_pkey_legacy"' in sql
+        assert ("ALTER SEQUENCE public.maven_market_snapshots_id_seq AS BIGINT "
+                "OWNED BY maven_market_snapshots.id") in sql
+        recreated = sql[swap:]
+        assert any(s.startswith("CREATE INDEX idx_market_snapshots_time") for s in recreated)
+        assert not any(s.startswith("CREATE UNIQUE INDEX maven_market_snapshots_pkey") for s in recreated)
+        assert any(s.startswith("CREATE TRIGGER maven_market_snapshots_notify") for s in recreated)
+
+        copies = [params[0] for s, params in fake_db.executed
+                  if "create_partitions(%s, %s)" in s]
+        assert copies == [today - timedelta(days=n) for n in range(4)]  # newest first, 3-day retention
+        assert sql[-1] == "DROP TABLE maven_market_snapshots_legacy"
+
+    def test_migrate_keeps_legacy_when_counts_differ(self, fake_db):
+        fake_db.respond("SELECT relkind", [("p",)])
+        fake_db.respond("IS NOT NULL", [(True,)])
+        fake_db.respond("MIN(snapshot_at)", [(None, None)])
+        fake_db.respond("COUNT(*), COALESCE(MAX(id), 0)", [(500, 42)])
+        fake_db.respond("SELECT COUNT(*) FROM maven_market_snapshots WHERE", [(499,)])
+        conn = fake_db.connect()
+
+        assert not partitions.migrate(conn, drop_legacy=True)
+        sql = executed_sql(fake_db)
+        assert not any(s.startswith(("ALTER TABLE", "DROP TABLE")) for s in sql)
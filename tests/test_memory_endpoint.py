@@ -0,0 +1,56 @@
+"""
+Tests for /api/mcp/memory tail and cursor parameters.
+
+Run with: python -m pytest tests/test_memory_endpoint.py -v
+"""
+
+
+LOG = (
+    "# Maven Session Log\n\n---\n"
+    "\n## [2026-01-01T00:00:00+00:00] OBSERVATION\n\nfirst\n\n---\n"
+    "\n## [2026-01-01T00:01:00+00:00] DECISION\n\nsecond\n\n---\n"
+)
+
+
+class TestMemoryEndpoint:
+    """Tests for tail reads and incremental polling."""
+
+    def test_lines_returns_tail(self, client, maven_data_dir):
+        (maven_data_dir / "session_log.md").write_text(LOG)
+
+        response = client.get("/api/mcp/memory?lines=2")
+
+        assert response.get_data(as_text=True) == "\n---"
+        assert response.headers["X-Log-Next-Cursor"] == str(len(LOG))
+
+    def test_entries_then_poll_with_cursor(self, client, maven_data_dir):
+        path = maven_data_dir / "session_log.md"
+        path.write_text(LOG)
+
+        latest = client.get("/api/mcp/memory?entries=1")
+        assert "second" in latest.get_data(as_text=True)
+        assert "first" not in latest.get_data(as_text=True)
+
+        cursor = latest.headers["X-Log-Next-Cursor"]
+        assert client.get(f"/api/mcp/memory?after={cursor}").get_data(as_text=True) == ""
+
+        with open(path, "a") as f:
+            f.write("\n## [2026-01-01T00:02:00+00:00] TRADE\n\nthird\n\n---\n")
+        polled = client.get(f"/api/mcp/memory?after={cursor}").get_data(as_text=True)
+        assert polled.startswith("\n## [2026-01-01T00:02:00")
+        assert "second" not in polled
+
+    def test_timestamp_cursor(self, client, maven_data_dir):
+        (maven_data_dir / "session_log.md").write_text(LOG)
+
+        body = client.get("/api/mcp/memory?after=2026-01-01T00:00:30Z").get_data(as_text=True)
+
+        assert body.startswith("## [2026-01-01T00:01:00")
+
+    def test_invalid_cursor(self, client, maven_data_dir):
+        (maven_data_dir / "session_log.md").write_text(LOG)
+        assert client.get("/api/mcp/memory?after=soon").status_code == 400
+
+    def test_full_log_streams(self, client, maven_data_dir):
+        (maven_data_dir / "session_log.md").write_text(LOG)
+        assert client.get("/api/mcp/memory").get_data(as_text=True) == LOG
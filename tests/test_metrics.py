@@ -0,0 +1,123 @@
+"""
+Tests for the per-route metrics middleware and /metrics.
+
+Run with: python -m pytest tests/test_metrics.py -v
+"""
+import pytest
+
+from database import connection
+from maven_api import metrics
+
+
+class FakeRedis:
+    """Minimal Redis: set/scan_iter/mget."""
+
+    def __init__(self):
+        self.data = {}
+
+    def set(self, key, value, ex=None):
+        self.data[key] = value
+
+    def scan_iter(self, match, count=None):
+        prefix = match.rstrip("*")
+        return [k for k in self.data if k.startswith(prefix)]
+
+    def mget(self, keys):
+        return [self.data.get(k) for k in keys]
+
+
+@pytest.fixture
+def registry(monkeypatch):
+    fresh = metrics.RequestMetrics()
+    monkeypatch.setattr(metrics, "registry", fresh)
+    monkeypatch.setattr(metrics, "shared", None)
+    return fresh
+
+
+class TestMiddleware:
+    """Tests for request recording."""
+
+    def test_records_route_template_status_and_db_time(self, client, fake_db, registry):
+        def slow_query(sql, params):
+            connection.record_query_time(0.25)
+            return []
+
+        fake_db.respond("FROM maven_decisions", slow_query)
+        client.get("/api/decisions?limit=5")
+        client.get("/api/decisions?cursor=garbage")
+
+        series = registry.snapshot()[("/api/decisions", "GET")]
+        assert series["count"] == 2
+        assert series["statuses"] == {200: 1, 400: 1}
+        assert series["db_seconds"] == pytest.approx(0.25)
+
+    def test_unmatched_paths_share_one_series(self, client, registry):
+        client.get("/nope/1")
+        client.get("/nope/2")
+        assert registry.snapshot()[("unmatched", "GET")]["statuses"] == {404: 2}
+
+    def test_query_time_does_not_leak_between_requests(self, client, registry):
+        connection.record_query_time(5.0)
+        client.get("/health")
+        assert registry.snapshot()[("/health", "GET")]["db_seconds"] == 0.0
+
+
+class TestExposition:
+    """Tests for GET /metrics."""
+
+    def test_prometheus_text(self, client, fake_db, registry):
+        client.get("/health")
+        client.get("/api/db/pool")
+        connection.get_pool()
+
+        response = client.get("/metrics")
+        text = response.get_data(as_text=True)
+
+        assert response.mimetype == "text/plain"
+        assert 'maven_http_requests_total{route="/health",method="GET",status="200"} 1' in text
+        assert 'maven_http_request_duration_seconds_bucket{route="/health",method="GET",le="+Inf"} 1' in text
+        assert 'maven_http_request_duration_seconds_count{route="/health",method="GET"} 1' in text
+        assert f'maven_db_pool_max_connections{{worker="{metrics.WORKER_ID}"}}' in text
+
+    def test_histogram_buckets_are_cumulative(self, registry):
+        registry.observe("/x", "GET", 200, 0.003)
+        registry.observe("/x", "GET", 200, 0.2)
+        registry.observe("/x", "GET", 500, 30.0)
+
+        text = metrics.render(registry.snapshot(), {})
+
+        assert 'le="0.005"} 1' in text
+        assert 'le="0.25"} 2' in text
+        assert 'le="10.0"} 2' in text
+        assert 'le="+Inf"} 3' in text
+
+
+class TestSharing:
+    """Tests for cross-worker aggregation through Redis."""
+
+    def test_other_workers_are_summed(self, registry):
+        redis = FakeRedis()
+        other = metrics.RequestMetrics()
+        other.observe("/health", "GET", 200, 0.001)
+        other.observe("/health", "GET", 503, 0.002)
+        metrics.SharedSnapshots("host:2", redis).push(other.snapshot(), {"initialized": False})
+
+        me = metrics.SharedSnapshots("host:1", redis)
+        registry.observe("/health", "GET", 200, 0.001)
+        me.push(registry.snapshot(), {"initialized": False})
+
+        collected = me.collect()
+        assert list(collected) == ["host:2"]
+
+        merged = metrics.merge([registry.snapshot()] + [s for s, _ in collected.values()])
+        assert merged[("/health", "GET")]["statuses"] == {200: 2, 503: 1}
+        assert merged[("/health", "GET")]["count"] == 3
+
+    def test_redis_errors_fall_back_to_local(self):
+        class Broken:
+            def set(self, *args, **kwargs):
+                raise ConnectionError("down")
+
+        shared = metrics.SharedSnapshots("host:1", Broken())
+        assert shared.push({}, {}) is False
+        assert shared.collect() == {}
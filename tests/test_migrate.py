@@ -0,0 +1,165 @@
+"""
+Tests for the versioned migration runner (database.migrate).
+
+Run with: python -m pytest tests/test_migrate.py -v
+"""
+import hashlib
+from datetime import datetime, timezone
+from decimal import Decimal
+
+import pytest
+
+from database import migrate
+
+
+def write(directory, name, sql):
+    path = directory / name
+    path.write_text(sql)
+    return path
+
+
+def checksum(path):
+    return hashlib.sha256(path.read_bytes()).hexdigest()
+
+
+def applied_row(version, name, path):
+    return (version, name, checksum(path), Decimal("12.5"), datetime(2026, 1, 1, tzinfo=timezone.utc))
+
+
+class TestLoadMigrations:
+    """Tests for reading migration files."""
+
+    def test_orders_by_version_and_reads_the_marker(self, tmp_path):
+        write(tmp_path, "0002_index.sql",
+              "-- Index for the hot path\n-- migrate: no-transaction\n\n"
+              "CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_a ON t (a);\n")
+        write(tmp_path, "0001_base.sql", "CREATE TABLE IF NOT EXISTS t (a INT);\n")
+        write(tmp_path, "notes.sql", "-- not a migration\n")
+
+        migrations = migrate.load_migrations(tmp_path)
+
+        assert [m.label for m in migrations] == ["0001_base", "0002_index"]
+        assert [m.transactional for m in migrations] == [True, False]
+        assert migrations[0].checksum == checksum(tmp_path / "0001_base.sql")
+
+    def test_concurrent_index_needs_the_marker(self, tmp_path):
+        write(tmp_path, "0001_index.sql", "CREATE INDEX CONCURRENTLY idx_a ON t (a);\n")
+        with pytest.raises(migrate.MigrationError, match="no-transaction"):
+            migrate.load_migrations(tmp_path)
+
+    def test_duplicate_versions_are_rejected(self, tmp_path):
+        write(tmp_path, "0001_a.sql", "SELECT 1;")
+        write(tmp_path, "0001_b.sql", "SELECT 2;")
+        with pytest.raises(migrate.MigrationError, match="share version 1"):
+            migrate.load_migrations(tmp_path)
+
+    def test_repo_migrations_load(self):
+        migrations = migrate.load_migrations()
+        assert [m.version for m in migrations][:3] == [1, 2, 3]
+        assert all(m.transactional for m in migrations[:3])
+
+    def test_split_statements_keeps_quoted_semicolons(self):
+        sql = """
+            -- leading comment; with a semicolon
+            CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_a ON t (a) WHERE b <> ';';
+            COMMENT ON INDEX idx_a IS 'it''s; fine';
+            DO $body$ BEGIN PERFORM 1; END $body$;
+            /* trailing; comment */
+        """
+        statements = migrate.split_statements(sql)
+
+        assert len(statements) == 3
+        assert statements[0].endswith("WHERE b <> ';'")
+        assert statements[1] == "COMMENT ON INDEX idx_a IS 'it''s; fine'"
+        assert statements[2] == "DO $body$ BEGIN PERFORM 1; END $body$"
+
+
+class TestMigrate:
+    """Tests for applying migrations against the fake database."""
+
+    def test_applies_pending_in_one_transaction_each_and_records_them(self, fake_db, tmp_path):
+        base = write(tmp_path, "0001_base.sql", "CREATE TABLE IF NOT EXISTS t (a INT);\n")
+        write(tmp_path, "0002_more.sql", "ALTER TABLE t ADD COLUMN IF NOT EXISTS b INT;\n")
+        write(tmp_path, "0003_later.sql", "ALTER TABLE t ADD COLUMN IF NOT EXISTS c INT;\n")
+        fake_db.respond("FROM schema_migrations", [applied_row(1, "base", base)])
+        conn = fake_db.connect()
+
+        done = migrate.migrate(conn, tmp_path, target=2)
+
+        assert [label for label, _ in done] == ["0002_more"]
+        executed = [sql for sql, _ in fake_db.executed]
+        assert "SELECT pg_advisory_lock(hashtext(%s))" in executed
+        assert executed[-1] == "SELECT pg_advisory_unlock(hashtext(%s))"
+        assert not any("ADD COLUMN IF NOT EXISTS c" in sql for sql in executed)
+        assert not any("CREATE TABLE IF NOT EXISTS t" in sql for sql in executed)
+
+        run = executed.index("ALTER TABLE t ADD COLUMN IF NOT EXISTS b INT;\n")
+        assert executed[run - 1] == "SET LOCAL lock_timeout = %s"
+        sql, params = fake_db.executed[run + 1]
+        assert sql.strip().startswith("INSERT INTO schema_migrations")
+        assert params[:4] == (2, "more", checksum(tmp_path / "0002_more.sql"), True)
+        assert params[4] >= 0
+
+    def test_no_transaction_migration_runs_statements_in_autocommit(self, fake_db, tmp_path):
+        write(tmp_path, "0001_index.sql",
+              "-- migrate: no-transaction\n\n"
+              "CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_a ON t (a);\n"
+              "CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_b ON t (b);\n")
+        modes = []
+        fake_db.respond("CREATE INDEX CONCURRENTLY",
+                        lambda sql, params: modes.append(conn.autocommit) or [])
+        # idx_a was left INVALID by an earlier failed build
+        fake_db.respond("NOT i.indisvalid", lambda sql, params: [(params == ("idx_a",),)])
+        conn = fake_db.connect()
+
+        migrate.migrate(conn, tmp_path)
+
+        executed = [sql.strip() for sql, _ in fake_db.executed]
+        drop = executed.index("DROP INDEX CONCURRENTLY IF EXISTS idx_a")
+        assert "CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_a" in executed[drop + 1]
+        assert "DROP INDEX CONCURRENTLY IF EXISTS idx_b" not in executed
+        assert modes == [True, True]
+        assert conn.autocommit is False
+        record = next(params for sql, params in fake_db.executed if "INSERT INTO schema_migrations" in sql)
+        assert record[3] is False
+
+    def test_refuses_to_run_when_an_applied_file_changed(self, fake_db, tmp_path):
+        base = write(tmp_path, "0001_base.sql", "CREATE TABLE IF NOT EXISTS t (a INT);\n")
+        fake_db.respond("FROM schema_migrations", [applied_row(1, "base", base)])
+        base.write_text("CREATE TABLE IF NOT EXISTS t (a BIGINT);\n")
+        write(tmp_path, "0002_more.sql", "SELECT 1;\n")
+        conn = fake_db.connect()
+
+        with pytest.raises(migrate.MigrationError, match="0001_base \\(changed\\)"):
+            migrate.migrate(conn, tmp_path)
+
+        assert not any("SELECT 1" in sql for sql, _ in fake_db.executed)
+        assert fake_db.executed[-1][0] == "SELECT pg_advisory_unlock(hashtext(%s))"
+
+    def test_failed_migration_rolls_back_and_is_not_recorded(self, fake_db, tmp_path):
+        write(tmp_path, "0001_broken.sql", "ALTER TABLE missing ADD COLUMN a INT;\n")
+
+        def fail(sql, params):
+            raise RuntimeError('relation "missing" does not exist')
+
+        fake_db.respond("ALTER TABLE missing", fail)
+        conn = fake_db.connect()
+
+        with pytest.raises(RuntimeError):
+            migrate.migrate(conn, tmp_path)
+
+        assert conn.rollbacks == 1
+        assert not any("INSERT INTO schema_migrations" in sql for sql, _ in fake_db.executed)
+
+    def test_status_flags_pending_changed_and_missing(self, tmp_path):
+        write(tmp_path, "0001_base.sql", "SELECT 1;")
+        write(tmp_path, "0002_more.sql", "SELECT 2;")
+        migrations = migrate.load_migrations(tmp_path)
+        applied = {
+            1: {"name": "base", "checksum": "edited", "execution_ms": 3.0, "applied_at": None},
+            9: {"name": "gone", "checksum": "x", "execution_ms": 1.0, "applied_at": None},
+        }
+
+        states = {s["version"]: s["state"] for s in migrate.migration_status(migrations, applied)}
+
+        assert states == {1: "changed", 2: "pending", 9: "missing"}
@@ -0,0 +1,266 @@
+"""
+Tests for the background notification dispatcher and /api/notifications/send.
+
+Run with: python -m pytest tests/test_notifications.py -v
+"""
+import time
+
+import pytest
+
+from maven_api import notifications
+from maven_api.spool import NotificationSpool
+
+
+OPPORTUNITY = {
+    "asset": "BTC",
+    "direction": "long",
+    "maven_confidence": 93,
+    "price": 97000,
+    "reasoning": "breakout",
+}
+
+
+def _wait_for(predicate, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+def _record(spool, message_id):
+    return spool.get(message_id)
+
+
+@pytest.fixture
+def spool(tmp_path):
+    return NotificationSpool(tmp_path / "notifications")
+
+
+@pytest.fixture
+def make_dispatcher(spool, email_server, monkeypatch):
+    """Build started dispatchers that send through the stand-in email server."""
+    from maven_mcp import tools
+
+    monkeypatch.setattr(notifications, "BASE_DELAY", 0.01)
+    started = []
+
+    def make(spool_=None, **kwargs):
+        kwargs.setdefault("breaker", tools.email_breaker)
+        d = notifications.NotificationDispatcher(spool_ or spool, tools._send_email, **kwargs)
+        started.append(d.start())
+        return d
+
+    yield make
+    for d in started:
+        d.stop()
+
+
+class TestBackoff:
+    """Tests for retry delays."""
+
+    def test_exponential_with_jitter_and_cap(self):
+        assert notifications.backoff_delay(1, base=2, cap=300, rand=lambda: 0.0) == 1
+        assert notifications.backoff_delay(1, base=2, cap=300, rand=lambda: 1.0) == 2
+        assert notifications.backoff_delay(4, base=2, cap=300, rand=lambda: 1.0) == 16
+        assert notifications.backoff_delay(20, base=2, cap=300, rand=lambda: 1.0) == 300
+        assert 150 <= notifications.backoff_delay(20, base=2, cap=300) <= 300
+
+
+class TestDispatcher:
+    """Tests for sending, retrying and persistence."""
+
+    def test_sends_and_marks_sent(self, make_dispatcher, spool, email_server):
+        d = make_dispatcher()
+        message_id = d.enqueue("boss@example.com", "Alert", "<p>hi</p>", "hi", [OPPORTUNITY])
+
+        assert _wait_for(lambda: _record(spool, message_id)["sent"])
+        record = _record(spool, message_id)
+        assert record["status"] == "sent"
+        assert record["attempts"] == 1
+        assert email_server.requests[0]["to"] == ["boss@example.com"]
+        assert email_server.requests[0]["fromEmail"] == "maven@motherhaven.app"
+        assert d.stats()["sent"] == 1
+
+    def test_retries_transient_errors(self, make_dispatcher, spool, email_server):
+        email_server.responses += [(503, {"error": "busy"}), (429, {"error": "slow down"})]
+        d = make_dispatcher()
+        message_id = d.enqueue("boss@example.com", "Alert", None, "hi", [OPPORTUNITY])
+
+        assert _wait_for(lambda: _record(spool, message_id)["sent"])
+        assert _record(spool, message_id)["attempts"] == 3
+        assert d.stats()["retries"] == 2
+        assert len(email_server.requests) == 3
+
+    def test_permanent_error_fails_without_retry(self, make_dispatcher, spool, email_server):
+        email_server.responses.append((400, {"error": "bad recipient"}))
+        d = make_dispatcher()
+        message_id = d.enqueue("nobody", "Alert", None, "hi", [OPPORTUNITY])
+
+        assert _wait_for(lambda: _record(spool, message_id)["status"] == "failed")
+        record = _record(spool, message_id)
+        assert record["attempts"] == 1
+        assert record["last_error"] == "bad recipient"
+        assert not record["sent"]
+
+    def test_read_timeout_is_not_resent(self, make_dispatcher, spool, email_server, monkeypatch):
+        from maven_mcp import tools
+
+        monkeypatch.setattr(tools, "EMAIL_API_TIMEOUT", 0.05)
+        email_server.delay = 0.3  # the API got the request and may still send it
+        d = make_dispatcher()
+        message_id = d.enqueue("boss@example.com", "Alert", None, "hi", [OPPORTUNITY])
+
+        assert _wait_for(lambda: _record(spool, message_id)["status"] == "failed")
+        assert _record(spool, message_id)["attempts"] == 1
+        assert "may have been sent" in _record(spool, message_id)["last_error"]
+        assert len(email_server.requests) == 1
+
+    def test_gives_up_after_max_attempts(self, make_dispatcher, spool, email_server):
+        email_server.responses += [(502, {})] * 10
+        d = make_dispatcher(max_attempts=3)
+        message_id = d.enqueue("boss@example.com", "Alert", None, "hi", [OPPORTUNITY])
+
+        assert _wait_for(lambda: _record(spool, message_id)["status"] == "failed")
+        assert _record(spool, message_id)["attempts"] == 3
+        assert len(email_server.requests) == 3
+
+    def test_pending_messages_survive_restart(self, make_dispatcher, spool, email_server):
+        idle = notifications.NotificationDispatcher(spool, send=None)
+        ids = [idle.enqueue("boss@example.com", f"Alert {i}", None, "hi", []) for i in range(3)]
+
+        make_dispatcher()
+
+        assert _wait_for(lambda: all(_record(spool, i)["sent"] for i in ids))
+        assert sorted(r["subject"] for r in email_server.requests) == ["Alert 0", "Alert 1", "Alert 2"]
+
+    def test_workers_sharing_a_spool_send_once(self, make_dispatcher, spool, email_server):
+        email_server.delay = 0.01
+        idle = notifications.NotificationDispatcher(spool, send=None)
+        ids = [idle.enqueue("boss@example.com", f"Alert {i}", None, "hi", []) for i in range(20)]
+
+        make_dispatcher(workers=3)
+        make_dispatcher(NotificationSpool(spool.directory), workers=3)  # a second process
+
+        assert _wait_for(lambda: all(_record(spool, i)["sent"] for i in ids))
+        subjects = [r["subject"] for r in email_server.requests]
+        assert len(subjects) == len(set(subjects)) == 20
+
+    def test_old_messages_expire_instead_of_sending(self, make_dispatcher, spool,
+                                                   email_server, monkeypatch):
+        monkeypatch.setattr(notifications, "MAX_AGE_SECONDS", 0.0)
+        d = make_dispatcher()
+        message_id = d.enqueue("boss@example.com", "Stale", None, "hi", [])
+
+        assert _wait_for(lambda: _record(spool, message_id)["status"] == "failed")
+        assert _record(spool, message_id)["last_error"] == "expired before delivery"
+        assert email_server.requests == []
+
+    def test_open_email_circuit_defers_without_using_attempts(self, make_dispatcher, spool,
+                                                              email_server, monkeypatch):
+        from database.circuit import CircuitBreaker
+        from maven_mcp import tools
+
+        breaker = CircuitBreaker("email", failure_threshold=1, reset_seconds=0.3)
+        breaker.record_failure("down")
+        monkeypatch.setattr(tools, "email_breaker", breaker)
+        d = make_dispatcher()
+        message_id = d.enqueue("boss@example.com", "Alert", None, "hi", [])
+
+        assert _wait_for(lambda: d.stats()["deferred"] >= 1)
+        assert _record(spool, message_id)["attempts"] == 0
+        assert email_server.requests == []
+
+        assert _wait_for(lambda: _record(spool, message_id)["sent"])
+        assert _record(spool, message_id)["attempts"] == 1
+        assert breaker.state == "closed"
+
+    def test_send_email_opens_the_circuit_on_server_errors(self, email_server):
+        from maven_mcp import tools
+
+        email_server.responses += [(502, {})] * 3
+        for _ in range(3):
+            assert tools._send_email("boss@example.com", "Alert", text_content="hi")["retryable"]
+
+        result = tools._send_email("boss@example.com", "Alert", text_content="hi")
+        assert result["circuit_open"] and result["retry_after"] > 0
+        assert len(email_server.requests) == 3
+
+
+def _render(opportunities, threshold):
+    return f"Digest of {len(opportunities)}", None, ", ".join(o["asset"] for o in opportunities)
+
+
+class TestCoalescing:
+    """Tests for digesting repeated scanner alerts."""
+
+    def test_repeated_alerts_become_one_email(self, make_dispatcher, spool, email_server):
+        d = make_dispatcher(render=_render, window=0.2)
+        assert d.coalescing
+
+        for _ in range(5):
+            d.coalesce("boss@example.com", [OPPORTUNITY, dict(OPPORTUNITY, asset="ETH")], 90)
+
+        assert _wait_for(lambda: d.stats()["sent"] == 1)
+        time.sleep(0.3)
+        assert len(email_server.requests) == 1
+        assert email_server.requests[0]["subject"] == "Digest of 2"
+        stats = d.stats()
+        assert (stats["digests"], stats["coalesced"], stats["buffered"]) == (1, 8, 0)
+
+    def test_not_coalescing_without_renderer_or_window(self, make_dispatcher):
+        assert not make_dispatcher().coalescing
+        assert not make_dispatcher(render=_render, window=0).coalescing
+        assert not notifications.NotificationDispatcher(None, None, render=_render).coalescing
+
+
+class TestSendEndpoint:
+    """Tests for POST /api/notifications/send."""
+
+    def test_enqueues_and_returns_before_sending(self, client, make_dispatcher, spool,
+                                                 email_server, monkeypatch):
+        email_server.delay = 1.0
+        d = make_dispatcher()
+        monkeypatch.setattr(notifications, "dispatcher", d)
+
+        started = time.monotonic()
+        response = client.post("/api/notifications/send", json={
+            "opportunities": [OPPORTUNITY],
+            "recipient": "boss@example.com",
+        })
+        elapsed = time.monotonic() - started
+
+        body = response.get_json()
+        assert response.status_code == 202
+        assert body["status"] == "queued"
+        assert elapsed < 0.5
+        assert _wait_for(lambda: _record(spool, body["id"])["sent"])
+        assert "BTC" in email_server.requests[0]["subject"]
+
+    def test_stats_endpoint(self, client, make_dispatcher, monkeypatch):
+        monkeypatch.setattr(notifications, "dispatcher", make_dispatcher())
+        stats = client.get("/api/notifications/stats").get_json()
+        assert stats["depth"] == 0
+        assert stats["workers"] == 2
+        assert stats["spool"]["sent"] == 0
+
+    def test_missing_recipient_is_400(self, client):
+        response = client.post("/api/notifications/send", json={"opportunities": [OPPORTUNITY]})
+        assert response.status_code == 400
+
+    def test_coalesces_by_default(self, client, make_dispatcher, spool, monkeypatch):
+        d = make_dispatcher(render=_render, window=60)
+        monkeypatch.setattr(notifications, "dispatcher", d)
+        payload = {"opportunities": [OPPORTUNITY], "recipient": "boss@example.com"}
+
+        first = client.post("/api/notifications/send", json=payload).get_json()
+        second = client.post("/api/notifications/send", json=payload).get_json()
+
+        assert first["status"] == "coalesced"
+        assert (first["new"], second["merged"]) == (1, 1)
+        assert second["digest_at"] == first["digest_at"]
+        assert spool.buffered() == 1
+
+        direct = client.post("/api/notifications/send", json=dict(payload, coalesce=False))
+        assert direct.get_json()["status"] == "queued"
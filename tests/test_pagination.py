@@ -0,0 +1,101 @@
+"""
+Tests for keyset pagination on the list endpoints.
+
+Run with: python -m pytest tests/test_pagination.py -v
+"""
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from maven_api import pagination
+
+
+T0 = datetime(2026, 1, 11, 12, 0, tzinfo=timezone.utc)
+
+
+def _decision(i):
+    return (i, "trade", "BTC", "buy", "why", 0.8, "medium", False, T0 - timedelta(minutes=i))
+
+
+def _params_for(fake_db, fragment):
+    return [p for sql, p in fake_db.executed if fragment in sql]
+
+
+class TestCursorTokens:
+    """Tests for cursor encoding."""
+
+    def test_round_trip_keeps_microseconds_and_zone(self):
+        ts = T0.replace(microsecond=123456)
+        assert pagination.decode_cursor(pagination.encode_cursor(ts, 42)) == (ts, 42)
+
+    @pytest.mark.parametrize("token", ["", "!!!", "bm90LWEtY3Vyc29y", "MjAyNi0wMS0xMXxhYmM"])
+    def test_tampered_tokens_rejected(self, token):
+        with pytest.raises(ValueError):
+            pagination.decode_cursor(token)
+
+
+class TestDecisionsPaging:
+    """Tests for GET /api/decisions."""
+
+    def test_first_page_fetches_one_extra_row(self, client, fake_db):
+        fake_db.respond("FROM maven_decisions", [_decision(i) for i in range(1, 4)])
+
+        body = client.get("/api/decisions?limit=2").get_json()
+
+        assert [d["id"] for d in body["decisions"]] == [1, 2]
+        assert body["next_cursor"] == pagination.encode_cursor(T0 - timedelta(minutes=2), 2)
+        assert _params_for(fake_db, "FROM maven_decisions") == [(3,)]
+
+    def test_next_page_seeks_past_cursor(self, client, fake_db):
+        fake_db.respond("FROM maven_decisions", [_decision(3)])
+        ts = T0 - timedelta(minutes=2)
+
+        body = client.get(f"/api/decisions?limit=2&cursor={pagination.encode_cursor(ts, 2)}").get_json()
+
+        assert [d["id"] for d in body["decisions"]] == [3]
+        assert body["next_cursor"] is None
+        sql, params = [(q, p) for q, p in fake_db.executed if "FROM maven_decisions" in q][0]
+        assert "(decided_at, id) < (%s, %s)" in sql
+        assert "OFFSET" not in sql
+        assert params == (ts, ts, 2, 3)
+
+    def test_bad_cursor_is_400(self, client):
+        response = client.get("/api/decisions?cursor=garbage")
+        assert response.status_code == 400
+
+    def test_limit_is_capped(self, client, fake_db):
+        client.get("/api/decisions?limit=100000")
+        assert _params_for(fake_db, "FROM maven_decisions") == [(pagination.MAX_PAGE_SIZE + 1,)]
+
+
+class TestSignalsPaging:
+    """Tests for GET /api/signals."""
+
+    def test_coin_filter_and_cursor(self, client, fake_db):
+        fake_db.respond("FROM maven_trading_signals", [
+            ("ETH", "ta_bot", "buy", 70, "r", T0, None, 9),
+        ])
+
+        token = pagination.encode_cursor(T0 + timedelta(minutes=1), 10)
+        body = client.get(f"/api/signals?coin=eth&cursor={token}").get_json()
+
+        assert body["signals"][0]["id"] == 9
+        assert body["next_cursor"] is None
+        params = _params_for(fake_db, "FROM maven_trading_signals")[0]
+        assert params[-2:] == ("ETH", 51)
+
+
+class TestPerformancePaging:
+    """Tests for GET /api/decisions/performance."""
+
+    def test_pages_decisions_before_aggregating(self, client, fake_db):
+        fake_db.respond("FROM page d", [
+            (5, T0, "trade", "BTC", 0.9, 1, 12.5, "profitable"),
+            (4, T0 - timedelta(hours=1), "trade", "ETH", 0.6, 0, 0, "breakeven"),
+        ])
+
+        body = client.get("/api/decisions/performance?days=30&limit=1").get_json()
+
+        assert [d["decision_id"] for d in body["decisions"]] == [5]
+        assert body["next_cursor"] == pagination.encode_cursor(T0, 5)
+        assert _params_for(fake_db, "FROM page d") == [(30, 2)]
@@ -0,0 +1,155 @@
+"""
+Tests for per-client rate limiting and admission control.
+
+Run with: python -m pytest tests/test_ratelimit.py -v
+"""
+import threading
+
+import pytest
+
+from database.circuit import CircuitBreaker
+from maven_api import ratelimit
+from maven_api.ratelimit import AdmissionController, TokenBuckets
+
+
+class FakeRedis:
+    """Runs the bucket script's logic in Python over a shared dict."""
+
+    def __init__(self, fail=False):
+        self.data = {}
+        self.fail = fail
+        self.calls = 0
+
+    def register_script(self, source):
+        assert "HMGET" in source
+
+        def script(keys, args):
+            self.calls += 1
+            if self.fail:
+                raise ConnectionError("redis down")
+            rate, burst, now, cost = (float(a) for a in args)
+            tokens, ts = self.data.get(keys[0], (burst, now))
+            tokens = min(burst, tokens + max(0, now - ts) * rate)
+            allowed, retry = 0, 0
+            if tokens >= cost:
+                tokens -= cost
+                allowed = 1
+            else:
+                retry = (cost - tokens) / rate
+            self.data[keys[0]] = (tokens, now)
+            return [allowed, str(retry).encode()]
+
+        return script
+
+
+class TestTokenBuckets:
+    """Tests for bucket arithmetic and the shared/local paths."""
+
+    def test_burst_then_refill(self):
+        buckets = TokenBuckets(redis_client=FakeRedis())
+        results = [buckets.hit("c", rate=2, burst=3, now=100.0) for _ in range(4)]
+
+        assert [allowed for allowed, _ in results] == [True, True, True, False]
+        assert results[-1][1] == pytest.approx(0.5)
+        assert buckets.hit("c", rate=2, burst=3, now=100.5) == (True, 0.0)
+
+    def test_workers_share_one_bucket_through_redis(self):
+        redis = FakeRedis()
+        worker_a, worker_b = TokenBuckets(redis_client=redis), TokenBuckets(redis_client=redis)
+
+        assert worker_a.hit("c", rate=1, burst=2, now=10.0)[0]
+        assert worker_b.hit("c", rate=1, burst=2, now=10.0)[0]
+        assert not worker_a.hit("c", rate=1, burst=2, now=10.0)[0]
+        assert list(redis.data) == [ratelimit.KEY_PREFIX + "c"]
+
+    def test_falls_back_to_local_buckets_when_redis_down(self):
+        redis = FakeRedis(fail=True)
+        breaker = CircuitBreaker("redis", failure_threshold=1, reset_seconds=60)
+        buckets = TokenBuckets(redis_client=redis, breaker=breaker)
+
+        assert buckets.hit("c", rate=1, burst=1, now=10.0) == (True, 0.0)
+        assert buckets.hit("c", rate=1, burst=1, now=10.0)[0] is False
+        assert redis.calls == 1  # the redis circuit opened on the first error
+        assert breaker.state == "open"
+
+
+class TestAdmissionController:
+    """Tests for 429 / 503 decisions."""
+
+    def make(self, **kwargs):
+        options = dict(buckets=TokenBuckets(redis_client=FakeRedis()),
+                       limits={"read": (1000, 1000), "write": (1000, 1000)},
+                       concurrency={"read": 2, "write": 1}, wait=0.0, enabled=True)
+        options.update(kwargs)
+        return AdmissionController(**options)
+
+    def test_rate_limit_is_per_client_and_class(self):
+        controller = self.make(limits={"read": (0.001, 2), "write": (0.001, 1)})
+
+        assert controller.admit("a", "read") == (None, None)
+        controller.release("read")
+        assert controller.admit("a", "read") == (None, None)
+        controller.release("read")
+        assert controller.admit("a", "read")[0] == 429
+        assert controller.admit("b", "read") == (None, None)
+        controller.release("read")
+        assert controller.admit("a", "write") == (None, None)
+        controller.release("write")
+        assert controller.stats()["read"]["rate_limited"] == 1
+
+    def test_concurrency_cap_sheds_with_503(self):
+        controller = self.make()
+        assert controller.admit("a", "read") == (None, None)
+        assert controller.admit("b", "read") == (None, None)
+
+        assert controller.admit("c", "read") == (503, 1.0)
+        assert controller.admit("c", "write") == (None, None)  # writes keep their own slots
+
+        controller.release("read")
+        assert controller.admit("c", "read") == (None, None)
+        stats = controller.stats()["read"]
+        assert (stats["in_flight"], stats["shed"]) == (2, 1)
+
+
+class TestFlaskIntegration:
+    """Tests for the before/teardown hooks on app.py."""
+
+    @pytest.fixture
+    def controller(self, monkeypatch):
+        controller = AdmissionController(
+            buckets=TokenBuckets(redis_client=FakeRedis()),
+            limits={"read": (0.001, 3), "write": (0.001, 3)},
+            concurrency={"read": 4, "write": 4}, wait=0.0, enabled=True,
+        )
+        monkeypatch.setattr(ratelimit, "controller", controller)
+        return controller
+
+    def test_429_with_retry_after_per_api_key(self, client, fake_db, controller):
+        statuses = [client.get("/api/db/pool", headers={"X-API-Key": "bot-1"}).status_code
+                    for _ in range(4)]
+        limited = client.get("/api/db/pool", headers={"X-API-Key": "bot-1"})
+        other = client.get("/api/db/pool", headers={"X-API-Key": "bot-2"})
+
+        assert statuses == [200, 200, 200, 429]
+        assert limited.status_code == 429
+        assert int(limited.headers["Retry-After"]) >= 1
+        assert limited.get_json()["error"] == "Rate limit exceeded"
+        assert other.status_code == 200
+
+    def test_slots_are_released_after_each_request(self, client, fake_db, controller):
+        for _ in range(3):
+            client.get("/api/db/pool")
+        assert controller.stats()["read"]["in_flight"] == 0
+
+    def test_exempt_paths_are_not_limited(self, client, controller):
+        assert all(client.get("/health").status_code == 200 for _ in range(10))
+
+    def test_503_when_route_class_is_saturated(self, client, fake_db, controller):
+        controller._slots["read"] = threading.BoundedSemaphore(1)
+        controller._slots["read"].acquire()
+        try:
+            response = client.get("/api/db/pool")
+        finally:
+            controller._slots["read"].release()
+        assert response.status_code == 503
+        assert response.headers["Retry-After"] == "1"
@@ -0,0 +1,51 @@
+"""
+Tests for the trading signal expiry sweeper (database.signal_expiry).
+
+Run with: python -m pytest tests/test_signal_expiry.py -v
+"""
+from database import migrate, signal_expiry
+from maven_api.maintenance import DEFAULT_JOBS
+
+
+class TestSignalExpiry:
+    """Tests for batching, archiving and scheduling."""
+
+    def test_expires_in_batches_until_a_short_one(self, fake_db):
+        batches = [(3,), (3,), (1,)]
+        fake_db.respond("maven_expire_signals", lambda sql, params: [batches.pop(0)])
+        conn = fake_db.connect()
+
+        result = signal_expiry.run(conn, batch=3, archive_days=0)
+
+        assert result == {"expired": 7, "archived": 0}
+        assert conn.commits == 3
+        assert not any("maven_archive_signals" in sql for sql, _ in fake_db.executed)
+
+    def test_archives_when_configured(self, fake_db):
+        fake_db.respond("maven_expire_signals", [(0,)])
+        fake_db.respond("maven_archive_signals", [(2,)])
+
+        result = signal_expiry.run(fake_db.connect(), batch=10, archive_days=30)
+
+        assert result == {"expired": 0, "archived": 2}
+        assert fake_db.executed[-1][1] == (30, 10)
+
+    def test_backlog_is_capped_per_run(self, fake_db):
+        fake_db.respond("maven_expire_signals", [(5,)])
+
+        result = signal_expiry.run(fake_db.connect(), batch=5, archive_days=0, max_batches=4)
+
+        assert result["expired"] == 20
+
+    def test_registered_as_maintenance_job(self):
+        assert "signal_expiry" in DEFAULT_JOBS
+
+    def test_index_migration_is_built_concurrently(self):
+        migrations = {m.name: m for m in migrate.load_migrations()}
+        index = migrations["signal_expiry_index"]
+
+        assert not index.transactional
+        assert migrations["signal_expiry"].transactional
+        statements = migrate.split_statements(index.sql)
+        assert len(statements) == 1
+        assert "CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_signals_expiring" in statements[0]
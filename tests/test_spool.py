@@ -0,0 +1,217 @@
+"""
+Tests for the indexed notification spool and /api/notifications/pending.
+
+Run with: python -m pytest tests/test_spool.py -v
+"""
+import json
+import threading
+from datetime import datetime
+
+import pytest
+
+from maven_api import notifications
+from maven_api.spool import NotificationSpool
+
+
+@pytest.fixture
+def spool(tmp_path):
+    return NotificationSpool(tmp_path / "notifications")
+
+
+def _add(spool, n, **kwargs):
+    return [spool.add("boss@example.com", f"Alert {i}", None, "hi", [{"asset": "BTC"}], **kwargs)["id"]
+            for i in range(n)]
+
+
+class TestSpool:
+    """Tests for ids, counts and state transitions."""
+
+    def test_ids_never_collide(self, spool):
+        assert len(set(_add(spool, 200))) == 200
+
+    def test_counts_follow_transitions(self, spool):
+        _add(spool, 3)
+        assert spool.counts()["pending"] == 3
+
+        first = spool.claim_due()
+        second = spool.claim_due()
+        assert spool.mark_sent(first["id"])
+        assert spool.mark_retry(second["id"], 0, "busy")
+        third = spool.claim_due()
+        assert spool.mark_failed(third["id"], "bad recipient")
+
+        assert spool.counts() == {"pending": 1, "sending": 0, "sent": 1, "failed": 1}
+        assert spool.get(first["id"])["sent"] is True
+
+    def test_transitions_require_a_claim(self, spool):
+        message_id = _add(spool, 1)[0]
+        assert not spool.mark_sent(message_id)
+        assert spool.get(message_id)["status"] == "pending"
+
+    def test_concurrent_claims_are_exclusive(self, spool):
+        _add(spool, 50)
+        claimed = []
+        lock = threading.Lock()
+
+        def worker():
+            local = NotificationSpool(spool.directory)
+            while True:
+                record = local.claim_due()
+                if record is None:
+                    return
+                with lock:
+                    claimed.append(record["id"])
+
+        threads = [threading.Thread(target=worker) for _ in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        assert len(claimed) == len(set(claimed)) == 50
+        assert spool.counts()["sending"] == 50
+
+    def test_expired_lease_is_reclaimed(self, spool):
+        message_id = _add(spool, 1)[0]
+        first = spool.claim_due()
+        assert spool.claim_due() is None
+
+        again = spool.claim_due(now=first["claimed_until"] + 1)
+        assert again["id"] == message_id
+        assert again["attempts"] == 2
+
+    def test_future_retries_are_not_due(self, spool):
+        message_id = _add(spool, 1)[0]
+        spool.claim_due()
+        spool.mark_retry(message_id, 4102444800, "busy")  # 2100-01-01
+        assert spool.claim_due() is None
+        assert spool.next_due() == 4102444800
+
+
+def _render(opportunities, threshold):
+    assets = ", ".join(o["asset"] for o in opportunities)
+    return f"Digest: {assets}", None, f">= {threshold}%"
+
+
+class TestDigestBuffer:
+    """Tests for coalescing opportunities into per-recipient digests."""
+
+    def _buffer(self, spool, recipient, *opps, now=1000.0, threshold=90):
+        items = [(notifications.digest_key(o), o) for o in opps]
+        return spool.buffer(recipient, items, threshold, now=now)
+
+    def test_repeats_merge_and_keep_highest_confidence(self, spool):
+        btc = {"asset": "BTC", "direction": "long", "maven_confidence": 91}
+        assert self._buffer(spool, "a@x", btc, {"asset": "ETH", "direction": "long",
+                                                "maven_confidence": 92}) == (2, 0)
+        assert self._buffer(spool, "a@x", dict(btc, maven_confidence=96), now=1010.0) == (0, 1)
+        assert self._buffer(spool, "a@x", dict(btc, maven_confidence=93), now=1020.0) == (0, 1)
+        assert self._buffer(spool, "a@x", {"asset": "BTC", "direction": "short",
+                                           "maven_confidence": 90}, now=1030.0) == (1, 0)
+        assert spool.buffered() == 3
+
+        assert spool.flush_digests(_render, window=60, now=1059.0) == []
+        ids = spool.flush_digests(_render, window=60, now=1060.0)
+
+        assert len(ids) == 1 and spool.buffered() == 0
+        digest = spool.get(ids[0])
+        assert digest["type"] == "digest"
+        assert digest["subject"] == "Digest: BTC, ETH, BTC"
+        top = digest["opportunities"][0]
+        assert (top["direction"], top["maven_confidence"], top["alert_count"]) == ("long", 96, 3)
+
+    def test_window_is_per_recipient(self, spool):
+        self._buffer(spool, "a@x", {"asset": "BTC", "maven_confidence": 91}, now=1000.0)
+        self._buffer(spool, "b@x", {"asset": "BTC", "maven_confidence": 91}, now=1050.0)
+
+        assert spool.next_digest_due(60, now=1050.0) == 1060.0
+        ids = spool.flush_digests(_render, window=60, now=1070.0)
+        assert [spool.get(i)["recipient"] for i in ids] == ["a@x"]
+        assert spool.next_digest_due(60, now=1070.0) == 1110.0
+
+    def test_rate_cap_defers_and_keeps_merging(self, spool):
+        now = datetime.now().timestamp()
+        self._buffer(spool, "a@x", {"asset": "BTC", "maven_confidence": 91}, now=now)
+        assert len(spool.flush_digests(_render, window=0, max_per_hour=1, now=now)) == 1
+
+        for i in range(5):
+            self._buffer(spool, "a@x", {"asset": "SOL", "maven_confidence": 91}, now=now + i)
+        assert spool.flush_digests(_render, window=0, max_per_hour=1, now=now + 10) == []
+        assert spool.next_digest_due(0, max_per_hour=1, now=now + 10) == pytest.approx(now + 3600)
+        assert spool.buffered() == 1
+
+        ids = spool.flush_digests(_render, window=0, max_per_hour=1, now=now + 3601)
+        assert spool.get(ids[0])["opportunities"][0]["alert_count"] == 5
+
+
+class TestMigration:
+    """Tests for importing legacy signal_*.json files."""
+
+    def _write(self, directory, name, **data):
+        directory.mkdir(parents=True, exist_ok=True)
+        record = {"type": "high_confidence_signal", "recipient": "boss@example.com",
+                  "subject": name, "text_content": "hi", "opportunities": [], "sent": False}
+        record.update(data)
+        (directory / f"{name}.json").write_text(json.dumps(record))
+
+    def test_imports_once_with_status(self, spool):
+        self._write(spool.directory, "signal_20260119_021149", timestamp="2026-01-19T02:11:49",
+                    sent=True, sent_at="2026-01-19T03:28:30Z",
+                    opportunities="[{'asset': 'BERA'}]")
+        self._write(spool.directory, "signal_20260119_021150", timestamp="2026-01-19T02:11:50")
+        (spool.directory / "signal_broken.json").write_text("{")
+
+        assert spool.migrate_json() == 2
+        assert spool.migrate_json() == 0
+
+        sent = spool.get("signal_20260119_021149")
+        assert sent["status"] == "sent"
+        assert sent["opportunities"] == "[{'asset': 'BERA'}]"
+        unsent = spool.get("signal_20260119_021150")
+        assert unsent["status"] == "failed"
+        assert "not resent" in unsent["last_error"]
+        assert spool.counts()["pending"] == 0
+        assert (spool.directory / "signal_20260119_021149.json").exists()
+
+    def test_resend_imports_unsent_files_as_pending(self, spool):
+        self._write(spool.directory, "signal_20260119_021150", timestamp="2026-01-19T02:11:50")
+        self._write(spool.directory, "signal_20260119_021151", timestamp="2026-01-19T02:11:51",
+                    status="sending")
+
+        assert spool.migrate_json(resend=True) == 2
+        assert spool.counts()["pending"] == 2
+
+
+class TestPendingEndpoint:
+    """Tests for GET /api/notifications/pending."""
+
+    @pytest.fixture
+    def spooled(self, spool, monkeypatch):
+        d = notifications.NotificationDispatcher(spool, send=None)
+        monkeypatch.setattr(notifications, "dispatcher", d)
+        return spool
+
+    def test_pages_oldest_first(self, client, spooled):
+        ids = _add(spooled, 5)
+
+        first = client.get("/api/notifications/pending?limit=2").get_json()
+        second = client.get(f"/api/notifications/pending?limit=2&cursor={first['next_cursor']}").get_json()
+        third = client.get(f"/api/notifications/pending?limit=2&cursor={second['next_cursor']}").get_json()
+
+        assert first["count"] == 5
+        assert [n["id"] for n in first["pending"] + second["pending"] + third["pending"]] == ids
+        assert third["next_cursor"] is None
+        assert first["pending"][0]["signal_count"] == 1
+
+    def test_failed_listing(self, client, spooled):
+        message_id = _add(spooled, 2)[0]
+        spooled.claim_due()
+        spooled.mark_failed(message_id, "bad recipient")
+
+        body = client.get("/api/notifications/pending?status=failed").get_json()
+
+        assert body["count"] == 1
+        assert body["pending"][0]["last_error"] == "bad recipient"
+
+    def test_bad_status_is_400(self, client, spooled):
+        assert client.get("/api/notifications/pending?status=sent").status_code == 400
@@ -0,0 +1,204 @@
+"""
+Tests for the /api/stream Server-Sent Events feed.
+
+Run with: python -m pytest tests/test_stream.py -v
+"""
+import json
+
+import pytest
+
+from maven_api import stream
+
+
+@pytest.fixture
+def broker(monkeypatch):
+    """A broker that never opens a LISTEN connection; tests publish directly."""
+    b = stream.EventBroker(listen=False, max_clients=8)
+    monkeypatch.setattr(stream, "broker", b)
+    monkeypatch.setattr(stream, "REORDER_SECONDS", 0.01)
+    return b
+
+
+def _frames(chunks):
+    """Parse SSE chunks into [(id, event, data)], skipping comments and retry."""
+    frames = []
+    for chunk in chunks:
+        if isinstance(chunk, bytes):
+            chunk = chunk.decode()
+        fields = dict(line.split(": ", 1) for line in chunk.strip().split("\n")
+                      if not line.startswith(":") and not line.startswith("retry"))
+        if fields:
+            frames.append((fields["id"], fields["event"], json.loads(fields["data"])))
+    return frames
+
+
+def _open(client, path, **kwargs):
+    response = client.get(path, buffered=False, **kwargs)
+    return response, iter(response.response)
+
+
+class TestCursor:
+    """Tests for Last-Event-ID parsing."""
+
+    def test_round_trip(self):
+        cursor = {"treasury": 12, "signals": 40, "watchlist": 9001}
+        assert stream.format_cursor(cursor) == "t12.s40.w9001"
+        assert stream.parse_cursor("t12.s40.w9001") == cursor
+
+    @pytest.mark.parametrize("value", [None, "", "garbage", "t1.s2", "t1.s2.wX", "t1.s2.x3"])
+    def test_malformed_ids_start_fresh(self, value):
+        assert stream.parse_cursor(value) is None
+
+    def test_unknown_topic_rejected(self):
+        with pytest.raises(ValueError):
+            stream.parse_topics("signals,gossip")
+
+
+class TestBroker:
+    """Tests for in-process fan-out."""
+
+    def test_topic_and_coin_filters(self, broker):
+        btc = broker.subscribe(("signals",), coins={"BTC"})
+        treasury = broker.subscribe(("treasury",))
+
+        broker.publish("signals", {"id": 1, "coin": "ETH"})
+        broker.publish("signals", {"id": 2, "coin": "BTC"})
+        broker.publish("treasury", {"id": 7, "account_value_usd": 100.0})
+
+        assert btc.queue.get_nowait() == ("signals", {"id": 2, "coin": "BTC"})
+        assert btc.queue.empty()
+        assert treasury.queue.get_nowait()[1]["id"] == 7
+
+    def test_slow_client_is_closed(self, broker, monkeypatch):
+        monkeypatch.setattr(stream, "QUEUE_SIZE", 2)
+        sub = broker.subscribe(("signals",))
+
+        for i in range(5):
+            broker.publish("signals", {"id": i, "coin": "BTC"})
+
+        chunks = list(stream.event_stream(sub, {"treasury": 0, "signals": -1, "watchlist": 0}))
+        assert broker.stats()["dropped_clients"] == 1
+        assert broker.stats()["subscribers"] == 0
+        assert len(_frames(chunks)) == 1
+
+    def test_dispatch_ignores_malformed_payloads(self, broker):
+        sub = broker.subscribe(stream.TOPICS)
+        broker.dispatch("not json")
+        broker.dispatch(json.dumps({"topic": "gossip", "data": {"id": 1}}))
+        broker.dispatch(json.dumps({"topic": "watchlist", "data": {"id": 3, "coin": "SOL"}}))
+        assert sub.queue.get_nowait() == ("watchlist", {"id": 3, "coin": "SOL"})
+        assert sub.queue.empty()
+
+
+class TestStreamEndpoint:
+    """Tests for GET /api/stream."""
+
+    def test_fresh_client_gets_live_events(self, client, fake_db, broker):
+        fake_db.respond("MAX(id)", [(5, 10, 100)])
+
+        response, chunks = _open(client, "/api/stream?topics=signals")
+        assert response.status_code == 200
+        assert response.mimetype == "text/event-stream"
+        assert next(chunks).startswith(b"retry:")
+
+        broker.publish("signals", {"id": 11, "coin": "BTC", "signal_type": "buy"})
+        frames = _frames([next(chunks)])
+        response.close()
+
+        assert frames == [("t5.s11.w100", "signals", {"id": 11, "coin": "BTC", "signal_type": "buy"})]
+        assert broker.stats()["subscribers"] == 0
+
+    def test_resume_replays_backlog_then_skips_duplicates(self, client, fake_db, broker):
+        fake_db.respond("FROM maven_trading_signals", [
+            (11, "BTC", "ta_bot", "buy", 80, "breakout", None, None),
+            (12, "ETH", "ta_bot", "sell", 60, "rejection", None, None),
+        ])
+
+        response, chunks = _open(client, "/api/stream?topics=signals",
+                                 headers={"Last-Event-ID": "t5.s10.w100"})
+        next(chunks)
+        backlog = _frames([next(chunks), next(chunks)])
+
+        # A live duplicate of a replayed row is dropped; the next new row is sent
+        broker.publish("signals", {"id": 12, "coin": "ETH"})
+        broker.publish("signals", {"id": 13, "coin": "SOL"})
+        live = _frames([next(chunks)])
+        response.close()
+
+        assert [(i, d["id"], d["source"]) for i, _, d in backlog] == [
+            ("t5.s11.w100", 11, "ta_bot"), ("t5.s12.w100", 12, "ta_bot"),
+        ]
+        assert live == [("t5.s13.w100", "signals", {"id": 13, "coin": "SOL"})]
+        params = [p for sql, p in fake_db.executed if "FROM maven_trading_signals" in sql]
+        assert params == [(10, stream.BACKLOG_LIMIT)]
+
+    def test_events_committed_out_of_order_are_sent_in_id_order(self, client, fake_db, broker,
+                                                                monkeypatch):
+        monkeypatch.setattr(stream, "REORDER_SECONDS", 0.2)
+        fake_db.respond("MAX(id)", [(5, 10, 100)])
+        response, chunks = _open(client, "/api/stream?topics=signals")
+        next(chunks)
+
+        # id 12 was handed out first but its transaction committed second
+        broker.publish("signals", {"id": 13, "coin": "SOL"})
+        broker.publish("signals", {"id": 12, "coin": "ETH"})
+        in_window = _frames([next(chunks), next(chunks)])
+
+        # Committed after the window: still sent, without moving the cursor back
+        broker.publish("signals", {"id": 11, "coin": "BTC"})
+        broker.publish("signals", {"id": 13, "coin": "SOL"})
+        broker.publish("signals", {"id": 14, "coin": "BTC"})
+        late = _frames([next(chunks), next(chunks)])
+        response.close()
+
+        assert [(i, d["id"]) for i, _, d in in_window] == [("t5.s12.w100", 12), ("t5.s13.w100", 13)]
+        assert [(i, d["id"]) for i, _, d in late] == [("t5.s13.w100", 11), ("t5.s14.w100", 14)]
+
+    def test_connection_released_while_streaming(self, client, fake_db, broker):
+        from database import connection
+
+        fake_db.respond("MAX(id)", [(0, 0, 0)])
+        response, chunks = _open(client, "/api/stream")
+        next(chunks)
+
+        assert connection.get_pool_stats()["in_use"] == 0
+        response.close()
+
+    def test_streams_past_the_cap_get_503(self, client, fake_db, broker):
+        broker.max_clients = 1
+        fake_db.respond("MAX(id)", [(0, 0, 0)])
+        first, chunks = _open(client, "/api/stream")
+        next(chunks)
+
+        response = client.get("/api/stream")
+
+        assert response.status_code == 503
+        assert int(response.headers["Retry-After"]) >= 1
+        assert broker.stats()["rejected"] == 1
+        first.close()
+        assert broker.stats()["subscribers"] == 0
+
+    def test_failed_backlog_read_unsubscribes(self, client, fake_db, broker):
+        def fail(sql, params):
+            raise RuntimeError("backlog query failed")
+
+        fake_db.respond("FROM maven_trading_signals", fail)
+
+        response = client.get("/api/stream?topics=signals", headers={"Last-Event-ID": "t1.s1.w1"})
+
+        assert response.status_code == 500
+        assert broker.stats()["subscribers"] == 0
+
+    def test_stream_closed_before_first_chunk_unsubscribes(self, client, fake_db, broker):
+        fake_db.respond("MAX(id)", [(0, 0, 0)])
+        response = client.get("/api/stream", buffered=False)
+        assert broker.stats()["subscribers"] == 1
+
+        response.close()
+
+        assert broker.stats()["subscribers"] == 0
+
+    def test_unknown_topic_is_400(self, client, broker):
+        response = client.get("/api/stream?topics=gossip")
+        assert response.status_code == 400
+        assert broker.stats()["subscribers"] == 0